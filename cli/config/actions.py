@@ -25,6 +25,12 @@ ACTIONS: Dict[str, ActionInfo] = {
         level="info",
         format="🚀 工作流開始: {topic}",
     ),
+    "workflow_resume": ActionInfo(
+        name="工作流恢復",
+        description="由檢查點恢復中斷的工作流",
+        level="info",
+        format="⏯️ 工作流恢復: 從 {next_stage} 繼續 (迭代 {iteration})",
+    ),
     "stage_start": ActionInfo(
         name="階段開始",
         description="開始執行新階段",
@@ -55,6 +61,24 @@ ACTIONS: Dict[str, ActionInfo] = {
         level="error",
         format="❌ Agent 錯誤: {agent_id} - {reason}",
     ),
+    "agent_stats": ActionInfo(
+        name="Agent 統計",
+        description="階段內的 Agent 調用統計",
+        level="info",
+        format="📊 Agent 統計: {stage_id} - 快取命中 {cache_hits}, 未命中 {cache_misses}, JSON 修復 {json_repairs}/{json_parses}",
+    ),
+    "stage_early_completion": ActionInfo(
+        name="階段提前完成",
+        description="達到 quorum 或期限，取消其餘視角",
+        level="info",
+        format="⏱️ 提前完成: {stage_id} ({reason}) - 成功 {succeeded}, 取消 {cancelled}",
+    ),
+    "stage_reuse": ActionInfo(
+        name="重用視角結果",
+        description="視角輸入未變，重用先前的報告",
+        level="info",
+        format="♻️ 重用: {stage_id} - {reused} ({total} 個視角中)",
+    ),
     "file_write": ActionInfo(
         name="檔案寫入",
         description="寫入檔案",
@@ -91,6 +115,12 @@ ACTIONS: Dict[str, ActionInfo] = {
         level="error",
         format="❌ 工作流錯誤: {error}",
     ),
+    "workflow_cancelled": ActionInfo(
+        name="工作流取消",
+        description="工作流依要求在階段邊界停止，可由檢查點恢復",
+        level="warning",
+        format="⏹️ 工作流取消: 停在 {stage} 之前 (迭代 {iteration})",
+    ),
     "human_intervention": ActionInfo(
         name="人工介入",
         description="需要人工介入",
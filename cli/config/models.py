@@ -6,6 +6,7 @@ Pydantic 資料模型 - 定義所有資料結構
 - 階段相關模型
 - 工作流相關模型
 - 品質閘門相關模型
+- 佇列相關模型
 """
 
 from datetime import datetime
@@ -38,6 +39,7 @@ class AgentStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class WorkflowStatus(str, Enum):
@@ -49,6 +51,7 @@ class WorkflowStatus(str, Enum):
     FAILED = "failed"
     ROLLBACK = "rollback"
     HUMAN_INTERVENTION = "human_intervention"
+    CANCELLED = "cancelled"
 
 
 class WorkflowMode(str, Enum):
@@ -83,6 +86,8 @@ class AgentResponse(BaseModel):
     error: Optional[str] = Field(None, description="錯誤訊息")
     tokens_used: Optional[int] = Field(None, description="使用的 token 數")
     duration_seconds: Optional[float] = Field(None, description="執行時間（秒）")
+    cached: bool = Field(False, description="是否來自回應快取")
+    repaired: bool = Field(False, description="JSON 是否經過修復")
 
 
 class AgentState(BaseModel):
@@ -112,6 +117,22 @@ class StageConfig(BaseModel):
     perspectives: List[str] = Field(default_factory=list)
     gate_threshold: float = Field(75.0, description="品質閘門閾值")
     required_outputs: List[str] = Field(default_factory=list)
+    quorum: Optional[int] = Field(
+        None, description="成功視角達此數量即提前完成（None 表示等待全部）"
+    )
+    deadline_seconds: Optional[float] = Field(
+        None, description="視角執行期限（秒），逾時以已完成者繼續"
+    )
+    task_dag: bool = Field(
+        False, description="有任務 DAG（tasks.yaml）時依 DAG 執行任務，取代固定視角"
+    )
+    task_parallelism: int = Field(4, description="DAG 任務的最大並行數")
+    task_max_attempts: int = Field(2, description="單一任務的最大嘗試次數")
+    pipelined_synthesis: bool = Field(
+        False,
+        description="視角完成即分批發起部分綜合，最後在本地合併（選用；TASKS 階段不支援）",
+    )
+    synthesis_batch_size: int = Field(2, description="管線化綜合每批視角報告數")
 
 
 class StageState(BaseModel):
@@ -134,6 +155,41 @@ class StageResult(BaseModel):
     quality_score: Optional[float] = None
     errors: List[str] = Field(default_factory=list)
     duration_seconds: Optional[float] = None
+    perspectives_total: int = Field(0, description="啟動的視角數")
+    perspectives_succeeded: int = Field(0, description="成功的視角數")
+    perspectives_cancelled: List[str] = Field(
+        default_factory=list, description="提前完成時被取消的視角"
+    )
+    early_completion: Optional[str] = Field(
+        None, description="提前完成原因（quorum / deadline）"
+    )
+    quorum: Optional[int] = Field(None, description="要求的成功視角數")
+    perspectives_reused: List[str] = Field(
+        default_factory=list, description="輸入未變而重用先前結果的視角"
+    )
+    tasks_total: int = Field(0, description="DAG 任務數（0 表示未使用任務 DAG）")
+    tasks_completed: int = Field(0, description="完成的 DAG 任務數")
+    tasks_failed: List[str] = Field(default_factory=list, description="失敗的 DAG 任務")
+    tasks_skipped: List[str] = Field(
+        default_factory=list, description="因依賴失敗而略過的 DAG 任務"
+    )
+
+
+class TaskResult(BaseModel):
+    """DAG 任務執行結果"""
+
+    task_id: str
+    status: str = Field(..., description="completed / failed / skipped")
+    content: Optional[Dict[str, Any]] = Field(None, description="任務回報內容")
+    error: Optional[str] = None
+    attempts: int = Field(0, description="嘗試次數（0 表示未調用 Agent）")
+    duration_seconds: Optional[float] = None
+    blocked_by: Optional[str] = Field(None, description="略過時，導致略過的失敗任務")
+    reused: bool = Field(False, description="是否重用先前結果")
+
+    @property
+    def success(self) -> bool:
+        return self.status == "completed"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -177,6 +233,7 @@ class WorkflowConfig(BaseModel):
     start_from: Optional[StageID] = Field(None, description="從指定階段開始")
     skip_stages: List[StageID] = Field(default_factory=list, description="跳過的階段")
     max_iterations: int = Field(10, description="最大迭代次數")
+    priority: int = Field(1, description="佇列與排程優先級（越大越優先）")
 
 
 class WorkflowState(BaseModel):
@@ -204,6 +261,65 @@ class WorkflowResult(BaseModel):
     errors: List[str] = Field(default_factory=list)
 
 
+class BatchEntry(BaseModel):
+    """批次中的單一工作流"""
+
+    topic: str = Field(..., description="工作流主題/需求描述")
+    mode: WorkflowMode = Field(WorkflowMode.NORMAL, description="執行模式")
+    priority: int = Field(1, description="優先級（越大越先啟動，並作為排程權重）")
+    start_from: Optional[StageID] = Field(None, description="從指定階段開始")
+    skip_stages: List[StageID] = Field(default_factory=list, description="跳過的階段")
+
+    def to_config(self) -> WorkflowConfig:
+        """轉為工作流配置"""
+        return WorkflowConfig(
+            topic=self.topic,
+            mode=self.mode,
+            start_from=self.start_from,
+            skip_stages=self.skip_stages,
+            priority=self.priority,
+        )
+
+
+class BatchItemResult(BaseModel):
+    """批次中單一工作流的執行結果"""
+
+    entry: BatchEntry
+    workflow_id: Optional[str] = None
+    result: Optional[WorkflowResult] = None
+    error: Optional[str] = Field(None, description="工作流無法建立時的錯誤")
+
+    @property
+    def success(self) -> bool:
+        return self.result is not None and self.result.success
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 佇列模型
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class QueueJob(BaseModel):
+    """持久化佇列中的工作（工作流 / 階段 / 視角）"""
+
+    id: int
+    kind: str = Field(..., description="workflow / stage / perspective")
+    workflow_id: str
+    key: str = Field("", description="種類內的識別（階段 ID、視角 ID）")
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    priority: int = 1
+    submitter: str = ""
+    status: str = Field(..., description="queued / leased / done / failed / cancelled")
+    attempts: int = 0
+    max_attempts: int = 3
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 視角模型
 # ─────────────────────────────────────────────────────────────────────────────
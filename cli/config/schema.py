@@ -227,6 +227,41 @@ TASKS_SCHEMA: Dict[str, Any] = {
 }
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# 任務實作計畫回報 Schema
+# ─────────────────────────────────────────────────────────────────────────────
+
+TASK_RESULT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["task_id", "status", "summary"],
+    "properties": {
+        "task_id": {"type": "string"},
+        "status": {
+            "type": "string",
+            "enum": ["planned", "blocked"],
+            "description": "blocked 表示無法規劃（視為任務失敗）",
+        },
+        "summary": {"type": "string"},
+        "file_changes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["path", "change"],
+                "properties": {
+                    "path": {"type": "string"},
+                    "change": {"type": "string"},
+                },
+            },
+        },
+        "test_plan": {
+            "type": "array",
+            "items": {"type": "string"},
+        },
+        "notes": {"type": "string"},
+    },
+}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 審查報告 Schema
 # ─────────────────────────────────────────────────────────────────────────────
@@ -328,6 +363,7 @@ SCHEMAS: Dict[str, Dict[str, Any]] = {
     "perspective_report": PERSPECTIVE_REPORT_SCHEMA,
     "synthesis_report": SYNTHESIS_REPORT_SCHEMA,
     "tasks": TASKS_SCHEMA,
+    "task_result": TASK_RESULT_SCHEMA,
     "review_report": REVIEW_REPORT_SCHEMA,
     "verification_report": VERIFICATION_REPORT_SCHEMA,
 }
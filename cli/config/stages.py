@@ -26,6 +26,9 @@ STAGES: Dict[StageID, StageConfig] = {
         ],
         gate_threshold=70.0,
         required_outputs=["synthesis.md"],
+        # 研究視角互補性高，4 取 3 即足以綜合
+        quorum=3,
+        deadline_seconds=900.0,
     ),
     StageID.PLAN: StageConfig(
         id=StageID.PLAN,
@@ -64,6 +67,8 @@ STAGES: Dict[StageID, StageConfig] = {
         ],
         gate_threshold=80.0,
         required_outputs=["implementation.md"],
+        # TASKS 產出 tasks.yaml 時依 DAG 並行執行任務
+        task_dag=True,
     ),
     StageID.REVIEW: StageConfig(
         id=StageID.REVIEW,
@@ -77,6 +82,8 @@ STAGES: Dict[StageID, StageConfig] = {
         ],
         gate_threshold=75.0,
         required_outputs=["review-summary.md"],
+        # 每個審查視角都可能發現 BLOCKER，不設 quorum，只限制等待時間
+        deadline_seconds=900.0,
     ),
     StageID.VERIFY: StageConfig(
         id=StageID.VERIFY,
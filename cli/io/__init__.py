@@ -3,7 +3,15 @@ I/O 模組 - 讀寫層
 
 包含：
 - memory.py: Memory 讀寫
+- catalog.py: 工作流目錄索引（SQLite）
+- doc_cache.py: 已解析文件快取（唯讀視圖）
 - logging.py: Action Log
-- state.py: 即時狀態追蹤
+- log_writer.py: JSONL 批次寫入器（持久檔案控制代碼、背景寫入）
+- log_index.py: Action Log 索引（SQLite，篩選與分頁查詢）
+- log_segments.py: JSONL 日誌分段（輪替、壓縮、跨分段讀取）
+- action_store.py: Action 分析儲存（欄位式陣列、增量匯入、跨工作流彙整）
+- state.py: 即時狀態追蹤（current.json 快照 + state.jsonl 事件日誌）
+- cache.py: Agent 回應快取
+- job_queue.py: 持久化工作佇列（SQLite）
 - report.py: 報告生成
 """
@@ -0,0 +1,544 @@
+"""
+Action 分析儲存 - 以欄位式陣列彙整所有工作流的 actions.jsonl
+
+儲存位置（root 目錄）：
+- meta.json        列數、字串字典、各來源日誌的匯入進度（提交點：最後以原子方式寫入）
+- <column>.bin     各欄位的 array 資料（只追加）
+
+欄位：
+- ts            float64  Unix 時間（秒）
+- workflow / stage / agent / tool / status
+                uint32   字典編碼的字串（代碼對應 meta.json 的字典）
+- duration_ms   int64    執行時間（毫秒，-1 表示未記錄）
+
+特性：
+- 增量匯入：記住每個來源的寫入中分段 inode 與位元組偏移量，只解析新追加的行；
+  已輪替的分段（log_segments.py）各匯入一次，不重複計算輪替前已匯入的部分
+- 彙整直接在欄位陣列上計算（整數代碼分組），不需逐行解析 JSON：
+  依 tool / agent / stage 等分組的次數、失敗率、百分位數與時間分桶直方圖
+- 每個字串欄位維護各代碼的列索引（postings，匯入時追加、載入時重建），
+  篩選從最少列的條件開始，不篩選時的分組直接取用 postings，不需走訪所有列
+- root 為 None 時只保存在記憶體（單次查詢）
+- hook 與 tool 腳本格式（tool / status / duration_ms）與 ActionLogger 格式
+  （action / level / details）都會正規化為相同欄位
+
+本模組只使用標準函式庫，shared/tools 的獨立腳本也可直接匯入。
+"""
+
+import heapq
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .log_segments import closed_segments, iter_lines, iter_segment_lines
+
+
+# 字串欄位（字典編碼）與數值欄位
+STRING_COLUMNS = ("workflow", "stage", "agent", "tool", "status")
+NUMERIC_COLUMNS = {"ts": "d", "duration_ms": "q"}
+COLUMNS = ("ts", *STRING_COLUMNS, "duration_ms")
+
+# 失敗狀態
+FAILED_STATUSES = frozenset({"failed", "timeout", "error"})
+
+# 預設百分位數
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+STORE_VERSION = 1
+
+# hook 腳本（scripts/hooks/log_action.py）寫入的日誌根目錄，與 action-log-viewer 相同
+HOOK_LOG_DIR = Path(".claude/workflow")
+
+
+def _typecode(column: str) -> str:
+    return NUMERIC_COLUMNS.get(column, "I")
+
+
+def parse_timestamp(value: Any) -> float:
+    """ISO 8601 時間 → Unix 秒（無時區時視為本地時間；無法解析時為 0）"""
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def normalize_record(record: Dict[str, Any]) -> Tuple[float, str, str, str, str, str, int]:
+    """
+    記錄 → 欄位值
+
+    hook 記錄：tool / status / duration_ms / stage / agent_id
+    ActionLogger 記錄：action → tool，level == error → failed，
+    details.stage_id / stage、details.agent_id、details.duration_seconds
+    """
+    details = record.get("details") if isinstance(record.get("details"), dict) else {}
+
+    status = record.get("status")
+    if not status:
+        if "success" in details:
+            status = "success" if details["success"] else "failed"
+        else:
+            status = "failed" if record.get("level") == "error" else "success"
+
+    duration = record.get("duration_ms")
+    if duration is None and details.get("duration_seconds") is not None:
+        duration = details["duration_seconds"] * 1000
+    try:
+        duration_ms = int(duration) if duration is not None else -1
+    except (TypeError, ValueError):
+        duration_ms = -1
+
+    return (
+        parse_timestamp(record.get("timestamp")),
+        str(record.get("workflow_id") or ""),
+        str(record.get("stage") or details.get("stage_id") or details.get("stage") or "").upper(),
+        str(record.get("agent_id") or details.get("agent_id") or ""),
+        str(record.get("tool") or record.get("action") or ""),
+        str(status),
+        duration_ms,
+    )
+
+
+def hook_log_dirs() -> List[Path]:
+    """hook 日誌的根目錄：專案與家目錄的 .claude/workflow"""
+    return [HOOK_LOG_DIR, Path.home() / HOOK_LOG_DIR]
+
+
+def find_action_logs(bases: Optional[Iterable[Union[str, Path]]] = None) -> List[Path]:
+    """
+    尋找 bases 下所有 logs/actions.jsonl（寫入中分段，已輪替分段由 ingest 處理）
+
+    Args:
+        bases: 搜尋的根目錄（None 表示 hook_log_dirs()）
+
+    Returns:
+        去除重複後依路徑排序的日誌
+    """
+    if bases is None:
+        bases = hook_log_dirs()
+    found: Dict[Path, Path] = {}
+    for base in bases:
+        base = Path(base)
+        if base.is_dir():
+            for path in base.glob("**/logs/actions.jsonl"):
+                found.setdefault(path.resolve(), path)
+    return sorted(found.values())
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> Optional[float]:
+    """線性內插的百分位數（sorted_values 須已排序）"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    if lo == hi:
+        return float(sorted_values[lo])
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class ActionStore:
+    """欄位式 Action 分析儲存"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        """
+        初始化分析儲存（root 存在時載入既有資料）
+
+        Args:
+            root: 儲存目錄（None 表示只保存在記憶體）
+        """
+        self.root = Path(root) if root else None
+        self._lock = threading.RLock()
+        self._reset()
+        if self.root is not None:
+            self._load()
+
+    def _reset(self) -> None:
+        self.columns: Dict[str, array] = {c: array(_typecode(c)) for c in COLUMNS}
+        self.dictionaries: Dict[str, List[str]] = {c: [] for c in STRING_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {c: {} for c in STRING_COLUMNS}
+        # 欄位 → 代碼 → 該代碼的列索引（遞增）
+        self._postings: Dict[str, List[array]] = {c: [] for c in STRING_COLUMNS}
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self._persisted_rows = 0
+
+    def __len__(self) -> int:
+        return len(self.columns["ts"])
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 載入與保存
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.root / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == STORE_VERSION else None
+
+    def _load(self) -> None:
+        meta = self._read_meta()
+        if meta is None:
+            return
+
+        rows = int(meta.get("rows", 0))
+        columns = {}
+        for column in COLUMNS:
+            data = array(_typecode(column))
+            try:
+                with open(self.root / f"{column}.bin", "rb") as f:
+                    # 只讀取已提交的列（追加到一半的資料在 meta 之後，忽略）
+                    data.fromfile(f, rows)
+            except (OSError, EOFError):
+                return
+            if meta.get("byteorder", sys.byteorder) != sys.byteorder:
+                data.byteswap()
+            columns[column] = data
+
+        self.columns = columns
+        self.dictionaries = {c: list(meta["dictionaries"].get(c, [])) for c in STRING_COLUMNS}
+        self._codes = {c: {v: i for i, v in enumerate(d)} for c, d in self.dictionaries.items()}
+        self._postings = {c: self._build_postings(c) for c in STRING_COLUMNS}
+        self.sources = meta.get("sources", {})
+        self._persisted_rows = rows
+
+    def _build_postings(self, column: str) -> List[array]:
+        postings = [array("I") for _ in self.dictionaries[column]]
+        for row, code in enumerate(self.columns[column]):
+            postings[code].append(row)
+        return postings
+
+    def save(self) -> bool:
+        """
+        追加新的列並寫入 meta（root 為 None 時略過）
+
+        Returns:
+            是否保存；其他程序已在之後保存時為 False（呼叫端應重新載入）
+        """
+        if self.root is None:
+            return True
+        with self._lock:
+            meta = self._read_meta()
+            if int(meta["rows"] if meta else 0) != self._persisted_rows:
+                return False
+            self.root.mkdir(parents=True, exist_ok=True)
+            rows = len(self)
+            for column in COLUMNS:
+                path = self.root / f"{column}.bin"
+                itemsize = self.columns[column].itemsize
+                with open(path, "ab") as f:
+                    # 截掉上次未提交的資料後追加
+                    f.truncate(self._persisted_rows * itemsize)
+                    f.seek(self._persisted_rows * itemsize)
+                    self.columns[column][self._persisted_rows:rows].tofile(f)
+
+            meta = {
+                "version": STORE_VERSION,
+                "rows": rows,
+                "byteorder": sys.byteorder,
+                "dictionaries": self.dictionaries,
+                "sources": self.sources,
+            }
+            tmp = self.root / f".meta.json.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp, self.root / "meta.json")
+            self._persisted_rows = rows
+            return True
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 匯入
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _encode(self, column: str, value: str) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.dictionaries[column])
+            self.dictionaries[column].append(value)
+            self._postings[column].append(array("I"))
+        return code
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """追加一筆記錄"""
+        ts, workflow, stage, agent, tool, status, duration_ms = normalize_record(record)
+        with self._lock:
+            row = len(self)
+            for column, value in zip(STRING_COLUMNS, (workflow, stage, agent, tool, status)):
+                code = self._encode(column, value)
+                self.columns[column].append(code)
+                self._postings[column][code].append(row)
+            self.columns["ts"].append(ts)
+            self.columns["duration_ms"].append(duration_ms)
+
+    def _append_lines(self, lines: Iterable[Tuple[int, bytes]]) -> Tuple[int, int]:
+        """追加 JSONL 行；回傳 (追加的記錄數, 最後一個完整行之後的偏移量)"""
+        added = end = 0
+        for offset, line in lines:
+            end = offset + len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                self.append(record)
+                added += 1
+        return added, end
+
+    def ingest(self, log_path: Union[str, Path]) -> int:
+        """
+        增量匯入單一日誌（含已輪替的分段）
+
+        Args:
+            log_path: 寫入中的分段路徑（actions.jsonl）
+
+        Returns:
+            新匯入的記錄數
+        """
+        log_path = Path(log_path)
+        key = str(log_path.resolve())
+        with self._lock:
+            source = self.sources.get(key, {"segments": [], "inode": None, "offset": 0})
+            try:
+                st = os.stat(log_path)
+            except OSError:
+                st = None
+            inode = st.st_ino if st else None
+            rotated = source["inode"] is not None and source["inode"] != inode
+            added = 0
+
+            # 新出現的已關閉分段：第一個是上次匯入時的寫入中分段，略過已匯入的部分
+            done = set(source["segments"])
+            new = [(n, p) for n, p in closed_segments(log_path) if n not in done]
+            for i, (number, segment) in enumerate(new):
+                skip = source["offset"] if rotated and i == 0 else 0
+                try:
+                    lines = ((o, line) for o, line in iter_segment_lines(segment) if o >= skip)
+                    added += self._append_lines(lines)[0]
+                except FileNotFoundError:
+                    continue
+                source["segments"].append(number)
+            if rotated or st is None or st.st_size < source["offset"]:
+                source["offset"] = 0
+
+            if st is not None and st.st_size > source["offset"]:
+                with open(log_path, "rb") as f:
+                    f.seek(source["offset"])
+                    count, end = self._append_lines(iter_lines(f))
+                added += count
+                source["offset"] += end
+            source["inode"] = inode
+            self.sources[key] = source
+            return added
+
+    def ingest_many(self, log_paths: Iterable[Union[str, Path]]) -> int:
+        """匯入多個日誌並保存（其他程序同時保存時重新載入後再匯入一次）"""
+        log_paths = list(log_paths)
+        with self._lock:
+            added = sum(self.ingest(p) for p in log_paths)
+            if added and not self.save():
+                self._reset()
+                self._load()
+                added = sum(self.ingest(p) for p in log_paths)
+                self.save()
+            return added
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _code_set(self, column: str, value: Optional[Union[str, Sequence[str]]]) -> Optional[set]:
+        if value is None:
+            return None
+        values = [value] if isinstance(value, str) else list(value)
+        if column == "stage":
+            values = [v.upper() for v in values]
+        codes = self._codes[column]
+        return {codes[v] for v in values if v in codes}
+
+    def _posting_rows(self, column: str, codes: Iterable[int]) -> Sequence[int]:
+        """多個代碼的列索引（遞增）"""
+        postings = [self._postings[column][code] for code in codes]
+        if len(postings) == 1:
+            return postings[0]
+        return sorted(itertools.chain.from_iterable(postings))
+
+    def select(
+        self,
+        workflow: Optional[Union[str, Sequence[str]]] = None,
+        stage: Optional[Union[str, Sequence[str]]] = None,
+        agent: Optional[Union[str, Sequence[str]]] = None,
+        tool: Optional[Union[str, Sequence[str]]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        failed: bool = False,
+        since: Optional[float] = None,
+        min_duration_ms: Optional[int] = None,
+    ) -> List[int]:
+        """
+        篩選列（比較整數代碼，不解碼字串）
+
+        Args:
+            workflow / stage / agent / tool / status: 欄位值（單一或多個）
+            failed: 只包含失敗狀態
+            since: 只包含此 Unix 時間之後的列
+            min_duration_ms: 只包含執行時間至少此毫秒數的列
+
+        Returns:
+            列索引
+        """
+        if failed:
+            status = [s for s in self.dictionaries["status"] if s in FAILED_STATUSES]
+        filters = []
+        for column, value in (
+            ("workflow", workflow), ("stage", stage), ("agent", agent),
+            ("tool", tool), ("status", status),
+        ):
+            codes = self._code_set(column, value)
+            if codes is None:
+                continue
+            if not codes:
+                return []
+            size = sum(len(self._postings[column][code]) for code in codes)
+            filters.append((size, column, codes))
+
+        rows: Iterable[int] = range(len(self))
+        if filters:
+            # 從列數最少的條件的 postings 開始，其餘條件只檢查這些列
+            filters.sort(key=lambda f: f[0])
+            _, column, codes = filters[0]
+            rows = self._posting_rows(column, codes)
+            for _, column, codes in filters[1:]:
+                data = self.columns[column]
+                rows = [i for i in rows if data[i] in codes]
+        if since is not None:
+            ts = self.columns["ts"]
+            rows = [i for i in rows if ts[i] >= since]
+        if min_duration_ms is not None:
+            durations = self.columns["duration_ms"]
+            rows = [i for i in rows if durations[i] >= min_duration_ms]
+        return list(rows)
+
+    def _groups(self, by: str, rows: Optional[Sequence[int]]) -> Dict[int, Sequence[int]]:
+        if rows is None:
+            return {code: posting for code, posting in enumerate(self._postings[by]) if posting}
+        data = self.columns[by]
+        groups: Dict[int, List[int]] = {}
+        for i in rows:
+            groups.setdefault(data[i], []).append(i)
+        return groups
+
+    def count_by(self, by: str, rows: Optional[Sequence[int]] = None) -> Dict[str, int]:
+        """依欄位分組計數"""
+        names = self.dictionaries[by]
+        return {names[code]: len(members) for code, members in self._groups(by, rows).items()}
+
+    def failure_rates(self, by: str, rows: Optional[Sequence[int]] = None) -> Dict[str, Dict[str, Any]]:
+        """依欄位分組的次數、失敗數、失敗率與總執行時間"""
+        names = self.dictionaries[by]
+        data, durations = self.columns[by], self.columns["duration_ms"]
+
+        # 失敗數：只走訪失敗狀態的 postings
+        failed_codes = self._code_set("status", list(FAILED_STATUSES)) or set()
+        selected = None if rows is None else set(rows)
+        failed: Dict[int, int] = {}
+        for i in self._posting_rows("status", failed_codes) if failed_codes else ():
+            if selected is None or i in selected:
+                failed[data[i]] = failed.get(data[i], 0) + 1
+
+        result = {}
+        for code, members in self._groups(by, rows).items():
+            result[names[code]] = {
+                "count": len(members),
+                "failed": failed.get(code, 0),
+                "failure_rate": round(failed.get(code, 0) / len(members), 4),
+                "total_ms": sum(durations[i] for i in members if durations[i] >= 0),
+            }
+        return result
+
+    def percentiles(
+        self,
+        by: str,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        rows: Optional[Sequence[int]] = None,
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """依欄位分組的執行時間百分位數（忽略未記錄執行時間的列）"""
+        names = self.dictionaries[by]
+        durations = self.columns["duration_ms"]
+        result = {}
+        for code, members in self._groups(by, rows).items():
+            values = sorted(durations[i] for i in members if durations[i] >= 0)
+            stats: Dict[str, Optional[float]] = {"count": len(values)}
+            for p in percentiles:
+                stats[f"p{p:g}"] = percentile(values, p)
+            result[names[code]] = stats
+        return result
+
+    def histogram(
+        self,
+        bucket_seconds: float,
+        rows: Optional[Sequence[int]] = None,
+        by: Optional[str] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        時間分桶直方圖
+
+        Args:
+            bucket_seconds: 分桶寬度（秒）
+            rows: 列索引（None 表示全部）
+            by: 每個分桶內再依此欄位分組（None 表示只計總數）
+
+        Returns:
+            {分桶起點 ISO 時間: {分組值或 "total": 次數}}
+        """
+        ts = self.columns["ts"]
+        data = self.columns[by] if by else None
+        names = self.dictionaries[by] if by else None
+        buckets: Dict[int, Dict[str, int]] = {}
+        for i in range(len(self)) if rows is None else rows:
+            counts = buckets.setdefault(int(ts[i] // bucket_seconds), {})
+            key = names[data[i]] if by else "total"
+            counts[key] = counts.get(key, 0) + 1
+        return {
+            datetime.fromtimestamp(bucket * bucket_seconds).isoformat(): counts
+            for bucket, counts in sorted(buckets.items())
+        }
+
+    def summary(self, rows: Optional[Sequence[int]] = None, top: int = 10) -> Dict[str, Any]:
+        """整體統計（與 action-log-viewer --stats 相同的結構，另含百分位數）"""
+        total = len(self) if rows is None else len(rows)
+        if not total:
+            return {"total": 0}
+        durations = self.columns["duration_ms"]
+        if rows is None:
+            total_ms = sum(d for d in durations if d >= 0)
+            slowest = heapq.nlargest(top, range(total), key=durations.__getitem__)
+        else:
+            total_ms = sum(durations[i] for i in rows if durations[i] >= 0)
+            slowest = heapq.nlargest(top, rows, key=durations.__getitem__)
+        tools, agents = self.dictionaries["tool"], self.dictionaries["agent"]
+        return {
+            "total": total,
+            "by_status": self.count_by("status", rows),
+            "by_tool": self.failure_rates("tool", rows),
+            "by_stage": self.failure_rates("stage", rows),
+            "by_agent": self.count_by("agent", rows),
+            "total_duration_sec": round(total_ms / 1000, 2),
+            "avg_duration_ms": round(total_ms / total, 2),
+            "percentiles_by_tool": self.percentiles("tool", rows=rows),
+            "top_10_slowest": [
+                {
+                    "duration_ms": max(durations[i], 0),
+                    "tool": tools[self.columns["tool"][i]],
+                    "agent": agents[self.columns["agent"][i]],
+                }
+                for i in slowest
+            ],
+        }
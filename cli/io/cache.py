@@ -0,0 +1,257 @@
+"""
+Agent 回應快取 - 以內容定址的磁碟快取
+
+快取位置：.claude/memory/cache/responses/<key[:2]>/<key>.json
+
+特性：
+- Key = sha256(prompt + 模型 + 允許工具 + 輸出格式 + 輸入檔案內容摘要)
+  （呼叫端排除 prompt 中的工作流 ID 與迭代次數，見 orchestrator/fingerprint.py）
+- 依最近使用時間（LRU）淘汰，受筆數、總大小與 TTL 限制
+- 命中時更新 mtime 作為最近使用時間，重啟後仍保有 LRU 順序
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from .memory import get_memory
+
+
+# 預設上限
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 7 天
+
+
+class ResponseCache:
+    """Agent 回應快取"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+    ):
+        """
+        初始化回應快取
+
+        Args:
+            cache_dir: 快取目錄（預設為 .claude/memory/cache/responses）
+            max_entries: 最大筆數
+            max_bytes: 最大總大小（bytes）
+            ttl_seconds: 存活時間（None 表示不過期）
+        """
+        if cache_dir:
+            self.cache_dir = Path(cache_dir)
+        else:
+            self.cache_dir = get_memory().base_path / "cache" / "responses"
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # key -> (size, last_used)，依最近使用排序（最舊在前）
+        self._index: Optional["OrderedDict[str, Tuple[int, float]]"] = None
+        self._total_bytes = 0
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Key
+    # ─────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model: str,
+        tools: Iterable[str],
+        output_format: str = "json",
+        inputs: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        計算快取 Key
+
+        Args:
+            prompt: prompt（含系統指令與上下文）
+            model: 模型名稱
+            tools: 允許的工具
+            output_format: 輸出格式
+            inputs: Agent 可讀取的輸入檔案內容摘要（{名稱: sha256}）
+
+        Returns:
+            sha256 十六進位字串
+        """
+        h = hashlib.sha256()
+        for part in (model, ",".join(tools), output_format, prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        if inputs:
+            h.update(json.dumps(inputs, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 索引
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _load_index(self) -> "OrderedDict[str, Tuple[int, float]]":
+        """掃描快取目錄建立 LRU 索引（僅首次）"""
+        if self._index is not None:
+            return self._index
+
+        entries = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, path.stem, st.st_size))
+
+        entries.sort()
+        self._index = OrderedDict((key, (size, mtime)) for mtime, key, size in entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+        return self._index
+
+    def _drop(self, key: str) -> None:
+        """移除單筆（索引與檔案）"""
+        index = self._load_index()
+        size, _ = index.pop(key, (0, 0.0))
+        self._total_bytes -= size
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _is_expired(self, last_used: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - last_used > self.ttl_seconds
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 讀寫
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        讀取快取
+
+        Args:
+            key: 快取 Key
+
+        Returns:
+            快取內容（未命中或過期時為 None）
+        """
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+
+            now = time.time()
+            if self._is_expired(entry[1], now):
+                self._drop(key)
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                os.utime(path, (now, now))
+            except (OSError, ValueError):
+                self._drop(key)
+                return None
+
+            index[key] = (entry[0], now)
+            index.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: Dict[str, Any]) -> bool:
+        """
+        寫入快取（原子寫入後依上限淘汰）
+
+        Args:
+            key: 快取 Key
+            data: 可 JSON 序列化的內容
+
+        Returns:
+            是否成功
+        """
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return False
+
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_bytes(payload)
+                os.replace(tmp, path)
+            except OSError:
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+                return False
+
+            old_size, _ = index.pop(key, (0, 0.0))
+            self._total_bytes += len(payload) - old_size
+            index[key] = (len(payload), time.time())
+            self._evict()
+            return True
+
+    def _evict(self) -> None:
+        """淘汰過期與最久未使用的項目"""
+        index = self._load_index()
+        now = time.time()
+
+        for key in [k for k, (_, used) in index.items() if self._is_expired(used, now)]:
+            self._drop(key)
+
+        while index and (
+            len(index) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(index))
+            self._drop(oldest)
+
+    def invalidate(self, key: str) -> None:
+        """移除單筆快取"""
+        with self._lock:
+            self._drop(key)
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._drop(key)
+
+    def get_info(self) -> Dict[str, Any]:
+        """取得快取使用狀況"""
+        with self._lock:
+            index = self._load_index()
+            return {
+                "entries": len(index),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# 全域實例
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """取得全域回應快取"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
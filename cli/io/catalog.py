@@ -0,0 +1,281 @@
+"""
+工作流目錄索引 - 以 SQLite 索引 workflows/*/meta.yaml
+
+索引位置：.claude/memory/catalog.db（WAL 模式，僅用標準函式庫 sqlite3）
+
+特性：
+- MemoryManager 建立工作流與寫回 meta 時更新索引，
+  list / current 只需一次索引查詢，不再逐一解析 meta.yaml
+- 依狀態、日期、主題、ID 篩選並分頁（依建立時間由新到舊）
+- 索引不存在時由磁碟重建；workflows/ 目錄的 mtime 與記錄不同時
+  （其他程序新增或刪除了工作流目錄）只補入新增、移除已刪除的工作流
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_workflows_created ON workflows (created_at);
+CREATE INDEX IF NOT EXISTS idx_workflows_status ON workflows (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_workflows_date ON workflows (date, created_at);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 讀取 meta.yaml 的函式（由 MemoryManager 提供）
+MetaReader = Callable[[Path], Optional[Dict[str, Any]]]
+
+
+class WorkflowCatalog:
+    """SQLite 工作流目錄索引"""
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        workflows_dir: Union[str, Path],
+        read_meta: MetaReader,
+    ):
+        """
+        初始化目錄索引
+
+        Args:
+            db_path: 資料庫路徑
+            workflows_dir: 工作流根目錄（workflows/）
+            read_meta: 讀取 meta.yaml 的函式（重建索引時使用）
+        """
+        self.db_path = Path(db_path)
+        self.workflows_dir = Path(workflows_dir)
+        self.read_meta = read_meta
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        fresh = not self.db_path.exists()
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+        if fresh:
+            self.rebuild()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """開啟連線（交易結束時提交並關閉）"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 更新
+    # ─────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, workflow_id: str, meta: Dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO workflows"
+            " (id, topic, status, date, created_at, updated_at, meta)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                workflow_id,
+                str(meta.get("topic") or ""),
+                str(meta.get("status") or ""),
+                str(meta.get("date") or "")[:10],
+                str(meta.get("created_at") or ""),
+                str(meta["updated_at"]) if meta.get("updated_at") else None,
+                json.dumps(meta, ensure_ascii=False, default=str),
+            ),
+        )
+
+    def _dir_mtime(self) -> str:
+        try:
+            return str(os.stat(self.workflows_dir).st_mtime_ns)
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _set_mtime(conn: sqlite3.Connection, mtime: str) -> None:
+        conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('dir_mtime', ?)", (mtime,))
+
+    def upsert(self, workflow_id: str, meta: Dict[str, Any], created: bool = False) -> None:
+        """
+        新增或更新工作流
+
+        Args:
+            workflow_id: 工作流 ID
+            meta: meta 文件
+            created: 是否剛建立工作流目錄（同步記錄目錄 mtime，避免下次查詢重新掃描）
+        """
+        with self._connect() as conn:
+            self._upsert(conn, workflow_id, meta)
+            if created:
+                self._set_mtime(conn, self._dir_mtime())
+
+    def upsert_many(self, metas: Dict[str, Dict[str, Any]]) -> None:
+        """在單一交易內更新多個工作流"""
+        if not metas:
+            return
+        with self._connect() as conn:
+            for workflow_id, meta in metas.items():
+                self._upsert(conn, workflow_id, meta)
+
+    def remove(self, workflow_id: str) -> None:
+        """移除工作流"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
+
+    def rebuild(self) -> int:
+        """
+        由磁碟重建整個索引
+
+        Returns:
+            索引的工作流數
+        """
+        mtime = self._dir_mtime()
+        metas = self._scan(self._dir_names())
+        with self._connect() as conn:
+            conn.execute("DELETE FROM workflows")
+            for workflow_id, meta in metas.items():
+                self._upsert(conn, workflow_id, meta)
+            self._set_mtime(conn, mtime)
+        return len(metas)
+
+    def sync(self) -> bool:
+        """
+        workflows/ 目錄有變動時同步索引（只解析新增的工作流）
+
+        Returns:
+            是否進行了同步
+        """
+        mtime = self._dir_mtime()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM state WHERE key = 'dir_mtime'").fetchone()
+            if row is not None and row["value"] == mtime:
+                return False
+            indexed = {r["id"] for r in conn.execute("SELECT id FROM workflows")}
+
+        on_disk = set(self._dir_names())
+        added = self._scan(sorted(on_disk - indexed))
+        with self._connect() as conn:
+            for workflow_id in indexed - on_disk:
+                conn.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
+            for workflow_id, meta in added.items():
+                self._upsert(conn, workflow_id, meta)
+            self._set_mtime(conn, mtime)
+        return True
+
+    def _dir_names(self) -> List[str]:
+        if not self.workflows_dir.exists():
+            return []
+        return [d.name for d in self.workflows_dir.iterdir() if d.is_dir()]
+
+    def _scan(self, workflow_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        metas = {}
+        for workflow_id in workflow_ids:
+            meta = self.read_meta(self.workflows_dir / workflow_id / "meta.yaml")
+            if meta:
+                metas[workflow_id] = meta
+        return metas
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _where(
+        status: Optional[Union[str, Sequence[str]]],
+        date: Optional[str],
+        topic: Optional[str],
+        id_contains: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status:
+            statuses = [status] if isinstance(status, str) else list(status)
+            clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if date:
+            clauses.append("date = ?")
+            params.append(date)
+        if topic:
+            clauses.append("topic LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(topic)}%")
+        if id_contains:
+            clauses.append("id LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(id_contains)}%")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        date: Optional[str] = None,
+        topic: Optional[str] = None,
+        id_contains: Optional[str] = None,
+        limit: Optional[int] = 10,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        查詢工作流（依建立時間由新到舊）
+
+        Args:
+            status: 狀態（單一或多個）
+            date: 建立日期（YYYY-MM-DD）
+            topic: 主題包含的文字
+            id_contains: ID 包含的文字
+            limit: 筆數上限（None 表示不限）
+            offset: 略過的筆數
+
+        Returns:
+            meta 文件列表
+        """
+        self.sync()
+        where, params = self._where(status, date, topic, id_contains)
+        sql = f"SELECT meta FROM workflows{where} ORDER BY created_at DESC, id DESC"
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [json.loads(row["meta"]) for row in rows]
+
+    def count(
+        self,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        date: Optional[str] = None,
+        topic: Optional[str] = None,
+        id_contains: Optional[str] = None,
+    ) -> int:
+        """符合條件的工作流數"""
+        self.sync()
+        where, params = self._where(status, date, topic, id_contains)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM workflows{where}", params).fetchone()[0]
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
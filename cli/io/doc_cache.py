@@ -0,0 +1,184 @@
+"""
+文件快取 - 已解析的 JSON / YAML / JSONL 文件的程序內快取
+
+- 以路徑為 key，(mtime_ns, size, inode) 驗證：檔案被改寫（包含 rename 取代）即重新解析
+- LRU，同時限制項目數與檔案總位元組數
+- 快取內容凍結為唯讀視圖（FrozenDict / tuple）：多個呼叫端共用同一份資料，
+  不需防禦性深複製；需要修改時以 thaw() 取得可變副本
+- 執行緒安全
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, Union
+
+import yaml
+
+
+# 有 libyaml 時自動使用 C 實作
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CDumper", yaml.Dumper)
+
+# 預設上限
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 檔案識別：(mtime_ns, size, inode)
+Stamp = Tuple[int, int, int]
+
+
+class FrozenDict(dict):
+    """唯讀 dict（仍為 dict 子類別，可直接 json.dumps）"""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("cached document is read-only; use thaw() for a mutable copy")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenDict":
+        return self
+
+    def __reduce__(self) -> Any:
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """轉為唯讀視圖（dict → FrozenDict，list → tuple）"""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """取得可變副本（FrozenDict → dict，tuple → list）"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def file_stamp(path: Union[str, Path]) -> Optional[Stamp]:
+    """檔案識別（不存在時為 None）"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class DocumentCache:
+    """已解析文件的 LRU 快取"""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        初始化文件快取
+
+        Args:
+            max_entries: 最大項目數
+            max_bytes: 快取文件的檔案總大小上限（位元組）
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Stamp, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Union[str, Path], loader: Callable[[Path], Any]) -> Any:
+        """
+        取得文件的唯讀視圖（未快取或檔案已變更時以 loader 解析）
+
+        Args:
+            path: 檔案路徑
+            loader: 解析函式（例外直接拋出，不快取）
+
+        Returns:
+            唯讀視圖；檔案不存在時為 None
+        """
+        path = Path(path)
+        key = str(path)
+        stamp = file_stamp(path)
+        if stamp is None:
+            self.invalidate(path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = freeze(loader(path))
+        # 解析期間檔案被改寫時不快取（下次重新解析）
+        if file_stamp(path) == stamp:
+            self._store(key, stamp, value)
+        return value
+
+    def invalidate(self, path: Union[str, Path]) -> None:
+        """移除快取項目"""
+        with self._lock:
+            entry = self._entries.pop(str(path), None)
+            if entry is not None:
+                self._bytes -= entry[0][1]
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, stamp: Stamp, value: Any) -> None:
+        size = stamp[1]
+        if size > self.max_bytes:
+            self.invalidate(key)
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[0][1]
+            self._entries[key] = (stamp, value)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (old_stamp, _) = self._entries.popitem(last=False)
+                self._bytes -= old_stamp[1]
+
+
+# 全域實例（程序內共用）
+_document_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> DocumentCache:
+    """取得全域文件快取"""
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache()
+    return _document_cache
@@ -0,0 +1,552 @@
+"""
+持久化工作佇列 - 以 SQLite 保存工作流 / 階段 / 視角工作
+
+佇列位置：.claude/memory/jobs.db（WAL 模式，僅用標準函式庫 sqlite3）
+
+特性：
+- 工作以 (kind, workflow_id, key) 唯一識別，重複 enqueue 不會重複建立
+- claim 取得租約（lease）；持有者須以 heartbeat 延長，
+  租約過期的工作由 requeue_expired 放回佇列（超過最大嘗試次數則標記失敗）
+- 排程：優先級高者先；同優先級時，目前持有租約最少的提交者先（公平），
+  再依提交順序
+- 每次操作使用獨立連線（可跨執行緒、跨程序使用）
+
+工作狀態：queued → leased → done / failed / cancelled
+"""
+
+import getpass
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from ..config.models import QueueJob
+from .memory import get_memory
+
+
+# 預設租約長度（秒）
+DEFAULT_LEASE_SECONDS = 60.0
+
+# 預設最大嘗試次數（租約過期或失敗重試都計入）
+DEFAULT_MAX_ATTEMPTS = 3
+
+# 工作狀態
+STATUS_QUEUED = "queued"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+TERMINAL_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 1,
+    submitter TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, workflow_id, key)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, kind, priority);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires);
+"""
+
+
+def default_submitter() -> str:
+    """預設提交者（user@host）"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "unknown"
+    return f"{user}@{socket.gethostname()}"
+
+
+def default_owner() -> str:
+    """預設租約持有者（host:pid:thread，同程序內的不同執行緒視為不同持有者）"""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobQueue:
+    """SQLite 工作佇列"""
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ):
+        """
+        初始化工作佇列
+
+        Args:
+            db_path: 資料庫路徑（預設為 .claude/memory/jobs.db）
+            lease_seconds: 預設租約長度（秒）
+        """
+        if db_path:
+            self.db_path = Path(db_path)
+        else:
+            self.db_path = get_memory().base_path / "jobs.db"
+        self.lease_seconds = lease_seconds
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        開啟連線（交易結束時提交並關閉）
+
+        Args:
+            immediate: 是否以 BEGIN IMMEDIATE 取得寫入鎖（claim 等讀後寫操作）
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_job(row: Optional[sqlite3.Row]) -> Optional[QueueJob]:
+        if row is None:
+            return None
+        data = dict(row)
+        data["payload"] = json.loads(data["payload"] or "{}")
+        data["result"] = json.loads(data["result"]) if data["result"] else None
+        return QueueJob.model_validate(data)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 提交
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def enqueue(
+        self,
+        kind: str,
+        workflow_id: str,
+        key: str = "",
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 1,
+        submitter: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> int:
+        """
+        提交工作
+
+        相同 (kind, workflow_id, key) 的工作已在佇列或租約中時直接回傳其 ID；
+        已結束（done / failed / cancelled）時重新放回佇列。
+
+        Returns:
+            工作 ID
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT id, status FROM jobs WHERE kind = ? AND workflow_id = ? AND key = ?",
+                (kind, workflow_id, key),
+            ).fetchone()
+            if row is None:
+                cursor = conn.execute(
+                    "INSERT INTO jobs (kind, workflow_id, key, payload, priority, submitter,"
+                    " max_attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        kind, workflow_id, key, json.dumps(payload or {}, ensure_ascii=False),
+                        priority, submitter or default_submitter(), max_attempts, now, now,
+                    ),
+                )
+                return cursor.lastrowid
+            if row["status"] in TERMINAL_STATUSES:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = 0, payload = ?, priority = ?,"
+                    " max_attempts = ?, lease_owner = NULL, lease_expires = NULL, result = NULL,"
+                    " error = NULL, updated_at = ? WHERE id = ?",
+                    (
+                        STATUS_QUEUED, json.dumps(payload or {}, ensure_ascii=False),
+                        priority, max_attempts, now, row["id"],
+                    ),
+                )
+            return row["id"]
+
+    def cancel(self, workflow_id: str) -> int:
+        """
+        取消工作流的所有未結束工作
+
+        Returns:
+            取消的工作數
+        """
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,"
+                " updated_at = ? WHERE workflow_id = ? AND status IN (?, ?)",
+                (STATUS_CANCELLED, time.time(), workflow_id, STATUS_QUEUED, STATUS_LEASED),
+            )
+            return cursor.rowcount
+
+    def cancel_job(self, job_id: int) -> bool:
+        """
+        取消單一未結束的工作
+
+        Returns:
+            是否取消成功
+        """
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,"
+                " updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (STATUS_CANCELLED, time.time(), job_id, STATUS_QUEUED, STATUS_LEASED),
+            )
+            return cursor.rowcount == 1
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 租約
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def claim(
+        self,
+        owner: Optional[str] = None,
+        kinds: Optional[Sequence[str]] = None,
+        lease_seconds: Optional[float] = None,
+    ) -> Optional[QueueJob]:
+        """
+        取得下一個工作的租約
+
+        順序：優先級（高→低）→ 提交者目前持有的租約數（少→多）→ 提交順序。
+
+        Args:
+            owner: 租約持有者（預設 default_owner()）
+            kinds: 只取指定種類
+            lease_seconds: 租約長度
+
+        Returns:
+            工作，佇列為空時為 None
+        """
+        self.requeue_expired()
+        owner = owner or default_owner()
+        lease = lease_seconds or self.lease_seconds
+        kind_filter = ""
+        params: List[Any] = [STATUS_LEASED, STATUS_QUEUED]
+        if kinds:
+            kind_filter = f" AND j.kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT j.id FROM jobs j LEFT JOIN ("
+                "  SELECT submitter, COUNT(*) AS active FROM jobs WHERE status = ?"
+                "  GROUP BY submitter"
+                ") a ON a.submitter = j.submitter"
+                f" WHERE j.status = ?{kind_filter}"
+                " ORDER BY j.priority DESC, COALESCE(a.active, 0) ASC, j.id ASC LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                return None
+            return self._lease(conn, row["id"], owner, lease)
+
+    def claim_job(
+        self,
+        job_id: int,
+        owner: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+    ) -> Optional[QueueJob]:
+        """
+        取得指定工作的租約
+
+        工作在佇列中、租約已過期或已由同一持有者持有時成功。
+
+        Returns:
+            工作，無法取得時為 None
+        """
+        owner = owner or default_owner()
+        lease = lease_seconds or self.lease_seconds
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT status, lease_owner, lease_expires FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            available = row["status"] == STATUS_QUEUED or (
+                row["status"] == STATUS_LEASED
+                and (row["lease_owner"] == owner or (row["lease_expires"] or 0) < time.time())
+            )
+            if not available:
+                return None
+            return self._lease(conn, job_id, owner, lease, renew=row["lease_owner"] == owner)
+
+    def _lease(
+        self,
+        conn: sqlite3.Connection,
+        job_id: int,
+        owner: str,
+        lease: float,
+        renew: bool = False,
+    ) -> Optional[QueueJob]:
+        """在交易中設定租約（renew 時不增加嘗試次數）"""
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?,"
+            " attempts = attempts + ?, updated_at = ? WHERE id = ?",
+            (STATUS_LEASED, owner, now + lease, 0 if renew else 1, now, job_id),
+        )
+        return self._to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def heartbeat(
+        self,
+        job_id: int,
+        owner: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+    ) -> bool:
+        """
+        延長租約
+
+        Returns:
+            是否仍持有租約（False 表示已過期被接手或工作已取消）
+        """
+        owner = owner or default_owner()
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ?"
+                " WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + (lease_seconds or self.lease_seconds), now, job_id, STATUS_LEASED, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(
+        self,
+        job_id: int,
+        owner: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        標記工作完成
+
+        Returns:
+            是否仍持有租約（租約已失效時不更新）
+        """
+        return self._finish(job_id, owner, STATUS_DONE, result=result)
+
+    def fail(
+        self,
+        job_id: int,
+        owner: Optional[str] = None,
+        error: Optional[str] = None,
+        retry: bool = True,
+    ) -> bool:
+        """
+        標記工作失敗
+
+        Args:
+            retry: 未達最大嘗試次數時放回佇列
+
+        Returns:
+            是否仍持有租約
+        """
+        owner = owner or default_owner()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs"
+                " WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, STATUS_LEASED, owner),
+            ).fetchone()
+            if row is None:
+                return False
+            requeue = retry and row["attempts"] < row["max_attempts"]
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,"
+                " error = ?, updated_at = ? WHERE id = ?",
+                (STATUS_QUEUED if requeue else STATUS_FAILED, error, time.time(), job_id),
+            )
+            return True
+
+    def release(self, job_id: int, owner: Optional[str] = None, status: str = STATUS_CANCELLED) -> bool:
+        """以指定的結束狀態釋放租約（例如取消）"""
+        return self._finish(job_id, owner, status)
+
+    def _finish(
+        self,
+        job_id: int,
+        owner: Optional[str],
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        owner = owner or default_owner()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,"
+                " result = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    time.time(), job_id, STATUS_LEASED, owner,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def requeue_expired(self) -> int:
+        """
+        回收過期租約：未達最大嘗試次數者放回佇列，其餘標記失敗
+
+        Returns:
+            回收的工作數
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,"
+                " error = CASE WHEN attempts < max_attempts THEN error ELSE ? END,"
+                " lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE status = ? AND lease_expires < ?",
+                (STATUS_QUEUED, STATUS_FAILED, "租約過期次數超過上限", now, STATUS_LEASED, now),
+            )
+            return requeued.rowcount
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def get(self, job_id: int) -> Optional[QueueJob]:
+        """取得工作"""
+        with self._connect() as conn:
+            return self._to_job(
+                conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            )
+
+    def find(self, kind: str, workflow_id: str, key: str = "") -> Optional[QueueJob]:
+        """依 (kind, workflow_id, key) 取得工作"""
+        with self._connect() as conn:
+            return self._to_job(conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND workflow_id = ? AND key = ?",
+                (kind, workflow_id, key),
+            ).fetchone())
+
+    def list(
+        self,
+        workflow_id: Optional[str] = None,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[QueueJob]:
+        """列出工作（依 ID 排序）"""
+        clauses, params = [], []
+        for column, value in (("workflow_id", workflow_id), ("status", status), ("kind", kind)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT * FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._connect() as conn:
+            return [self._to_job(row) for row in conn.execute(sql, params).fetchall()]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各種類、各狀態的工作數"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"
+            ).fetchall()
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            stats.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return stats
+
+
+class LeaseKeeper:
+    """背景執行緒定期延長租約（context manager）"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        job_id: int,
+        owner: str,
+        lease_seconds: Optional[float] = None,
+        interval: Optional[float] = None,
+    ):
+        """
+        初始化租約維持器
+
+        Args:
+            queue: 工作佇列
+            job_id: 工作 ID
+            owner: 租約持有者
+            lease_seconds: 每次延長的租約長度
+            interval: heartbeat 間隔（預設為租約長度的 1/3）
+        """
+        self.queue = queue
+        self.job_id = job_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds or queue.lease_seconds
+        self.interval = interval or self.lease_seconds / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread = threading.Thread(
+            target=self._run, name=f"maw-lease-{self.job_id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                alive = self.queue.heartbeat(self.job_id, self.owner, self.lease_seconds)
+            except sqlite3.Error:
+                # 暫時性錯誤（例如鎖逾時）：下次再試，租約仍有餘裕
+                continue
+            if not alive:
+                self.lost = True
+                return
+
+
+# 全域實例（依資料庫路徑）
+_queues: Dict[str, JobQueue] = {}
+
+
+def get_job_queue(base_path: Optional[Union[str, Path]] = None) -> JobQueue:
+    """
+    取得工作佇列
+
+    Args:
+        base_path: Memory 根目錄（預設使用全域 Memory 的根目錄）
+    """
+    root = Path(base_path) if base_path else get_memory().base_path
+    db_path = str(root / "jobs.db")
+    if db_path not in _queues:
+        _queues[db_path] = JobQueue(db_path)
+    return _queues[db_path]
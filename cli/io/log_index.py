@@ -0,0 +1,343 @@
+"""
+Action Log 索引 - actions.jsonl 的 SQLite 旁路索引
+
+索引位置：logs/actions.idx.db（與日誌同目錄，WAL 模式，僅用標準函式庫 sqlite3）
+
+特性：
+- 每筆記錄的分段、位元組偏移量與長度，以及 action / level / stage 欄位（各自建立索引）
+- 涵蓋所有分段（log_segments.py）：已關閉的分段各索引一次（偏移量為解壓縮後的位置），
+  寫入中的分段增量索引——記住已索引的位元組偏移量，查詢前只解析新追加的完整行；
+  寫入中的分段被輪替（inode 改變）或截短時重新索引，被刪除的分段自索引移除
+- 查詢在索引內篩選、排序與分頁（由新到舊），只讀取命中的行
+  （寫入中與未壓縮的分段直接 seek；壓縮分段串流解壓縮到最後一筆命中的行）
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .log_segments import closed_segments, iter_lines, iter_segment_lines, open_segment
+
+
+# 索引格式版本（不同時捨棄重建：索引可由日誌完整重建）
+INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    seg INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    action TEXT NOT NULL DEFAULT '',
+    level TEXT NOT NULL DEFAULT '',
+    stage TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (seg, n)
+);
+CREATE INDEX IF NOT EXISTS idx_records_action ON records (action, seg, n);
+CREATE INDEX IF NOT EXISTS idx_records_level ON records (level, seg, n);
+CREATE INDEX IF NOT EXISTS idx_records_stage ON records (stage, seg, n);
+CREATE TABLE IF NOT EXISTS segments (
+    seg INTEGER PRIMARY KEY,
+    records INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 寫入中分段的 seg 值（大於任何已關閉分段的編號，排序在最後）
+ACTIVE_SEG = 1 << 40
+
+# 篩選值：單一值或多個值
+Filter = Optional[Union[str, Sequence[str]]]
+
+
+def index_path_for(log_path: Union[str, Path]) -> Path:
+    """日誌對應的索引路徑（actions.jsonl → actions.idx.db）"""
+    log_path = Path(log_path)
+    return log_path.with_name(f"{log_path.stem}.idx.db")
+
+
+def record_stage(record: Dict[str, Any]) -> str:
+    """記錄所屬的階段（details.stage_id 或 details.stage，大寫）"""
+    details = record.get("details") or {}
+    stage = details.get("stage_id") or details.get("stage") or ""
+    return str(stage).upper()
+
+
+class LogIndex:
+    """JSONL Action Log 的 SQLite 索引"""
+
+    def __init__(self, log_path: Union[str, Path], db_path: Optional[Union[str, Path]] = None):
+        """
+        初始化日誌索引
+
+        Args:
+            log_path: 日誌路徑（actions.jsonl）
+            db_path: 索引路徑（預設見 index_path_for）
+        """
+        self.log_path = Path(log_path)
+        self.db_path = Path(db_path) if db_path else index_path_for(self.log_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                conn.executescript(
+                    "DROP TABLE IF EXISTS records; DROP TABLE IF EXISTS segments;"
+                    " DROP TABLE IF EXISTS state;"
+                )
+                conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """開啟連線（交易結束時提交並關閉）"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 建立索引
+    # ─────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _get_state(conn: sqlite3.Connection) -> Dict[str, str]:
+        return {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM state")}
+
+    @staticmethod
+    def _set_state(conn: sqlite3.Connection, **values: Any) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            [(k, str(v)) for k, v in values.items()],
+        )
+
+    def refresh(self) -> int:
+        """
+        索引新追加的記錄與新關閉的分段
+
+        Returns:
+            新索引的記錄數
+        """
+        closed = dict(closed_segments(self.log_path))
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            st = None
+
+        with self._connect() as conn:
+            state = self._get_state(conn)
+            offset = int(state.get("offset", 0))
+            count = int(state.get("count", 0))
+            inode = str(st.st_ino) if st else ""
+            added = 0
+
+            # 已關閉的分段：移除已刪除的、索引新出現的（輪替後的舊寫入中分段）
+            indexed = {r["seg"] for r in conn.execute("SELECT seg FROM segments")}
+            for seg in indexed - closed.keys():
+                conn.execute("DELETE FROM records WHERE seg = ?", (seg,))
+                conn.execute("DELETE FROM segments WHERE seg = ?", (seg,))
+            for seg in sorted(closed.keys() - indexed):
+                added += self._index_segment(conn, seg, closed[seg])
+
+            if st is None or state.get("inode", inode) != inode or st.st_size < offset:
+                # 寫入中的分段不存在、被輪替或截短：重新索引
+                conn.execute("DELETE FROM records WHERE seg = ?", (ACTIVE_SEG,))
+                offset = count = 0
+            if st is not None and st.st_size > offset:
+                rows = []
+                # 下一次由最後一個完整行之後開始（未完成的行留待下次索引）
+                end = offset
+                with open(self.log_path, "rb") as f:
+                    f.seek(offset)
+                    for line_offset, line in iter_lines(f):
+                        row = self._row(ACTIVE_SEG, count, offset + line_offset, line)
+                        if row is not None:
+                            rows.append(row)
+                            count += 1
+                        end = offset + line_offset + len(line)
+                offset = end
+                self._insert(conn, rows)
+                added += len(rows)
+
+            self._set_state(conn, inode=inode, offset=offset, count=count)
+            return added
+
+    @staticmethod
+    def _row(seg: int, n: int, offset: int, line: bytes) -> Optional[Tuple]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(record, dict):
+            return None
+        return (
+            seg,
+            n,
+            offset,
+            len(line),
+            str(record.get("action") or ""),
+            str(record.get("level") or ""),
+            record_stage(record),
+        )
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO records (seg, n, offset, length, action, level, stage)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _index_segment(self, conn: sqlite3.Connection, seg: int, path: Path) -> int:
+        """索引整個已關閉的分段"""
+        try:
+            lines = list(iter_segment_lines(path))
+        except FileNotFoundError:
+            # 索引期間被壓縮取代
+            path = dict(closed_segments(self.log_path)).get(seg)
+            if path is None:
+                return 0
+            lines = list(iter_segment_lines(path))
+        rows = []
+        for offset, line in lines:
+            row = self._row(seg, len(rows), offset, line)
+            if row is not None:
+                rows.append(row)
+        conn.execute("DELETE FROM records WHERE seg = ?", (seg,))
+        self._insert(conn, rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO segments (seg, records) VALUES (?, ?)", (seg, len(rows))
+        )
+        return len(rows)
+
+    def rebuild(self) -> int:
+        """
+        捨棄並重建整個索引
+
+        Returns:
+            索引的記錄數
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM records")
+            conn.execute("DELETE FROM segments")
+            conn.execute("DELETE FROM state")
+        return self.refresh()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _where(action: Filter, level: Filter, stage: Filter) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("action", action), ("level", level), ("stage", stage)):
+            if not value:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            if column == "stage":
+                values = [v.upper() for v in values]
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        action: Filter = None,
+        level: Filter = None,
+        stage: Filter = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        查詢記錄（先更新索引）
+
+        Args:
+            action: Action 類型（單一或多個）
+            level: 日誌等級（單一或多個）
+            stage: 階段 ID（單一或多個，不分大小寫）
+            limit: 筆數上限（None 表示不限）
+            offset: 由最新往前略過的筆數
+
+        Returns:
+            由舊到新的記錄（最新 offset 筆之前的最後 limit 筆）
+        """
+        self.refresh()
+        where, params = self._where(action, level, stage)
+        sql = (
+            f"SELECT seg, offset, length FROM records{where}"
+            " ORDER BY seg DESC, n DESC LIMIT ? OFFSET ?"
+        )
+        with self._connect() as conn:
+            rows = conn.execute(
+                sql, (*params, -1 if limit is None else limit, max(offset, 0))
+            ).fetchall()
+        return self._read([(r["seg"], r["offset"], r["length"]) for r in reversed(rows)])
+
+    def count(
+        self,
+        action: Filter = None,
+        level: Filter = None,
+        stage: Filter = None,
+    ) -> int:
+        """符合條件的記錄數（先更新索引）"""
+        self.refresh()
+        where, params = self._where(action, level, stage)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM records{where}", params).fetchone()[0]
+
+    def _read(self, spans: List[Tuple[int, int, int]]) -> List[Dict[str, Any]]:
+        """依分段與位元組偏移量讀取記錄（spans 依時間排序）"""
+        found: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        by_seg: Dict[int, List[Tuple[int, int]]] = {}
+        for seg, offset, length in spans:
+            by_seg.setdefault(seg, []).append((offset, length))
+
+        closed = dict(closed_segments(self.log_path)) if len(by_seg) > 1 or ACTIVE_SEG not in by_seg else {}
+        for seg, wanted in by_seg.items():
+            path = self.log_path if seg == ACTIVE_SEG else closed.get(seg)
+            if path is None:
+                continue
+            try:
+                if path.name.endswith(".jsonl"):
+                    with open(path, "rb") as f:
+                        for offset, length in wanted:
+                            f.seek(offset)
+                            found[(seg, offset)] = f.read(length)
+                else:
+                    offsets = {offset for offset, _ in wanted}
+                    last = max(offsets)
+                    with open_segment(path) as f:
+                        for offset, line in iter_lines(f):
+                            if offset in offsets:
+                                found[(seg, offset)] = line
+                            if offset >= last:
+                                break
+            except OSError:
+                continue
+
+        records = []
+        for seg, offset, _ in spans:
+            try:
+                records.append(json.loads(found[(seg, offset)]))
+            except (KeyError, ValueError):
+                continue
+        return records
@@ -0,0 +1,419 @@
+"""
+JSONL 日誌分段 - 依大小或階段輪替、壓縮已關閉的分段、跨分段串流讀取
+
+檔案配置（以 logs/actions.jsonl 為例）：
+- actions.jsonl                 目前寫入中的分段
+- actions.000001.jsonl.gz       已關閉的分段（依序編號；.zst 為 zstd，壓縮完成前為 .jsonl）
+- actions.manifest.json         分段清單（記錄數、位元組數、時間範圍、輪替原因）
+
+輪替流程（可由多個程序同時嘗試，不需檔案鎖）：
+1. rename 寫入中的分段為暫存名稱（只有一個程序能取得原檔案）
+2. 以 link 取得下一個未使用的編號（不覆寫既有分段），建立新的空白寫入中分段
+3. 壓縮為 .gz / .zst（先寫暫存檔再 rename）並刪除未壓縮的分段，更新清單
+
+讀取端依編號串流讀取所有分段再讀取寫入中的分段；清單只是中繼資料，
+分段以目錄內容為準（清單遺失或落後時自動補上）。
+
+本模組只使用標準函式庫（zstd 需要選用套件 zstandard），
+hook 與 shared/tools 的獨立腳本也可直接匯入。
+"""
+
+import gzip
+import io
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # 選用套件
+    zstandard = None
+
+
+# 預設輪替大小（位元組）
+DEFAULT_ROTATE_BYTES = 32 * 1024 * 1024
+
+# 壓縮格式與副檔名
+CODEC_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_CODEC = "gzip"
+
+# 讀取區塊大小（位元組）
+READ_CHUNK = 1024 * 1024
+
+
+def resolve_codec(codec: Optional[str] = None) -> str:
+    """實際使用的壓縮格式（未安裝 zstandard 時 zstd 改用 gzip）"""
+    codec = codec or DEFAULT_CODEC
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"未知的壓縮格式: {codec}")
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec
+
+
+def manifest_path(path: Union[str, Path]) -> Path:
+    """分段清單路徑（actions.jsonl → actions.manifest.json）"""
+    path = Path(path)
+    return path.with_name(f"{_stem(path)}.manifest.json")
+
+
+def _stem(path: Path) -> str:
+    return path.name[: -len(".jsonl")] if path.name.endswith(".jsonl") else path.stem
+
+
+def _segment_pattern(path: Path) -> "re.Pattern[str]":
+    return re.compile(rf"^{re.escape(_stem(path))}\.(\d{{6}})\.jsonl(\.gz|\.zst)?$")
+
+
+def segment_name(path: Union[str, Path], number: int, codec: Optional[str] = None) -> str:
+    """分段檔名（codec 為 None 表示未壓縮）"""
+    path = Path(path)
+    suffix = CODEC_SUFFIXES[codec] if codec else ""
+    return f"{_stem(path)}.{number:06d}.jsonl{suffix}"
+
+
+def closed_segments(path: Union[str, Path]) -> List[Tuple[int, Path]]:
+    """
+    已關閉的分段（依編號排序；同一編號同時有壓縮與未壓縮檔時取壓縮檔）
+
+    Returns:
+        [(編號, 路徑)]
+    """
+    path = Path(path)
+    pattern = _segment_pattern(path)
+    found: Dict[int, Path] = {}
+    try:
+        names = os.listdir(path.parent)
+    except OSError:
+        return []
+    for name in names:
+        match = pattern.match(name)
+        if not match:
+            continue
+        number = int(match.group(1))
+        # 壓縮檔以 rename 完成，存在時即為完整內容
+        if number not in found or match.group(2):
+            found[number] = path.parent / name
+    return sorted(found.items())
+
+
+def segment_paths(path: Union[str, Path]) -> List[Path]:
+    """所有分段（舊到新，最後為寫入中的分段）"""
+    path = Path(path)
+    paths = [p for _, p in closed_segments(path)]
+    if path.exists():
+        paths.append(path)
+    return paths
+
+
+def open_segment(path: Union[str, Path]) -> IO[bytes]:
+    """以二進位串流開啟分段（自動解壓縮）"""
+    path = Path(path)
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"讀取 {path.name} 需要安裝 zstandard")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def iter_segment_lines(path: Union[str, Path]) -> Iterator[Tuple[int, bytes]]:
+    """
+    逐行讀取單一分段（略過空行與未完成的最後一行）
+
+    Yields:
+        (解壓縮後的位元組偏移量, 行內容含換行)
+    """
+    with open_segment(path) as f:
+        yield from iter_lines(f)
+
+
+def iter_lines(f: IO[bytes]) -> Iterator[Tuple[int, bytes]]:
+    """逐行讀取串流（偏移量相對於串流目前位置）"""
+    offset = 0
+    pending = b""
+    while True:
+        chunk = f.read(READ_CHUNK)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            length = len(line) + 1
+            if line.strip():
+                yield offset, line + b"\n"
+            offset += length
+
+
+def iter_records(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """跨所有分段依序串流讀取記錄（略過損壞的行）"""
+    for segment in segment_paths(path):
+        try:
+            f = open_segment(segment)
+        except FileNotFoundError:
+            # 開啟前已被壓縮取代：改讀壓縮後的分段
+            replacement = dict(closed_segments(path)).get(_segment_number(segment))
+            if replacement is None or replacement == segment:
+                continue
+            f = open_segment(replacement)
+        with f:
+            for _, line in iter_lines(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+def _segment_number(segment: Path) -> Optional[int]:
+    match = re.search(r"\.(\d{6})\.jsonl", segment.name)
+    return int(match.group(1)) if match else None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 輪替與壓縮
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def should_rotate(path: Union[str, Path], rotate_bytes: Optional[int]) -> bool:
+    """寫入中的分段是否超過輪替大小"""
+    if not rotate_bytes:
+        return False
+    try:
+        return os.stat(path).st_size >= rotate_bytes
+    except OSError:
+        return False
+
+
+def rotate(
+    path: Union[str, Path],
+    reason: str = "size",
+    codec: Optional[str] = None,
+    compress: bool = True,
+    keep_segments: Optional[int] = None,
+) -> Optional[Path]:
+    """
+    關閉寫入中的分段並開始新的分段
+
+    Args:
+        path: 寫入中的分段（actions.jsonl）
+        reason: 輪替原因（size / stage / manual，記錄於清單）
+        codec: 壓縮格式（gzip / zstd）
+        compress: 是否立即壓縮（False 時由呼叫端稍後呼叫 compress_segment）
+        keep_segments: 保留的已關閉分段數（None 表示全部保留）
+
+    Returns:
+        已關閉的分段路徑；寫入中的分段不存在、為空或已由其他程序輪替時為 None
+    """
+    path = Path(path)
+    try:
+        if os.stat(path).st_size == 0:
+            return None
+    except OSError:
+        return None
+
+    # 1. 取得寫入中的分段（rename 是原子操作，只有一個程序成功）
+    claimed = path.with_name(f".{path.name}.rotate.{os.getpid()}.{threading.get_ident()}")
+    try:
+        os.rename(path, claimed)
+    except OSError:
+        return None
+
+    # 2. 取得下一個未使用的編號（link 不覆寫既有檔案）
+    existing = closed_segments(path)
+    number = existing[-1][0] + 1 if existing else 1
+    while True:
+        target = path.with_name(segment_name(path, number))
+        if not any(path.with_name(segment_name(path, number, c)).exists() for c in CODEC_SUFFIXES):
+            try:
+                os.link(claimed, target)
+                break
+            except FileExistsError:
+                pass
+        number += 1
+    os.unlink(claimed)
+
+    # 新的空白分段：讀取端與快取以 inode 改變得知已輪替
+    with open(path, "a", encoding="utf-8"):
+        pass
+
+    _record_segment(path, number, target, reason)
+    if compress:
+        # 一併壓縮先前未完成壓縮的分段（例如程序在壓縮前結束）
+        compress_pending(path, codec)
+        target = dict(closed_segments(path)).get(number, target)
+    if keep_segments is not None:
+        prune_segments(path, keep_segments)
+    return target
+
+
+def compress_segment(segment: Union[str, Path], codec: Optional[str] = None) -> Optional[Path]:
+    """
+    壓縮已關閉的分段（先寫暫存檔再 rename，完成後刪除未壓縮的分段）
+
+    Returns:
+        壓縮後的路徑；分段不存在（已由其他程序壓縮）時為 None
+    """
+    segment = Path(segment)
+    codec = resolve_codec(codec)
+    target = segment.with_name(segment.name + CODEC_SUFFIXES[codec])
+    tmp = segment.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(segment, "rb") as src, open(tmp, "wb") as raw:
+            if codec == "zstd":
+                with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as dst:
+                    _copy(src, dst)
+            else:
+                with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as dst:
+                    _copy(src, dst)
+        os.replace(tmp, target)
+    except FileNotFoundError:
+        _unlink(tmp)
+        return None
+    except OSError:
+        _unlink(tmp)
+        raise
+    _unlink(segment)
+
+    number = _segment_number(segment)
+    stored_bytes = target.stat().st_size
+
+    def mark_compressed(entries: Dict[int, Dict[str, Any]]) -> None:
+        if number in entries:
+            entries[number].update(name=target.name, codec=codec, stored_bytes=stored_bytes)
+
+    _update_manifest(_base_path(segment), mark_compressed)
+    return target
+
+
+def compress_pending(path: Union[str, Path], codec: Optional[str] = None) -> int:
+    """壓縮所有尚未壓縮的已關閉分段（例如程序在壓縮前結束）"""
+    count = 0
+    for _, segment in closed_segments(path):
+        if segment.name.endswith(".jsonl") and compress_segment(segment, codec):
+            count += 1
+    return count
+
+
+def prune_segments(path: Union[str, Path], keep: int) -> List[Path]:
+    """刪除最舊的已關閉分段，只保留最新 keep 個"""
+    segments = closed_segments(path)
+    removed = [p for _, p in segments[: max(len(segments) - keep, 0)]]
+    for segment in removed:
+        _unlink(segment)
+    if removed:
+        numbers = {n for n, _ in segments[: len(removed)]}
+
+        def drop(entries: Dict[int, Dict[str, Any]]) -> None:
+            for number in numbers:
+                entries.pop(number, None)
+
+        _update_manifest(Path(path), drop)
+    return removed
+
+
+def _copy(src: IO[bytes], dst: Any) -> None:
+    while True:
+        chunk = src.read(READ_CHUNK)
+        if not chunk:
+            break
+        dst.write(chunk)
+
+
+def _unlink(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _base_path(segment: Path) -> Path:
+    """分段對應的寫入中分段路徑（actions.000001.jsonl.gz → actions.jsonl）"""
+    stem = re.sub(r"\.\d{6}\.jsonl(\.gz|\.zst)?$", "", segment.name)
+    return segment.with_name(f"{stem}.jsonl")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 分段清單
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _record_segment(path: Path, number: int, segment: Path, reason: str) -> None:
+    """統計剛關閉的分段並寫入清單"""
+    records = 0
+    first = last = None
+    for _, line in iter_segment_lines(segment):
+        try:
+            timestamp = json.loads(line).get("timestamp")
+        except (ValueError, AttributeError):
+            continue
+        records += 1
+        first = first or timestamp
+        last = timestamp or last
+    entry = {
+        "number": number,
+        "name": segment.name,
+        "codec": None,
+        "records": records,
+        "bytes": segment.stat().st_size,
+        "stored_bytes": segment.stat().st_size,
+        "first_timestamp": first,
+        "last_timestamp": last,
+        "reason": reason,
+        "rotated_at": datetime.now().isoformat(),
+    }
+
+    def add(entries: Dict[int, Dict[str, Any]]) -> None:
+        entries[number] = entry
+
+    _update_manifest(path, add)
+
+
+def read_manifest(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    分段清單（以目錄內容為準：補上清單缺少的分段、移除已刪除的分段）
+
+    Returns:
+        依編號排序的分段資訊
+    """
+    path = Path(path)
+    entries = _load_manifest(path)
+    segments = closed_segments(path)
+    result = []
+    for number, segment in segments:
+        entry = dict(entries.get(number) or {"number": number})
+        entry["name"] = segment.name
+        result.append(entry)
+    return result
+
+
+def _load_manifest(path: Path) -> Dict[int, Dict[str, Any]]:
+    try:
+        with open(manifest_path(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {int(e["number"]): e for e in data.get("segments", []) if "number" in e}
+
+
+def _update_manifest(path: Path, mutate: Callable[[Dict[int, Dict[str, Any]]], None]) -> None:
+    """讀取、修改並原子寫回清單（失敗時略過：清單只是中繼資料）"""
+    entries = _load_manifest(path)
+    mutate(entries)
+    target = manifest_path(path)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"segments": [entries[n] for n in sorted(entries)]},
+                f, ensure_ascii=False, indent=2,
+            )
+        os.replace(tmp, target)
+    except OSError:
+        _unlink(tmp)
@@ -0,0 +1,303 @@
+"""
+JSONL 寫入器 - 持久檔案控制代碼 + 有界佇列 + 背景批次寫入
+
+ActionLogger 的寫入後端：
+- 記錄在呼叫端序列化後放入佇列（順序在入列時決定，並行的 Agent 執行緒也保持順序），
+  由背景執行緒依批次大小或時間間隔寫入
+- 檔案保持開啟（追加模式）；檔案被移走或取代時重新開啟
+- 佇列已滿時由呼叫端直接寫入（背壓，不丟棄記錄）
+- 持久化等級（durability）：
+  - event: 每筆記錄在 write() 返回前寫入
+  - stage: 背景批次寫入；階段邊界記錄（barrier）在返回前寫入
+  - error: 背景批次寫入；只有錯誤記錄在返回前寫入
+  所有等級下，錯誤記錄都會 fsync
+- 超過 rotate_bytes 時輪替為編號分段（log_segments.py），由背景執行緒壓縮
+- close() 寫完佇列後關閉檔案並結束背景執行緒（之後的寫入同步進行、不保留控制代碼）；
+  程序結束時自動關閉所有寫入器
+"""
+
+import atexit
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Literal, Optional, Union
+
+from . import log_segments
+
+
+Durability = Literal["event", "stage", "error"]
+
+DURABILITY_LEVELS = ("event", "stage", "error")
+
+# 預設持久化等級（可由環境變數 MAW_LOG_DURABILITY 覆寫）
+DEFAULT_DURABILITY: Durability = "stage"
+
+# 批次大小（筆）、最長延遲（秒）與佇列上限（筆）
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_MAX_QUEUE = 10_000
+
+
+def default_durability() -> Durability:
+    """預設持久化等級（環境變數值無效時使用 DEFAULT_DURABILITY）"""
+    value = os.environ.get("MAW_LOG_DURABILITY", DEFAULT_DURABILITY)
+    return value if value in DURABILITY_LEVELS else DEFAULT_DURABILITY
+
+
+class JsonlWriter:
+    """單一 JSONL 檔案的批次追加寫入器"""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        durability: Optional[Durability] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        rotate_bytes: Optional[int] = None,
+        codec: Optional[str] = None,
+        keep_segments: Optional[int] = None,
+    ):
+        """
+        初始化寫入器
+
+        Args:
+            path: JSONL 檔案路徑
+            durability: 持久化等級（event / stage / error；預設見 default_durability）
+            batch_size: 累積到此筆數時立即寫入
+            flush_interval: 記錄在佇列中的最長停留時間（秒）
+            max_queue: 佇列上限（超過時由呼叫端直接寫入）
+            rotate_bytes: 檔案超過此大小時輪替（None 表示不輪替）
+            codec: 已關閉分段的壓縮格式（gzip / zstd）
+            keep_segments: 保留的已關閉分段數（None 表示全部保留）
+        """
+        durability = durability or default_durability()
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"未知的持久化等級: {durability}")
+
+        self.path = Path(path)
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.rotate_bytes = rotate_bytes
+        self.codec = log_segments.resolve_codec(codec)
+        self.keep_segments = keep_segments
+
+        self._queue: Deque[str] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._write_lock = threading.Lock()
+        self._handle = None
+        self._handle_ino: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._compressors: List[threading.Thread] = []
+        self._closed = False
+        self.batches = 0
+        self.errors = 0
+        _writers.add(self)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 寫入
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def write(self, line: str, barrier: bool = False, error: bool = False) -> bool:
+        """
+        追加一筆記錄
+
+        Args:
+            line: 已序列化的記錄（不含換行）
+            barrier: 階段邊界記錄（stage 等級下在返回前寫入）
+            error: 錯誤記錄（在返回前寫入並 fsync）
+
+        Returns:
+            記錄已寫入或已入列；同步寫入失敗時為 False
+        """
+        sync = (
+            error
+            or self.durability == "event"
+            or (barrier and self.durability == "stage")
+        )
+        with self._cond:
+            self._queue.append(line + "\n")
+            if self._closed:
+                sync = True
+            elif len(self._queue) >= self.max_queue:
+                sync = True
+            elif not sync:
+                self._ensure_thread()
+                # 喚醒背景執行緒：開始計時（第一筆）或達到批次大小
+                if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+                return True
+        return self.flush(fsync=error)
+
+    def flush(self, fsync: bool = False) -> bool:
+        """
+        寫入佇列中所有記錄
+
+        Args:
+            fsync: 寫入後 fsync（確保落盤）
+
+        Returns:
+            是否寫入成功（失敗的記錄放回佇列前端，下次重試）
+        """
+        with self._write_lock:
+            return self._flush_locked(fsync)
+
+    def rotate(self, reason: str = "manual") -> Optional[Path]:
+        """
+        寫入佇列後輪替為已關閉的分段（背景壓縮）
+
+        Args:
+            reason: 輪替原因（記錄於分段清單）
+
+        Returns:
+            已關閉的分段路徑；檔案為空時為 None
+        """
+        with self._write_lock:
+            if not self._flush_locked():
+                return None
+            return self._rotate(reason)
+
+    def _flush_locked(self, fsync: bool = False) -> bool:
+        """寫入佇列中所有記錄（呼叫端須持有 _write_lock）"""
+        with self._cond:
+            if not self._queue:
+                return True
+            lines: List[str] = list(self._queue)
+            self._queue.clear()
+        try:
+            handle = self._open()
+            handle.write("".join(lines))
+            handle.flush()
+            if fsync:
+                os.fsync(handle.fileno())
+            size = handle.tell()
+        except OSError:
+            self.errors += 1
+            self._close_handle()
+            with self._cond:
+                self._queue.extendleft(reversed(lines))
+            return False
+        self.batches += 1
+        if self.rotate_bytes and size >= self.rotate_bytes:
+            self._rotate("size")
+        if self._closed:
+            # 關閉後的同步寫入不保留檔案控制代碼
+            self._close_handle()
+        return True
+
+    def _rotate(self, reason: str) -> Optional[Path]:
+        """關閉檔案並輪替（呼叫端須持有 _write_lock）"""
+        self._close_handle()
+        try:
+            segment = log_segments.rotate(self.path, reason, compress=False)
+        except OSError:
+            return None
+        if segment is None:
+            return None
+        # 壓縮不佔用寫入路徑；非 daemon 執行緒，程序結束前會完成
+        compressor = threading.Thread(
+            target=self._compress, args=(segment,), name=f"jsonl-compress:{segment.name}"
+        )
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [compressor]
+        compressor.start()
+        return segment
+
+    def _compress(self, segment: Path) -> None:
+        try:
+            # 一併壓縮先前未完成壓縮的分段
+            log_segments.compress_pending(self.path, self.codec)
+            if self.keep_segments is not None:
+                log_segments.prune_segments(self.path, self.keep_segments)
+        except OSError:
+            # 未壓縮的分段仍可讀取；下次輪替時補壓縮
+            pass
+
+    def close(self) -> None:
+        """寫入剩餘記錄並關閉檔案（之後的 write 改為同步寫入）"""
+        with self._cond:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            self._cond.notify()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        with self._write_lock:
+            self._close_handle()
+            compressors, self._compressors = self._compressors, []
+        for compressor in compressors:
+            compressor.join()
+
+    def __len__(self) -> int:
+        """佇列中尚未寫入的記錄數"""
+        return len(self._queue)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 內部
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _open(self):
+        """取得追加控制代碼（檔案被移走或取代時重新開啟；呼叫端須持有 _write_lock）"""
+        if self._handle is not None:
+            try:
+                current = os.stat(self.path).st_ino
+            except OSError:
+                current = None
+            if current != self._handle_ino:
+                self._close_handle()
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+            self._handle_ino = os.fstat(self._handle.fileno()).st_ino
+        return self._handle
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+            self._handle_ino = None
+
+    def _ensure_thread(self) -> None:
+        """啟動背景寫入執行緒（呼叫端須持有 _cond）"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"jsonl-writer:{self.path.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """背景寫入：佇列達到批次大小、最舊記錄停留超過 flush_interval 或關閉時寫入"""
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._queue) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            if not self.flush():
+                # 寫入失敗（例如磁碟已滿）：稍後重試，避免忙碌迴圈
+                time.sleep(self.flush_interval)
+
+
+# 程序結束時寫入並關閉所有寫入器
+_writers: "weakref.WeakSet[JsonlWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all_writers() -> None:
+    for writer in list(_writers):
+        writer.close()
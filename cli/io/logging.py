@@ -3,56 +3,103 @@ Action Log 模組 - 記錄所有操作
 
 所有操作都以 JSONL 格式記錄到 logs/actions.jsonl
 
+寫入經由 JsonlWriter（log_writer.py）：檔案保持開啟、背景批次寫入，
+階段邊界與錯誤記錄依持久化等級（durability）同步寫入；讀取前先寫入佇列。
+查詢經由旁路索引 logs/actions.idx.db（log_index.py）篩選與分頁，只讀取命中的行。
+日誌超過 rotate_bytes（或每個階段結束時，rotate_on_stage）輪替為壓縮的編號分段
+（log_segments.py），查詢與 MemoryManager.read_jsonl 透明地涵蓋所有分段。
+
 Actions:
 - workflow_init: 工作流開始
+- workflow_resume: 工作流由檢查點恢復
 - stage_start: 階段開始
 - agent_start: Agent 開始
 - agent_complete: Agent 完成
 - agent_call_error: Agent 失敗
+- agent_stats: Agent 調用統計（快取命中、JSON 修復率等）
+- stage_early_completion: 階段提前完成（quorum / deadline）
+- stage_reuse: 重用輸入未變的視角結果
 - file_write: 寫入檔案
 - gate_check: 品質閘門
 - gate_failed: 閘門失敗
 - rollback_triggered: 觸發回退
 - workflow_complete: 完成
+- workflow_cancelled: 工作流被取消（停在階段邊界）
 """
 
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional
 
+from .log_index import LogIndex
+from .log_segments import DEFAULT_ROTATE_BYTES
+from .log_writer import Durability, JsonlWriter
 from .memory import get_memory
 
 
 # Action 類型
 ActionType = Literal[
     "workflow_init",
+    "workflow_resume",
     "stage_start",
     "stage_complete",
     "agent_start",
     "agent_complete",
     "agent_call_error",
+    "agent_stats",
+    "stage_early_completion",
+    "stage_reuse",
     "file_write",
     "gate_check",
     "gate_failed",
     "rollback_triggered",
     "workflow_complete",
     "workflow_error",
+    "workflow_cancelled",
     "human_intervention",
 ]
 
+# 階段邊界 Action（stage 持久化等級下同步寫入）
+BARRIER_ACTIONS = frozenset({
+    "workflow_init",
+    "workflow_resume",
+    "stage_start",
+    "stage_complete",
+    "rollback_triggered",
+    "workflow_complete",
+    "workflow_error",
+    "workflow_cancelled",
+    "human_intervention",
+})
+
 
 class ActionLogger:
     """Action 日誌記錄器"""
 
-    def __init__(self, workflow_id: str, base_path: Optional[str] = None):
+    def __init__(
+        self,
+        workflow_id: str,
+        base_path: Optional[str] = None,
+        durability: Optional[Durability] = None,
+        rotate_bytes: Optional[int] = DEFAULT_ROTATE_BYTES,
+        rotate_on_stage: bool = False,
+        codec: Optional[str] = None,
+        keep_segments: Optional[int] = None,
+    ):
         """
         初始化 Action Logger
 
         Args:
             workflow_id: 工作流 ID
             base_path: Memory 根目錄
+            durability: 持久化等級（event / stage / error，見 log_writer.py）
+            rotate_bytes: 日誌超過此大小時輪替（None 表示不依大小輪替）
+            rotate_on_stage: 每個階段結束時輪替
+            codec: 已關閉分段的壓縮格式（gzip / zstd）
+            keep_segments: 保留的已關閉分段數（None 表示全部保留）
         """
         self.workflow_id = workflow_id
         self.memory = get_memory(base_path)
@@ -65,6 +112,17 @@ class ActionLogger:
             self.log_file = self.memory.base_path / "workflows" / workflow_id / "logs" / "actions.jsonl"
 
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.rotate_on_stage = rotate_on_stage
+        self.writer = JsonlWriter(
+            self.log_file,
+            durability,
+            rotate_bytes=rotate_bytes,
+            codec=codec,
+            keep_segments=keep_segments,
+        )
+        # 時間戳與入列在同一把鎖內：並行執行緒的記錄在檔案中依時間排序
+        self._lock = threading.Lock()
+        self._index: Optional[LogIndex] = None
 
     def log(
         self,
@@ -83,17 +141,32 @@ class ActionLogger:
         Returns:
             記錄的完整內容
         """
-        record = {
-            "timestamp": datetime.now().isoformat(),
-            "workflow_id": self.workflow_id,
-            "action": action,
-            "level": level,
-            "details": details or {},
-        }
-
-        self.memory.append_jsonl(self.log_file, record)
+        with self._lock:
+            record = {
+                "timestamp": datetime.now().isoformat(),
+                "workflow_id": self.workflow_id,
+                "action": action,
+                "level": level,
+                "details": details or {},
+            }
+            # 在呼叫端序列化：之後修改 details 不影響已記錄的內容
+            self.writer.write(
+                json.dumps(record, ensure_ascii=False),
+                barrier=action in BARRIER_ACTIONS,
+                error=level == "error",
+            )
+        if action == "stage_complete" and self.rotate_on_stage:
+            self.writer.rotate("stage")
         return record
 
+    def flush(self) -> bool:
+        """立即寫入佇列中的記錄"""
+        return self.writer.flush()
+
+    def close(self) -> None:
+        """寫入剩餘記錄並關閉日誌檔"""
+        self.writer.close()
+
     # ─────────────────────────────────────────────────────────────────────────
     # 便捷方法
     # ─────────────────────────────────────────────────────────────────────────
@@ -105,6 +178,22 @@ class ActionLogger:
             {"topic": topic, "config": config or {}},
         )
 
+    def workflow_resume(
+        self,
+        next_stage: Optional[str],
+        iteration: int,
+        restored_stages: List[str],
+    ) -> Dict:
+        """記錄工作流由檢查點恢復"""
+        return self.log(
+            "workflow_resume",
+            {
+                "next_stage": next_stage,
+                "iteration": iteration,
+                "restored_stages": restored_stages,
+            },
+        )
+
     def stage_start(
         self,
         stage_id: str,
@@ -194,6 +283,67 @@ class ActionLogger:
             level="error",
         )
 
+    def agent_stats(self, stage_id: str, stats: Dict[str, int]) -> Dict:
+        """記錄階段內的 Agent 調用統計"""
+        parses = stats.get("json_parses", 0)
+        repairs = stats.get("json_repairs", 0)
+        return self.log(
+            "agent_stats",
+            {
+                "stage_id": stage_id,
+                "cache_hits": stats.get("cache_hits", 0),
+                "cache_misses": stats.get("cache_misses", 0),
+                "inflight_joins": stats.get("inflight_joins", 0),
+                "json_parses": parses,
+                "json_repairs": repairs,
+                "json_repair_failures": stats.get("json_repair_failures", 0),
+                "json_repair_rate": round(repairs / parses, 3) if parses else 0.0,
+            },
+        )
+
+    def stage_early_completion(
+        self,
+        stage_id: str,
+        reason: str,
+        completed: List[str],
+        succeeded: int,
+        cancelled: List[str],
+        quorum: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+    ) -> Dict:
+        """記錄階段提前完成（達到 quorum 或期限）"""
+        return self.log(
+            "stage_early_completion",
+            {
+                "stage_id": stage_id,
+                "reason": reason,
+                "completed": completed,
+                "succeeded": succeeded,
+                "cancelled": cancelled,
+                "quorum": quorum,
+                "deadline_seconds": deadline_seconds,
+            },
+            level="warning" if reason == "deadline" else "info",
+        )
+
+    def stage_reuse(
+        self,
+        stage_id: str,
+        reused: List[str],
+        total: int,
+        synthesis_reused: bool = False,
+    ) -> Dict:
+        """記錄重用先前結果的視角（指紋相符）"""
+        return self.log(
+            "stage_reuse",
+            {
+                "stage_id": stage_id,
+                "reused": reused,
+                "total": total,
+                "synthesis_reused": synthesis_reused,
+            },
+        )
+
     def file_write(self, path: str, size_bytes: int) -> Dict:
         """記錄檔案寫入"""
         return self.log(
@@ -271,6 +421,14 @@ class ActionLogger:
             level="error",
         )
 
+    def workflow_cancelled(self, stage: Optional[str], iteration: int) -> Dict:
+        """記錄工作流取消"""
+        return self.log(
+            "workflow_cancelled",
+            {"stage": stage, "iteration": iteration},
+            level="warning",
+        )
+
     def human_intervention(self, reason: str, context: Optional[Dict] = None) -> Dict:
         """記錄需要人工介入"""
         return self.log(
@@ -283,35 +441,52 @@ class ActionLogger:
     # 查詢方法
     # ─────────────────────────────────────────────────────────────────────────
 
+    @property
+    def index(self) -> LogIndex:
+        """日誌索引（logs/actions.idx.db，首次查詢時建立）"""
+        if self._index is None:
+            self._index = LogIndex(self.log_file)
+        return self._index
+
     def get_logs(
         self,
         action_filter: Optional[List[ActionType]] = None,
         level_filter: Optional[List[str]] = None,
         limit: Optional[int] = None,
+        offset: int = 0,
+        stage: Optional[str] = None,
     ) -> List[Dict]:
         """
-        取得日誌記錄
+        取得日誌記錄（經由索引篩選與分頁，只讀取命中的行）
 
         Args:
             action_filter: 只包含指定的 action 類型
             level_filter: 只包含指定的 level
             limit: 限制返回數量（最新的）
+            offset: 由最新往前略過的筆數（分頁）
+            stage: 只包含指定階段的記錄
 
         Returns:
-            日誌記錄列表
+            日誌記錄列表（由舊到新）
         """
-        records = self.memory.read_jsonl(self.log_file)
-
-        if action_filter:
-            records = [r for r in records if r.get("action") in action_filter]
-
-        if level_filter:
-            records = [r for r in records if r.get("level") in level_filter]
-
-        if limit:
-            records = records[-limit:]
+        self.flush()
+        return self.index.query(
+            action=action_filter,
+            level=level_filter,
+            stage=stage,
+            limit=limit or None,
+            offset=offset,
+        )
 
-        return records
+    def count_logs(
+        self,
+        action_filter: Optional[List[ActionType]] = None,
+        level_filter: Optional[List[str]] = None,
+        stage: Optional[str] = None,
+    ) -> int:
+        """符合條件的日誌記錄數"""
+        self.flush()
+        return self.index.count(action=action_filter, level=level_filter, stage=stage)
 
     def get_errors(self) -> List[Dict]:
         """取得所有錯誤記錄"""
@@ -319,21 +494,26 @@ class ActionLogger:
 
     def get_stage_logs(self, stage: str) -> List[Dict]:
         """取得指定階段的日誌"""
-        records = self.memory.read_jsonl(self.log_file)
-        return [
-            r
-            for r in records
-            if r.get("details", {}).get("stage_id", "").upper() == stage.upper()
-            or r.get("details", {}).get("stage", "").upper() == stage.upper()
-        ]
+        return self.get_logs(stage=stage)
 
 
 # 全域 Logger 實例快取
 _loggers: Dict[str, ActionLogger] = {}
 
 
-def get_logger(workflow_id: str, base_path: Optional[str] = None) -> ActionLogger:
+def get_logger(
+    workflow_id: str,
+    base_path: Optional[str] = None,
+    durability: Optional[Durability] = None,
+) -> ActionLogger:
     """取得 Action Logger 實例"""
     if workflow_id not in _loggers:
-        _loggers[workflow_id] = ActionLogger(workflow_id, base_path)
+        _loggers[workflow_id] = ActionLogger(workflow_id, base_path, durability)
     return _loggers[workflow_id]
+
+
+def release_logger(workflow_id: str) -> None:
+    """關閉 Logger 並自快取移除（工作流結束時呼叫，釋放檔案控制代碼與寫入執行緒）"""
+    logger = _loggers.pop(workflow_id, None)
+    if logger is not None:
+        logger.close()
@@ -5,31 +5,82 @@ Memory 讀寫模組 - 管理 .claude/memory/ 目錄結構
 - 工作流目錄建立與管理
 - YAML/JSON 檔案讀寫
 - 路徑解析與驗證
+
+meta.yaml 寫回快取（write-behind）：
+- 每個工作流的 meta 文件保存在記憶體，update_workflow_meta / update_stage_status
+  只修改記憶體並標記為 dirty，不在呼叫端序列化 YAML
+- flush_meta 把 dirty 的文件以暫存檔 + rename 原子寫入；觸發時機為階段邊界
+  （Workflow 呼叫）、計時器（flush_interval 秒內合併多次更新）與程序結束
+- 所有存取以鎖保護，可由並行的 Agent 執行緒呼叫
+- 快取的文件記住 meta.yaml 的 (mtime_ns, size, inode)：修改或寫回前比對，
+  檔案被其他程序更新時重新載入並重新套用尚未寫回的更新，不覆蓋其他程序的變更
+- 工作流結束時由 evict_meta 移出快取（常駐服務不累積）
+
+工作流列表由目錄索引（catalog.db，見 catalog.py）查詢，建立與寫回時同步更新。
+
+讀取經由程序內文件快取（見 doc_cache.py）：未變更的檔案不重新解析；
+view_* 回傳共用的唯讀視圖，read_* 回傳可變副本。
 """
 
+import atexit
+import copy
 import json
 import os
+import sqlite3
+import threading
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import yaml
 
+from .catalog import WorkflowCatalog
+from .doc_cache import DocumentCache, YamlDumper, YamlLoader, get_document_cache, thaw
+from .log_segments import iter_records
+
+
+# meta.yaml 寫回間隔（秒）
+META_FLUSH_INTERVAL = 2.0
+
+# 視為進行中的工作流狀態
+ACTIVE_STATUSES = ["running", "in_progress", "initialized"]
+
 
 class MemoryManager:
     """Memory 目錄管理器"""
 
-    def __init__(self, base_path: Optional[str] = None):
+    def __init__(
+        self,
+        base_path: Optional[str] = None,
+        flush_interval: Optional[float] = META_FLUSH_INTERVAL,
+    ):
         """
         初始化 Memory 管理器
 
         Args:
             base_path: Memory 根目錄，預設為 .claude/memory/
+            flush_interval: meta.yaml 自動寫回的延遲秒數（None 表示只在明確 flush 與程序結束時寫回）
         """
         if base_path:
             self.base_path = Path(base_path)
         else:
             self.base_path = Path(".claude/memory")
+        self.flush_interval = flush_interval
+        self.documents: DocumentCache = get_document_cache()
+
+        # meta 寫回快取
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        # 載入或寫入時的 meta.yaml 狀態（見 _meta_file_stat）
+        self._meta_stat: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        # 尚未寫回的更新（重新載入後重新套用）
+        self._pending: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._dirty: Set[str] = set()
+        self._meta_lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._catalog: Optional[WorkflowCatalog] = None
+        _managers.add(self)
 
         self._ensure_base_dirs()
 
@@ -48,6 +99,18 @@ class MemoryManager:
         for d in dirs:
             d.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def catalog(self) -> WorkflowCatalog:
+        """工作流目錄索引（首次使用時建立；不存在時由磁碟重建）"""
+        with self._meta_lock:
+            if self._catalog is None:
+                self._catalog = WorkflowCatalog(
+                    self.base_path / "catalog.db",
+                    self.base_path / "workflows",
+                    self.read_yaml,
+                )
+            return self._catalog
+
     # ─────────────────────────────────────────────────────────────────────────
     # 工作流管理
     # ─────────────────────────────────────────────────────────────────────────
@@ -88,7 +151,13 @@ class MemoryManager:
             "current_stage": None,
             "stages": {},
         }
-        self.write_yaml(workflow_dir / "meta.yaml", meta)
+        with self._meta_lock:
+            self._meta[workflow_id] = meta
+            self._pending.pop(workflow_id, None)
+            self._dirty.discard(workflow_id)
+            self.write_yaml(workflow_dir / "meta.yaml", meta)
+            self._meta_stat[workflow_id] = self._meta_file_stat(workflow_id)
+        self.catalog.upsert(workflow_id, meta, created=True)
 
         return workflow_dir
 
@@ -99,31 +168,42 @@ class MemoryManager:
             return workflow_dir
         return None
 
-    def list_workflows(self, limit: int = 10) -> List[Dict]:
-        """列出所有工作流"""
-        workflows_dir = self.base_path / "workflows"
-        if not workflows_dir.exists():
-            return []
-
-        workflows = []
-        for wf_dir in workflows_dir.iterdir():
-            if wf_dir.is_dir():
-                meta_file = wf_dir / "meta.yaml"
-                if meta_file.exists():
-                    meta = self.read_yaml(meta_file)
-                    if meta:
-                        workflows.append(meta)
-
-        # 按日期排序
-        workflows.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return workflows[:limit]
+    def list_workflows(
+        self,
+        limit: Optional[int] = 10,
+        offset: int = 0,
+        status: Optional[Union[str, List[str]]] = None,
+        date: Optional[str] = None,
+        topic: Optional[str] = None,
+        id_contains: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        列出工作流（依建立時間由新到舊，由目錄索引查詢）
+
+        Args:
+            limit: 筆數上限（None 表示不限）
+            offset: 略過的筆數（分頁）
+            status: 狀態篩選（單一或多個）
+            date: 建立日期（YYYY-MM-DD）
+            topic: 主題包含的文字
+            id_contains: ID 包含的文字
+        """
+        # 先寫回本程序尚未寫入的 meta，索引才會反映最新狀態
+        self.flush_meta()
+        return self.catalog.query(
+            status=status,
+            date=date,
+            topic=topic,
+            id_contains=id_contains,
+            limit=limit,
+            offset=offset,
+        )
 
     def get_active_workflow(self) -> Optional[Dict]:
-        """取得當前活動的工作流"""
-        workflows = self.list_workflows()
-        for wf in workflows:
-            if wf.get("status") in ["running", "in_progress", "initialized"]:
-                return wf
+        """取得當前活動的工作流（最新的進行中工作流，沒有時為最新的工作流）"""
+        workflows = self.list_workflows(limit=1, status=ACTIVE_STATUSES)
+        if not workflows:
+            workflows = self.list_workflows(limit=1)
         return workflows[0] if workflows else None
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -173,60 +253,86 @@ class MemoryManager:
     # 檔案讀寫
     # ─────────────────────────────────────────────────────────────────────────
 
-    def read_yaml(self, path: Union[str, Path]) -> Optional[Dict]:
-        """讀取 YAML 檔案"""
-        path = Path(path)
-        if not path.exists():
-            return None
+    @staticmethod
+    def _load_yaml(path: Path) -> Dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.load(f, Loader=YamlLoader) or {}
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or {}
-        except Exception:
-            return None
+    @staticmethod
+    def _load_json(path: Path) -> Any:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
 
-    def write_yaml(self, path: Union[str, Path], data: Dict) -> bool:
-        """寫入 YAML 檔案"""
-        path = Path(path)
-        path.parent.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def _load_jsonl(path: Path) -> List[Dict]:
+        # 涵蓋輪替後的所有分段（略過損壞的行）
+        return list(iter_records(path))
 
+    def view_yaml(self, path: Union[str, Path]) -> Optional[Dict]:
+        """讀取 YAML 檔案的唯讀視圖（快取；不存在或無法解析時為 None）"""
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                yaml.dump(
-                    data,
-                    f,
-                    allow_unicode=True,
-                    default_flow_style=False,
-                    sort_keys=False,
-                )
-            return True
+            return self.documents.get(path, self._load_yaml)
         except Exception:
-            return False
-
-    def read_json(self, path: Union[str, Path]) -> Optional[Dict]:
-        """讀取 JSON 檔案"""
-        path = Path(path)
-        if not path.exists():
             return None
 
+    def view_json(self, path: Union[str, Path]) -> Optional[Dict]:
+        """讀取 JSON 檔案的唯讀視圖（快取；不存在或無法解析時為 None）"""
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self.documents.get(path, self._load_json)
         except Exception:
             return None
 
-    def write_json(self, path: Union[str, Path], data: Dict) -> bool:
-        """寫入 JSON 檔案"""
+    def view_jsonl(self, path: Union[str, Path]) -> Tuple[Dict, ...]:
+        """讀取 JSONL 檔案的唯讀視圖（快取；不存在時為空）"""
+        return self.documents.get(path, self._load_jsonl) or ()
+
+    def read_yaml(self, path: Union[str, Path]) -> Optional[Dict]:
+        """讀取 YAML 檔案"""
+        return thaw(self.view_yaml(path))
+
+    @staticmethod
+    def _write_atomic(path: Union[str, Path], dump: Callable[[IO[str]], Any]) -> bool:
+        """以暫存檔 + rename 寫入（讀取端不會看到寫到一半的檔案）"""
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
 
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                dump(f)
+            os.replace(tmp_path, path)
             return True
         except Exception:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
             return False
 
+    def write_yaml(self, path: Union[str, Path], data: Dict) -> bool:
+        """寫入 YAML 檔案（原子寫入）"""
+        return self._write_atomic(
+            path,
+            lambda f: yaml.dump(
+                data,
+                f,
+                Dumper=YamlDumper,
+                allow_unicode=True,
+                default_flow_style=False,
+                sort_keys=False,
+            ),
+        )
+
+    def read_json(self, path: Union[str, Path]) -> Optional[Dict]:
+        """讀取 JSON 檔案"""
+        return thaw(self.view_json(path))
+
+    def write_json(self, path: Union[str, Path], data: Dict) -> bool:
+        """寫入 JSON 檔案（原子寫入）"""
+        return self._write_atomic(
+            path, lambda f: json.dump(data, f, ensure_ascii=False, indent=2)
+        )
+
     def read_text(self, path: Union[str, Path]) -> Optional[str]:
         """讀取文字檔案"""
         path = Path(path)
@@ -264,43 +370,159 @@ class MemoryManager:
             return False
 
     def read_jsonl(self, path: Union[str, Path]) -> List[Dict]:
-        """讀取 JSONL 檔案"""
-        path = Path(path)
-        if not path.exists():
-            return []
-
-        records = []
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        records.append(json.loads(line))
-        except Exception:
-            pass
+        """讀取 JSONL 檔案（包含輪替後的已關閉分段）"""
+        return thaw(self.view_jsonl(path))
 
-        return records
+    def iter_jsonl(self, path: Union[str, Path]) -> Iterator[Dict]:
+        """依序串流讀取 JSONL 檔案的所有分段（不經快取，適合大型日誌的完整掃描）"""
+        return iter_records(path)
 
     # ─────────────────────────────────────────────────────────────────────────
     # 工作流狀態更新
     # ─────────────────────────────────────────────────────────────────────────
 
+    def _meta_file_stat(self, workflow_id: str) -> Optional[Tuple[int, int, int]]:
+        """meta.yaml 的 (mtime_ns, size, inode)（不存在時為 None）"""
+        try:
+            st = os.stat(self.base_path / "workflows" / workflow_id / "meta.yaml")
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _load_meta(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        取得快取中的 meta 文件（呼叫端須持有 _meta_lock）
+
+        未快取或 meta.yaml 已被其他程序更新時由檔案載入，並重新套用尚未寫回的更新。
+        """
+        meta = self._meta.get(workflow_id)
+        stat = self._meta_file_stat(workflow_id)
+        if meta is not None and (stat is None or stat == self._meta_stat.get(workflow_id)):
+            return meta
+
+        workflow_dir = self.get_workflow_dir(workflow_id)
+        if not workflow_dir:
+            return None
+        meta = self.read_yaml(workflow_dir / "meta.yaml") or {}
+        for apply in self._pending.get(workflow_id, []):
+            apply(meta)
+        self._meta[workflow_id] = meta
+        self._meta_stat[workflow_id] = stat
+        return meta
+
+    def _update_meta(
+        self,
+        workflow_id: str,
+        apply: Callable[[Dict[str, Any]], None],
+    ) -> bool:
+        """套用一項更新並標記待寫回（記住更新，重新載入時重新套用）"""
+        with self._meta_lock:
+            meta = self._load_meta(workflow_id)
+            if meta is None:
+                return False
+            apply(meta)
+            self._pending.setdefault(workflow_id, []).append(apply)
+            self._mark_dirty(workflow_id)
+        return True
+
+    def _mark_dirty(self, workflow_id: str) -> None:
+        """標記 meta 待寫回並啟動寫回計時器（呼叫端須持有 _meta_lock）"""
+        self._dirty.add(workflow_id)
+        if self._timer is None and self.flush_interval is not None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self) -> None:
+        with self._meta_lock:
+            self._timer = None
+        self.flush_meta()
+
+    def get_workflow_meta(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """取得工作流 meta（含尚未寫回的更新；回傳副本）"""
+        with self._meta_lock:
+            meta = self._load_meta(workflow_id)
+            return copy.deepcopy(meta) if meta is not None else None
+
+    def flush_meta(self, workflow_id: Optional[str] = None) -> bool:
+        """
+        把待寫回的 meta 寫入 meta.yaml
+
+        Args:
+            workflow_id: 只寫回指定工作流（None 表示全部）
+
+        Returns:
+            是否全部寫入成功（失敗的保持 dirty，下次再寫）
+        """
+        # 寫入過程持有 _flush_lock：同一工作流較新的快照一定較晚寫入
+        with self._flush_lock:
+            with self._meta_lock:
+                ids = [workflow_id] if workflow_id else list(self._dirty)
+                snapshots = {}
+                applied = {}
+                for wid in ids:
+                    if wid not in self._dirty:
+                        continue
+                    # 其他程序更新過 meta.yaml 時先合併，不覆蓋其變更
+                    meta = self._load_meta(wid)
+                    if meta is None:
+                        self._pending.pop(wid, None)
+                        continue
+                    snapshots[wid] = copy.deepcopy(meta)
+                    applied[wid] = self._pending.pop(wid, [])
+                self._dirty.difference_update(ids)
+
+            written = {}
+            stats = {}
+            for wid, meta in snapshots.items():
+                meta_file = self.base_path / "workflows" / wid / "meta.yaml"
+                if self.write_yaml(meta_file, meta):
+                    written[wid] = meta
+                    stats[wid] = self._meta_file_stat(wid)
+            try:
+                self.catalog.upsert_many(written)
+            except sqlite3.Error:
+                written = {}
+
+            failed = set(snapshots) - set(written)
+            with self._meta_lock:
+                for wid in written:
+                    if wid in self._meta:
+                        self._meta_stat[wid] = stats[wid]
+                for wid in failed:
+                    self._pending[wid] = applied[wid] + self._pending.get(wid, [])
+                self._dirty.update(failed)
+            return not failed
+
+    def evict_meta(self, workflow_id: str) -> bool:
+        """
+        把已寫回的 meta 移出快取（工作流結束時呼叫）
+
+        Returns:
+            是否已移出（仍有未寫回的更新時保留）
+        """
+        with self._meta_lock:
+            if workflow_id in self._dirty:
+                return False
+            self._meta.pop(workflow_id, None)
+            self._meta_stat.pop(workflow_id, None)
+            self._pending.pop(workflow_id, None)
+            return True
+
     def update_workflow_meta(
         self,
         workflow_id: str,
         updates: Dict[str, Any],
     ) -> bool:
-        """更新工作流 meta.yaml"""
-        workflow_dir = self.get_workflow_dir(workflow_id)
-        if not workflow_dir:
-            return False
+        """更新工作流 meta（寫回快取，見 flush_meta）"""
+        updates = copy.deepcopy(updates)
+        updated_at = datetime.now().isoformat()
 
-        meta_file = workflow_dir / "meta.yaml"
-        meta = self.read_yaml(meta_file) or {}
-        meta.update(updates)
-        meta["updated_at"] = datetime.now().isoformat()
+        def apply(meta: Dict[str, Any]) -> None:
+            meta.update(copy.deepcopy(updates))
+            meta["updated_at"] = updated_at
 
-        return self.write_yaml(meta_file, meta)
+        return self._update_meta(workflow_id, apply)
 
     def update_stage_status(
         self,
@@ -309,33 +531,38 @@ class MemoryManager:
         status: str,
         details: Optional[Dict] = None,
     ) -> bool:
-        """更新階段狀態"""
-        workflow_dir = self.get_workflow_dir(workflow_id)
-        if not workflow_dir:
-            return False
-
-        meta_file = workflow_dir / "meta.yaml"
-        meta = self.read_yaml(meta_file) or {}
-
-        if "stages" not in meta:
-            meta["stages"] = {}
-
-        meta["stages"][stage.lower()] = {
+        """更新階段狀態（寫回快取，見 flush_meta）"""
+        entry = {
             "status": status,
             "updated_at": datetime.now().isoformat(),
-            **(details or {}),
+            **copy.deepcopy(details or {}),
         }
 
-        if status == "running":
-            meta["current_stage"] = stage.upper()
-            meta["status"] = "running"
+        def apply(meta: Dict[str, Any]) -> None:
+            if not meta.get("stages"):
+                meta["stages"] = {}
 
-        return self.write_yaml(meta_file, meta)
+            meta["stages"][stage.lower()] = copy.deepcopy(entry)
+
+            if status == "running":
+                meta["current_stage"] = stage.upper()
+                meta["status"] = "running"
+
+        return self._update_meta(workflow_id, apply)
 
 
 # 全域實例
 _memory: Optional[MemoryManager] = None
 
+# 程序結束時寫回所有尚未寫入的 meta
+_managers: "weakref.WeakSet[MemoryManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_meta() -> None:
+    for manager in list(_managers):
+        manager.flush_meta()
+
 
 def get_memory(base_path: Optional[str] = None) -> MemoryManager:
     """取得全域 Memory 管理器實例"""
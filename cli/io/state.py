@@ -1,88 +1,417 @@
 """
-即時狀態追蹤模組 - 管理 current.json
+即時狀態追蹤模組 - 管理 current.json 與狀態事件日誌 state.jsonl
 
 支援並行 Agent 的即時狀態追蹤：
 - 工作流資訊
 - 當前階段
 - 多個 Agent 的狀態
 - 進度統計
+
+狀態以記憶體中的文件為準（以鎖保護，可由並行的 Agent 執行緒更新）：
+- 每次狀態變更產生一個精簡事件（seq 遞增），由 apply_event 套用到狀態；
+  沒有改變狀態的更新不產生事件
+- 事件追加到 state.jsonl（append-only），current.json 為帶有 seq 的快照
+- 最多每 flush_interval 秒寫入一次（先追加日誌、再原子寫入快照）；
+  階段邊界（set_stage / clear_stage、StageRunner 結束）與程序結束時立即寫入
+- 日誌超過 JOURNAL_COMPACT_EVENTS 個事件時壓縮：只移除被後續進度取代的串流進度事件，
+  狀態轉換全部保留，可完整重播時間線
+
+讀取端（StateFollower）載入快照後只套用 seq 更大的事件，
+並記住日誌偏移量，之後只讀取新追加的部分（`maw current --follow`）。
 """
 
+import atexit
+import copy
 import json
+import os
+import threading
+import time
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
 
 from .memory import get_memory
 
 
-AgentStatus = Literal["pending", "running", "completed", "failed"]
+AgentStatus = Literal["pending", "running", "completed", "failed", "cancelled"]
 StageStatus = Literal["pending", "running", "completed", "failed", "skipped"]
 
+# 計入已完成進度的 Agent 狀態
+AGENT_DONE_STATUSES = ("completed", "failed", "cancelled")
+
+# 工作流結束狀態（follow 在此時停止）
+WORKFLOW_FINISHED_STATUSES = ("completed", "failed", "cancelled", "human_intervention")
+
+# current.json 寫入間隔（秒）
+STATE_FLUSH_INTERVAL = 0.1
+
+# 快照與事件日誌檔名
+SNAPSHOT_FILE = "current.json"
+JOURNAL_FILE = "state.jsonl"
+
+# 日誌壓縮門檻（事件數）
+JOURNAL_COMPACT_EVENTS = 5000
+
+
+def default_state(workflow_id: str) -> Dict:
+    """預設狀態"""
+    return {
+        "updated_at": datetime.now().isoformat(),
+        "seq": 0,
+        "workflow": {"id": workflow_id, "topic": None},
+        "stage": None,
+        "agents": [],
+        "progress": {"agents_completed": 0, "agents_total": 0},
+    }
+
+
+def _find_agent(state: Dict, agent_id: str) -> Optional[Dict]:
+    return next((a for a in state["agents"] if a["id"] == agent_id), None)
+
+
+def _count_completed(state: Dict) -> None:
+    state["progress"]["agents_completed"] = sum(
+        1 for a in state["agents"] if a.get("status") in AGENT_DONE_STATUSES
+    )
+
+
+def apply_event(state: Dict, event: Dict) -> bool:
+    """
+    套用狀態事件（StateTracker 與日誌讀取端共用）
+
+    Args:
+        state: 狀態文件（原地修改）
+        event: 事件（seq, ts, op 與各操作的欄位）
+
+    Returns:
+        狀態是否改變（未改變時不更新 seq）
+    """
+    op = event.get("op")
+    if op == "workflow":
+        workflow = state["workflow"]
+        fields = {k: event[k] for k in ("topic", "status") if k in event}
+        if all(workflow.get(k) == v for k, v in fields.items()):
+            return False
+        workflow.update(fields)
+    elif op == "stage":
+        state["stage"] = copy.deepcopy(event["stage"])
+        state["agents"] = []
+        state["progress"] = {"agents_completed": 0, "agents_total": 0}
+    elif op == "clear_stage":
+        if state["stage"] is None and not state["agents"]:
+            return False
+        state["stage"] = None
+        state["agents"] = []
+        state["progress"] = {"agents_completed": 0, "agents_total": 0}
+    elif op == "agent_add":
+        if _find_agent(state, event["agent"]["id"]) is not None:
+            return False
+        state["agents"].append(copy.deepcopy(event["agent"]))
+        state["progress"]["agents_total"] = len(state["agents"])
+    elif op == "agent_status":
+        agent = _find_agent(state, event["id"])
+        task = event.get("task")
+        if agent is None or (agent.get("status") == event["status"] and (not task or agent.get("task") == task)):
+            return False
+        agent["status"] = event["status"]
+        if task:
+            agent["task"] = task
+        _count_completed(state)
+    elif op == "agent_progress":
+        agent = _find_agent(state, event["id"])
+        if agent is None:
+            return False
+        agent["progress"] = copy.deepcopy(event["progress"])
+        agent["last_activity_at"] = event["ts"]
+    elif op == "early":
+        if state["stage"] is None:
+            return False
+        state["stage"]["early_completion"] = {
+            "reason": event["reason"],
+            "succeeded": event["succeeded"],
+            "cancelled": list(event["cancelled"]),
+            "at": event["ts"],
+        }
+    elif op == "agents":
+        state["agents"] = copy.deepcopy(event["agents"])
+        state["progress"]["agents_total"] = len(state["agents"])
+        _count_completed(state)
+    else:
+        return False
+
+    state["seq"] = event["seq"]
+    return True
+
+
+def compact_events(events: List[Dict]) -> List[Dict]:
+    """移除被同一階段內後續進度取代的串流進度事件（其餘事件保持不變）"""
+    kept: List[Dict] = []
+    latest: set = set()
+    for event in reversed(events):
+        if event.get("op") == "stage":
+            latest = set()
+        elif event.get("op") == "agent_progress":
+            if event["id"] in latest:
+                continue
+            latest.add(event["id"])
+        kept.append(event)
+    kept.reverse()
+    return kept
+
+
+class StateFollower:
+    """由快照 + 事件日誌重建狀態，並由上次的偏移量繼續讀取新事件"""
+
+    def __init__(self, workflow_dir: Path, workflow_id: Optional[str] = None):
+        """
+        初始化讀取端
+
+        Args:
+            workflow_dir: 工作流目錄
+            workflow_id: 工作流 ID（預設為目錄名稱）
+        """
+        self.workflow_dir = Path(workflow_dir)
+        self.workflow_id = workflow_id or self.workflow_dir.name
+        self.snapshot_file = self.workflow_dir / SNAPSHOT_FILE
+        self.journal_file = self.workflow_dir / JOURNAL_FILE
+
+        self.state: Dict = default_state(self.workflow_id)
+        self.snapshot_seq: Optional[int] = None
+        self.offset = 0
+        # 目前日誌檔中已讀取的事件數（含快照已涵蓋者；日誌壓縮後重新計算）
+        self.journal_events = 0
+        self._inode: Optional[int] = None
+        self._partial = b""
+
+    def load(self) -> Dict:
+        """載入快照並套用其後的事件"""
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            snapshot = None
+
+        if isinstance(snapshot, dict):
+            self.state = {**default_state(self.workflow_id), **snapshot}
+            self.snapshot_seq = self.state["seq"]
+        else:
+            self.state = default_state(self.workflow_id)
+            self.snapshot_seq = None
+        self.offset = 0
+        self.journal_events = 0
+        self._inode = None
+        self._partial = b""
+        self.poll()
+        return self.state
+
+    def poll(self) -> List[Dict]:
+        """
+        讀取並套用新追加的事件
+
+        Returns:
+            新套用的事件（沒有新事件時為空）
+        """
+        try:
+            st = os.stat(self.journal_file)
+        except OSError:
+            return []
+        if st.st_ino != self._inode or st.st_size < self.offset:
+            # 首次讀取或日誌已壓縮（rename 取代）：從頭讀取，依 seq 略過已套用的事件
+            self._inode = st.st_ino
+            self.offset = 0
+            self.journal_events = 0
+            self._partial = b""
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.journal_file, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        events = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            self.journal_events += 1
+            if event.get("seq", 0) <= self.state.get("seq", 0):
+                continue
+            apply_event(self.state, event)
+            self.state["seq"] = event["seq"]
+            events.append(event)
+        return events
+
+    @property
+    def finished(self) -> bool:
+        """工作流是否已結束"""
+        return self.state["workflow"].get("status") in WORKFLOW_FINISHED_STATUSES
+
+
+def replay_state(
+    workflow_dir: Path,
+    workflow_id: Optional[str] = None,
+) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    由事件日誌重播完整時間線
+
+    Yields:
+        (事件, 套用該事件後的狀態)；狀態為同一個持續更新的文件，需保留時請自行複製
+    """
+    workflow_dir = Path(workflow_dir)
+    state = default_state(workflow_id or workflow_dir.name)
+    try:
+        f = open(workflow_dir / JOURNAL_FILE, "r", encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            apply_event(state, event)
+            yield event, state
+
 
 class StateTracker:
     """即時狀態追蹤器"""
 
-    def __init__(self, workflow_id: str, base_path: Optional[str] = None):
+    def __init__(
+        self,
+        workflow_id: str,
+        base_path: Optional[str] = None,
+        flush_interval: float = STATE_FLUSH_INTERVAL,
+    ):
         """
         初始化狀態追蹤器
 
         Args:
             workflow_id: 工作流 ID
             base_path: Memory 根目錄
+            flush_interval: 日誌與快照的最短寫入間隔（秒）
         """
         self.workflow_id = workflow_id
         self.memory = get_memory(base_path)
+        self.flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._last_flush = 0.0
+        self._pending: List[Dict] = []
+        _tracker_refs.add(self)
 
         workflow_dir = self.memory.get_workflow_dir(workflow_id)
         if workflow_dir:
-            self.state_file = workflow_dir / "current.json"
+            self.state_file = workflow_dir / SNAPSHOT_FILE
         else:
             self.state_file = (
-                self.memory.base_path / "workflows" / workflow_id / "current.json"
+                self.memory.base_path / "workflows" / workflow_id / SNAPSHOT_FILE
             )
+        self.journal_file = self.state_file.parent / JOURNAL_FILE
 
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # 初始化狀態
-        if not self.state_file.exists():
-            self._init_state()
-
-    def _init_state(self) -> None:
-        """初始化狀態檔案"""
-        state = {
-            "updated_at": datetime.now().isoformat(),
-            "workflow": {
-                "id": self.workflow_id,
-                "topic": None,
-            },
-            "stage": None,
-            "agents": [],
-            "progress": {
-                "agents_completed": 0,
-                "agents_total": 0,
-            },
-        }
-        self._save_state(state)
-
-    def _load_state(self) -> Dict:
-        """載入當前狀態"""
-        return self.memory.read_json(self.state_file) or self._get_default_state()
-
-    def _save_state(self, state: Dict) -> bool:
-        """儲存狀態"""
-        state["updated_at"] = datetime.now().isoformat()
-        return self.memory.write_json(self.state_file, state)
-
-    def _get_default_state(self) -> Dict:
-        """取得預設狀態"""
-        return {
-            "updated_at": datetime.now().isoformat(),
-            "workflow": {"id": self.workflow_id, "topic": None},
-            "stage": None,
-            "agents": [],
-            "progress": {"agents_completed": 0, "agents_total": 0},
-        }
+        # 初始化狀態（既有快照與日誌時沿用，例如恢復工作流）
+        follower = StateFollower(self.state_file.parent, workflow_id)
+        self._state: Dict = follower.load()
+        self._seq: int = self._state["seq"]
+        # 恢復時沿用既有日誌的事件數，壓縮門檻不因重新啟動而延後
+        self._journal_events = follower.journal_events
+        self._snapshot_seq = follower.snapshot_seq
+        if self._snapshot_seq != self._seq:
+            self.flush()
+
+    def _emit(self, op: str, **fields: Any) -> bool:
+        """
+        產生並套用狀態事件，排程寫入
+
+        Returns:
+            狀態是否改變
+        """
+        with self._lock:
+            event = {"seq": self._seq + 1, "ts": datetime.now().isoformat(), "op": op, **fields}
+            if not apply_event(self._state, event):
+                return False
+            self._seq = event["seq"]
+            self._pending.append(event)
+            self._schedule_flush()
+            return True
+
+    def _schedule_flush(self) -> None:
+        """去抖動：距上次寫入至少間隔 flush_interval 秒後寫入（由計時器執行緒寫入；呼叫端須持有 _lock）"""
+        if self._timer is not None:
+            return
+        delay = max(0.0, self._last_flush + self.flush_interval - time.monotonic())
+        self._timer = threading.Timer(delay, self._flush_on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self) -> bool:
+        """
+        立即追加待寫入的事件並寫入快照（沒有變更時略過）
+
+        Returns:
+            是否寫入成功或無需寫入
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._last_flush = time.monotonic()
+                events, self._pending = self._pending, []
+                if not events and self._snapshot_seq == self._seq:
+                    return True
+                self._state["updated_at"] = datetime.now().isoformat()
+                snapshot = copy.deepcopy(self._state)
+
+            # 先追加日誌再寫快照：讀取端載入快照後只需套用 seq 更大的事件
+            if events:
+                try:
+                    with open(self.journal_file, "a", encoding="utf-8") as f:
+                        f.write("".join(
+                            json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in events
+                        ))
+                except OSError:
+                    with self._lock:
+                        self._pending[:0] = events
+                    return False
+                self._journal_events += len(events)
+
+            if not self.memory.write_json(self.state_file, snapshot):
+                return False
+            self._snapshot_seq = snapshot["seq"]
+
+            if self._journal_events >= JOURNAL_COMPACT_EVENTS:
+                self._compact()
+            return True
+
+    def _compact(self) -> None:
+        """壓縮事件日誌（呼叫端須持有 _write_lock）"""
+        events = [event for event, _ in replay_state(self.journal_file.parent, self.workflow_id)]
+        kept = compact_events(events)
+        lines = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in kept)
+        if self.memory._write_atomic(self.journal_file, lambda f: f.write(lines)):
+            self._journal_events = len(kept)
+        if self._journal_events >= JOURNAL_COMPACT_EVENTS:
+            # 沒有可移除的事件：下次到達兩倍門檻時再試
+            self._journal_events -= JOURNAL_COMPACT_EVENTS
 
     # ─────────────────────────────────────────────────────────────────────────
     # 工作流狀態
@@ -90,9 +419,18 @@ class StateTracker:
 
     def set_workflow(self, topic: str) -> None:
         """設定工作流資訊"""
-        state = self._load_state()
-        state["workflow"]["topic"] = topic
-        self._save_state(state)
+        self._emit("workflow", topic=topic)
+
+    def set_status(self, status: str) -> None:
+        """
+        設定工作流狀態（結束狀態立即寫入）
+
+        Args:
+            status: running / completed / failed / cancelled / human_intervention
+        """
+        self._emit("workflow", status=status)
+        if status in WORKFLOW_FINISHED_STATUSES:
+            self.flush()
 
     # ─────────────────────────────────────────────────────────────────────────
     # 階段狀態
@@ -107,7 +445,7 @@ class StateTracker:
         total: int,
     ) -> None:
         """
-        設定當前階段
+        設定當前階段（重置 Agents，立即寫入）
 
         Args:
             stage_id: 階段 ID (如 RESEARCH, PLAN)
@@ -116,26 +454,22 @@ class StateTracker:
             index: 當前階段索引 (1-based)
             total: 總階段數
         """
-        state = self._load_state()
-        state["stage"] = {
-            "id": stage_id,
-            "name": stage_name,
-            "description": description,
-            "index": index,
-            "total": total,
-        }
-        # 重置 agents
-        state["agents"] = []
-        state["progress"] = {"agents_completed": 0, "agents_total": 0}
-        self._save_state(state)
+        self._emit(
+            "stage",
+            stage={
+                "id": stage_id,
+                "name": stage_name,
+                "description": description,
+                "index": index,
+                "total": total,
+            },
+        )
+        self.flush()
 
     def clear_stage(self) -> None:
-        """清除階段狀態"""
-        state = self._load_state()
-        state["stage"] = None
-        state["agents"] = []
-        state["progress"] = {"agents_completed": 0, "agents_total": 0}
-        self._save_state(state)
+        """清除階段狀態（立即寫入）"""
+        self._emit("clear_stage")
+        self.flush()
 
     # ─────────────────────────────────────────────────────────────────────────
     # Agent 狀態
@@ -150,7 +484,7 @@ class StateTracker:
         task: Optional[str] = None,
     ) -> None:
         """
-        新增 Agent
+        新增 Agent（已存在時忽略）
 
         Args:
             agent_id: Agent ID
@@ -159,27 +493,17 @@ class StateTracker:
             model: 使用的模型
             task: 分配的任務
         """
-        state = self._load_state()
-
-        # 檢查是否已存在
-        existing = next(
-            (a for a in state["agents"] if a["id"] == agent_id),
-            None,
+        self._emit(
+            "agent_add",
+            agent={
+                "id": agent_id,
+                "name": agent_name,
+                "description": description,
+                "model": model,
+                "status": "pending",
+                "task": task,
+            },
         )
-        if existing:
-            return
-
-        agent = {
-            "id": agent_id,
-            "name": agent_name,
-            "description": description,
-            "model": model,
-            "status": "pending",
-            "task": task,
-        }
-        state["agents"].append(agent)
-        state["progress"]["agents_total"] = len(state["agents"])
-        self._save_state(state)
 
     def update_agent_status(
         self,
@@ -195,22 +519,40 @@ class StateTracker:
             status: 新狀態
             task: 更新任務描述（可選）
         """
-        state = self._load_state()
-
-        for agent in state["agents"]:
-            if agent["id"] == agent_id:
-                agent["status"] = status
-                if task:
-                    agent["task"] = task
-                break
-
-        # 更新進度
-        completed = sum(
-            1 for a in state["agents"] if a["status"] in ["completed", "failed"]
-        )
-        state["progress"]["agents_completed"] = completed
+        fields: Dict[str, Any] = {"id": agent_id, "status": status}
+        if task:
+            fields["task"] = task
+        self._emit("agent_status", **fields)
+
+    def update_agent_progress(
+        self,
+        agent_id: str,
+        progress: Dict[str, Any],
+    ) -> None:
+        """
+        更新 Agent 的串流進度
+
+        Args:
+            agent_id: Agent ID
+            progress: 進度事件（kind, events, bytes, tool ...）
+        """
+        self._emit("agent_progress", id=agent_id, progress=dict(progress))
+
+    def set_early_completion(
+        self,
+        reason: str,
+        succeeded: int,
+        cancelled: List[str],
+    ) -> None:
+        """
+        記錄階段提前完成的決策
 
-        self._save_state(state)
+        Args:
+            reason: quorum 或 deadline
+            succeeded: 成功的視角數
+            cancelled: 被取消的視角 ID
+        """
+        self._emit("early", reason=reason, succeeded=succeeded, cancelled=list(cancelled))
 
     def set_agents(self, agents: List[Dict]) -> None:
         """
@@ -219,36 +561,31 @@ class StateTracker:
         Args:
             agents: Agent 列表，每個包含 id, name, description, model, status, task
         """
-        state = self._load_state()
-        state["agents"] = agents
-        state["progress"]["agents_total"] = len(agents)
-        state["progress"]["agents_completed"] = sum(
-            1 for a in agents if a.get("status") in ["completed", "failed"]
-        )
-        self._save_state(state)
+        self._emit("agents", agents=copy.deepcopy(agents))
 
     # ─────────────────────────────────────────────────────────────────────────
     # 查詢方法
     # ─────────────────────────────────────────────────────────────────────────
 
     def get_state(self) -> Dict:
-        """取得完整狀態"""
-        return self._load_state()
+        """取得完整狀態（副本）"""
+        with self._lock:
+            return copy.deepcopy(self._state)
 
     def get_stage(self) -> Optional[Dict]:
-        """取得當前階段"""
-        state = self._load_state()
-        return state.get("stage")
+        """取得當前階段（副本）"""
+        with self._lock:
+            return copy.deepcopy(self._state.get("stage"))
 
     def get_agents(self) -> List[Dict]:
-        """取得所有 Agents"""
-        state = self._load_state()
-        return state.get("agents", [])
+        """取得所有 Agents（副本）"""
+        with self._lock:
+            return copy.deepcopy(self._state.get("agents", []))
 
     def get_progress(self) -> Dict:
-        """取得進度統計"""
-        state = self._load_state()
-        return state.get("progress", {"agents_completed": 0, "agents_total": 0})
+        """取得進度統計（副本）"""
+        with self._lock:
+            return dict(self._state.get("progress", {"agents_completed": 0, "agents_total": 0}))
 
     def is_all_agents_done(self) -> bool:
         """檢查是否所有 Agents 都完成"""
@@ -262,6 +599,15 @@ class StateTracker:
 # 全域狀態追蹤器快取
 _trackers: Dict[str, StateTracker] = {}
 
+# 程序結束時寫入所有追蹤器尚未寫入的狀態
+_tracker_refs: "weakref.WeakSet[StateTracker]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_trackers() -> None:
+    for tracker in list(_tracker_refs):
+        tracker.flush()
+
 
 def get_tracker(workflow_id: str, base_path: Optional[str] = None) -> StateTracker:
     """取得狀態追蹤器實例"""
@@ -270,7 +616,14 @@ def get_tracker(workflow_id: str, base_path: Optional[str] = None) -> StateTrack
     return _trackers[workflow_id]
 
 
+def release_tracker(workflow_id: str) -> None:
+    """寫入狀態並自快取移除（工作流結束時呼叫）"""
+    tracker = _trackers.pop(workflow_id, None)
+    if tracker is not None:
+        tracker.flush()
+
+
 def read_current_state(workflow_id: str, base_path: Optional[str] = None) -> Dict:
-    """快速讀取當前狀態"""
-    tracker = get_tracker(workflow_id, base_path)
+    """快速讀取當前狀態（不加入快取）"""
+    tracker = _trackers.get(workflow_id) or StateTracker(workflow_id, base_path)
     return tracker.get_state()
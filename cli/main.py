@@ -8,16 +8,27 @@ Multi-Agent Workflow CLI 入口
 - maw run "需求" --start-from PLAN  從指定階段開始
 - maw run "需求" --mode quick       快速模式
 - maw current                  查看當前執行狀態
+- maw current --follow         持續顯示狀態變化（追蹤狀態事件日誌）
 - maw status [workflow_id]     查看工作流狀態
-- maw logs <workflow_id>       查看日誌
-- maw list                     列出工作流
+- maw logs <workflow_id>       查看日誌（-a / -l / -s 篩選、--page 分頁）
+- maw stats                    跨工作流的 Action 統計（次數、失敗率、執行時間百分位數）
+- maw list                     列出工作流（--status / --date / --topic 篩選、--page 分頁）
 - maw validate <workflow_id>   驗證工作流
+- maw resume <workflow_id>     由檢查點恢復中斷的工作流
+- maw batch topics.yaml        在同一程序內並行執行多個工作流
+- maw serve                    啟動常駐編排服務（run / current 自動使用）
+- maw jobs                     查看持久化工作佇列
+- maw recover                  恢復租約過期（程序被終止）的工作流
+- maw run "需求" --broker jobs.db   視角 Agent 分派給 worker 執行
+- maw worker --broker jobs.db  執行分派來的視角 Agent
 """
 
+import time
 from typing import List, Optional
 
 import typer
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
@@ -26,7 +37,7 @@ from . import __version__
 from .config.models import StageID, WorkflowMode
 from .config.stages import STAGE_ORDER
 from .io.memory import get_memory
-from .io.state import read_current_state
+from .io.state import StateFollower
 
 app = typer.Typer(
     name="maw",
@@ -93,6 +104,17 @@ def run(
         "--dry-run",
         help="只顯示計劃，不執行",
     ),
+    local: bool = typer.Option(
+        False,
+        "--local",
+        help="不使用常駐服務，在本程序內執行",
+    ),
+    broker: Optional[str] = typer.Option(
+        None,
+        "--broker",
+        envvar="MAW_BROKER",
+        help="視角工作佇列（共享儲存上的 SQLite 檔），視角 Agent 交由 maw worker 執行",
+    ),
 ):
     """
     執行完整工作流
@@ -101,6 +123,7 @@ def run(
         maw run "建立用戶認證系統"
         maw run "優化效能" --start-from IMPLEMENT
         maw run "新增功能" --mode quick
+        maw run "重構" --broker /shared/maw/jobs.db
     """
     from .orchestrator.workflow import create_workflow
 
@@ -124,12 +147,22 @@ def run(
         _show_plan(topic, start_from, skip, mode)
         return
 
+    # 常駐服務執行中時提交給服務（共用暖快取與 Agent 槽位）
+    if not local and not broker:
+        from .orchestrator.daemon import find_daemon
+
+        client = find_daemon()
+        if client is not None:
+            _run_via_daemon(client, topic, mode, start_from, skip)
+            return
+
     # 建立並執行工作流
     workflow = create_workflow(
         topic=topic,
         mode=mode,
         start_from=start_from,
         skip_stages=skip,
+        broker=_make_broker(broker),
     )
 
     console.print(f"[dim]Workflow ID: {workflow.workflow_id}[/dim]")
@@ -146,7 +179,75 @@ def run(
 
         progress.update(task, completed=True)
 
-    # 顯示結果
+    _show_result(result)
+
+
+def _make_broker(path: Optional[str]):
+    """由 --broker 路徑建立視角分派器（未指定時回傳 None）"""
+    if not path:
+        return None
+
+    from .io.job_queue import JobQueue
+    from .orchestrator.broker import QueueBroker
+
+    return QueueBroker(JobQueue(path))
+
+
+def _run_via_daemon(client, topic: str, mode: str, start_from: Optional[str], skip: Optional[List[str]]):
+    """提交工作流給常駐服務並跟隨事件直到結束"""
+    from .config.actions import format_action
+    from .config.models import BatchEntry, WorkflowResult
+    from .orchestrator.errors import WorkflowError
+
+    entry = BatchEntry(
+        topic=topic,
+        mode=WorkflowMode(mode),
+        start_from=StageID(start_from.upper()) if start_from else None,
+        skip_stages=[StageID(s.upper()) for s in skip or []],
+    )
+    try:
+        workflow_id = client.submit(entry)
+    except WorkflowError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    console.print(f"[dim]Workflow ID: {workflow_id} (via maw serve)[/dim]")
+    console.print()
+
+    snapshot = None
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("等待服務排程...", total=None)
+        try:
+            for event in client.events(workflow_id):
+                if event["type"] == "end":
+                    snapshot = event["workflow"]
+                    break
+                record = event["record"]
+                progress.update(
+                    task,
+                    description=format_action(record.get("action", ""), record.get("details", {})),
+                )
+        except KeyboardInterrupt:
+            client.cancel(workflow_id)
+            console.print(f"[yellow]已要求取消（將停在階段邊界）: {workflow_id}[/yellow]")
+            raise typer.Exit(130)
+        progress.update(task, completed=True)
+
+    if not snapshot or not snapshot.get("result"):
+        console.print(Panel(
+            f"[red]工作流未完成[/red]\n狀態: {(snapshot or {}).get('state', 'unknown')}",
+            title="Result",
+        ))
+        raise typer.Exit(1)
+    _show_result(WorkflowResult.model_validate(snapshot["result"]))
+
+
+def _show_result(result):
+    """顯示工作流執行結果（失敗時以結束碼 1 離開）"""
     if result.success:
         console.print(Panel(
             f"[green]工作流完成[/green]\n"
@@ -208,38 +309,40 @@ def _show_plan(
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-@app.command()
-def current():
-    """查看當前執行狀態"""
-    memory = get_memory()
-    workflow = memory.get_active_workflow()
-
-    if not workflow:
-        console.print("[yellow]沒有活動的工作流[/yellow]")
-        return
-
-    workflow_id = workflow.get("id", "unknown")
-
-    try:
-        state = read_current_state(workflow_id)
-    except Exception:
-        console.print("[yellow]無法讀取狀態[/yellow]")
-        return
-
-    # 顯示狀態
-    console.print(Panel(
-        f"[bold]{state['workflow'].get('topic', 'Unknown')}[/bold]",
-        title=f"Workflow: {workflow_id}",
+# Agent 狀態圖示
+AGENT_STATUS_ICONS = {
+    "pending": "⏳",
+    "running": "🔄",
+    "completed": "✅",
+    "failed": "❌",
+    "cancelled": "⏹️",
+}
+
+
+def _render_state(workflow_id: str, state: dict) -> Group:
+    """繪製工作流即時狀態（current 與 current --follow 共用）"""
+    parts: list = []
+    title = f"Workflow: {workflow_id}"
+    if status := state["workflow"].get("status"):
+        title += f" · {status}"
+    parts.append(Panel(
+        f"[bold]{state['workflow'].get('topic') or 'Unknown'}[/bold]",
+        title=title,
     ))
 
     # 階段資訊
     if stage := state.get("stage"):
-        console.print(f"\n[cyan]Stage {stage['index']}/{stage['total']}:[/cyan] {stage['name']}")
-        console.print(f"[dim]{stage['description']}[/dim]")
+        parts.append(f"\n[cyan]Stage {stage['index']}/{stage['total']}:[/cyan] {stage['name']}")
+        parts.append(f"[dim]{stage['description']}[/dim]")
+        if early := stage.get("early_completion"):
+            cancelled = ", ".join(early.get("cancelled", [])) or "-"
+            parts.append(
+                f"[yellow]提前完成 ({early['reason']})：成功 {early['succeeded']}，取消 {cancelled}[/yellow]"
+            )
 
     # Agent 狀態
     if agents := state.get("agents"):
-        console.print("\n[bold]Agents:[/bold]")
+        parts.append("\n[bold]Agents:[/bold]")
 
         table = Table(show_header=True, show_lines=False)
         table.add_column("ID", style="cyan")
@@ -247,15 +350,8 @@ def current():
         table.add_column("Status")
         table.add_column("Task", max_width=40)
 
-        status_icons = {
-            "pending": "⏳",
-            "running": "🔄",
-            "completed": "✅",
-            "failed": "❌",
-        }
-
         for agent in agents:
-            icon = status_icons.get(agent.get("status", "pending"), "?")
+            icon = AGENT_STATUS_ICONS.get(agent.get("status", "pending"), "?")
             table.add_row(
                 agent.get("id", ""),
                 agent.get("name", ""),
@@ -263,14 +359,74 @@ def current():
                 agent.get("task", "")[:40] if agent.get("task") else "",
             )
 
-        console.print(table)
+        parts.append(table)
 
     # 進度
     progress = state.get("progress", {})
     completed = progress.get("agents_completed", 0)
     total = progress.get("agents_total", 0)
     if total > 0:
-        console.print(f"\n[bold]Progress:[/bold] {completed}/{total} agents completed")
+        parts.append(f"\n[bold]Progress:[/bold] {completed}/{total} agents completed")
+
+    return Group(*parts)
+
+
+@app.command()
+def current(
+    follow: bool = typer.Option(
+        False, "--follow", "-f",
+        help="持續顯示狀態變化（追蹤狀態事件日誌，直到工作流結束或 Ctrl+C）",
+    ),
+    interval: float = typer.Option(0.2, "--interval", help="follow 檢查日誌的間隔（秒）"),
+):
+    """查看當前執行狀態"""
+    from .orchestrator.daemon import find_daemon
+
+    memory = get_memory()
+    workflow_id = None
+
+    # 常駐服務執行中時，以服務中最近提交且執行中的工作流為準
+    client = find_daemon(memory)
+    if client is not None:
+        jobs = client.list()
+        running = [j for j in jobs if j["state"] == "running"]
+        pending = [j for j in jobs if j["state"] == "pending"]
+        console.print(
+            f"[dim]maw serve: 執行中 {len(running)} · 等待 {len(pending)} · 共 {len(jobs)}[/dim]"
+        )
+        if running:
+            workflow_id = running[-1]["workflow_id"]
+
+    if workflow_id is None:
+        workflow = memory.get_active_workflow()
+
+        if not workflow:
+            console.print("[yellow]沒有活動的工作流[/yellow]")
+            return
+
+        workflow_id = workflow.get("id", "unknown")
+
+    # 唯讀：由快照 + 事件日誌重建狀態（不建立 StateTracker，不寫入）
+    workflow_dir = memory.get_workflow_dir(workflow_id)
+    if workflow_dir is None:
+        console.print("[yellow]無法讀取狀態[/yellow]")
+        return
+    follower = StateFollower(workflow_dir, workflow_id)
+    state = follower.load()
+
+    if not follow:
+        console.print(_render_state(workflow_id, state))
+        return
+
+    # 只有新追加的事件才重新繪製
+    try:
+        with Live(_render_state(workflow_id, state), console=console, auto_refresh=False) as live:
+            while not follower.finished:
+                time.sleep(interval)
+                if follower.poll():
+                    live.update(_render_state(workflow_id, follower.state), refresh=True)
+    except KeyboardInterrupt:
+        pass
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -287,11 +443,8 @@ def status(
 
     if workflow_id:
         # 查找特定工作流
-        workflows = memory.list_workflows(limit=100)
-        workflow = next(
-            (w for w in workflows if workflow_id in w.get("id", "")),
-            None,
-        )
+        workflows = memory.list_workflows(limit=1, id_contains=workflow_id)
+        workflow = workflows[0] if workflows else None
         if not workflow:
             console.print(f"[red]找不到工作流: {workflow_id}[/red]")
             raise typer.Exit(1)
@@ -341,10 +494,20 @@ def _show_workflow_status(workflow: dict):
 @app.command(name="list")
 def list_workflows(
     limit: int = typer.Option(10, "--limit", "-n", help="顯示數量"),
+    page: int = typer.Option(1, "--page", "-p", help="頁數（每頁 --limit 筆）"),
+    status: Optional[str] = typer.Option(None, "--status", "-s", help="篩選狀態"),
+    date: Optional[str] = typer.Option(None, "--date", "-d", help="篩選建立日期 (YYYY-MM-DD)"),
+    topic: Optional[str] = typer.Option(None, "--topic", "-t", help="篩選主題（包含文字）"),
+    reindex: bool = typer.Option(False, "--reindex", help="由磁碟重建工作流索引"),
 ):
     """列出工作流"""
     memory = get_memory()
-    workflows = memory.list_workflows(limit=limit)
+    if reindex:
+        count = memory.catalog.rebuild()
+        console.print(f"[dim]已重建索引：{count} 個工作流[/dim]")
+
+    filters = {"status": status, "date": date, "topic": topic}
+    workflows = memory.list_workflows(limit=limit, offset=(max(page, 1) - 1) * limit, **filters)
 
     if not workflows:
         console.print("[yellow]沒有找到工作流[/yellow]")
@@ -363,6 +526,7 @@ def list_workflows(
         "completed": "✅",
         "failed": "❌",
         "human_intervention": "👤",
+        "cancelled": "⏹️",
     }
 
     for wf in workflows:
@@ -380,6 +544,10 @@ def list_workflows(
         )
 
     console.print(table)
+    total = memory.catalog.count(**filters)
+    if total > limit:
+        pages = (total + limit - 1) // limit
+        console.print(f"[dim]第 {max(page, 1)}/{pages} 頁 · 共 {total} 個工作流[/dim]")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -392,24 +560,29 @@ def logs(
     workflow_id: str = typer.Argument(..., help="工作流 ID"),
     action: Optional[str] = typer.Option(None, "--action", "-a", help="篩選 action 類型"),
     level: Optional[str] = typer.Option(None, "--level", "-l", help="篩選 level"),
+    stage: Optional[str] = typer.Option(None, "--stage", "-s", help="篩選階段"),
     limit: int = typer.Option(50, "--limit", "-n", help="顯示數量"),
+    page: int = typer.Option(1, "--page", "-p", help="頁數（由最新往前，每頁 --limit 筆）"),
 ):
     """查看工作流日誌"""
     from .io.logging import get_logger
 
+    if not get_memory().get_workflow_dir(workflow_id):
+        console.print(f"[red]找不到工作流: {workflow_id}[/red]")
+        raise typer.Exit(1)
+
     logger = get_logger(workflow_id)
-    records = logger.get_logs(limit=limit)
+    filters = {
+        "action_filter": [action] if action else None,
+        "level_filter": [level] if level else None,
+        "stage": stage,
+    }
+    records = logger.get_logs(limit=limit, offset=(max(page, 1) - 1) * limit, **filters)
 
     if not records:
         console.print("[yellow]沒有找到日誌[/yellow]")
         return
 
-    # 篩選
-    if action:
-        records = [r for r in records if r.get("action") == action]
-    if level:
-        records = [r for r in records if r.get("level") == level]
-
     # 顯示
     level_colors = {
         "info": "white",
@@ -417,7 +590,7 @@ def logs(
         "error": "red",
     }
 
-    for record in records[-limit:]:
+    for record in records:
         timestamp = record.get("timestamp", "")[:19]
         lvl = record.get("level", "info")
         act = record.get("action", "")
@@ -433,6 +606,100 @@ def logs(
 
         console.print(f"[dim]{timestamp}[/dim] [{color}]{lvl:7}[/{color}] {act}{details_str}")
 
+    total = logger.count_logs(**filters)
+    if total > limit:
+        pages = (total + limit - 1) // limit
+        console.print(f"[dim]第 {max(page, 1)}/{pages} 頁 · 共 {total} 筆[/dim]")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# stats 命令
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@app.command()
+def stats(
+    by: str = typer.Option("tool", "--by", "-b", help="分組欄位（tool / agent / stage / workflow / status）"),
+    workflow_id: Optional[str] = typer.Option(None, "--workflow", "-w", help="只統計此工作流"),
+    stage: Optional[str] = typer.Option(None, "--stage", "-s", help="只統計此階段"),
+    since: Optional[float] = typer.Option(None, "--since", help="只統計最近 N 小時"),
+    bucket: Optional[int] = typer.Option(None, "--bucket", help="依 N 分鐘分桶顯示次數"),
+    as_json: bool = typer.Option(False, "--json", help="以 JSON 輸出"),
+):
+    """跨工作流的 Action 統計"""
+    import json
+
+    from .io.action_store import STRING_COLUMNS, ActionStore, find_action_logs, hook_log_dirs
+
+    if by not in STRING_COLUMNS:
+        console.print(f"[red]未知的分組欄位: {by}（可用：{' / '.join(STRING_COLUMNS)}）[/red]")
+        raise typer.Exit(1)
+
+    memory = get_memory()
+    store = ActionStore(memory.base_path / "analytics")
+    # ActionLogger 的工作流日誌 + hook 腳本的工具日誌（專案與家目錄的 .claude/workflow）
+    added = store.ingest_many(find_action_logs([memory.base_path / "workflows", *hook_log_dirs()]))
+
+    rows = store.select(
+        workflow=workflow_id,
+        stage=stage,
+        since=time.time() - since * 3600 if since is not None else None,
+    )
+    rates = store.failure_rates(by, rows)
+    percentiles = store.percentiles(by, rows=rows)
+    histogram = store.histogram(bucket * 60, rows) if bucket else None
+
+    if as_json:
+        result = {
+            "total": len(rows),
+            "by": by,
+            "groups": {k: {**v, **percentiles[k]} for k, v in rates.items()},
+        }
+        if histogram is not None:
+            result["histogram"] = {k: v["total"] for k, v in histogram.items()}
+        console.print_json(json.dumps(result, ensure_ascii=False))
+        return
+
+    if not rows:
+        console.print("[yellow]沒有找到 Action 記錄[/yellow]")
+        return
+
+    def ms(value: Optional[float]) -> str:
+        return f"{value:.0f}" if value is not None else "-"
+
+    table = Table(show_header=True)
+    table.add_column(by.capitalize(), style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("Rate", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p90 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+
+    for name, rate in sorted(rates.items(), key=lambda item: -item[1]["count"]):
+        p = percentiles[name]
+        color = "red" if rate["failure_rate"] >= 0.1 else "white"
+        table.add_row(
+            name or "-",
+            str(rate["count"]),
+            str(rate["failed"]),
+            f"[{color}]{rate['failure_rate']:.1%}[/{color}]",
+            ms(p["p50"]),
+            ms(p["p90"]),
+            ms(p["p99"]),
+        )
+
+    console.print(table)
+
+    if histogram:
+        peak = max(v["total"] for v in histogram.values())
+        console.print()
+        for start, counts in histogram.items():
+            bar = "█" * max(1, round(counts["total"] / peak * 40))
+            console.print(f"[dim]{start[:16]}[/dim] {bar} {counts['total']}")
+
+    console.print(f"[dim]共 {len(rows)} 筆 · 本次新匯入 {added} 筆[/dim]")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # validate 命令
@@ -497,12 +764,344 @@ def resume(
         "-f",
         help="從指定階段恢復",
     ),
+    broker: Optional[str] = typer.Option(
+        None,
+        "--broker",
+        envvar="MAW_BROKER",
+        help="視角工作佇列（共享儲存上的 SQLite 檔）",
+    ),
 ):
-    """恢復中斷的工作流"""
-    console.print(f"[bold]恢復工作流: {workflow_id}[/bold]")
+    """
+    恢復中斷的工作流
+
+    沿用相同 workflow ID，已完成的階段與視角不重新執行。
+
+    Example:
+        maw resume auth-20250101-abc123
+        maw resume auth-20250101-abc123 --from REVIEW
+    """
+    from .orchestrator.errors import WorkflowError
+    from .orchestrator.workflow import load_workflow
+
+    stage = None
+    if from_stage:
+        try:
+            stage = StageID(from_stage.upper())
+        except ValueError:
+            console.print(f"[red]無效的階段: {from_stage}[/red]")
+            console.print(f"有效階段: {', '.join(s.value for s in StageID)}")
+            raise typer.Exit(1)
+
+    try:
+        workflow = load_workflow(workflow_id, broker=_make_broker(broker))
+    except WorkflowError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    next_stage = stage or workflow.next_stage
+    if next_stage is None:
+        console.print(f"[green]工作流已完成: {workflow_id}[/green]")
+        return
 
-    # TODO: 實作恢復邏輯
-    console.print("[yellow]功能開發中...[/yellow]")
+    console.print(Panel(
+        f"[bold blue]恢復工作流[/bold blue]\n{workflow.config.topic}\n"
+        f"從 {next_stage.value} 繼續 · 迭代 {workflow.iteration} · "
+        f"已完成階段: {', '.join(workflow.stage_results) or '無'}"
+    ))
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("執行工作流...", total=None)
+
+        result = workflow.resume(stage)
+
+        progress.update(task, completed=True)
+
+    _show_result(result)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# batch 命令
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@app.command()
+def batch(
+    file: str = typer.Argument(..., help="批次檔（topics.yaml）"),
+    concurrency: Optional[int] = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        help="同時執行的工作流數（預設使用批次檔設定或 4）",
+    ),
+):
+    """
+    在同一程序內並行執行多個工作流
+
+    所有工作流共用同一個 Agent 排程器與 Memory；優先級高者先啟動，
+    並在模型槽位緊張時取得較多槽位。
+
+    Example:
+        maw batch topics.yaml
+        maw batch topics.yaml --concurrency 8
+    """
+    import threading
+
+    from .orchestrator.batch import BatchRunner, load_batch, summarize_batch
+    from .orchestrator.errors import WorkflowError
+
+    try:
+        entries, file_concurrency = load_batch(file)
+    except WorkflowError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    runner = BatchRunner(concurrency=concurrency or file_concurrency or 4)
+    console.print(Panel(
+        f"[bold blue]批次執行[/bold blue]\n"
+        f"{len(entries)} 個工作流 · 並行 {runner.concurrency}"
+    ))
+
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(runner.run(entries)), daemon=True)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("執行批次...", total=len(entries))
+        thread.start()
+        while thread.is_alive():
+            thread.join(0.5)
+            snapshot = runner.progress()
+            stages = ", ".join(
+                f"{wf['topic'][:15]}:{wf['stage'] or '-'}"
+                for wf in snapshot["workflows"]
+                if wf["state"] == "running"
+            )
+            progress.update(
+                task,
+                completed=snapshot["completed"] + snapshot["failed"],
+                description=(
+                    f"完成 {snapshot['completed']} · 失敗 {snapshot['failed']} · "
+                    f"執行中 {snapshot['running']} · 等待 {snapshot['pending']}"
+                    + (f" [dim]({stages})[/dim]" if stages else "")
+                ),
+            )
+
+    _show_batch_summary(results, summarize_batch(results))
+    if any(not r.success for r in results):
+        raise typer.Exit(1)
+
+
+def _show_batch_summary(results, summary: dict):
+    """顯示批次結果表"""
+    table = Table(show_header=True, title="Batch Summary")
+    table.add_column("Topic")
+    table.add_column("Priority", justify="right")
+    table.add_column("Workflow ID", style="cyan")
+    table.add_column("Status")
+    table.add_column("Quality", justify="right")
+    table.add_column("Iterations", justify="right")
+    table.add_column("Duration", justify="right")
+
+    for item in results:
+        result = item.result
+        status = result.final_status.value if result else "error"
+        icon = "✅" if item.success else "❌"
+        quality = result.quality_score if result else None
+        table.add_row(
+            item.entry.topic[:30],
+            str(item.entry.priority),
+            item.workflow_id or "-",
+            f"{icon} {status}",
+            f"{quality:.1f}" if quality is not None else "-",
+            str(result.total_iterations) if result else "-",
+            f"{result.duration_seconds:.1f}s" if result and result.duration_seconds else "-",
+        )
+
+    console.print(table)
+    avg = summary["avg_quality"]
+    console.print(
+        f"成功 {summary['succeeded']}/{summary['total']} · "
+        f"平均品質 {f'{avg:.1f}' if avg is not None else '-'} · "
+        f"累計執行時間 {summary['total_duration_seconds']:.1f}s"
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# serve 命令
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="綁定位址"),
+    port: int = typer.Option(8765, "--port", "-p", help="綁定埠"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="同時執行的工作流數"),
+):
+    """
+    啟動常駐編排服務
+
+    服務執行中時，`maw run` 會把工作流提交給服務（共用回應快取與 Agent 槽位），
+    `maw current` 會顯示服務中的工作流。Ctrl+C 停止：執行中的工作流停在階段邊界，
+    之後可用 `maw resume` 繼續。
+
+    Example:
+        maw serve
+        maw serve --port 9000 --concurrency 8
+    """
+    from .orchestrator.daemon import OrchestratorDaemon, find_daemon
+
+    if find_daemon() is not None:
+        console.print("[red]已有常駐服務在執行[/red]")
+        raise typer.Exit(1)
+
+    daemon = OrchestratorDaemon(host=host, port=port, concurrency=concurrency)
+    try:
+        daemon.start()
+    except OSError as e:
+        console.print(f"[red]無法啟動服務: {e}[/red]")
+        raise typer.Exit(1)
+
+    console.print(Panel(
+        f"[bold blue]maw serve[/bold blue]\n"
+        f"http://{daemon.host}:{daemon.port} · 並行 {daemon.concurrency}\n"
+        f"[dim]Ctrl+C 停止[/dim]"
+    ))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        console.print("[yellow]停止中：等待執行中的工作流到達階段邊界...[/yellow]")
+    finally:
+        daemon.shutdown()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# jobs / recover 命令
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@app.command()
+def jobs(
+    workflow_id: Optional[str] = typer.Argument(None, help="只顯示指定工作流"),
+    status: Optional[str] = typer.Option(
+        None, "--status", "-s", help="篩選狀態 (queued/leased/done/failed/cancelled)"
+    ),
+    kind: Optional[str] = typer.Option(None, "--kind", "-k", help="篩選種類 (workflow/stage/perspective)"),
+):
+    """查看持久化工作佇列"""
+    from .io.job_queue import get_job_queue
+
+    queue = get_job_queue()
+    queue.requeue_expired()
+    records = queue.list(workflow_id=workflow_id, status=status, kind=kind)
+
+    if not records:
+        console.print("[yellow]佇列中沒有工作[/yellow]")
+        return
+
+    table = Table(show_header=True)
+    table.add_column("ID", justify="right")
+    table.add_column("Kind")
+    table.add_column("Workflow", style="cyan")
+    table.add_column("Key")
+    table.add_column("Priority", justify="right")
+    table.add_column("Submitter")
+    table.add_column("Status")
+    table.add_column("Attempts", justify="right")
+    table.add_column("Lease")
+
+    now = time.time()
+    for job in records:
+        lease = "-"
+        if job.lease_expires:
+            lease = f"{job.lease_owner} ({job.lease_expires - now:.0f}s)"
+        table.add_row(
+            str(job.id),
+            job.kind,
+            job.workflow_id[:25],
+            job.key or "-",
+            str(job.priority),
+            job.submitter,
+            job.status,
+            f"{job.attempts}/{job.max_attempts}",
+            lease,
+        )
+
+    console.print(table)
+
+
+@app.command()
+def recover(
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", help="最多恢復的工作流數"),
+):
+    """
+    恢復被中斷的工作流
+
+    回收過期租約，依優先級與提交者公平性取出工作流，由檢查點繼續執行。
+    """
+    from .orchestrator.workflow import recover_workflows
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("恢復工作流...", total=None)
+        results = recover_workflows(limit=limit)
+        progress.update(task, completed=True)
+
+    if not results:
+        console.print("[green]沒有需要恢復的工作流[/green]")
+        return
+
+    for result in results:
+        icon = "✅" if result.success else "❌"
+        console.print(f"{icon} {result.workflow_id}: {result.final_status.value}")
+    if any(not r.success for r in results):
+        raise typer.Exit(1)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# worker 命令
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@app.command()
+def worker(
+    broker: str = typer.Option(
+        ..., "--broker", envvar="MAW_BROKER", help="視角工作佇列（共享儲存上的 SQLite 檔）"
+    ),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="同時執行的視角數"),
+    max_jobs: Optional[int] = typer.Option(None, "--max-jobs", help="處理此數量的工作後結束"),
+):
+    """
+    執行分派來的視角 Agent
+
+    從 broker 取出 `maw run --broker` 提交的視角工作，在本機調用 Agent 並回報結果。
+    worker 需能存取相同的專案與 Memory 路徑。Ctrl+C 停止：處理中的工作完成後結束，
+    被強制終止時租約過期，工作由其他 worker 接手。
+
+    Example:
+        maw worker --broker /shared/maw/jobs.db --concurrency 8
+    """
+    from .io.job_queue import JobQueue
+    from .orchestrator.broker import AgentWorker
+
+    agent_worker = AgentWorker(JobQueue(broker), concurrency=concurrency)
+    console.print(Panel(
+        f"[bold blue]maw worker[/bold blue]\n"
+        f"{broker} · 並行 {agent_worker.concurrency}\n"
+        f"[dim]Ctrl+C 停止[/dim]"
+    ))
+    processed = agent_worker.run(max_jobs=max_jobs)
+    console.print(f"[green]已處理 {processed} 個視角工作[/green]")
 
 
 if __name__ == "__main__":
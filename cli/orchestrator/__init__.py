@@ -5,6 +5,18 @@ Orchestrator 模組 - 工作流編排核心
 - workflow.py: 工作流狀態機
 - stage_runner.py: 階段執行器
 - agent_caller.py: Agent 調用
+- engine.py: 非同步執行引擎
+- scheduler.py: 全域並發排程
+- streaming.py: 串流輸出讀取
+- fingerprint.py: 視角指紋（回退迭代間重用結果）
+- task_executor.py: DAG 任務執行器
+- batch.py: 多工作流批次執行
+- daemon.py: 常駐編排服務（maw serve）與客戶端
+- broker.py: 視角工作分派（maw worker）
+- json_extract.py: JSON 區塊擷取
+- json_repair.py: JSON 容錯修復
+- retry.py: 重試與對沖策略
+- synthesis.py: 管線化綜合與部分綜合合併
 - rollback.py: 智慧回退
 - errors.py: 錯誤定義
 """
@@ -12,6 +24,7 @@ Orchestrator 模組 - 工作流編排核心
 from .errors import (
     MAWError,
     WorkflowError,
+    WorkflowCancelled,
     StageError,
     AgentError,
     ValidationError,
@@ -21,6 +34,7 @@ from .errors import (
 __all__ = [
     "MAWError",
     "WorkflowError",
+    "WorkflowCancelled",
     "StageError",
     "AgentError",
     "ValidationError",
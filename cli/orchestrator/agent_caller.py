@@ -6,17 +6,35 @@ Agent 調用模組 - 限制工具、強制 JSON 返回
 - 限制工具：只允許 Read/Glob/Grep/Bash/WebFetch
 - 禁止：Write/Task（確定性操作由 CLI 執行）
 - 強制 JSON 輸出
+
+執行模型：
+- 核心為 async（asyncio.create_subprocess_exec），在長駐事件迴圈中執行
+- 同步 API（call / call_parallel）只是把 coroutine 丟進引擎的薄包裝
 """
 
+import asyncio
+import concurrent.futures
 import json
-import re
-import subprocess
 import time
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 from ..config.models import AgentResponse
+from ..io.cache import ResponseCache, get_response_cache
+from ..prompts.base import strip_volatile_context
+from ..validators.schema import validate_schema
+from .engine import AgentEngine, get_engine
 from .errors import AgentError
+from .fingerprint import cache_context, upstream_digests
+from .json_extract import extract_json
+from .json_repair import repair_json
+from .retry import KIND_TIMEOUT, HedgePolicy, RetryPolicy, classify_failure
+from .scheduler import AgentScheduler, get_scheduler
+from .streaming import EventCallback, StreamLimits, StreamReader
+
 
+# 未指定工作流時的統計分組
+STATS_DEFAULT_KEY = "_default"
 
 # 允許的工具列表
 ALLOWED_TOOLS = [
@@ -45,6 +63,14 @@ class AgentCaller:
         default_model: str = "sonnet",
         timeout: int = 300,
         max_retries: int = 3,
+        engine: Optional[AgentEngine] = None,
+        scheduler: Optional[AgentScheduler] = None,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        streaming: bool = False,
+        stream_limits: Optional[StreamLimits] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
     ):
         """
         初始化 Agent 調用器
@@ -52,11 +78,51 @@ class AgentCaller:
         Args:
             default_model: 預設模型
             timeout: 超時時間（秒）
-            max_retries: 最大重試次數
+            max_retries: 最大嘗試次數（未指定 retry_policy 時使用）
+            engine: 執行引擎（預設使用全域引擎）
+            scheduler: 並發排程器（預設使用全域排程器）
+            cache: 回應快取（預設使用全域快取）
+            use_cache: 是否預設啟用快取（可逐次覆蓋）
+            streaming: 是否使用 stream-json 串流模式
+            stream_limits: 串流模式的輸出大小/閒置限制
+            retry_policy: 重試策略（退避、失敗分類）
+            hedge_policy: 對沖策略（None 表示不對沖）
         """
         self.default_model = default_model
         self.timeout = timeout
         self.max_retries = max_retries
+        self.engine = engine or get_engine()
+        self.scheduler = scheduler or get_scheduler()
+        self.use_cache = use_cache
+        self._cache = cache
+        self.streaming = streaming
+        self.stream_limits = stream_limits or StreamLimits()
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries)
+        self.hedge_policy = hedge_policy
+
+        # 進行中的請求（single-flight）：cache key -> Future[AgentResponse]
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 各工作流的統計計數
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @property
+    def cache(self) -> ResponseCache:
+        """回應快取（延遲建立）"""
+        if self._cache is None:
+            self._cache = get_response_cache()
+        return self._cache
+
+    def get_stats(self, workflow_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        取得統計計數
+
+        Args:
+            workflow_id: 工作流 ID（None 表示未指定工作流的調用）
+
+        Returns:
+            計數字典（cache_hits, cache_misses, inflight_joins, retries, hedges_launched ...）
+        """
+        return dict(self._stats[workflow_id or STATS_DEFAULT_KEY])
 
     def call(
         self,
@@ -64,15 +130,75 @@ class AgentCaller:
         model: Optional[str] = None,
         output_format: str = "json",
         context: Optional[Dict] = None,
+        workflow_id: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        on_event: Optional[EventCallback] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        agent_id: Optional[str] = None,
+        inputs: Optional[Dict[str, Any]] = None,
     ) -> AgentResponse:
         """
-        調用 Agent 並獲取 JSON 回應
+        調用 Agent 並獲取 JSON 回應（同步包裝）
 
         Args:
             prompt: Prompt 內容
             model: 使用的模型（預設使用 default_model）
             output_format: 輸出格式（json/text）
             context: 額外上下文
+            workflow_id: 所屬工作流（排程公平分配用）
+            use_cache: 是否使用回應快取（None 表示依預設）
+            on_event: 串流進度事件回呼（於引擎執行緒中呼叫）
+            schema: 預期的 JSON Schema（用於驗證修復後的輸出）
+            agent_id: Agent / 視角 ID（對沖延遲依此分組）
+            inputs: prompt 引用的上下文（其 *_outputs 檔案內容計入快取 key；預設為 context）
+
+        Returns:
+            AgentResponse 物件
+        """
+        return self.engine.run(
+            self.acall(
+                prompt,
+                model=model,
+                output_format=output_format,
+                context=context,
+                workflow_id=workflow_id,
+                use_cache=use_cache,
+                on_event=on_event,
+                schema=schema,
+                agent_id=agent_id,
+                inputs=inputs,
+            )
+        )
+
+    async def acall(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        output_format: str = "json",
+        context: Optional[Dict] = None,
+        workflow_id: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        on_event: Optional[EventCallback] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        agent_id: Optional[str] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+        cacheable: Optional[Callable[[AgentResponse], bool]] = None,
+    ) -> AgentResponse:
+        """
+        調用 Agent 並獲取 JSON 回應（async）
+
+        Args:
+            prompt: Prompt 內容
+            model: 使用的模型（預設使用 default_model）
+            output_format: 輸出格式（json/text）
+            context: 額外上下文
+            workflow_id: 所屬工作流（排程公平分配用）
+            use_cache: 是否使用回應快取（None 表示依預設）
+            on_event: 串流進度事件回呼（於引擎執行緒中呼叫）
+            schema: 預期的 JSON Schema（用於驗證修復後的輸出）
+            agent_id: Agent / 視角 ID（對沖延遲依此分組）
+            inputs: prompt 引用的上下文（其 *_outputs 檔案內容計入快取 key；預設為 context）
+            cacheable: 成功的回應是否可寫入快取（不符合的快取命中會移除並重新調用）
 
         Returns:
             AgentResponse 物件
@@ -83,21 +209,92 @@ class AgentCaller:
         # 構建完整 prompt
         full_prompt = self._build_prompt(prompt, output_format, context)
 
-        # 重試邏輯
+        if use_cache is None:
+            use_cache = self.use_cache
+        if not use_cache:
+            return await self._call_with_retries(
+                full_prompt, model, output_format, workflow_id, start_time,
+                on_event=on_event, schema=schema, agent_id=agent_id,
+            )
+
+        stats = self._stats[workflow_id or STATS_DEFAULT_KEY]
+        key = await self._cache_key(prompt, model, output_format, context, inputs)
+
+        # 1. 磁碟快取（索引掃描與檔案讀寫不在事件迴圈上執行）
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            response = AgentResponse(**cached)
+            if cacheable is None or cacheable(response):
+                stats["cache_hits"] += 1
+                response.cached = True
+                response.duration_seconds = time.time() - start_time
+                return response
+            await asyncio.to_thread(self.cache.invalidate, key)
+
+        # 2. 相同請求進行中：共用同一個子程序
+        #    （在上面的 await 之後才檢查；發起者寫入快取完成前不會移出 _inflight）
+        while key in self._inflight:
+            shared = self._inflight[key]
+            try:
+                response = await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # 發起者被取消，改由自己發起
+                continue
+            stats["inflight_joins"] += 1
+            return response.model_copy()
+
+        # 3. 實際調用
+        stats["cache_misses"] += 1
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[key] = shared
+        try:
+            response = await self._call_with_retries(
+                full_prompt, model, output_format, workflow_id, start_time,
+                on_event=on_event, schema=schema, agent_id=agent_id,
+            )
+            shared.set_result(response)
+            if response.success and (cacheable is None or cacheable(response)):
+                await asyncio.to_thread(
+                    self.cache.put, key, response.model_dump(exclude={"cached"})
+                )
+            return response
+        finally:
+            if not shared.done():
+                shared.cancel()
+            self._inflight.pop(key, None)
+
+    async def _call_with_retries(
+        self,
+        full_prompt: str,
+        model: str,
+        output_format: str,
+        workflow_id: Optional[str],
+        start_time: float,
+        on_event: Optional[EventCallback] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        agent_id: Optional[str] = None,
+    ) -> AgentResponse:
+        """執行 CLI 調用（含重試）"""
+        stats = self._stats[workflow_id or STATS_DEFAULT_KEY]
         last_error = None
-        for attempt in range(1, self.max_retries + 1):
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
             try:
-                result = self._execute_claude(full_prompt, model)
+                result = await self._execute_attempt(
+                    full_prompt, model, workflow_id, on_event, agent_id
+                )
                 duration = time.time() - start_time
 
                 # 解析回應
                 if output_format == "json":
-                    content = self._parse_json_response(result)
+                    content, repaired = self._parse_json_response(result, schema, stats)
                     return AgentResponse(
                         success=True,
                         content=content,
                         raw_output=result,
                         duration_seconds=duration,
+                        repaired=repaired,
                     )
                 else:
                     return AgentResponse(
@@ -109,9 +306,11 @@ class AgentCaller:
 
             except AgentError as e:
                 last_error = e
-                if not e.retryable or attempt >= self.max_retries:
+                if not self.retry_policy.should_retry(e, attempt):
                     break
-                time.sleep(2 ** attempt)  # 指數退避
+                stats["retries"] += 1
+                # 退避期間不佔用執行緒與排程槽位
+                await asyncio.sleep(self.retry_policy.backoff(attempt, e))
 
             except Exception as e:
                 last_error = AgentError(
@@ -128,6 +327,97 @@ class AgentCaller:
             duration_seconds=duration,
         )
 
+    async def _execute_attempt(
+        self,
+        full_prompt: str,
+        model: str,
+        workflow_id: Optional[str],
+        on_event: Optional[EventCallback],
+        agent_id: Optional[str],
+    ) -> str:
+        """執行一次嘗試（有足夠延遲歷史時啟用對沖）"""
+        delay = None
+        if self.hedge_policy is not None:
+            delay = self.hedge_policy.delay_for(model, agent_id)
+        if delay is None:
+            return await self._execute_once(full_prompt, model, workflow_id, on_event, agent_id)
+
+        stats = self._stats[workflow_id or STATS_DEFAULT_KEY]
+        primary = asyncio.ensure_future(
+            self._execute_once(full_prompt, model, workflow_id, on_event, agent_id)
+        )
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                # 超過歷史 p95：發起對沖調用（不回報串流進度，避免重複事件）
+                stats["hedges_launched"] += 1
+                pending.add(asyncio.ensure_future(
+                    self._execute_once(full_prompt, model, workflow_id, None, agent_id)
+                ))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            stats["hedges_won"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # 取消落後者（子程序會被終止）並等待清理完成
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _execute_once(
+        self,
+        full_prompt: str,
+        model: str,
+        workflow_id: Optional[str],
+        on_event: Optional[EventCallback],
+        agent_id: Optional[str],
+    ) -> str:
+        """向排程器申請槽位後執行一次 CLI，並記錄延遲"""
+        async with self.scheduler.slot(model, workflow_id):
+            started = time.monotonic()
+            if self.streaming:
+                result = await self._execute_claude_streaming(full_prompt, model, on_event)
+            else:
+                result = await self._execute_claude(full_prompt, model)
+
+        if self.hedge_policy is not None:
+            self.hedge_policy.record(model, agent_id, time.monotonic() - started)
+        return result
+
+    async def _cache_key(
+        self,
+        prompt: str,
+        model: str,
+        output_format: str,
+        context: Optional[Dict],
+        inputs: Optional[Dict[str, Any]],
+    ) -> str:
+        """
+        回應快取 key
+
+        prompt 與上下文排除工作流 ID 與迭代次數（回退迭代與相同主題的重新執行可命中），
+        另計入 Agent 可讀取的前階段輸出檔案內容摘要（檔案改變時不命中）。
+        """
+        key_prompt = strip_volatile_context(
+            self._build_prompt(prompt, output_format, cache_context(context) if context else None)
+        )
+        # 讀取檔案計算摘要，不佔用事件迴圈
+        digests = await asyncio.to_thread(
+            upstream_digests, inputs if inputs is not None else context or {}
+        )
+        return ResponseCache.make_key(key_prompt, model, ALLOWED_TOOLS, output_format, digests)
+
     def _build_prompt(
         self,
         prompt: str,
@@ -177,9 +467,9 @@ You MUST return your response as valid JSON.
 - Ensure the JSON is valid and parseable
 - Do not include any text outside the JSON block in your final response"""
 
-    def _execute_claude(self, prompt: str, model: str) -> str:
+    async def _execute_claude(self, prompt: str, model: str) -> str:
         """
-        執行 Claude CLI
+        執行 Claude CLI（非阻塞子程序）
 
         Args:
             prompt: 完整 prompt
@@ -197,27 +487,79 @@ You MUST return your response as valid JSON.
         ]
 
         try:
-            result = subprocess.run(
-                cmd,
-                input=prompt,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise AgentError(
+                "Claude CLI not found. Please install claude-code.",
+                retryable=False,
             )
 
-            if result.returncode != 0:
-                error_msg = result.stderr or "Unknown error"
-                raise AgentError(
-                    f"Claude CLI failed: {error_msg}",
-                    retryable=True,
-                )
-
-            return result.stdout
-
-        except subprocess.TimeoutExpired:
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(prompt.encode("utf-8")),
+                timeout=self.timeout,
+            )
+        except asyncio.TimeoutError:
+            await _kill_process(proc)
             raise AgentError(
                 f"Agent timed out after {self.timeout}s",
                 retryable=True,
+                details={"kind": KIND_TIMEOUT},
+            )
+        except asyncio.CancelledError:
+            # 被取消時確保子程序不會殘留
+            await _kill_process(proc)
+            raise
+
+        if proc.returncode != 0:
+            raise classify_failure(
+                stderr.decode("utf-8", errors="replace"),
+                proc.returncode,
+            )
+
+        return stdout.decode("utf-8", errors="replace")
+
+    async def _execute_claude_streaming(
+        self,
+        prompt: str,
+        model: str,
+        on_event: Optional[EventCallback] = None,
+    ) -> str:
+        """
+        以 stream-json 模式執行 Claude CLI，逐行讀取
+
+        讀到最終 result 事件即停止並終止子程序；同時套用輸出大小上限
+        與閒置逾時，可在總逾時前發現卡住或輸出亂碼的 Agent。
+
+        Args:
+            prompt: 完整 prompt
+            model: 模型名稱
+            on_event: 進度事件回呼
+
+        Returns:
+            最終文字輸出
+        """
+        cmd = [
+            "claude",
+            "--print",
+            "--model", model,
+            "--allowedTools", ",".join(ALLOWED_TOOLS),
+            "--output-format", "stream-json",
+            "--verbose",
+        ]
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=self.stream_limits.max_output_bytes,
             )
         except FileNotFoundError:
             raise AgentError(
@@ -225,52 +567,213 @@ You MUST return your response as valid JSON.
                 retryable=False,
             )
 
-    def _parse_json_response(self, output: str) -> Dict[str, Any]:
+        reader = StreamReader("stream-json", self.stream_limits, on_event)
+        # 同時讀取 stderr，避免管線塞滿造成子程序阻塞
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+        try:
+            proc.stdin.write(prompt.encode("utf-8"))
+            await proc.stdin.drain()
+            proc.stdin.close()
+
+            output = await asyncio.wait_for(reader.read(proc.stdout), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            await _kill_process(proc)
+            raise AgentError(
+                f"Agent timed out after {self.timeout}s",
+                retryable=True,
+                details={"kind": KIND_TIMEOUT},
+            )
+        except ValueError:
+            # 單行超過 StreamReader 上限
+            await _kill_process(proc)
+            raise AgentError(
+                f"Agent output exceeded {self.stream_limits.max_output_bytes} bytes",
+                retryable=True,
+                details={"kind": "output_limit"},
+            )
+        except BaseException:
+            await _kill_process(proc)
+            raise
+        finally:
+            if not stderr_task.done() and proc.returncode is not None:
+                stderr_task.cancel()
+
+        if reader.done:
+            # 已取得最終結果，不再等待子程序自行結束
+            await _kill_process(proc)
+            stderr_task.cancel()
+            return output
+
+        await proc.wait()
+        if proc.returncode != 0:
+            stderr = await stderr_task
+            raise classify_failure(
+                stderr.decode("utf-8", errors="replace"),
+                proc.returncode,
+            )
+
+        return output
+
+    def _parse_json_response(
+        self,
+        output: str,
+        schema: Optional[Dict[str, Any]] = None,
+        stats: Optional[Dict[str, int]] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
         """
-        解析 JSON 回應
+        解析 JSON 回應（必要時修復）
 
         Args:
             output: CLI 輸出
+            schema: 預期的 JSON Schema（修復結果須通過驗證）
+            stats: 統計計數（json_parses / json_repairs / json_repair_failures）
 
         Returns:
-            解析後的 JSON 物件
+            (解析後的 JSON 物件, 是否經過修復)
         """
-        # 嘗試找到 JSON 區塊
-        json_patterns = [
-            r"```json\s*([\s\S]*?)\s*```",  # ```json ... ```
-            r"```\s*([\s\S]*?)\s*```",       # ``` ... ```
-            r"\{[\s\S]*\}",                   # 直接 JSON
-        ]
+        if stats is None:
+            stats = defaultdict(int)
+        stats["json_parses"] += 1
+
+        # 單次線性掃描：```json → ``` → 最外層物件，各類取最後一個
+        content = extract_json(output)
+        if content is not None:
+            return content, False
+
+        # 格式瑕疵（尾隨逗號、智慧引號、截斷）：修復後須符合 Schema 才採用
+        content, fixes = repair_json(output)
+        schema_errors = (
+            validate_schema(content, schema) if content is not None and schema else []
+        )
+        if content is not None and not schema_errors:
+            stats["json_repairs"] += 1
+            return content, True
 
-        for pattern in json_patterns:
-            matches = re.findall(pattern, output, re.MULTILINE)
-            if matches:
-                # 取最後一個匹配（通常是最終答案）
-                json_str = matches[-1] if isinstance(matches[-1], str) else matches[-1]
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    continue
+        stats["json_repair_failures"] += 1
+        details: Dict[str, Any] = {"raw_output": output[:500]}
+        if fixes:
+            details["repairs"] = fixes
+        if schema_errors:
+            details["schema_errors"] = schema_errors[:10]
 
         # 無法解析 JSON
         raise AgentError(
             "Failed to parse JSON from agent response",
             retryable=False,
-            details={"raw_output": output[:500]},
+            details=details,
         )
 
 
 class ParallelAgentCaller:
-    """並行 Agent 調用器"""
+    """
+    並行 Agent 調用器
 
-    def __init__(self, caller: Optional[AgentCaller] = None):
+    不自行建立執行緒池：所有 Agent 都提交給共用的引擎與排程器，
+    實際並發數由排程器的模型槽位決定。
+    """
+
+    def __init__(self, caller: Optional[AgentCaller] = None, broker: Optional[Any] = None):
         """
         初始化並行調用器
 
         Args:
             caller: 基礎調用器（可選）
+            broker: 遠端分派器（broker.QueueBroker；設定後 Agent 交由 `maw worker` 執行）
         """
         self.caller = caller or AgentCaller()
+        self.broker = broker
+
+    @property
+    def engine(self) -> AgentEngine:
+        """執行引擎（與基礎調用器共用）"""
+        return self.caller.engine
+
+    async def _call_agent(
+        self,
+        agent: Dict,
+        context: Optional[Dict],
+    ) -> AgentResponse:
+        """執行單一 Agent，例外轉為失敗回應"""
+        try:
+            if self.broker is not None:
+                return await self.broker.acall(agent, context)
+            return await self.caller.acall(
+                prompt=agent["prompt"],
+                model=agent.get("model"),
+                context=context,
+                workflow_id=agent.get("workflow_id") or (context or {}).get("workflow_id"),
+                use_cache=agent.get("use_cache"),
+                on_event=agent.get("on_event"),
+                schema=agent.get("schema"),
+                agent_id=agent["id"],
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return AgentResponse(
+                success=False,
+                error=str(e),
+            )
+
+    async def acall_parallel(
+        self,
+        agents: List[Dict],
+        context: Optional[Dict] = None,
+    ) -> Dict[str, AgentResponse]:
+        """
+        並行調用多個 Agent（async）
+
+        Args:
+            agents: Agent 配置列表，每個包含 id, prompt, model / use_cache / on_event / schema (可選)
+            context: 共享上下文
+
+        Returns:
+            以 agent_id 為 key 的結果字典
+        """
+        results = {}
+        async for agent_id, response in self.aiter_completed(agents, context):
+            results[agent_id] = response
+        return results
+
+    async def aiter_completed(
+        self,
+        agents: List[Dict],
+        context: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[str, AgentResponse]]:
+        """
+        並行調用多個 Agent，依完成順序逐一產出結果（async）
+
+        Args:
+            agents: Agent 配置列表
+            context: 共享上下文
+            timeout: 整體期限（秒），逾時即停止產出並取消其餘 Agent
+
+        Yields:
+            (agent_id, AgentResponse)
+        """
+        tasks = {
+            asyncio.ensure_future(self._call_agent(agent, context)): agent["id"]
+            for agent in agents
+        }
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            pending = set(tasks)
+            while pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    yield tasks[task], task.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
     def call_parallel(
         self,
@@ -278,7 +781,7 @@ class ParallelAgentCaller:
         context: Optional[Dict] = None,
     ) -> Dict[str, AgentResponse]:
         """
-        並行調用多個 Agent
+        並行調用多個 Agent（同步包裝）
 
         Args:
             agents: Agent 配置列表，每個包含 id, prompt, model (可選)
@@ -287,34 +790,56 @@ class ParallelAgentCaller:
         Returns:
             以 agent_id 為 key 的結果字典
         """
-        import concurrent.futures
+        return dict(self.iter_completed(agents, context))
 
-        results = {}
+    def iter_completed(
+        self,
+        agents: List[Dict],
+        context: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Tuple[str, AgentResponse]]:
+        """
+        並行調用多個 Agent，依完成順序逐一產出結果（同步）
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(agents)) as executor:
-            # 提交所有任務
-            future_to_agent = {}
-            for agent in agents:
-                future = executor.submit(
-                    self.caller.call,
-                    prompt=agent["prompt"],
-                    model=agent.get("model"),
-                    context=context,
-                )
-                future_to_agent[future] = agent["id"]
+        所有 Agent 都在引擎的事件迴圈中執行，呼叫端執行緒只負責等待；
+        提前結束迭代或超過期限會取消尚未完成的 Agent（子程序隨之終止）。
 
-            # 收集結果
-            for future in concurrent.futures.as_completed(future_to_agent):
-                agent_id = future_to_agent[future]
-                try:
-                    results[agent_id] = future.result()
-                except Exception as e:
-                    results[agent_id] = AgentResponse(
-                        success=False,
-                        error=str(e),
-                    )
+        Args:
+            agents: Agent 配置列表
+            context: 共享上下文
+            timeout: 整體期限（秒），逾時即停止產出
 
-        return results
+        Yields:
+            (agent_id, AgentResponse)
+        """
+        futures = {
+            self.engine.submit(self._call_agent(agent, context)): agent["id"]
+            for agent in agents
+        }
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                agent_id = futures[future]
+                try:
+                    yield agent_id, future.result()
+                except concurrent.futures.CancelledError:
+                    yield agent_id, AgentResponse(success=False, error="cancelled")
+        except concurrent.futures.TimeoutError:
+            # 期限已到：其餘 Agent 於 finally 中取消
+            return
+        finally:
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+
+async def _kill_process(proc: "asyncio.subprocess.Process") -> None:
+    """終止子程序並回收"""
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
 
 
 # 全域實例
@@ -0,0 +1,246 @@
+"""
+批次執行器 - 在同一程序內並行執行多個工作流
+
+共用資源：
+- 同一個 AgentCaller（引擎、排程器、回應快取）與 MemoryManager
+- 各工作流在各自的執行緒中同步執行，Agent 調用全部進入共用引擎，
+  由排程器的模型槽位統一限制並發
+
+優先級：
+- 優先級較高的工作流先啟動（同優先級依檔案順序）
+- 優先級同時作為排程器的工作流權重，槽位緊張時每輪可取得較多槽位
+
+批次檔格式（topics.yaml）：
+
+    concurrency: 4            # 可省略
+    defaults:                 # 可省略，套用到每個工作流
+      mode: quick
+    workflows:
+      - "主題 A"
+      - topic: "主題 B"
+        priority: 3
+        skip_stages: [VERIFY]
+
+也可以直接是主題（或工作流設定）列表。
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import yaml
+from pydantic import ValidationError as PydanticValidationError
+
+from ..config.models import BatchEntry, BatchItemResult
+from ..io.doc_cache import YamlLoader
+from ..io.memory import MemoryManager, get_memory
+from .agent_caller import AgentCaller
+from .errors import WorkflowError
+from .workflow import Workflow
+
+
+# 進度回呼：收到 progress() 快照
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def load_batch(source: Union[str, Path, Dict, List]) -> Tuple[List[BatchEntry], Optional[int]]:
+    """
+    載入批次檔
+
+    Args:
+        source: 批次檔路徑或已解析的內容
+
+    Returns:
+        (工作流列表, 檔案指定的並行數或 None)
+
+    Raises:
+        WorkflowError: 檔案無法讀取或格式錯誤
+    """
+    data: Any = source
+    if isinstance(source, (str, Path)):
+        try:
+            with open(source, "r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=YamlLoader)
+        except (OSError, yaml.YAMLError) as e:
+            raise WorkflowError(f"無法讀取批次檔: {e}")
+
+    concurrency = None
+    defaults: Dict[str, Any] = {}
+    items = data
+    if isinstance(data, dict):
+        concurrency = data.get("concurrency")
+        defaults = data.get("defaults") or {}
+        items = data.get("workflows")
+    if not isinstance(items, list) or not items:
+        raise WorkflowError("批次檔缺少 workflows 列表")
+
+    entries = []
+    for i, item in enumerate(items):
+        fields = {"topic": item} if isinstance(item, str) else item
+        if not isinstance(fields, dict):
+            raise WorkflowError(f"批次檔第 {i + 1} 項格式錯誤")
+        fields = {**defaults, **fields}
+        if isinstance(fields.get("start_from"), str):
+            fields["start_from"] = fields["start_from"].upper()
+        if fields.get("skip_stages"):
+            fields["skip_stages"] = [str(s).upper() for s in fields["skip_stages"]]
+        try:
+            entries.append(BatchEntry.model_validate(fields))
+        except PydanticValidationError as e:
+            raise WorkflowError(f"批次檔第 {i + 1} 項無效: {e}")
+
+    return entries, concurrency
+
+
+class BatchRunner:
+    """批次執行器"""
+
+    def __init__(
+        self,
+        memory: Optional[MemoryManager] = None,
+        caller: Optional[AgentCaller] = None,
+        concurrency: int = 4,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        """
+        初始化批次執行器
+
+        Args:
+            memory: 共用的 Memory 管理器
+            caller: 共用的 Agent 調用器（引擎、排程器、快取）
+            concurrency: 同時執行的工作流數
+            on_progress: 工作流開始或結束時的進度回呼（階段進度請輪詢 progress()）
+        """
+        self.memory = memory or get_memory()
+        self.caller = caller or AgentCaller()
+        self.concurrency = max(1, concurrency)
+        self.on_progress = on_progress
+
+        self._lock = threading.Lock()
+        self._entries: List[BatchEntry] = []
+        self._workflows: Dict[int, Workflow] = {}
+        self._results: Dict[int, BatchItemResult] = {}
+        self._started_at: Optional[float] = None
+
+    def run(self, entries: List[BatchEntry]) -> List[BatchItemResult]:
+        """
+        執行批次
+
+        Args:
+            entries: 工作流列表
+
+        Returns:
+            與輸入順序相同的結果列表
+        """
+        self._entries = list(entries)
+        self._workflows.clear()
+        self._results.clear()
+        self._started_at = time.time()
+
+        # 優先級高者先啟動（sorted 為穩定排序，同優先級保持檔案順序）
+        order = sorted(range(len(entries)), key=lambda i: -entries[i].priority)
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="maw-batch"
+        ) as pool:
+            for index in order:
+                pool.submit(self._run_one, index)
+
+        return [self._results[i] for i in range(len(entries))]
+
+    def _run_one(self, index: int) -> None:
+        """執行單一工作流（於工作執行緒中）"""
+        entry = self._entries[index]
+        try:
+            workflow = Workflow(entry.to_config(), memory=self.memory, caller=self.caller)
+        except Exception as e:
+            self._finish(index, BatchItemResult(entry=entry, error=str(e)))
+            return
+
+        self.caller.scheduler.set_workflow_weight(workflow.workflow_id, entry.priority)
+        with self._lock:
+            self._workflows[index] = workflow
+        self._notify()
+
+        try:
+            result = workflow.run()
+            item = BatchItemResult(entry=entry, workflow_id=workflow.workflow_id, result=result)
+        except Exception as e:
+            item = BatchItemResult(entry=entry, workflow_id=workflow.workflow_id, error=str(e))
+        finally:
+            self.caller.scheduler.workflow_weights.pop(workflow.workflow_id, None)
+        self._finish(index, item)
+
+    def _finish(self, index: int, item: BatchItemResult) -> None:
+        with self._lock:
+            self._results[index] = item
+        self._notify()
+
+    def _notify(self) -> None:
+        if self.on_progress:
+            self.on_progress(self.progress())
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        取得批次進度快照
+
+        Returns:
+            {total, pending, running, completed, failed, elapsed_seconds,
+             workflows: [{topic, priority, workflow_id, state, stage, iteration}]}
+        """
+        with self._lock:
+            workflows = []
+            for i, entry in enumerate(self._entries):
+                workflow = self._workflows.get(i)
+                item = self._results.get(i)
+                if item is not None:
+                    state = "completed" if item.success else "failed"
+                elif workflow is not None:
+                    state = "running"
+                else:
+                    state = "pending"
+                workflows.append({
+                    "topic": entry.topic,
+                    "priority": entry.priority,
+                    "workflow_id": workflow.workflow_id if workflow else None,
+                    "state": state,
+                    "stage": (
+                        workflow.current_stage.value
+                        if workflow and workflow.current_stage else None
+                    ),
+                    "iteration": workflow.iteration if workflow else 0,
+                })
+
+        counts = {s: 0 for s in ("pending", "running", "completed", "failed")}
+        for wf in workflows:
+            counts[wf["state"]] += 1
+        return {
+            "total": len(workflows),
+            **counts,
+            "elapsed_seconds": time.time() - self._started_at if self._started_at else 0.0,
+            "workflows": workflows,
+        }
+
+
+def summarize_batch(results: List[BatchItemResult]) -> Dict[str, Any]:
+    """
+    彙總批次結果
+
+    Returns:
+        {total, succeeded, failed, avg_quality, total_duration_seconds}
+    """
+    scores = [
+        r.result.quality_score
+        for r in results
+        if r.success and r.result.quality_score is not None
+    ]
+    return {
+        "total": len(results),
+        "succeeded": sum(1 for r in results if r.success),
+        "failed": sum(1 for r in results if not r.success),
+        "avg_quality": sum(scores) / len(scores) if scores else None,
+        "total_duration_seconds": sum(
+            r.result.duration_seconds or 0.0 for r in results if r.result
+        ),
+    }
@@ -0,0 +1,241 @@
+"""
+視角工作代理（broker）- 把視角 Agent 調用分派給其他機器上的 `maw worker`
+
+以 io/job_queue.py 的 SQLite 佇列作為 broker（放在共享儲存上即可跨機器）：
+- 需求端：ParallelAgentCaller 設定 broker 後，每個視角 Agent 變成一個
+  perspective 工作（prompt、模型、Schema、上下文），輪詢直到 worker 回報
+  AgentResponse；取消（quorum / 期限）時一併取消工作
+- worker 端：AgentWorker 取得租約並以本機的 AgentCaller 執行，
+  heartbeat 維持租約；程序被終止時租約過期，工作由其他 worker 接手
+
+視角結果回到需求端後照常寫入階段目錄，目錄結構不變。
+worker 需能存取相同的專案與 Memory 路徑（prompt 以路徑引用前階段輸出）。
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config.models import AgentResponse
+from ..io.job_queue import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    JobQueue,
+    LeaseKeeper,
+    default_owner,
+)
+from .agent_caller import AgentCaller
+
+
+# 工作種類
+PERSPECTIVE_KIND = "perspective"
+
+# 需求端輪詢間隔（秒）
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+def perspective_job_key(agent_id: str, prompt: str) -> str:
+    """視角工作的 key（同一工作流內以視角 ID + prompt 摘要區分）"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{agent_id}:{digest}"
+
+
+def _consume_exception(future: "asyncio.Future") -> None:
+    """取消工作失敗時忽略（租約到期後由 worker 放棄或完成）"""
+    if not future.cancelled():
+        future.exception()
+
+
+class QueueBroker:
+    """需求端：經由工作佇列分派視角 Agent"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        priority: int = 1,
+    ):
+        """
+        初始化 broker
+
+        Args:
+            queue: 工作佇列（共享儲存上的 jobs.db）
+            poll_interval: 等待結果的輪詢間隔（秒）
+            priority: 視角工作的優先級
+        """
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.priority = priority
+
+    async def acall(self, agent: Dict, context: Optional[Dict] = None) -> AgentResponse:
+        """
+        分派一個 Agent 並等待 worker 回報（async）
+
+        Args:
+            agent: ParallelAgentCaller 的 Agent 配置（id, prompt, model, schema, use_cache）
+            context: 共享上下文（需可 JSON 序列化）
+
+        Returns:
+            worker 回報的 AgentResponse
+        """
+        workflow_id = agent.get("workflow_id") or (context or {}).get("workflow_id") or "_default"
+        payload = {
+            "agent_id": agent["id"],
+            "prompt": agent["prompt"],
+            "model": agent.get("model"),
+            "schema": agent.get("schema"),
+            "use_cache": agent.get("use_cache"),
+            # 上下文經 JSON 往返，確保可寫入佇列
+            "context": json.loads(json.dumps(context, default=str)) if context else None,
+        }
+        start = time.time()
+        job_id = await asyncio.to_thread(
+            self.queue.enqueue,
+            PERSPECTIVE_KIND,
+            workflow_id,
+            perspective_job_key(agent["id"], agent["prompt"]),
+            payload,
+            self.priority,
+        )
+
+        try:
+            while True:
+                job = await asyncio.to_thread(self.queue.get, job_id)
+                if job is None or job.status == STATUS_CANCELLED:
+                    return AgentResponse(success=False, error="perspective job cancelled")
+                if job.status == STATUS_DONE and job.result is not None:
+                    response = AgentResponse.model_validate(job.result)
+                    response.duration_seconds = time.time() - start
+                    return response
+                if job.status == STATUS_FAILED:
+                    return AgentResponse(
+                        success=False,
+                        error=job.error or "perspective job failed",
+                        duration_seconds=time.time() - start,
+                    )
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            # 提前完成：取消尚未完成的工作，worker 的 heartbeat 會發現並放棄結果。
+            # 佇列寫入可能因鎖競爭阻塞，交給執行緒池且不等待，避免卡住共用的事件迴圈
+            cancelling = asyncio.get_running_loop().run_in_executor(
+                None, self.queue.cancel_job, job_id
+            )
+            cancelling.add_done_callback(_consume_exception)
+            raise
+
+
+class AgentWorker:
+    """worker 端：從佇列取出視角工作並在本機執行"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        caller: Optional[AgentCaller] = None,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        lease_seconds: Optional[float] = None,
+    ):
+        """
+        初始化 worker
+
+        Args:
+            queue: 工作佇列
+            caller: 本機 Agent 調用器（引擎、排程器、快取）
+            concurrency: 同時處理的工作數
+            poll_interval: 佇列為空時的等待間隔（秒）
+            lease_seconds: 租約長度（預設使用佇列設定）
+        """
+        self.queue = queue
+        self.caller = caller or AgentCaller()
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds or queue.lease_seconds
+
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """要求停止（處理中的工作完成後結束）"""
+        self._stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, idle_exit: Optional[float] = None) -> int:
+        """
+        執行 worker 迴圈（阻塞）
+
+        Args:
+            max_jobs: 處理此數量的工作後結束
+            idle_exit: 佇列持續為空超過此秒數即結束
+
+        Returns:
+            處理的工作數
+        """
+        threads: List[threading.Thread] = [
+            threading.Thread(
+                target=self._loop, args=(max_jobs, idle_exit), name=f"maw-worker-{i}", daemon=True
+            )
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+        return self.processed
+
+    def _loop(self, max_jobs: Optional[int], idle_exit: Optional[float]) -> None:
+        owner = default_owner()
+        idle_since = time.monotonic()
+        while not self._stop.is_set():
+            with self._lock:
+                if max_jobs is not None and self.processed >= max_jobs:
+                    return
+            job = self.queue.claim(owner, kinds=[PERSPECTIVE_KIND], lease_seconds=self.lease_seconds)
+            if job is None:
+                if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    return
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self.process(job, owner)
+            idle_since = time.monotonic()
+            with self._lock:
+                self.processed += 1
+
+    def process(self, job: Any, owner: str) -> None:
+        """執行單一工作並回報結果（保持租約直到完成）"""
+        payload = job.payload
+        with LeaseKeeper(self.queue, job.id, owner, self.lease_seconds) as lease:
+            future = self.caller.engine.submit(self.caller.acall(
+                payload["prompt"],
+                model=payload.get("model"),
+                context=payload.get("context"),
+                workflow_id=job.workflow_id,
+                use_cache=payload.get("use_cache"),
+                schema=payload.get("schema"),
+                agent_id=payload.get("agent_id"),
+            ))
+            # 需求端取消或租約被接手時中止
+            while True:
+                try:
+                    response: AgentResponse = future.result(timeout=self.poll_interval)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if lease.lost:
+                        future.cancel()
+                        return
+                except Exception as e:
+                    self.queue.fail(job.id, owner, error=str(e) or type(e).__name__)
+                    return
+
+        self.queue.complete(job.id, owner, response.model_dump(mode="json"))
@@ -0,0 +1,556 @@
+"""
+常駐編排服務 - `maw serve` 的 localhost HTTP API 與客戶端
+
+服務在單一程序內持有暖快取，所有提交的工作流共用：
+- 同一個 AgentCaller（引擎、排程器槽位、回應快取、single-flight）
+- 同一個 MemoryManager 與已載入的 prompt / 設定模組
+
+API（JSON，僅綁定 localhost）：
+- GET  /health                       服務狀態
+- GET  /workflows                    所有工作流快照
+- POST /workflows                    提交工作流（BatchEntry 欄位）→ 201 {workflow_id}
+- GET  /workflows/<id>               單一工作流快照（完成後含 result）
+- POST /workflows/<id>/cancel        取消（等待中立即取消，執行中於階段邊界停止）
+- GET  /workflows/<id>/events?since=N
+      以 NDJSON 串流 Action Log（從第 N 筆起），工作流結束後送出
+      {"type": "end", "workflow": 快照} 並關閉連線
+
+已結束的工作流保留最近 MAX_FINISHED_JOBS 個（更早者仍可由 `maw status` 查詢）。
+
+服務位址寫在 <memory>/daemon.json，客戶端以 find_daemon() 探測；
+`maw run` / `maw current` 在服務執行中時自動改用 API。
+"""
+
+import heapq
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import ValidationError as PydanticValidationError
+
+from ..config.models import BatchEntry, WorkflowResult, WorkflowStatus
+from ..io.log_segments import closed_segments, iter_segment_lines
+from ..io.memory import MemoryManager, get_memory
+from .agent_caller import AgentCaller
+from .errors import WorkflowError
+from .workflow import Workflow
+
+
+# 預設位址
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 服務位址檔（相對於 Memory 根目錄）
+DAEMON_FILE = "daemon.json"
+
+# 事件串流輪詢間隔（秒）
+EVENT_POLL_INTERVAL = 0.2
+
+# 工作流狀態
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_FINISHED = ("completed", "failed", "cancelled", "human_intervention")
+
+# 保留的已結束工作流數（超過時移除最早結束者；仍可由 Memory 查詢）
+MAX_FINISHED_JOBS = 200
+
+
+class _Job:
+    """服務中的一個工作流"""
+
+    def __init__(self, workflow: Workflow, entry: BatchEntry):
+        self.workflow = workflow
+        self.entry = entry
+        self.state = JOB_PENDING
+        self.result: Optional[WorkflowResult] = None
+        self.submitted_at = datetime.now().isoformat()
+        self.done = threading.Event()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """工作流快照（JSON 可序列化）"""
+        workflow = self.workflow
+        return {
+            "workflow_id": workflow.workflow_id,
+            "topic": self.entry.topic,
+            "priority": self.entry.priority,
+            "state": self.state,
+            "stage": workflow.current_stage.value if workflow.current_stage else None,
+            "iteration": workflow.iteration,
+            "cancel_requested": workflow.cancel_requested,
+            "submitted_at": self.submitted_at,
+            "result": self.result.model_dump(mode="json") if self.result else None,
+        }
+
+
+class OrchestratorDaemon:
+    """常駐編排服務"""
+
+    def __init__(
+        self,
+        memory: Optional[MemoryManager] = None,
+        caller: Optional[AgentCaller] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        concurrency: int = 4,
+    ):
+        """
+        初始化服務
+
+        Args:
+            memory: 共用的 Memory 管理器
+            caller: 共用的 Agent 調用器
+            host: 綁定位址
+            port: 綁定埠（0 表示由系統分配）
+            concurrency: 同時執行的工作流數
+        """
+        self.memory = memory or get_memory()
+        self.caller = caller or AgentCaller()
+        self.host = host
+        self.port = port
+        self.concurrency = max(1, concurrency)
+
+        self._jobs: Dict[str, _Job] = {}
+        # 已結束的工作流（依結束順序）
+        self._finished: List[str] = []
+        self._queue: List[Tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._workers: List[threading.Thread] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._server_thread: Optional[threading.Thread] = None
+
+    @property
+    def daemon_file(self):
+        """服務位址檔路徑"""
+        return self.memory.base_path / DAEMON_FILE
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 生命週期
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """啟動 HTTP 服務與工作執行緒（非阻塞）"""
+        self._stopping = False
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever, name="maw-daemon-http", daemon=True
+        )
+        self._server_thread.start()
+        for i in range(self.concurrency):
+            worker = threading.Thread(target=self._worker, name=f"maw-daemon-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        self.memory.write_json(
+            self.daemon_file,
+            {
+                "host": self.host,
+                "port": self.port,
+                "pid": os.getpid(),
+                "started_at": datetime.now().isoformat(),
+            },
+        )
+
+    def shutdown(self) -> None:
+        """停止服務：取消所有工作流並等待執行中者停在階段邊界"""
+        with self._cond:
+            self._stopping = True
+            jobs = list(self._jobs.values())
+            self._cond.notify_all()
+        for job in jobs:
+            self.cancel(job.workflow.workflow_id)
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+
+        data = self.memory.read_json(self.daemon_file)
+        if data and data.get("pid") == os.getpid() and data.get("port") == self.port:
+            self.daemon_file.unlink(missing_ok=True)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 工作流管理
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def submit(self, entry: BatchEntry) -> str:
+        """
+        提交工作流（立即建立工作流目錄，依優先級排入佇列）
+
+        Returns:
+            workflow ID
+
+        Raises:
+            WorkflowError: 服務正在停止
+        """
+        if self._stopping:
+            raise WorkflowError("服務正在停止，不接受新的工作流")
+
+        workflow = Workflow(entry.to_config(), memory=self.memory, caller=self.caller)
+        job = _Job(workflow, entry)
+        with self._cond:
+            self._jobs[workflow.workflow_id] = job
+            heapq.heappush(self._queue, (-entry.priority, next(self._seq), workflow.workflow_id))
+            self._cond.notify()
+        return workflow.workflow_id
+
+    def cancel(self, workflow_id: str) -> bool:
+        """
+        取消工作流
+
+        Returns:
+            是否找到且仍可取消
+        """
+        with self._cond:
+            job = self._jobs.get(workflow_id)
+            if job is None or job.state in JOB_FINISHED:
+                return False
+            job.workflow.cancel()
+            if job.state == JOB_PENDING:
+                # 尚未開始：直接標記取消（工作執行緒取出時略過）
+                job.state = WorkflowStatus.CANCELLED.value
+                self.memory.update_workflow_meta(workflow_id, {"status": "cancelled"})
+                self.memory.flush_meta(workflow_id)
+                self._finish(job)
+        return True
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """取得工作流快照（不存在時為 None）"""
+        with self._cond:
+            job = self._jobs.get(workflow_id)
+            return job.snapshot() if job else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """取得所有工作流快照（依提交順序）"""
+        with self._cond:
+            return [job.snapshot() for job in self._jobs.values()]
+
+    def is_finished(self, workflow_id: str) -> bool:
+        """工作流是否已結束（不存在視為已結束）"""
+        job = self._jobs.get(workflow_id)
+        return job is None or job.done.is_set()
+
+    def _finish(self, job: _Job) -> None:
+        """標記工作流結束並移除過舊的已結束工作流（呼叫端須持有 _cond）"""
+        job.done.set()
+        self._finished.append(job.workflow.workflow_id)
+        while len(self._finished) > MAX_FINISHED_JOBS:
+            self._jobs.pop(self._finished.pop(0), None)
+
+    def _worker(self) -> None:
+        """工作執行緒：依優先級取出工作流並執行"""
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                _, _, workflow_id = heapq.heappop(self._queue)
+                job = self._jobs[workflow_id]
+                if job.state != JOB_PENDING:
+                    continue
+                job.state = JOB_RUNNING
+
+            weights = self.caller.scheduler.workflow_weights
+            self.caller.scheduler.set_workflow_weight(workflow_id, job.entry.priority)
+            try:
+                result = job.workflow.run()
+            except Exception as e:
+                # 租約由其他程序持有、SQLite 鎖定逾時等：記錄為失敗，工作執行緒繼續服務
+                result = WorkflowResult(
+                    workflow_id=workflow_id,
+                    success=False,
+                    final_status=WorkflowStatus.FAILED,
+                    total_iterations=job.workflow.iteration,
+                    errors=[str(e) or type(e).__name__],
+                )
+            finally:
+                weights.pop(workflow_id, None)
+
+            with self._cond:
+                job.result = result
+                job.state = result.final_status.value
+                self._finish(job)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP 處理
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _tail_file(path: Path, handle: Optional[BinaryIO]) -> Tuple[Optional[BinaryIO], bytes]:
+    """
+    讀取新追加的內容（持有開啟的檔案：輪替後先讀完舊分段，再切換到新檔案）
+
+    Returns:
+        (開啟的檔案, 新內容)
+    """
+    data = b""
+    while True:
+        if handle is None:
+            try:
+                handle = open(path, "rb")
+            except FileNotFoundError:
+                return None, data
+        data += handle.read()
+        try:
+            rotated = os.stat(path).st_ino != os.fstat(handle.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = False
+        if not rotated:
+            return handle, data
+        # 輪替前寫入的內容可能在上次 read 之後才到達：再讀一次舊檔
+        data += handle.read()
+        handle.close()
+        handle = None
+
+
+def _make_handler(daemon: OrchestratorDaemon):
+    """建立綁定服務實例的 request handler 類別"""
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "maw-daemon"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self) -> Tuple[List[str], Dict[str, List[str]]]:
+            url = urlparse(self.path)
+            return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+        def do_GET(self) -> None:
+            parts, query = self._route()
+            if parts == ["health"]:
+                self._send_json(200, {
+                    "status": "ok",
+                    "pid": os.getpid(),
+                    "workflows": len(daemon.list()),
+                })
+            elif parts == ["workflows"]:
+                self._send_json(200, {"workflows": daemon.list()})
+            elif len(parts) == 2 and parts[0] == "workflows":
+                snapshot = daemon.get(parts[1])
+                if snapshot is None:
+                    self._send_json(404, {"error": f"找不到工作流: {parts[1]}"})
+                else:
+                    self._send_json(200, snapshot)
+            elif len(parts) == 3 and parts[0] == "workflows" and parts[2] == "events":
+                since = int((query.get("since") or ["0"])[0])
+                self._stream_events(parts[1], since)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            parts, _ = self._route()
+            if parts == ["workflows"]:
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    fields = json.loads(self.rfile.read(length) or b"{}")
+                    entry = BatchEntry.model_validate(fields)
+                except (ValueError, PydanticValidationError) as e:
+                    self._send_json(400, {"error": f"無效的工作流設定: {e}"})
+                    return
+                try:
+                    workflow_id = daemon.submit(entry)
+                except WorkflowError as e:
+                    self._send_json(503, {"error": str(e)})
+                    return
+                self._send_json(201, {"workflow_id": workflow_id})
+            elif len(parts) == 3 and parts[0] == "workflows" and parts[2] == "cancel":
+                if daemon.get(parts[1]) is None:
+                    self._send_json(404, {"error": f"找不到工作流: {parts[1]}"})
+                else:
+                    self._send_json(200, {"cancelled": daemon.cancel(parts[1])})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def _stream_events(self, workflow_id: str, since: int) -> None:
+            """跟隨 actions.jsonl 串流事件直到工作流結束"""
+            job = daemon._jobs.get(workflow_id)
+            if job is None:
+                self._send_json(404, {"error": f"找不到工作流: {workflow_id}"})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.end_headers()
+
+            log_file = job.workflow.logger.log_file
+            handle = None
+            seen = 0
+
+            def emit(line: bytes) -> None:
+                nonlocal seen
+                if not line.strip():
+                    return
+                seen += 1
+                if seen > since:
+                    record = json.loads(line)
+                    self._write_line({"type": "action", "index": seen, "record": record})
+
+            try:
+                # 先讀已輪替的分段，再跟隨寫入中的分段
+                for _, segment in closed_segments(log_file):
+                    for _, line in iter_segment_lines(segment):
+                        emit(line)
+                pending = b""
+                while True:
+                    finished = job.done.is_set()
+                    handle, chunk = _tail_file(log_file, handle)
+                    # 只處理完整的行
+                    lines = (pending + chunk).split(b"\n")
+                    pending = lines.pop()
+                    for line in lines:
+                        emit(line)
+                    if finished:
+                        break
+                    time.sleep(EVENT_POLL_INTERVAL)
+                with daemon._cond:
+                    snapshot = job.snapshot()
+                self._write_line({"type": "end", "workflow": snapshot})
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                if handle is not None:
+                    handle.close()
+
+        def _write_line(self, data: Dict[str, Any]) -> None:
+            self.wfile.write(json.dumps(data, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 客戶端
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class DaemonClient:
+    """服務 API 客戶端"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10.0):
+        """
+        初始化客戶端
+
+        Args:
+            host: 服務位址
+            port: 服務埠
+            timeout: 一般請求逾時（秒，事件串流不受限）
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, Dict[str, Any]]:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout or self.timeout)
+        try:
+            payload = json.dumps(body).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"} if payload else {}
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+
+    def _check(self, status: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        if status >= 400:
+            raise WorkflowError(data.get("error") or f"服務回應 {status}")
+        return data
+
+    def health(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """服務狀態"""
+        return self._check(*self._request("GET", "/health", timeout=timeout))
+
+    def submit(self, entry: BatchEntry) -> str:
+        """提交工作流，回傳 workflow ID"""
+        data = self._check(*self._request(
+            "POST", "/workflows", entry.model_dump(mode="json")
+        ))
+        return data["workflow_id"]
+
+    def get(self, workflow_id: str) -> Dict[str, Any]:
+        """工作流快照"""
+        return self._check(*self._request("GET", f"/workflows/{workflow_id}"))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """所有工作流快照"""
+        return self._check(*self._request("GET", "/workflows"))["workflows"]
+
+    def cancel(self, workflow_id: str) -> bool:
+        """取消工作流"""
+        return self._check(*self._request("POST", f"/workflows/{workflow_id}/cancel"))["cancelled"]
+
+    def events(self, workflow_id: str, since: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        串流工作流事件
+
+        Yields:
+            {"type": "action", "index", "record"} 與最後的 {"type": "end", "workflow"}
+        """
+        conn = http.client.HTTPConnection(self.host, self.port)
+        try:
+            conn.request("GET", f"/workflows/{workflow_id}/events?since={since}")
+            response = conn.getresponse()
+            if response.status != 200:
+                self._check(response.status, json.loads(response.read() or b"{}"))
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+
+def find_daemon(
+    memory: Optional[MemoryManager] = None,
+    timeout: float = 0.5,
+) -> Optional[DaemonClient]:
+    """
+    探測執行中的服務
+
+    Args:
+        memory: Memory 管理器（決定 daemon.json 位置）
+        timeout: 健康檢查逾時（秒）
+
+    Returns:
+        可用的客戶端；服務未執行（或位址檔過期）時為 None
+    """
+    memory = memory or get_memory()
+    data = memory.read_json(memory.base_path / DAEMON_FILE)
+    if not data or "port" not in data:
+        return None
+    client = DaemonClient(data.get("host", DEFAULT_HOST), data["port"])
+    try:
+        client.health(timeout=timeout)
+    except (OSError, ValueError, WorkflowError):
+        return None
+    return client
@@ -0,0 +1,128 @@
+"""
+非同步執行引擎 - 長駐事件迴圈
+
+所有 Agent 子程序都在同一個背景事件迴圈中執行：
+- 不再為每個 Agent 佔用一條執行緒
+- 同步 API 透過 run() / submit() 把 coroutine 丟進迴圈
+- 可在迴圈內同時維持數百個 `claude --print` 子程序
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Optional
+
+
+class AgentEngine:
+    """長駐事件迴圈（背景執行緒）"""
+
+    def __init__(self):
+        """初始化執行引擎（延遲啟動迴圈）"""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """取得事件迴圈（必要時啟動）"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self) -> None:
+        """啟動背景事件迴圈"""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name="maw-agent-engine", daemon=True)
+        thread.start()
+        ready.wait()
+
+        self._loop = loop
+        self._thread = thread
+
+    def in_engine_thread(self) -> bool:
+        """目前是否在引擎執行緒內"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """
+        提交 coroutine 到事件迴圈
+
+        Args:
+            coro: 要執行的 coroutine
+
+        Returns:
+            concurrent.futures.Future（可跨執行緒等待或取消）
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        同步執行 coroutine 並等待結果
+
+        Args:
+            coro: 要執行的 coroutine
+            timeout: 等待上限（秒）
+
+        Returns:
+            coroutine 的回傳值
+        """
+        if self.in_engine_thread():
+            # 在迴圈內同步等待會造成死鎖
+            coro.close()
+            raise RuntimeError("AgentEngine.run() 不可在引擎執行緒內呼叫，請直接 await")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """停止事件迴圈並取消所有未完成的任務"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None or loop.is_closed():
+            return
+
+        async def _cancel_all() -> None:
+            tasks = [
+                t for t in asyncio.all_tasks()
+                if t is not asyncio.current_task()
+            ]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_all(), loop).result(timeout)
+        except Exception:
+            pass
+
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        loop.close()
+
+
+# 全域實例
+_engine: Optional[AgentEngine] = None
+
+
+def get_engine() -> AgentEngine:
+    """取得全域執行引擎"""
+    global _engine
+    if _engine is None:
+        _engine = AgentEngine()
+    return _engine
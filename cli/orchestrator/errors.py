@@ -25,6 +25,12 @@ class WorkflowError(MAWError):
     pass
 
 
+class WorkflowCancelled(WorkflowError):
+    """工作流被要求取消"""
+
+    pass
+
+
 class StageError(MAWError):
     """階段執行錯誤"""
 
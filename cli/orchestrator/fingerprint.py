@@ -0,0 +1,100 @@
+"""
+視角指紋 - 判斷視角結果是否可在回退迭代間重用
+
+指紋 = sha256(prompt + 模型 + 上游輸出檔案摘要)：
+- prompt 以排除易變欄位（迭代次數）的上下文渲染，
+  迭代次數只是簿記資訊，不應使相同輸入的視角重新執行
+- 上游輸出計入上下文中所有前階段輸出（*_outputs，Agent 可依路徑讀取任一檔案），
+  以檔案內容摘要表示，內容不變即視為相同輸入
+
+指紋與報告一起保存在 stages/<stage>/perspectives/<pid>.meta.json。
+
+回應快取（agent_caller.py）的 key 也使用同一組摘要：cache_context 另排除工作流 ID，
+前階段輸出只保留名稱（路徑含工作流 ID，內容已由摘要計入），
+使回退迭代與相同主題的重新執行可以命中快取，輸入檔案改變時則不命中。
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 指紋格式版本（變更計算方式時遞增，使舊指紋失效）
+FINGERPRINT_VERSION = 2
+
+# 前階段輸出的上下文欄位後綴（<stage>_outputs: {輸出名稱: 檔案路徑}）
+OUTPUTS_KEY_SUFFIX = "_outputs"
+
+# 不影響視角輸入的上下文欄位
+VOLATILE_CONTEXT_KEYS = ("iteration",)
+
+# 回應快取 key 另外排除的上下文欄位（相同主題的不同工作流共用快取）
+CACHE_VOLATILE_CONTEXT_KEYS = ("workflow_id", *VOLATILE_CONTEXT_KEYS)
+
+
+def stable_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """取得排除易變欄位的上下文（用於渲染指紋 prompt）"""
+    return {k: v for k, v in context.items() if k not in VOLATILE_CONTEXT_KEYS}
+
+
+def cache_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """回應快取 key 使用的上下文（排除工作流 ID 與迭代次數，前階段輸出只保留名稱）"""
+    stable: Dict[str, Any] = {}
+    for key, value in context.items():
+        if key in CACHE_VOLATILE_CONTEXT_KEYS:
+            continue
+        if key.endswith(OUTPUTS_KEY_SUFFIX) and isinstance(value, dict):
+            value = sorted(value)
+        stable[key] = value
+    return stable
+
+
+def file_digest(path: str) -> str:
+    """計算檔案內容的 sha256（不存在時為 "missing"）"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return "missing"
+
+
+def upstream_digests(context: Dict[str, Any]) -> Dict[str, str]:
+    """
+    計算上下文中所有前階段輸出（*_outputs）的內容摘要
+
+    Returns:
+        {"<key>/<輸出名稱>": sha256}
+    """
+    digests: Dict[str, str] = {}
+    for key in sorted(context):
+        outputs = context[key]
+        if not key.endswith(OUTPUTS_KEY_SUFFIX) or not isinstance(outputs, dict):
+            continue
+        for name in sorted(outputs):
+            digests[f"{key}/{name}"] = file_digest(outputs[name])
+    return digests
+
+
+def perspective_fingerprint(
+    prompt: str,
+    model: str,
+    digests: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    計算視角指紋
+
+    Args:
+        prompt: 以 stable_context 渲染的 prompt
+        model: 模型名稱
+        digests: upstream_digests 的結果
+    """
+    payload = json.dumps(
+        {
+            "version": FINGERPRINT_VERSION,
+            "prompt": prompt,
+            "model": model,
+            "upstream": digests or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,207 @@
+"""
+JSON 區塊擷取 - 線性時間掃描 Agent 輸出
+
+取代原本的 regex 串接（```json / ``` / 貪婪 \\{[\\s\\S]*\\}）：
+- fence 以預先編譯的 regex 字面搜尋跳躍偵測；大括號掃描在結構字元間跳躍並略過字串內容
+- 候選區間依優先順序產出：```json 區塊 → ``` 區塊 → 最外層物件 → 首尾大括號
+- 同一類候選由後往前（最後的通常是最終答案）
+- 以 JSONDecoder.raw_decode(text, idx) 直接解碼，不切出子字串
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+_DECODER = json.JSONDecoder()
+_STRUCT_RE = re.compile(r'[{}"]')
+# 敘述中常有大量單一反引號，str.find 對開頭字元頻繁出現的 needle 較慢；
+# regex 字面搜尋在此情況下約快一倍（4MB 報告 3.5ms → 1.9ms）
+_FENCE_RE = re.compile("```")
+# 字串內容（不含結尾）；各分支互斥且不要求結尾，不會回溯
+_STRING_BODY_RE = re.compile(r'(?:[^"\\\n]+|\\.)*')
+_WHITESPACE = " \t\r\n"
+
+# 候選區間 (start, end)，end 為不含
+Span = Tuple[int, int]
+
+
+def find_fences(text: str) -> Tuple[List[Span], List[Span]]:
+    """
+    找出所有行首的 code fence 區塊
+
+    JSON 字串不可包含換行，因此行首的 ``` 不可能位於 JSON 字串內，
+    fence 偵測不需追蹤字串狀態，直接以 _FENCE_RE 跳躍。
+
+    Args:
+        text: Agent 輸出
+
+    Returns:
+        (```json 區塊, 其他 ``` 區塊)，皆為區塊內容的區間，依出現順序
+    """
+    json_fences: List[Span] = []
+    other_fences: List[Span] = []
+
+    n = len(text)
+    pos = 0
+    open_start: Optional[int] = None
+    open_is_json = False
+
+    while True:
+        m = _FENCE_RE.search(text, pos)
+        if m is None:
+            break
+        i = m.start()
+
+        # pos 一定位於行首，只需往回找到本行開頭
+        nl = text.rfind("\n", pos, i)
+        line_start = nl + 1 if nl != -1 else pos
+        if text[line_start:i].strip(" \t"):
+            # 行中的 ```：本行之後的 ``` 也不會在行首，直接跳到下一行
+            nl = text.find("\n", i)
+            if nl == -1:
+                break
+            pos = nl + 1
+            continue
+
+        eol = text.find("\n", i)
+        if eol == -1:
+            eol = n
+        if open_start is None:
+            open_is_json = text[i + 3:eol].strip().lower() == "json"
+            open_start = eol + 1
+        else:
+            span = (open_start, line_start)
+            (json_fences if open_is_json else other_fences).append(span)
+            open_start = None
+        pos = eol + 1
+
+    return json_fences, other_fences
+
+
+def find_object_spans(text: str) -> List[Span]:
+    """
+    找出所有最外層的完整大括號區間
+
+    以 regex 在結構字元之間跳躍，字串內的大括號不計；字串遇到換行視為
+    誤判（例如敘述中的引號）而結束。未閉合的 { 不會造成回溯，整體為線性時間。
+
+    Args:
+        text: Agent 輸出
+
+    Returns:
+        最外層區間，依出現順序
+    """
+    n = len(text)
+    stack: List[int] = []
+    closed: List[Span] = []
+    pos = 0
+
+    while pos < n:
+        if not stack:
+            i = text.find("{", pos)
+            if i == -1:
+                break
+            stack.append(i)
+            pos = i + 1
+            continue
+
+        m = _STRUCT_RE.search(text, pos)
+        if m is None:
+            break
+        i = m.start()
+        c = text[i]
+
+        if c == "{":
+            stack.append(i)
+            pos = i + 1
+        elif c == "}":
+            closed.append((stack.pop(), i + 1))
+            pos = i + 1
+        else:
+            # 跳過字串內容，停在結尾引號、換行或落單的反斜線
+            pos = _STRING_BODY_RE.match(text, i + 1).end() + 1
+
+    # 只保留最外層區間：由後往前，被更早開始的區間包含者捨棄
+    outermost: List[Span] = []
+    min_start = n + 1
+    for start, end in reversed(closed):
+        if start < min_start:
+            outermost.append((start, end))
+            min_start = start
+    outermost.reverse()
+    return outermost
+
+
+def iter_json_candidates(text: str) -> Iterator[Span]:
+    """
+    依優先順序產出候選區間（各類別內由後往前）
+
+    大括號掃描延後到 fence 候選都失敗後才進行。
+
+    Args:
+        text: Agent 輸出
+
+    Yields:
+        (start, end) 區間
+    """
+    json_fences, other_fences = find_fences(text)
+    yield from reversed(json_fences)
+    yield from reversed(other_fences)
+
+    yield from reversed(find_object_spans(text))
+
+    # 最後保底：第一個 { 到最後一個 }（等同舊的貪婪 regex）
+    first = text.find("{")
+    last = text.rfind("}")
+    if first != -1 and last > first:
+        yield first, last + 1
+
+
+def decode_span(text: str, start: int, end: int) -> Optional[Any]:
+    """
+    解碼區間內的 JSON（不複製子字串）
+
+    區間內除了前後空白外必須恰好是一個 JSON 值。
+
+    Returns:
+        解碼後的值，失敗時為 None
+    """
+    while start < end and text[start] in _WHITESPACE:
+        start += 1
+    if start >= end:
+        return None
+
+    try:
+        value, stop = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+
+    if stop > end:
+        return None
+    while stop < end and text[stop] in _WHITESPACE:
+        stop += 1
+    if stop != end:
+        return None
+    return value
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    從 Agent 輸出擷取最終 JSON 物件
+
+    Args:
+        text: Agent 輸出
+
+    Returns:
+        JSON 物件，找不到時為 None
+    """
+    seen = set()
+    for span in iter_json_candidates(text):
+        if span in seen:
+            continue
+        seen.add(span)
+        value = decode_span(text, *span)
+        if isinstance(value, dict):
+            return value
+    return None
@@ -0,0 +1,166 @@
+"""
+JSON 修復 - 容錯解析格式錯誤的 Agent 輸出
+
+只在 json_extract 找不到可解碼的物件時使用，處理常見的輸出瑕疵：
+- 智慧引號（“key”: “value”）當作字串分隔符
+- 尾隨逗號（[1, 2,] / {"a": 1,}）
+- 字串內未跳脫的換行
+- 輸出被截斷：未結束的字串、陣列、物件（必要時丟棄最後一個不完整元素）
+
+修復結果仍需由呼叫端依 Schema 驗證後才採用。
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 智慧引號
+_SMART_DOUBLE = "“”„‟"
+
+# 截斷時最多往回丟棄的元素數
+MAX_DROPPED_ELEMENTS = 3
+
+
+def _find_start(text: str) -> int:
+    """找出修復起點：最後一個 ```json 區塊內的第一個 {，否則為第一個 {"""
+    fence = text.rfind("```json")
+    if fence != -1:
+        brace = text.find("{", fence)
+        if brace != -1:
+            return brace
+    return text.find("{")
+
+
+def _strip_trailing_comma(out: List[str]) -> bool:
+    """移除輸出尾端（忽略空白）的逗號"""
+    i = len(out) - 1
+    while i >= 0 and out[i] in " \t\r\n":
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+        return True
+    return False
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    """補上截斷處缺少的結尾"""
+    text = "".join(out).rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+
+def _loads_dict(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def repair_json(text: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    嘗試修復並解析 Agent 輸出中的 JSON 物件
+
+    Args:
+        text: Agent 輸出
+
+    Returns:
+        (修復後的物件或 None, 套用的修復項目)
+    """
+    start = _find_start(text)
+    if start == -1:
+        return None, []
+
+    fixes: List[str] = []
+    out: List[str] = []
+    stack: List[str] = []
+    # 每個逗號的 (輸出位置, 當時的巢狀堆疊)，截斷時用來丟棄不完整的元素
+    commas: List[Tuple[int, Tuple[str, ...]]] = []
+
+    in_string = False
+    closers = '"'
+    escape = False
+    complete = False
+
+    n = len(text)
+    i = start
+    while i < n:
+        ch = text[i]
+        i += 1
+
+        if in_string:
+            if escape:
+                escape = False
+                out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch in closers:
+                in_string = False
+                out.append('"')
+            elif ch == "\n":
+                out.append("\\n")
+                fixes.append("raw_newline")
+            else:
+                out.append(ch)
+            continue
+
+        if ch == '"' or ch in _SMART_DOUBLE:
+            in_string = True
+            if ch == '"':
+                closers = '"'
+            else:
+                closers = _SMART_DOUBLE + '"'
+                fixes.append("smart_quotes")
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            if _strip_trailing_comma(out):
+                fixes.append("trailing_comma")
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                complete = True
+                break
+        elif ch == ",":
+            commas.append((len(out), tuple(stack)))
+            out.append(ch)
+        elif ch == "`" and text.startswith("```", i - 1):
+            # 未閉合的物件遇到 code fence 結尾，視為截斷
+            break
+        else:
+            out.append(ch)
+
+    if complete:
+        value = _loads_dict("".join(out))
+        return (value, _dedupe(fixes)) if value is not None else (None, [])
+
+    # 截斷：補上字串與括號結尾
+    fixes.append("truncated")
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    value = _loads_dict(_close(out, stack))
+    if value is not None:
+        return value, _dedupe(fixes)
+
+    # 最後一個元素不完整（例如只有 key）：往回丟棄到前一個逗號
+    for pos, snapshot in reversed(commas[-MAX_DROPPED_ELEMENTS:]):
+        value = _loads_dict(_close(out[:pos], list(snapshot)))
+        if value is not None:
+            fixes.append("dropped_partial")
+            return value, _dedupe(fixes)
+
+    return None, []
+
+
+def _dedupe(fixes: List[str]) -> List[str]:
+    """去除重複的修復項目（保留順序）"""
+    return list(dict.fromkeys(fixes))
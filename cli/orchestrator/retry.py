@@ -0,0 +1,267 @@
+"""
+重試與對沖策略 - 決定 Agent 調用失敗後是否、何時重試
+
+- 失敗分類：依 stderr / 結束碼區分速率限制、過載、認證、無效請求、崩潰
+- Full-jitter 退避：sleep = uniform(0, min(max_delay, base * 2^attempt))
+- Retry-After：速率限制訊息中的等待時間作為退避下限
+- 對沖（hedging）：單次調用超過歷史 p95 延遲時，再發起一個相同調用，
+  取先成功者並取消另一個（取消時子程序會被終止）
+"""
+
+import math
+import random
+import re
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from .errors import AgentError
+
+
+# 失敗類型
+KIND_RATE_LIMIT = "rate_limit"
+KIND_OVERLOADED = "overloaded"
+KIND_AUTH = "auth"
+KIND_INVALID_REQUEST = "invalid_request"
+KIND_CRASH = "crash"
+KIND_TIMEOUT = "timeout"
+KIND_UNKNOWN = "unknown"
+
+# HTTP 狀態碼只在 CLI 的錯誤格式中比對（`API Error: 529 {...}`、`Error: 429 ...`、
+# `HTTP/1.1 503`、`status code: 502`、`status_code=500`、`"status": 500`），
+# 避免誤判敘述中的數字
+_STATUS = (
+    r"(?:\bapi error:?|^\s*error:|\bhttp/[\d.]+|\bstatus[ _]code[\"']?\s*[:=]?|\"status\"\s*:)"
+    r"\s*"
+)
+# CLI 訊息開頭的錯誤前綴（`API Error: Overloaded`、`Error: internal server error`）
+_ERROR_PREFIX = r"(?:\bapi error|^\s*error)\s*:?\s*"
+
+# 依序比對（先符合者為準）：(類型, 是否可重試, pattern)
+# 關鍵字皆對應 CLI / API 的錯誤格式（API 錯誤類型如 authentication_error），
+# 不比對可能出現在一般輸出中的單字（authentication、forbidden 等）
+_CLASSIFIERS = [
+    (KIND_AUTH, False, re.compile(
+        _STATUS + r"(401|403)\b|\bauthentication_error\b|\bpermission_error\b"
+        r"|invalid (x-)?api[ -]key|not logged in|please (run )?/login"
+        r"|oauth token (has )?(expired|been revoked)",
+        re.IGNORECASE | re.MULTILINE,
+    )),
+    (KIND_RATE_LIMIT, True, re.compile(
+        _STATUS + r"429\b|\brate_limit_error\b|too many requests"
+        r"|rate limit (exceeded|reached)|usage limit reached",
+        re.IGNORECASE | re.MULTILINE,
+    )),
+    (KIND_OVERLOADED, True, re.compile(
+        _STATUS + r"(500|502|503|529)\b|\boverloaded_error\b|\bapi_error\b"
+        r"|" + _ERROR_PREFIX + r"(overloaded|service unavailable|internal server error)",
+        re.IGNORECASE | re.MULTILINE,
+    )),
+    (KIND_INVALID_REQUEST, False, re.compile(
+        _STATUS + r"400\b|\binvalid_request_error\b|prompt is too long"
+        r"|context (length|window) exceeded|exceeds? (the )?(model'?s )?context (length|window)",
+        re.IGNORECASE | re.MULTILINE,
+    )),
+    (KIND_CRASH, True, re.compile(
+        r"traceback \(most recent call last\)|segmentation fault|^panic:|fatal error"
+        r"|out of memory|^killed\b",
+        re.IGNORECASE | re.MULTILINE,
+    )),
+]
+
+_RETRY_AFTER = re.compile(
+    r"retry[-_ ]after[\"']?\s*[:=]?\s*(\d+(?:\.\d+)?)"
+    r"|(?:try again|retry) in (\d+(?:\.\d+)?)\s*(s|sec|seconds?|m|min|minutes?)\b",
+    re.IGNORECASE,
+)
+
+
+def parse_retry_after(message: str) -> Optional[float]:
+    """
+    從錯誤訊息擷取 Retry-After 秒數
+
+    支援 `Retry-After: 30`、`retry_after=30`、`try again in 2 minutes` 等格式。
+
+    Returns:
+        秒數，找不到時為 None
+    """
+    match = _RETRY_AFTER.search(message)
+    if not match:
+        return None
+    if match.group(1):
+        return float(match.group(1))
+    seconds = float(match.group(2))
+    if match.group(3).lower().startswith("m"):
+        seconds *= 60
+    return seconds
+
+
+def classify_failure(message: str, returncode: Optional[int] = None) -> AgentError:
+    """
+    將 CLI 失敗分類為 AgentError
+
+    Args:
+        message: stderr 或錯誤結果文字
+        returncode: 子程序結束碼（負值表示被訊號終止）
+
+    Returns:
+        AgentError（details 含 kind / returncode / retry_after）
+    """
+    text = message.strip() or "Unknown error"
+    details: Dict = {"kind": KIND_UNKNOWN}
+    retryable = True
+
+    for kind, kind_retryable, pattern in _CLASSIFIERS:
+        if pattern.search(text):
+            details["kind"] = kind
+            retryable = kind_retryable
+            break
+    else:
+        if returncode is not None and returncode < 0:
+            details["kind"] = KIND_CRASH
+
+    if returncode is not None:
+        details["returncode"] = returncode
+    retry_after = parse_retry_after(text)
+    if retry_after is not None:
+        details["retry_after"] = retry_after
+
+    return AgentError(
+        f"Claude CLI failed: {text[:1000]}",
+        retryable=retryable,
+        details=details,
+    )
+
+
+class RetryPolicy:
+    """重試策略（full-jitter 指數退避）"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_retry_after: float = 300.0,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        初始化重試策略
+
+        Args:
+            max_attempts: 最大嘗試次數（含第一次）
+            base_delay: 退避基準秒數
+            max_delay: 單次退避上限（秒）
+            max_retry_after: 接受的 Retry-After 上限（超過則放棄重試）
+            rng: 亂數產生器（測試用）
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self._rng = rng or random.Random()
+
+    def should_retry(self, error: AgentError, attempt: int) -> bool:
+        """
+        判斷是否重試
+
+        Args:
+            error: 本次失敗
+            attempt: 已完成的嘗試次數（從 1 開始）
+        """
+        if not error.retryable or attempt >= self.max_attempts:
+            return False
+        retry_after = error.details.get("retry_after")
+        return retry_after is None or retry_after <= self.max_retry_after
+
+    def backoff(self, attempt: int, error: Optional[AgentError] = None) -> float:
+        """
+        計算下一次嘗試前的等待秒數
+
+        Args:
+            attempt: 已完成的嘗試次數（從 1 開始）
+            error: 本次失敗（用於 Retry-After）
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = self._rng.uniform(0, cap)
+        retry_after = error.details.get("retry_after") if error else None
+        if retry_after is not None:
+            # Retry-After 為下限，再加上少量抖動避免同時重試
+            delay = retry_after + self._rng.uniform(0, self.base_delay)
+        return delay
+
+
+class LatencyTracker:
+    """依 key 記錄最近的調用延遲，估計 p95"""
+
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        """
+        初始化延遲追蹤器
+
+        Args:
+            window: 每個 key 保留的樣本數
+            min_samples: 計算百分位數所需的最少樣本數
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, key: str, seconds: float) -> None:
+        """記錄一次成功調用的延遲"""
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, pct: float = 95.0) -> Optional[float]:
+        """
+        取得百分位數延遲（最近鄰法）
+
+        Returns:
+            秒數，樣本不足時為 None
+        """
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+
+class HedgePolicy:
+    """對沖策略：何時發起重複調用"""
+
+    def __init__(
+        self,
+        tracker: Optional[LatencyTracker] = None,
+        percentile: float = 95.0,
+        min_delay: float = 10.0,
+    ):
+        """
+        初始化對沖策略
+
+        Args:
+            tracker: 延遲追蹤器
+            percentile: 觸發對沖的延遲百分位數
+            min_delay: 最短對沖延遲（秒），避免對快速調用浪費配額
+        """
+        self.tracker = tracker or LatencyTracker()
+        self.percentile = percentile
+        self.min_delay = min_delay
+
+    def delay_for(self, model: str, agent_id: Optional[str] = None) -> Optional[float]:
+        """
+        取得對沖延遲：優先使用模型+視角的歷史，否則退回模型層級
+
+        Returns:
+            秒數，無足夠歷史時為 None（不對沖）
+        """
+        value = None
+        if agent_id:
+            value = self.tracker.percentile(f"{model}:{agent_id}", self.percentile)
+        if value is None:
+            value = self.tracker.percentile(model, self.percentile)
+        if value is None:
+            return None
+        return max(self.min_delay, value)
+
+    def record(self, model: str, agent_id: Optional[str], seconds: float) -> None:
+        """記錄成功調用的延遲（模型層級與模型+視角層級）"""
+        self.tracker.record(model, seconds)
+        if agent_id:
+            self.tracker.record(f"{model}:{agent_id}", seconds)
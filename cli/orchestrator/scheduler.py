@@ -0,0 +1,349 @@
+"""
+Agent 並發排程器 - 全域的模型配額、速率限制與准入控制
+
+所有 Agent 調用都在同一個事件迴圈（engine.py）中向排程器申請配額：
+- 每個模型有固定的並發槽位（sonnet/opus/haiku）
+- 每個模型有 Token Bucket 限制啟動速率（先取得 token 再排隊取槽位，
+  等待速率配額時不佔用槽位）
+- 等待中的請求依工作流分組，以加權輪詢公平分配槽位
+- 佇列深度超過上限時直接拒絕（可重試錯誤）
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from .errors import AgentError
+
+
+# 各模型預設並發槽位
+DEFAULT_MODEL_SLOTS: Dict[str, int] = {
+    "opus": 2,
+    "sonnet": 4,
+    "haiku": 8,
+}
+
+# 各模型預設速率限制：(每秒啟動數, 突發容量)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "opus": (0.5, 2),
+    "sonnet": (1.0, 4),
+    "haiku": (2.0, 8),
+}
+
+# 未列出模型的預設槽位
+DEFAULT_SLOTS = 4
+
+# 未指定工作流時使用的分組
+DEFAULT_WORKFLOW = "_default"
+
+
+class TokenBucket:
+    """
+    Token Bucket 速率限制器
+
+    token 不足時先預支（tokens 可為負數）再於鎖外等待，
+    後到的請求依預支順序排在後面，不需持有鎖等待。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初始化 Token Bucket
+
+        Args:
+            rate: 每秒補充的 token 數
+            capacity: 最大容量（允許的突發數）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """依經過時間補充 token"""
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        取得 token（不足時等待）
+
+        Returns:
+            等待秒數
+        """
+        # 預支與計算等待時間之間沒有 await，在事件迴圈中不會交錯
+        self._refill()
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+
+        delay = -self.tokens / self.rate
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # 取消時歸還預支的 token
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+            raise
+        return delay
+
+
+class _ModelPool:
+    """單一模型的槽位與等待佇列"""
+
+    def __init__(self, slots: int, bucket: Optional[TokenBucket]):
+        self.slots = slots
+        self.bucket = bucket
+        self.in_use = 0
+        # 依工作流分組的等待者（保持插入順序作為輪詢順序）
+        self.waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        # 統計
+        self.admitted = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self.waiters.values())
+
+
+class AgentScheduler:
+    """全域 Agent 排程器"""
+
+    def __init__(
+        self,
+        model_slots: Optional[Dict[str, int]] = None,
+        rate_limits: Optional[Dict[str, Optional[Tuple[float, float]]]] = None,
+        default_slots: int = DEFAULT_SLOTS,
+        max_queue: Optional[int] = None,
+    ):
+        """
+        初始化排程器
+
+        Args:
+            model_slots: 各模型並發槽位（覆蓋預設值）
+            rate_limits: 各模型速率限制 (rate, burst)，None 表示不限速
+            default_slots: 未列出模型的槽位數
+            max_queue: 每個模型的最大等待數（超過即拒絕）
+        """
+        self.model_slots = {**DEFAULT_MODEL_SLOTS, **(model_slots or {})}
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.default_slots = default_slots
+        self.max_queue = max_queue
+        self.workflow_weights: Dict[str, int] = {}
+        self._pools: Dict[str, _ModelPool] = {}
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 配置
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _get_pool(self, model: str) -> _ModelPool:
+        """取得（必要時建立）模型池"""
+        pool = self._pools.get(model)
+        if pool is None:
+            slots = self.model_slots.get(model, self.default_slots)
+            limit = self.rate_limits.get(model)
+            bucket = TokenBucket(*limit) if limit else None
+            pool = _ModelPool(slots, bucket)
+            self._pools[model] = pool
+        return pool
+
+    def configure(
+        self,
+        model: str,
+        slots: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+    ) -> None:
+        """
+        調整模型配置（可在執行中調整）
+
+        Args:
+            model: 模型名稱
+            slots: 並發槽位
+            rate: 每秒啟動數
+            burst: 突發容量
+        """
+        if slots is not None:
+            self.model_slots[model] = slots
+        if rate is not None:
+            self.rate_limits[model] = (rate, burst or max(1.0, rate))
+
+        pool = self._pools.get(model)
+        if pool is None:
+            return
+        if slots is not None:
+            pool.slots = slots
+            self._wake(pool)
+        if rate is not None:
+            pool.bucket = TokenBucket(*self.rate_limits[model])
+
+    def set_workflow_weight(self, workflow_id: str, weight: int) -> None:
+        """
+        設定工作流權重（每輪可取得的槽位數）
+
+        Args:
+            workflow_id: 工作流 ID
+            weight: 權重（≥1）
+        """
+        self.workflow_weights[workflow_id] = max(1, weight)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 申請與釋放
+    # ─────────────────────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        workflow_id: Optional[str] = None,
+    ) -> AsyncIterator[None]:
+        """
+        取得一個模型槽位（async context manager）
+
+        Args:
+            model: 模型名稱
+            workflow_id: 所屬工作流（用於公平分配）
+        """
+        await self.acquire(model, workflow_id)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    async def acquire(self, model: str, workflow_id: Optional[str] = None) -> float:
+        """
+        申請模型槽位與速率配額
+
+        Returns:
+            等待秒數
+        """
+        pool = self._get_pool(model)
+        key = workflow_id or DEFAULT_WORKFLOW
+        start = time.monotonic()
+
+        # 先等速率配額再取槽位，避免持有槽位等待 token
+        self._check_admission(pool, model)
+        if pool.bucket is not None:
+            await pool.bucket.acquire()
+
+        if pool.in_use < pool.slots and pool.queued == 0:
+            pool.in_use += 1
+        else:
+            self._check_admission(pool, model)
+
+            waiter = asyncio.get_running_loop().create_future()
+            pool.waiters.setdefault(key, deque()).append(waiter)
+            pool.max_queue_depth = max(pool.max_queue_depth, pool.queued)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # 已被分配槽位後才取消，歸還槽位
+                    self.release(model)
+                else:
+                    self._remove_waiter(pool, key, waiter)
+                raise
+
+        waited = time.monotonic() - start
+        pool.admitted += 1
+        pool.total_wait_seconds += waited
+        return waited
+
+    def _check_admission(self, pool: _ModelPool, model: str) -> None:
+        """佇列深度超過上限時拒絕（可重試錯誤）"""
+        if self.max_queue is not None and pool.queued >= self.max_queue:
+            pool.rejected += 1
+            raise AgentError(
+                f"Scheduler queue for {model} is full ({self.max_queue})",
+                retryable=True,
+                details={"kind": "admission", "model": model},
+            )
+
+    def release(self, model: str) -> None:
+        """釋放模型槽位"""
+        pool = self._get_pool(model)
+        pool.in_use = max(0, pool.in_use - 1)
+        self._wake(pool)
+
+    def _wake(self, pool: _ModelPool) -> None:
+        """將空出的槽位以加權輪詢分配給等待中的工作流"""
+        while pool.in_use < pool.slots and pool.waiters:
+            key, queue = next(iter(pool.waiters.items()))
+            granted = 0
+            weight = self.workflow_weights.get(key, 1)
+            while queue and granted < weight and pool.in_use < pool.slots:
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                pool.in_use += 1
+                granted += 1
+                waiter.set_result(None)
+
+            # 輪到下一個工作流
+            pool.waiters.pop(key)
+            if queue:
+                pool.waiters[key] = queue
+
+    def _remove_waiter(
+        self,
+        pool: _ModelPool,
+        key: str,
+        waiter: asyncio.Future,
+    ) -> None:
+        """移除被取消的等待者"""
+        queue = pool.waiters.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            pool.waiters.pop(key, None)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        取得各模型的排程指標
+
+        Returns:
+            以模型為 key 的指標字典
+        """
+        metrics = {}
+        for model, pool in list(self._pools.items()):
+            metrics[model] = {
+                "slots": pool.slots,
+                "in_use": pool.in_use,
+                "queued": pool.queued,
+                "queued_by_workflow": {
+                    k: len(q) for k, q in list(pool.waiters.items())
+                },
+                "max_queue_depth": pool.max_queue_depth,
+                "admitted": pool.admitted,
+                "rejected": pool.rejected,
+                "avg_wait_seconds": (
+                    round(pool.total_wait_seconds / pool.admitted, 3)
+                    if pool.admitted else 0.0
+                ),
+            }
+        return metrics
+
+
+# 全域實例
+_scheduler: Optional[AgentScheduler] = None
+
+
+def get_scheduler() -> AgentScheduler:
+    """取得全域排程器"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AgentScheduler()
+    return _scheduler
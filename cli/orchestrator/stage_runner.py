@@ -3,15 +3,22 @@
 
 流程：
 1. 初始化階段目錄
-2. 並行調用視角 Agent
+2. 並行調用視角 Agent（可依 quorum / 期限提前完成；輸入未變的視角重用先前結果）
+   - 啟用 task_dag 且有 tasks.yaml 時，改為依 DAG 並行執行任務（見 task_executor.py）
 3. 收集並驗證結果
-4. 生成綜合報告
+4. 生成綜合報告（可管線化：視角完成即保存報告並分批部分綜合）
 5. 品質閘門檢查
+
+提供工作佇列時，階段執行期間持有 stage 工作的租約並定期 heartbeat
+（見 io/job_queue.py）；程序中斷時租約過期，階段可由其他程序接手。
+提供 broker 時，視角 Agent 分派給 `maw worker` 執行（見 broker.py），
+結果仍寫入本階段目錄。
 """
 
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from ..config.models import (
     AgentResponse,
@@ -20,14 +27,21 @@ from ..config.models import (
     StageConfig,
     StageID,
     StageResult,
+    TaskResult,
 )
 from ..config.perspectives import get_stage_perspectives
+from ..config.schema import PERSPECTIVE_REPORT_SCHEMA, SYNTHESIS_REPORT_SCHEMA
 from ..config.stages import get_stage
-from ..io.logging import ActionLogger
+from ..io.job_queue import JobQueue, LeaseKeeper, default_owner
 from ..io.memory import MemoryManager
+from ..io.logging import ActionLogger
 from ..io.state import StateTracker
 from .agent_caller import AgentCaller, ParallelAgentCaller
+from .broker import QueueBroker
 from .errors import StageError, ValidationError
+from .fingerprint import perspective_fingerprint, stable_context, upstream_digests
+from .synthesis import PIPELINE_UNSUPPORTED_STAGES, SynthesisPipeline
+from .task_executor import TaskExecutor, load_tasks
 
 
 class StageRunner:
@@ -40,6 +54,9 @@ class StageRunner:
         logger: ActionLogger,
         tracker: StateTracker,
         caller: Optional[AgentCaller] = None,
+        queue: Optional[JobQueue] = None,
+        priority: int = 1,
+        broker: Optional[QueueBroker] = None,
     ):
         """
         初始化階段執行器
@@ -50,19 +67,29 @@ class StageRunner:
             logger: Action Logger
             tracker: 狀態追蹤器
             caller: Agent 調用器
+            queue: 工作佇列（None 表示不記錄階段租約）
+            priority: 階段工作的佇列優先級
+            broker: 視角分派器（設定後視角 Agent 交由 `maw worker` 執行）
         """
         self.workflow_id = workflow_id
         self.memory = memory
         self.logger = logger
         self.tracker = tracker
         self.caller = caller or AgentCaller()
-        self.parallel_caller = ParallelAgentCaller(self.caller)
+        self.parallel_caller = ParallelAgentCaller(self.caller, broker=broker)
+        self.queue = queue
+        self.priority = priority
+
+        # 本次執行的視角指紋與重用的視角
+        self._fingerprints: Dict[str, str] = {}
+        self._reused: Set[str] = set()
 
     def run(
         self,
         stage_id: StageID,
         context: Dict[str, Any],
         quick_mode: bool = False,
+        reuse: bool = True,
     ) -> StageResult:
         """
         執行階段
@@ -71,19 +98,85 @@ class StageRunner:
             stage_id: 階段 ID
             context: 執行上下文（包含前階段輸出等）
             quick_mode: 是否快速模式（減少視角數量）
+            reuse: 是否重用指紋相符的先前視角結果與綜合報告
 
         Returns:
             StageResult 物件
+
+        Raises:
+            StageError: 階段工作的租約由其他程序持有
         """
+        try:
+            if self.queue is None:
+                return self._run(stage_id, context, quick_mode, reuse)
+            return self._run_leased(stage_id, context, quick_mode, reuse)
+        finally:
+            # 階段結束：立即寫入 current.json 與日誌佇列（不等待去抖動計時器）
+            self.tracker.flush()
+            self.logger.flush()
+
+    def _run_leased(
+        self,
+        stage_id: StageID,
+        context: Dict[str, Any],
+        quick_mode: bool,
+        reuse: bool,
+    ) -> StageResult:
+        """持有 stage 工作的租約執行階段（見 run）"""
+        owner = default_owner()
+        job_id = self.queue.enqueue(
+            "stage",
+            self.workflow_id,
+            stage_id.value,
+            payload={"iteration": context.get("iteration", 0), "quick_mode": quick_mode},
+            priority=self.priority,
+        )
+        if self.queue.claim_job(job_id, owner) is None:
+            raise StageError("階段正由其他程序執行", stage=stage_id.value)
+
+        with LeaseKeeper(self.queue, job_id, owner):
+            try:
+                result = self._run(stage_id, context, quick_mode, reuse)
+            except BaseException as e:
+                self.queue.fail(job_id, owner, error=str(e) or type(e).__name__)
+                raise
+        if result.success:
+            self.queue.complete(
+                job_id, owner, {"quality_score": result.quality_score}
+            )
+        else:
+            self.queue.fail(job_id, owner, error="; ".join(result.errors), retry=False)
+        return result
+
+    def _run(
+        self,
+        stage_id: StageID,
+        context: Dict[str, Any],
+        quick_mode: bool,
+        reuse: bool,
+    ) -> StageResult:
+        """執行階段（見 run）"""
         start_time = time.time()
         stage_config = get_stage(stage_id)
         errors: List[str] = []
         outputs: Dict[str, str] = {}
 
+        stats_before = self.caller.get_stats(self.workflow_id)
+        pipeline: Optional[SynthesisPipeline] = None
+        self._fingerprints = {}
+        self._reused = set()
+
         # 1. 初始化階段
         self._init_stage(stage_id, stage_config)
 
         try:
+            # 有任務 DAG 時依 DAG 執行任務，取代固定視角
+            tasks = self._load_task_dag(context) if stage_config.task_dag else None
+            if tasks:
+                return self._run_task_stage(
+                    stage_id, stage_config, tasks, context, reuse, start_time, stats_before
+                )
+
             # 2. 取得視角列表
             perspectives = get_stage_perspectives(stage_id, quick_mode)
             self.logger.stage_start(
@@ -95,35 +188,99 @@ class StageRunner:
             # 3. 設定 Agent 狀態
             self._setup_agents(perspectives)
 
-            # 4. 並行執行視角 Agent
-            perspective_results = self._run_perspectives(
+            # 4. 並行執行視角 Agent（管線化時每個結果即時保存並送入綜合管線）
+            self._fingerprints = self._compute_fingerprints(stage_id, perspectives, context)
+            reused = self._load_reused_perspectives(stage_id, perspectives) if reuse else {}
+
+            on_result = None
+            pipelined = (
+                stage_config.pipelined_synthesis
+                and stage_id not in PIPELINE_UNSUPPORTED_STAGES
+            )
+            if pipelined and len(reused) < len(perspectives):
+                pipeline = SynthesisPipeline(
+                    self.caller,
+                    stage_id,
+                    context,
+                    workflow_id=self.workflow_id,
+                    batch_size=stage_config.synthesis_batch_size,
+                )
+
+                def on_result(agent_id: str, result: AgentResponse) -> None:
+                    json_path = self._save_perspective_report(stage_id, agent_id, result)
+                    if json_path:
+                        outputs[f"perspective_{agent_id}"] = str(json_path)
+                        pipeline.add(agent_id, result.content)
+
+            quorum = self._effective_quorum(stage_config, perspectives)
+            perspective_results, early_reason = self._run_perspectives(
                 stage_id,
                 perspectives,
                 context,
+                quorum=quorum,
+                deadline_seconds=stage_config.deadline_seconds,
+                on_result=on_result,
+                reused=reused,
             )
+            succeeded = sum(1 for r in perspective_results.values() if r.success)
+            cancelled = [p.id for p in perspectives if p.id not in perspective_results]
+            if early_reason:
+                self._record_early_completion(
+                    stage_id,
+                    early_reason,
+                    perspective_results,
+                    cancelled,
+                    quorum,
+                    stage_config.deadline_seconds,
+                )
 
             # 5. 驗證並保存結果
-            outputs = self._save_perspective_reports(
-                stage_id,
-                perspective_results,
-            )
+            if pipeline is None:
+                outputs = self._save_perspective_reports(
+                    stage_id,
+                    perspective_results,
+                )
 
-            # 6. 生成綜合報告
-            synthesis_path = self._generate_synthesis(
-                stage_id,
-                perspective_results,
-                context,
+            # 6. 生成綜合報告（輸入視角全部重用且綜合報告仍對應時直接沿用）
+            synthesis_path = (
+                self._reuse_synthesis(stage_id, perspective_results) if reuse else None
             )
+            synthesis_reused = synthesis_path is not None
+            if synthesis_reused:
+                pass
+            elif pipeline is not None:
+                synthesis_path = self._finish_pipelined_synthesis(stage_id, pipeline)
+            else:
+                synthesis_path = self._generate_synthesis(
+                    stage_id,
+                    perspective_results,
+                    context,
+                )
             if synthesis_path:
                 outputs["synthesis"] = str(synthesis_path)
+                if not synthesis_reused:
+                    self._write_synthesis_meta(stage_id, perspective_results)
+                tasks_path = synthesis_path.parent / "tasks.yaml"
+                if tasks_path.exists():
+                    outputs["tasks"] = str(tasks_path)
+
+            if reused:
+                self.logger.stage_reuse(
+                    stage_id=stage_id.value,
+                    reused=sorted(reused),
+                    total=len(perspectives),
+                    synthesis_reused=synthesis_reused,
+                )
 
             # 7. 計算品質分數
             quality_score = self._calculate_quality_score(
                 stage_id,
                 perspective_results,
+                cancelled=cancelled if early_reason == "deadline" else None,
             )
 
             duration = time.time() - start_time
+            self._log_agent_stats(stage_id, stats_before)
             self.logger.stage_complete(
                 stage_id=stage_id.value,
                 success=True,
@@ -137,13 +294,22 @@ class StageRunner:
                 quality_score=quality_score,
                 errors=errors,
                 duration_seconds=duration,
+                perspectives_total=len(perspectives),
+                perspectives_succeeded=succeeded,
+                perspectives_cancelled=cancelled,
+                early_completion=early_reason,
+                quorum=quorum,
+                perspectives_reused=sorted(reused),
             )
 
         except Exception as e:
+            if pipeline is not None:
+                pipeline.cancel()
             duration = time.time() - start_time
             error_msg = str(e)
             errors.append(error_msg)
 
+            self._log_agent_stats(stage_id, stats_before)
             self.logger.stage_complete(
                 stage_id=stage_id.value,
                 success=False,
@@ -158,6 +324,221 @@ class StageRunner:
                 duration_seconds=duration,
             )
 
+    # ─────────────────────────────────────────────────────────────────────────
+    # 任務 DAG 執行
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _load_task_dag(self, context: Dict) -> Optional[List[Dict[str, Any]]]:
+        """
+        載入前階段產出的任務 DAG（context["tasks_outputs"]["tasks"]）
+
+        Returns:
+            任務列表；沒有 tasks.yaml 時為 None
+
+        Raises:
+            ValidationError: DAG 無效
+        """
+        path = (context.get("tasks_outputs") or {}).get("tasks")
+        if not path or not Path(path).exists():
+            return None
+        return load_tasks(path) or None
+
+    def _run_task_stage(
+        self,
+        stage_id: StageID,
+        stage_config: StageConfig,
+        tasks: List[Dict[str, Any]],
+        context: Dict,
+        reuse: bool,
+        start_time: float,
+        stats_before: Dict[str, int],
+    ) -> StageResult:
+        """依 DAG 執行任務並保存結果（tasks/<id>.json 與 implementation.md）"""
+        from ..prompts import get_task_prompt
+
+        self.logger.stage_start(
+            stage_id=stage_id.value,
+            stage_name=stage_config.name,
+            perspectives=[t["id"] for t in tasks],
+        )
+        for task in tasks:
+            if task.get("status") != "completed":
+                self.tracker.add_agent(
+                    agent_id=task["id"],
+                    agent_name=task.get("title", task["id"]),
+                    description=task.get("description"),
+                    model=task.get("model", "sonnet"),
+                )
+
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        tasks_dir = stage_dir / "tasks"
+        stable = stable_context(context)
+        digests = upstream_digests(context)
+        outputs: Dict[str, str] = {}
+
+        def lookup(task: Dict[str, Any], dependency_results: Dict[str, Dict]) -> Optional[Dict]:
+            # 指紋含依賴任務的回報，上游任務結果改變時下游也會重新執行
+            prompt = get_task_prompt(task, stable, dependency_results)
+            fingerprint = perspective_fingerprint(prompt, task.get("model", "sonnet"), digests)
+            self._fingerprints[task["id"]] = fingerprint
+            if not reuse:
+                return None
+            meta = self.memory.read_json(tasks_dir / f"{task['id']}.meta.json")
+            saved = self.memory.read_json(tasks_dir / f"{task['id']}.json")
+            if meta and saved and meta.get("fingerprint") == fingerprint:
+                if saved.get("status") == "completed" and saved.get("content"):
+                    return saved["content"]
+            return None
+
+        def on_start(task_id: str) -> None:
+            self.tracker.update_agent_status(task_id, "running")
+
+        def on_result(task_id: str, result: TaskResult) -> None:
+            path = self._save_task_result(tasks_dir, result)
+            if result.success and path:
+                outputs[f"task_{task_id}"] = str(path)
+            if result.attempts == 0 and not result.reused and result.success:
+                return  # tasks.yaml 中已完成的任務
+            status = {"completed": "completed", "failed": "failed"}.get(result.status, "cancelled")
+            self.tracker.update_agent_status(task_id, status)
+            if result.reused:
+                return
+            if result.status == "failed":
+                self.logger.agent_call_error(
+                    agent_id=task_id,
+                    reason=result.error or "Unknown error",
+                    attempt=result.attempts,
+                    retryable=False,
+                )
+            elif result.status == "completed":
+                self.logger.agent_complete(
+                    agent_id=task_id,
+                    success=True,
+                    duration_seconds=result.duration_seconds,
+                )
+
+        executor = TaskExecutor(
+            self.caller,
+            max_parallel=stage_config.task_parallelism,
+            max_attempts=stage_config.task_max_attempts,
+            workflow_id=self.workflow_id,
+        )
+        results = executor.execute(
+            tasks, context, on_start=on_start, on_result=on_result, lookup=lookup
+        )
+
+        summary_path = self._write_task_summary(stage_dir, tasks, results)
+        outputs["implementation"] = str(summary_path)
+
+        completed = sum(1 for r in results.values() if r.success)
+        failed = sorted(tid for tid, r in results.items() if r.status == "failed")
+        skipped = sorted(tid for tid, r in results.items() if r.status == "skipped")
+        reused_tasks = sorted(tid for tid, r in results.items() if r.reused)
+        if reused_tasks:
+            self.logger.stage_reuse(
+                stage_id=stage_id.value,
+                reused=reused_tasks,
+                total=len(tasks),
+            )
+
+        duration = time.time() - start_time
+        self._log_agent_stats(stage_id, stats_before)
+        self.logger.stage_complete(
+            stage_id=stage_id.value,
+            success=True,
+            duration_seconds=duration,
+        )
+
+        return StageResult(
+            stage_id=stage_id,
+            success=True,
+            outputs=outputs,
+            quality_score=completed / len(tasks) * 100,
+            duration_seconds=duration,
+            tasks_total=len(tasks),
+            tasks_completed=completed,
+            tasks_failed=failed,
+            tasks_skipped=skipped,
+        )
+
+    def _save_task_result(self, tasks_dir: Path, result: TaskResult) -> Optional[Path]:
+        """保存任務結果與指紋（tasks/<id>.json、tasks/<id>.meta.json）"""
+        json_path = tasks_dir / f"{result.task_id}.json"
+        if result.reused:
+            return json_path
+
+        meta_path = tasks_dir / f"{result.task_id}.meta.json"
+        meta_path.unlink(missing_ok=True)
+        self.memory.write_json(json_path, result.model_dump(mode="json"))
+        if result.success and (fingerprint := self._fingerprints.get(result.task_id)):
+            self.memory.write_json(
+                meta_path,
+                {"fingerprint": fingerprint, "saved_at": datetime.now().isoformat()},
+            )
+        return json_path
+
+    def _write_task_summary(
+        self,
+        stage_dir: Path,
+        tasks: List[Dict[str, Any]],
+        results: Dict[str, TaskResult],
+    ) -> Path:
+        """將各任務的實作計畫渲染為 implementation.md"""
+        icons = {"completed": "✅", "failed": "❌", "skipped": "⏭️"}
+        completed = sum(1 for r in results.values() if r.success)
+
+        lines = ["# 實作階段 - 任務實作計畫", ""]
+        lines.append(f"完成 {completed}/{len(tasks)} 個任務的計畫")
+        lines.append("")
+        lines.append("| 任務 | 標題 | 狀態 | 摘要 |")
+        lines.append("|------|------|------|------|")
+        for task in tasks:
+            result = results.get(task["id"])
+            status = result.status if result else "pending"
+            if result and result.status == "completed":
+                note = (result.content or {}).get("summary", "")
+            else:
+                note = result.error if result and result.error else ""
+            note = " ".join(str(note).split()).replace("|", "\\|")
+            lines.append(
+                f"| {task['id']} | {task.get('title', '')} | "
+                f"{icons.get(status, '')} {status} | {note} |"
+            )
+        lines.append("")
+
+        for task in tasks:
+            result = results.get(task["id"])
+            content = (result.content or {}) if result and result.success else {}
+            if not content.get("file_changes") and not content.get("test_plan"):
+                continue
+            lines.append(f"## {task['id']}: {task.get('title', '')}")
+            lines.append("")
+            for change in content.get("file_changes") or []:
+                lines.append(f"- `{change.get('path', '')}`: {change.get('change', '')}")
+            if test_plan := content.get("test_plan"):
+                lines.append("")
+                lines.append("測試：")
+                lines.extend(f"- {item}" for item in test_plan)
+            lines.append("")
+
+        md_path = stage_dir / "implementation.md"
+        self.memory.write_text(md_path, "\n".join(lines))
+        self.logger.file_write(str(md_path), md_path.stat().st_size)
+        return md_path
+
+    def _log_agent_stats(
+        self,
+        stage_id: StageID,
+        stats_before: Dict[str, int],
+    ) -> None:
+        """記錄本階段的 Agent 調用統計（快取命中/未命中、JSON 修復）"""
+        stats_after = self.caller.get_stats(self.workflow_id)
+        delta = {
+            key: value - stats_before.get(key, 0)
+            for key, value in stats_after.items()
+        }
+        self.logger.agent_stats(stage_id.value, delta)
+
     def _init_stage(self, stage_id: StageID, config: StageConfig) -> Path:
         """初始化階段目錄"""
         from ..config.stages import get_stage_index, STAGE_ORDER
@@ -192,12 +573,68 @@ class StageRunner:
                 model=p.model,
             )
 
-    def _run_perspectives(
+    def _effective_quorum(
+        self,
+        config: StageConfig,
+        perspectives: List[PerspectiveConfig],
+    ) -> Optional[int]:
+        """取得本次執行的 quorum（快速模式視角較少時不超過視角數）"""
+        if config.quorum is None:
+            return None
+        return max(1, min(config.quorum, len(perspectives)))
+
+    def _compute_fingerprints(
         self,
         stage_id: StageID,
         perspectives: List[PerspectiveConfig],
         context: Dict,
+    ) -> Dict[str, str]:
+        """計算各視角的指紋（prompt + 模型 + 上游輸出摘要）"""
+        from ..prompts import get_perspective_prompt
+
+        stable = stable_context(context)
+        digests = upstream_digests(context)
+        return {
+            p.id: perspective_fingerprint(
+                get_perspective_prompt(stage_id, p, stable), p.model, digests
+            )
+            for p in perspectives
+        }
+
+    def _load_reused_perspectives(
+        self,
+        stage_id: StageID,
+        perspectives: List[PerspectiveConfig],
     ) -> Dict[str, AgentResponse]:
+        """載入指紋相符的先前視角報告（perspectives/<pid>.meta.json）"""
+        reused: Dict[str, AgentResponse] = {}
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        if not stage_dir:
+            return reused
+
+        perspectives_dir = stage_dir / "perspectives"
+        for p in perspectives:
+            meta = self.memory.read_json(perspectives_dir / f"{p.id}.meta.json")
+            if not meta or meta.get("fingerprint") != self._fingerprints.get(p.id):
+                continue
+            content = self.memory.read_json(perspectives_dir / f"{p.id}.json")
+            if content is None:
+                continue
+            reused[p.id] = AgentResponse(success=True, content=content, duration_seconds=0.0)
+
+        self._reused = set(reused)
+        return reused
+
+    def _run_perspectives(
+        self,
+        stage_id: StageID,
+        perspectives: List[PerspectiveConfig],
+        context: Dict,
+        quorum: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        on_result: Optional[Callable[[str, AgentResponse], None]] = None,
+        reused: Optional[Dict[str, AgentResponse]] = None,
+    ) -> Tuple[Dict[str, AgentResponse], Optional[str]]:
         """
         並行執行視角 Agent
 
@@ -205,15 +642,34 @@ class StageRunner:
             stage_id: 階段 ID
             perspectives: 視角配置列表
             context: 執行上下文
+            quorum: 成功視角達此數量即停止等待其餘視角
+            deadline_seconds: 等待期限（秒），逾時以已完成者繼續
+            on_result: 每個視角完成時的回呼（agent_id, result）
+            reused: 重用的先前結果（不再調用 Agent，計入 quorum）
 
         Returns:
-            以視角 ID 為 key 的結果字典
+            (以視角 ID 為 key 的結果字典, 提前完成原因 quorum / deadline / None)
         """
         from ..prompts import get_perspective_prompt
 
+        results: Dict[str, AgentResponse] = {}
+        succeeded = 0
+        for agent_id, result in (reused or {}).items():
+            results[agent_id] = result
+            self.tracker.update_agent_status(agent_id, "completed")
+            if on_result:
+                on_result(agent_id, result)
+            succeeded += 1
+
+        pending = [p for p in perspectives if p.id not in results]
+        if not pending:
+            return results, None
+        if quorum and succeeded >= quorum:
+            return results, "quorum"
+
         # 構建 Agent 任務
         agents = []
-        for p in perspectives:
+        for p in pending:
             # 更新狀態
             self.tracker.update_agent_status(p.id, "running")
             self.logger.agent_start(
@@ -224,35 +680,108 @@ class StageRunner:
             )
 
             prompt = get_perspective_prompt(stage_id, p, context)
-            agents.append({
+            agent = {
                 "id": p.id,
                 "prompt": prompt,
                 "model": p.model,
-            })
+                "schema": PERSPECTIVE_REPORT_SCHEMA,
+            }
+            if self.caller.streaming:
+                agent["on_event"] = self._make_progress_callback(p.id)
+            agents.append(agent)
+
+        # 並行執行，依完成順序更新狀態；提前結束迭代即取消其餘視角
+        early_reason: Optional[str] = None
+        completed = self.parallel_caller.iter_completed(
+            agents, context, timeout=deadline_seconds
+        )
+        try:
+            for agent_id, result in completed:
+                results[agent_id] = result
+                self._record_agent_result(agent_id, result)
+                if on_result:
+                    on_result(agent_id, result)
+                if result.success:
+                    succeeded += 1
+                if quorum and succeeded >= quorum and len(results) < len(perspectives):
+                    early_reason = "quorum"
+                    break
+        finally:
+            completed.close()
+
+        if early_reason is None and len(results) < len(perspectives):
+            early_reason = "deadline"
+        return results, early_reason
+
+    def _record_early_completion(
+        self,
+        stage_id: StageID,
+        reason: str,
+        results: Dict[str, AgentResponse],
+        cancelled: List[str],
+        quorum: Optional[int],
+        deadline_seconds: Optional[float],
+    ) -> None:
+        """記錄提前完成的決策（actions.jsonl 與 current.json）"""
+        succeeded = sum(1 for r in results.values() if r.success)
+        for agent_id in cancelled:
+            self.tracker.update_agent_status(agent_id, "cancelled")
+
+        self.tracker.set_early_completion(reason, succeeded, cancelled)
+        self.logger.stage_early_completion(
+            stage_id=stage_id.value,
+            reason=reason,
+            completed=list(results),
+            succeeded=succeeded,
+            cancelled=cancelled,
+            quorum=quorum,
+            deadline_seconds=deadline_seconds,
+        )
+
+    def _make_progress_callback(
+        self,
+        agent_id: str,
+        min_interval: float = 1.0,
+    ) -> Callable[[Dict[str, Any]], None]:
+        """
+        建立串流進度回呼（節流寫入 current.json）
 
-        # 並行執行
-        results = self.parallel_caller.call_parallel(agents, context)
+        Args:
+            agent_id: Agent ID
+            min_interval: 兩次寫入的最小間隔（秒）
+        """
+        last_update = [0.0]
 
-        # 更新狀態
-        for p in perspectives:
-            result = results.get(p.id)
-            if result and result.success:
-                self.tracker.update_agent_status(p.id, "completed")
-                self.logger.agent_complete(
-                    agent_id=p.id,
-                    success=True,
-                    duration_seconds=result.duration_seconds,
-                )
-            else:
-                self.tracker.update_agent_status(p.id, "failed")
-                self.logger.agent_call_error(
-                    agent_id=p.id,
-                    reason=result.error if result else "Unknown error",
-                    attempt=1,
-                    retryable=False,
-                )
+        def on_event(event: Dict[str, Any]) -> None:
+            now = time.time()
+            if event.get("kind") != "result" and now - last_update[0] < min_interval:
+                return
+            last_update[0] = now
+            self.tracker.update_agent_progress(agent_id, event)
 
-        return results
+        return on_event
+
+    def _record_agent_result(
+        self,
+        agent_id: str,
+        result: Optional[AgentResponse],
+    ) -> None:
+        """記錄單一 Agent 的完成狀態"""
+        if result and result.success:
+            self.tracker.update_agent_status(agent_id, "completed")
+            self.logger.agent_complete(
+                agent_id=agent_id,
+                success=True,
+                duration_seconds=result.duration_seconds,
+            )
+        else:
+            self.tracker.update_agent_status(agent_id, "failed")
+            self.logger.agent_call_error(
+                agent_id=agent_id,
+                reason=result.error if result else "Unknown error",
+                attempt=1,
+                retryable=False,
+            )
 
     def _save_perspective_reports(
         self,
@@ -261,34 +790,57 @@ class StageRunner:
     ) -> Dict[str, str]:
         """保存視角報告"""
         outputs = {}
-        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        for perspective_id, response in results.items():
+            json_path = self._save_perspective_report(stage_id, perspective_id, response)
+            if json_path:
+                outputs[f"perspective_{perspective_id}"] = str(json_path)
+        return outputs
+
+    def _save_perspective_report(
+        self,
+        stage_id: StageID,
+        perspective_id: str,
+        response: AgentResponse,
+    ) -> Optional[Path]:
+        """保存單一視角報告（JSON、Markdown 與指紋），回傳 JSON 路徑"""
+        if not response.success or not response.content:
+            return None
 
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
         if not stage_dir:
-            return outputs
+            return None
 
         perspectives_dir = stage_dir / "perspectives"
+        json_path = perspectives_dir / f"{perspective_id}.json"
+        if perspective_id in self._reused:
+            return json_path
 
-        for perspective_id, response in results.items():
-            if not response.success or not response.content:
-                continue
+        # 先移除舊指紋，避免寫入中斷時新報告被舊指紋誤認
+        meta_path = perspectives_dir / f"{perspective_id}.meta.json"
+        meta_path.unlink(missing_ok=True)
 
-            # 保存 JSON
-            json_path = perspectives_dir / f"{perspective_id}.json"
-            self.memory.write_json(json_path, response.content)
-            outputs[f"perspective_{perspective_id}"] = str(json_path)
+        # 保存 JSON
+        self.memory.write_json(json_path, response.content)
 
-            # 記錄檔案寫入
-            self.logger.file_write(
-                str(json_path),
-                json_path.stat().st_size if json_path.exists() else 0,
-            )
+        # 記錄檔案寫入
+        self.logger.file_write(
+            str(json_path),
+            json_path.stat().st_size if json_path.exists() else 0,
+        )
 
-            # 生成 Markdown 報告
-            md_path = perspectives_dir / f"{perspective_id}.md"
-            md_content = self._render_perspective_markdown(perspective_id, response.content)
-            self.memory.write_text(md_path, md_content)
+        # 生成 Markdown 報告
+        md_path = perspectives_dir / f"{perspective_id}.md"
+        md_content = self._render_perspective_markdown(perspective_id, response.content)
+        self.memory.write_text(md_path, md_content)
 
-        return outputs
+        # 指紋（供回退迭代重用）
+        if fingerprint := self._fingerprints.get(perspective_id):
+            self.memory.write_json(
+                meta_path,
+                {"fingerprint": fingerprint, "saved_at": datetime.now().isoformat()},
+            )
+
+        return json_path
 
     def _render_perspective_markdown(
         self,
@@ -361,27 +913,112 @@ class StageRunner:
 
         # 調用綜合 Agent
         prompt = get_synthesis_prompt(stage_id, perspective_contents, context)
-        response = self.caller.call(prompt, model="sonnet")
+        response = self.caller.call(
+            prompt,
+            model="sonnet",
+            workflow_id=self.workflow_id,
+            schema=SYNTHESIS_REPORT_SCHEMA,
+            inputs=context,
+        )
 
         if not response.success or not response.content:
             return None
 
-        # 保存綜合報告
+        return self._write_synthesis(stage_id, response.content)
+
+    def _synthesis_inputs(self, results: Dict[str, AgentResponse]) -> Dict[str, str]:
+        """綜合報告的輸入：成功視角的指紋"""
+        return {
+            pid: self._fingerprints.get(pid, "")
+            for pid, response in sorted(results.items())
+            if response.success and response.content
+        }
+
+    def _reuse_synthesis(
+        self,
+        stage_id: StageID,
+        results: Dict[str, AgentResponse],
+    ) -> Optional[Path]:
+        """所有輸入視角皆為重用且先前綜合報告的輸入相同時，沿用該報告"""
+        inputs = self._synthesis_inputs(results)
+        if not inputs or not set(inputs) <= self._reused:
+            return None
+
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        if not stage_dir:
+            return None
+
+        meta = self.memory.read_json(stage_dir / "summaries" / "synthesis.meta.json")
+        md_path = stage_dir / "synthesis.md"
+        if not meta or meta.get("inputs") != inputs or not md_path.exists():
+            return None
+        return md_path
+
+    def _write_synthesis_meta(
+        self,
+        stage_id: StageID,
+        results: Dict[str, AgentResponse],
+    ) -> None:
+        """記錄綜合報告的輸入指紋"""
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        if stage_dir:
+            self.memory.write_json(
+                stage_dir / "summaries" / "synthesis.meta.json",
+                {"inputs": self._synthesis_inputs(results)},
+            )
+
+    def _finish_pipelined_synthesis(
+        self,
+        stage_id: StageID,
+        pipeline: SynthesisPipeline,
+    ) -> Optional[Path]:
+        """等待管線中的部分綜合並保存合併結果（多批時另存各部分綜合）"""
+        content, partials = pipeline.finish()
+        if content is None:
+            return None
+
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        if stage_dir and len(partials) > 1:
+            for i, (pids, partial) in enumerate(partials, 1):
+                self.memory.write_json(
+                    stage_dir / "summaries" / f"partial-{i}.json",
+                    {"perspectives": pids, "synthesis": partial},
+                )
+
+        return self._write_synthesis(stage_id, content)
+
+    def _write_synthesis(
+        self,
+        stage_id: StageID,
+        content: Dict,
+    ) -> Optional[Path]:
+        """保存綜合報告（summaries/synthesis.json 與 synthesis.md）"""
         stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
         if not stage_dir:
             return None
 
         # JSON 格式
         json_path = stage_dir / "summaries" / "synthesis.json"
-        self.memory.write_json(json_path, response.content)
+        self.memory.write_json(json_path, content)
 
         # Markdown 格式
         md_path = stage_dir / "synthesis.md"
-        md_content = self._render_synthesis_markdown(stage_id, response.content)
+        md_content = self._render_synthesis_markdown(stage_id, content)
         self.memory.write_text(md_path, md_content)
 
         self.logger.file_write(str(md_path), md_path.stat().st_size if md_path.exists() else 0)
 
+        # 含統一任務清單時（TASKS 階段）另存 tasks.yaml，供 IMPLEMENT 依 DAG 執行
+        tasks_path = stage_dir / "tasks.yaml"
+        if isinstance(content.get("tasks"), list) and content["tasks"]:
+            self.memory.write_yaml(
+                tasks_path,
+                {"metadata": content.get("metadata", {}), "tasks": content["tasks"]},
+            )
+            self.logger.file_write(str(tasks_path), tasks_path.stat().st_size)
+        else:
+            tasks_path.unlink(missing_ok=True)
+
         return md_path
 
     def _render_synthesis_markdown(
@@ -446,14 +1083,20 @@ class StageRunner:
         self,
         stage_id: StageID,
         results: Dict[str, AgentResponse],
+        cancelled: Optional[List[str]] = None,
     ) -> float:
-        """計算品質分數"""
+        """
+        計算品質分數
+
+        以實際完成的視角集合計分；逾期被取消的視角（cancelled）計入成功率
+        分母視為失敗，達到 quorum 而取消的視角則不計。
+        """
         if not results:
             return 0.0
 
         # 基礎分數：成功率
         success_count = sum(1 for r in results.values() if r.success)
-        success_rate = success_count / len(results)
+        success_rate = success_count / (len(results) + len(cancelled or []))
 
         # 內容品質分數
         content_score = 0.0
@@ -0,0 +1,239 @@
+"""
+串流輸出讀取 - 逐行讀取 Claude CLI 輸出並增量擷取最終 JSON
+
+支援兩種格式：
+- stream-json: `claude --print --output-format stream-json --verbose`
+  每行一個事件（system / assistant / user / result），讀到 result 即結束
+- text: 一般 `--print` 輸出，讀到完整的 ```json 區塊即結束
+
+讀取期間的保護：
+- 輸出大小上限（避免無限輸出）
+- 閒置逾時（長時間沒有任何輸出視為卡住）
+- 無法解析的行數上限（偵測輸出亂碼的 Agent）
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from .errors import AgentError
+from .retry import classify_failure
+
+
+# 預設限制
+DEFAULT_MAX_OUTPUT_BYTES = 4 * 1024 * 1024  # 4 MB
+DEFAULT_IDLE_TIMEOUT = 120.0  # 秒
+DEFAULT_MAX_GARBAGE_LINES = 50
+
+# 串流事件回呼：接收精簡後的進度事件
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+class StreamLimits:
+    """串流讀取限制"""
+
+    def __init__(
+        self,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_garbage_lines: int = DEFAULT_MAX_GARBAGE_LINES,
+    ):
+        """
+        初始化串流限制
+
+        Args:
+            max_output_bytes: 最大輸出大小
+            idle_timeout: 閒置逾時（秒）
+            max_garbage_lines: stream-json 模式下允許的無效行數
+        """
+        self.max_output_bytes = max_output_bytes
+        self.idle_timeout = idle_timeout
+        self.max_garbage_lines = max_garbage_lines
+
+
+class StreamReader:
+    """逐行讀取 CLI 輸出並判斷何時取得最終結果"""
+
+    def __init__(
+        self,
+        output_format: str = "stream-json",
+        limits: Optional[StreamLimits] = None,
+        on_event: Optional[EventCallback] = None,
+    ):
+        """
+        初始化串流讀取器
+
+        Args:
+            output_format: stream-json 或 text
+            limits: 讀取限制
+            on_event: 進度事件回呼
+        """
+        self.output_format = output_format
+        self.limits = limits or StreamLimits()
+        self.on_event = on_event
+
+        self.bytes_read = 0
+        self.events = 0
+        self.garbage_lines = 0
+        self._text_parts: List[str] = []
+        self._fence_lines: Optional[List[str]] = None
+        self._result: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        """是否已取得最終結果"""
+        return self._result is not None
+
+    @property
+    def text(self) -> str:
+        """最終（或目前累積的）文字輸出"""
+        if self._result is not None:
+            return self._result
+        return "".join(self._text_parts)
+
+    async def read(self, stream: asyncio.StreamReader) -> str:
+        """
+        讀取串流直到取得最終結果或 EOF
+
+        Args:
+            stream: 子程序 stdout
+
+        Returns:
+            最終文字輸出
+        """
+        while not self.done:
+            try:
+                line = await asyncio.wait_for(
+                    stream.readline(),
+                    timeout=self.limits.idle_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise AgentError(
+                    f"Agent produced no output for {self.limits.idle_timeout:.0f}s",
+                    retryable=True,
+                    details={"kind": "stalled", "bytes_read": self.bytes_read},
+                )
+
+            if not line:
+                break
+            self.feed(line)
+
+        return self.text
+
+    def feed(self, raw: bytes) -> None:
+        """
+        處理一行輸出
+
+        Args:
+            raw: 原始輸出行（含換行）
+        """
+        self.bytes_read += len(raw)
+        if self.bytes_read > self.limits.max_output_bytes:
+            raise AgentError(
+                f"Agent output exceeded {self.limits.max_output_bytes} bytes",
+                retryable=True,
+                details={"kind": "output_limit", "bytes_read": self.bytes_read},
+            )
+
+        line = raw.decode("utf-8", errors="replace")
+        if self.output_format == "stream-json":
+            self._feed_stream_json(line)
+        else:
+            self._feed_text(line)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # stream-json
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _feed_stream_json(self, line: str) -> None:
+        """處理 stream-json 事件行"""
+        stripped = line.strip()
+        if not stripped:
+            return
+
+        try:
+            event = json.loads(stripped)
+        except json.JSONDecodeError:
+            event = None
+
+        if not isinstance(event, dict):
+            self.garbage_lines += 1
+            if self.garbage_lines > self.limits.max_garbage_lines:
+                raise AgentError(
+                    "Agent emitted too many unparseable stream lines",
+                    retryable=True,
+                    details={"kind": "garbage", "garbage_lines": self.garbage_lines},
+                )
+            return
+
+        self.events += 1
+        event_type = event.get("type")
+
+        if event_type == "result":
+            if event.get("is_error"):
+                # 依錯誤內容分類（速率限制、認證...），決定是否重試
+                raise classify_failure(str(event.get("result") or event.get("subtype")))
+            self._result = event.get("result") or "".join(self._text_parts)
+            self._emit("result", duration_ms=event.get("duration_ms"))
+            return
+
+        if event_type == "assistant":
+            message = event.get("message") or {}
+            for block in message.get("content") or []:
+                if block.get("type") == "text":
+                    self._text_parts.append(block.get("text", ""))
+                    self._emit("text", chars=len(block.get("text", "")))
+                elif block.get("type") == "tool_use":
+                    self._emit("tool_use", tool=block.get("name"))
+            return
+
+        if event_type == "system":
+            self._emit("system", subtype=event.get("subtype"))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # text
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _feed_text(self, line: str) -> None:
+        """處理一般文字輸出，偵測完整的 ```json 區塊"""
+        self._text_parts.append(line)
+        stripped = line.strip()
+
+        if self._fence_lines is None:
+            if stripped.startswith("```json"):
+                self._fence_lines = []
+                self._emit("json_start")
+            return
+
+        if stripped.startswith("```"):
+            body = "".join(self._fence_lines)
+            self._fence_lines = None
+            try:
+                parsed = json.loads(body)
+            except json.JSONDecodeError:
+                return
+            if isinstance(parsed, dict):
+                self._result = "".join(self._text_parts)
+                self._emit("result")
+            return
+
+        self._fence_lines.append(line)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 事件
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _emit(self, kind: str, **fields: Any) -> None:
+        """送出進度事件（回呼錯誤不影響讀取）"""
+        if self.on_event is None:
+            return
+        event = {
+            "kind": kind,
+            "events": self.events,
+            "bytes": self.bytes_read,
+            **{k: v for k, v in fields.items() if v is not None},
+        }
+        try:
+            self.on_event(event)
+        except Exception:
+            pass
@@ -0,0 +1,239 @@
+"""
+管線化綜合 - 視角結果陸續完成時即開始綜合
+
+流程：
+- 每累積 batch_size 份成功的視角報告，就在引擎上發起一次部分綜合
+  （與其餘視角的執行重疊）
+- 視角全部結束後，剩餘報告再發起最後一次部分綜合
+- 所有部分綜合以 merge_syntheses 在本地合併（不再調用 Agent）
+
+只有一個批次時等同一般的綜合調用。
+
+管線化為選用功能（StageConfig.pipelined_synthesis，預設關閉）。
+TASKS 階段的綜合需產出單一一致的任務 DAG，各批次的部分 DAG 無法在本地合併，
+因此不支援管線化，一律使用一般綜合。
+"""
+
+import concurrent.futures
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.models import AgentResponse, StageID
+from ..config.schema import SYNTHESIS_REPORT_SCHEMA
+from .agent_caller import AgentCaller
+
+
+# 優先級排序（高 → 低）
+_PRIORITY_ORDER = ["critical", "high", "medium", "low"]
+_CONFIDENCE_ORDER = ["high", "medium", "low"]
+
+# 部分綜合
+Partial = Tuple[List[str], Dict[str, Any]]
+
+# merge_syntheses 逐欄合併的頂層欄位；其餘欄位原樣沿用
+MERGED_KEYS = frozenset({
+    "stage_id", "consensus", "key_insights", "conflicts", "action_items", "partial_syntheses",
+})
+
+# 綜合內容含無法逐批合併的階段特有欄位（tasks / metadata）
+PIPELINE_UNSUPPORTED_STAGES = frozenset({StageID.TASKS})
+
+
+def _norm(text: Any) -> str:
+    """正規化文字作為去重 key"""
+    return " ".join(str(text or "").lower().split())
+
+
+def _higher(a: Optional[str], b: Optional[str], order: List[str]) -> Optional[str]:
+    """取兩個等級中較高者（未知等級視為最低）"""
+    rank = {v: i for i, v in enumerate(order)}
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if rank.get(a, len(order)) <= rank.get(b, len(order)) else b
+
+
+def merge_syntheses(stage_id: StageID, partials: List[Partial]) -> Dict[str, Any]:
+    """
+    合併多份部分綜合（本地 reduce，不調用 Agent）
+
+    Args:
+        stage_id: 階段 ID
+        partials: (涵蓋的視角 ID, 部分綜合內容) 列表
+
+    Returns:
+        符合 SYNTHESIS_REPORT_SCHEMA 的綜合內容；MERGED_KEYS 以外的頂層欄位
+        沿用最後一份含該欄位的部分綜合
+    """
+    total = sum(len(pids) for pids, _ in partials) or 1
+
+    # 共識：依涵蓋視角數加權平均，要點去重
+    score = 0.0
+    points: Dict[str, str] = {}
+    for pids, content in partials:
+        consensus = content.get("consensus") or {}
+        score += float(consensus.get("score", 0) or 0) * len(pids) / total
+        for point in consensus.get("points", []) or []:
+            points.setdefault(_norm(point), point)
+
+    # 洞察：相同洞察合併來源，信心度取高
+    insights: Dict[str, Dict[str, Any]] = {}
+    for _, content in partials:
+        for item in content.get("key_insights", []) or []:
+            key = _norm(item.get("insight"))
+            merged = insights.get(key)
+            if merged is None:
+                insights[key] = {**item, "source_perspectives": list(item.get("source_perspectives", []))}
+                continue
+            for source in item.get("source_perspectives", []):
+                if source not in merged["source_perspectives"]:
+                    merged["source_perspectives"].append(source)
+            merged["confidence"] = _higher(
+                merged.get("confidence"), item.get("confidence"), _CONFIDENCE_ORDER
+            )
+
+    # 衝突：相同主題合併立場
+    conflicts: Dict[str, Dict[str, Any]] = {}
+    for _, content in partials:
+        for item in content.get("conflicts", []) or []:
+            key = _norm(item.get("topic"))
+            merged = conflicts.get(key)
+            if merged is None:
+                conflicts[key] = {**item, "perspectives": list(item.get("perspectives", []))}
+                continue
+            merged["perspectives"].extend(item.get("perspectives", []))
+            if not merged.get("resolution") and item.get("resolution"):
+                merged["resolution"] = item["resolution"]
+
+    # 行動項目：相同行動取最高優先級
+    actions: Dict[str, Dict[str, Any]] = {}
+    for _, content in partials:
+        for item in content.get("action_items", []) or []:
+            key = _norm(item.get("action"))
+            merged = actions.get(key)
+            if merged is None:
+                actions[key] = dict(item)
+            else:
+                merged["priority"] = _higher(
+                    merged.get("priority"), item.get("priority"), _PRIORITY_ORDER
+                )
+
+    # 階段特有欄位：不做語意合併，後面的部分綜合覆蓋前面的
+    extra: Dict[str, Any] = {}
+    for _, content in partials:
+        for key, value in content.items():
+            if key not in MERGED_KEYS:
+                extra[key] = value
+
+    return {
+        **extra,
+        "stage_id": stage_id.value,
+        "consensus": {"score": round(score, 3), "points": list(points.values())},
+        "key_insights": list(insights.values()),
+        "conflicts": list(conflicts.values()),
+        "action_items": sorted(
+            actions.values(),
+            key=lambda a: _PRIORITY_ORDER.index(a.get("priority"))
+            if a.get("priority") in _PRIORITY_ORDER else len(_PRIORITY_ORDER),
+        ),
+        "partial_syntheses": len(partials),
+    }
+
+
+class SynthesisPipeline:
+    """管線化綜合：依批次發起部分綜合，最後合併"""
+
+    def __init__(
+        self,
+        caller: AgentCaller,
+        stage_id: StageID,
+        context: Dict[str, Any],
+        workflow_id: Optional[str] = None,
+        batch_size: int = 2,
+    ):
+        """
+        初始化綜合管線
+
+        Args:
+            caller: Agent 調用器（部分綜合在其引擎上執行）
+            stage_id: 階段 ID
+            context: 執行上下文
+            workflow_id: 工作流 ID
+            batch_size: 每批視角報告數
+        """
+        self.caller = caller
+        self.stage_id = stage_id
+        self.context = context
+        self.workflow_id = workflow_id
+        self.batch_size = max(1, batch_size)
+
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._batches: List[Tuple[Dict[str, Dict[str, Any]], concurrent.futures.Future]] = []
+
+    @property
+    def launched(self) -> int:
+        """已發起的部分綜合數"""
+        return len(self._batches)
+
+    def add(self, perspective_id: str, content: Dict[str, Any]) -> None:
+        """加入一份成功的視角報告（累積滿一批即發起部分綜合）"""
+        self._pending[perspective_id] = content
+        if len(self._pending) >= self.batch_size:
+            self._launch()
+
+    def _launch(self) -> concurrent.futures.Future:
+        """對目前累積的報告發起一次部分綜合"""
+        from ..prompts import get_synthesis_prompt
+
+        batch = dict(self._pending)
+        self._pending.clear()
+        prompt = get_synthesis_prompt(self.stage_id, batch, self.context)
+        future = self.caller.engine.submit(
+            self.caller.acall(
+                prompt,
+                model="sonnet",
+                workflow_id=self.workflow_id,
+                schema=SYNTHESIS_REPORT_SCHEMA,
+                inputs=self.context,
+            )
+        )
+        self._batches.append((batch, future))
+        return future
+
+    def finish(self) -> Tuple[Optional[Dict[str, Any]], List[Partial]]:
+        """
+        發起剩餘批次並等待所有部分綜合，合併結果
+
+        Returns:
+            (合併後的綜合內容或 None, 成功的部分綜合列表)
+        """
+        if self._pending:
+            self._launch()
+
+        partials: List[Partial] = []
+        failed: Dict[str, Dict[str, Any]] = {}
+        for batch, future in self._batches:
+            response: AgentResponse = future.result()
+            if response.success and response.content:
+                partials.append((list(batch), response.content))
+            else:
+                failed.update(batch)
+
+        # 失敗批次的視角合為一批重試一次，避免其觀點從綜合中遺漏
+        if failed:
+            self._pending = failed
+            response = self._launch().result()
+            if response.success and response.content:
+                partials.append((list(failed), response.content))
+
+        if not partials:
+            return None, []
+        if len(partials) == 1:
+            return partials[0][1], partials
+        return merge_syntheses(self.stage_id, partials), partials
+
+    def cancel(self) -> None:
+        """取消尚未完成的部分綜合"""
+        self._pending.clear()
+        for _, future in self._batches:
+            future.cancel()
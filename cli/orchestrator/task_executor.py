@@ -0,0 +1,330 @@
+"""
+DAG 任務執行器 - 依 tasks.yaml 的依賴圖並行執行任務
+
+排程：
+- 依賴全部完成的任務進入就緒佇列，最多 max_parallel 個同時執行
+- 就緒任務依關鍵路徑長度排序（剩餘路徑最長者優先），再依 wave、ID
+- 任務失敗時重試至 max_attempts；仍失敗則其所有下游任務標記為 skipped
+- tasks.yaml 中 status: completed 的任務視為已完成，不再執行
+
+並行度同時受 AgentScheduler 的全域 slot 限制。
+回呼（on_start / on_result / lookup）含檔案與日誌 I/O，在執行緒中執行，
+不阻塞所有工作流共用的事件迴圈。
+"""
+
+import asyncio
+import heapq
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+from ..config.models import TaskResult
+from ..config.schema import TASK_RESULT_SCHEMA
+from ..io.doc_cache import YamlLoader
+from ..validators.dag import get_dependencies, validate_dag
+from .agent_caller import AgentCaller
+from .errors import ValidationError
+
+
+# 回呼
+StartCallback = Callable[[str], None]
+ResultCallback = Callable[[str, TaskResult], None]
+# 重用查詢：(任務, 依賴回報) → 先前的回報內容或 None
+LookupCallback = Callable[[Dict[str, Any], Dict[str, Dict]], Optional[Dict[str, Any]]]
+
+
+def load_tasks(source: Union[str, Path, Dict, List]) -> List[Dict[str, Any]]:
+    """
+    載入並驗證任務 DAG
+
+    Args:
+        source: tasks.yaml 路徑、已解析的 {"tasks": [...]} 或任務列表
+
+    Returns:
+        任務列表
+
+    Raises:
+        ValidationError: 檔案無法解析或 DAG 無效（缺少依賴、循環）
+    """
+    data: Any = source
+    if isinstance(source, (str, Path)):
+        try:
+            with open(source, "r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=YamlLoader)
+        except (OSError, yaml.YAMLError) as e:
+            raise ValidationError(f"無法讀取任務 DAG: {e}", validator="dag")
+
+    tasks = data.get("tasks") if isinstance(data, dict) else data
+    if not isinstance(tasks, list):
+        raise ValidationError("任務 DAG 缺少 tasks 列表", validator="dag")
+
+    result = validate_dag(tasks)
+    if not result.valid:
+        raise ValidationError("任務 DAG 無效", validator="dag", errors=result.errors)
+    return tasks
+
+
+def critical_path_lengths(tasks: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    計算每個任務到終點的最長路徑長度（含自身）
+
+    權重為 estimate_minutes（未提供時為 1）。
+
+    Returns:
+        {任務 ID: 路徑長度}
+    """
+    task_map = {t["id"]: t for t in tasks}
+    dependents: Dict[str, List[str]] = defaultdict(list)
+    for task in tasks:
+        for dep in get_dependencies(task):
+            dependents[dep].append(task["id"])
+
+    lengths: Dict[str, float] = {}
+
+    # 依拓撲逆序計算（DAG 已驗證無循環）
+    order = _topological_order(tasks)
+    for task_id in reversed(order):
+        weight = float(task_map[task_id].get("estimate_minutes") or 1)
+        tail = max((lengths[d] for d in dependents[task_id]), default=0.0)
+        lengths[task_id] = weight + tail
+    return lengths
+
+
+def _topological_order(tasks: List[Dict[str, Any]]) -> List[str]:
+    """Kahn 拓撲排序"""
+    in_degree = {t["id"]: len(get_dependencies(t)) for t in tasks}
+    dependents: Dict[str, List[str]] = defaultdict(list)
+    for task in tasks:
+        for dep in get_dependencies(task):
+            dependents[dep].append(task["id"])
+
+    queue = [tid for tid, degree in in_degree.items() if degree == 0]
+    order: List[str] = []
+    while queue:
+        task_id = queue.pop()
+        order.append(task_id)
+        for dependent in dependents[task_id]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                queue.append(dependent)
+    return order
+
+
+def _is_blocked(content: Optional[Dict[str, Any]]) -> bool:
+    """任務回報 blocked（應重試，不可沿用）"""
+    return (content or {}).get("status") == "blocked"
+
+
+class TaskExecutor:
+    """DAG 任務執行器"""
+
+    def __init__(
+        self,
+        caller: AgentCaller,
+        max_parallel: int = 4,
+        max_attempts: int = 2,
+        model: str = "sonnet",
+        workflow_id: Optional[str] = None,
+    ):
+        """
+        初始化任務執行器
+
+        Args:
+            caller: Agent 調用器（任務在其引擎上執行）
+            max_parallel: 最大並行任務數
+            max_attempts: 單一任務的最大嘗試次數
+            model: 預設模型（任務可用 model 欄位覆寫）
+            workflow_id: 工作流 ID
+        """
+        self.caller = caller
+        self.max_parallel = max(1, max_parallel)
+        self.max_attempts = max(1, max_attempts)
+        self.model = model
+        self.workflow_id = workflow_id
+
+    def execute(
+        self,
+        tasks: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        on_start: Optional[StartCallback] = None,
+        on_result: Optional[ResultCallback] = None,
+        lookup: Optional[LookupCallback] = None,
+    ) -> Dict[str, TaskResult]:
+        """同步執行 DAG（見 aexecute）"""
+        return self.caller.engine.run(
+            self.aexecute(tasks, context, on_start, on_result, lookup)
+        )
+
+    async def aexecute(
+        self,
+        tasks: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        on_start: Optional[StartCallback] = None,
+        on_result: Optional[ResultCallback] = None,
+        lookup: Optional[LookupCallback] = None,
+    ) -> Dict[str, TaskResult]:
+        """
+        執行 DAG
+
+        Args:
+            tasks: 已驗證的任務列表（見 load_tasks）
+            context: 執行上下文
+            on_start: 任務開始時的回呼（task_id）
+            on_result: 任務結束（含略過）時的回呼（task_id, result）
+            lookup: 重用查詢，回傳先前回報內容時不調用 Agent
+
+        Returns:
+            以任務 ID 為 key 的結果字典
+        """
+        task_map = {t["id"]: t for t in tasks}
+        priority = critical_path_lengths(tasks)
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        waiting: Dict[str, set] = {}
+        for task in tasks:
+            deps = get_dependencies(task)
+            waiting[task["id"]] = set(deps)
+            for dep in deps:
+                dependents[dep].append(task["id"])
+
+        results: Dict[str, TaskResult] = {}
+        ready: List[Tuple[float, int, str]] = []
+        queued: set = set()
+
+        async def finish(task_id: str, result: TaskResult) -> None:
+            results[task_id] = result
+            if on_result:
+                await asyncio.to_thread(on_result, task_id, result)
+            if result.success:
+                for dependent in dependents[task_id]:
+                    waiting[dependent].discard(task_id)
+                    if not waiting[dependent] and dependent not in results:
+                        push(dependent)
+            else:
+                await skip_dependents(task_id, task_id)
+
+        async def skip_dependents(task_id: str, root: str) -> None:
+            for dependent in dependents[task_id]:
+                if dependent in results:
+                    continue
+                results[dependent] = TaskResult(
+                    task_id=dependent,
+                    status="skipped",
+                    error=f"依賴任務 {root} 失敗",
+                    blocked_by=root,
+                )
+                if on_result:
+                    await asyncio.to_thread(on_result, dependent, results[dependent])
+                await skip_dependents(dependent, root)
+
+        def push(task_id: str) -> None:
+            if task_id in queued:
+                return
+            queued.add(task_id)
+            wave = int(task_map[task_id].get("wave") or 0)
+            heapq.heappush(ready, (-priority[task_id], wave, task_id))
+
+        # 已完成的任務（tasks.yaml status: completed）：不進入就緒佇列
+        done = [t["id"] for t in tasks if t.get("status") == "completed"]
+        queued.update(done)
+        for task_id in done:
+            await finish(task_id, TaskResult(task_id=task_id, status="completed"))
+
+        for task_id, deps in waiting.items():
+            if not deps and task_id not in results:
+                push(task_id)
+
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_parallel:
+                    _, _, task_id = heapq.heappop(ready)
+                    if on_start:
+                        await asyncio.to_thread(on_start, task_id)
+                    dependency_results = {
+                        dep: results[dep].content or {}
+                        for dep in get_dependencies(task_map[task_id])
+                    }
+                    coro = self._run_task(task_map[task_id], context, dependency_results, lookup)
+                    running[asyncio.ensure_future(coro)] = task_id
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    task_id = running.pop(future)
+                    await finish(task_id, future.result())
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return results
+
+    async def _run_task(
+        self,
+        task: Dict[str, Any],
+        context: Dict[str, Any],
+        dependency_results: Dict[str, Dict],
+        lookup: Optional[LookupCallback],
+    ) -> TaskResult:
+        """執行單一任務（含重試）"""
+        from ..prompts import get_task_prompt
+
+        task_id = task["id"]
+        if lookup:
+            content = await asyncio.to_thread(lookup, task, dependency_results)
+            if content is not None:
+                return TaskResult(
+                    task_id=task_id,
+                    status="completed",
+                    content=content,
+                    duration_seconds=0.0,
+                    reused=True,
+                )
+
+        prompt = get_task_prompt(task, context, dependency_results)
+        start = time.time()
+        error: Optional[str] = None
+        content = None
+        attempt = 0
+
+        while attempt < self.max_attempts:
+            attempt += 1
+            # 重試必須實際重新調用；blocked 回報不寫入快取，之後重跑也不會取得
+            response = await self.caller.acall(
+                prompt,
+                model=task.get("model") or self.model,
+                workflow_id=self.workflow_id,
+                use_cache=None if attempt == 1 else False,
+                schema=TASK_RESULT_SCHEMA,
+                agent_id=task_id,
+                inputs=context,
+                cacheable=lambda r: not _is_blocked(r.content),
+            )
+            content = response.content
+            if not response.success:
+                error = response.error
+            elif _is_blocked(content):
+                error = (content or {}).get("notes") or "任務回報 blocked"
+            else:
+                return TaskResult(
+                    task_id=task_id,
+                    status="completed",
+                    content=content,
+                    attempts=attempt,
+                    duration_seconds=time.time() - start,
+                )
+
+        return TaskResult(
+            task_id=task_id,
+            status="failed",
+            content=content,
+            error=error,
+            attempts=attempt,
+            duration_seconds=time.time() - start,
+        )
@@ -5,8 +5,25 @@
 RESEARCH → PLAN → TASKS → IMPLEMENT → REVIEW → VERIFY
                                         ↑__________↓
                                       智慧回退機制
+
+檢查點（checkpoint）：
+- 每個階段完成後寫入 stages/<stage>/result.json 與 meta.yaml 的 checkpoint
+  （下一個階段、迭代次數、回退歷史）；meta 更新先進入 MemoryManager 的寫回快取，
+  在階段邊界與工作流結束時寫入檔案
+- Workflow.load 由 meta.yaml、階段目錄與 current.json 恢復狀態，
+  以相同 workflow ID 從第一個未完成的階段繼續
+- 中斷階段內已完成的視角由指紋重用（見 fingerprint.py），不重新調用
+
+取消：cancel() 可由其他執行緒呼叫，工作流在下一個階段邊界停止
+（狀態為 cancelled），之後可用 resume 由檢查點繼續。
+
+持久化佇列（見 io/job_queue.py）：
+- run() 期間持有 workflow 工作的租約並定期 heartbeat，各階段持有 stage 工作的租約
+- 程序被終止時租約過期，recover_workflows 把工作放回佇列並由檢查點恢復
+- 同一工作流的租約由其他程序持有時拒絕執行，避免重複執行
 """
 
+import threading
 import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -28,14 +45,23 @@ from ..config.stages import (
     get_next_stage,
     is_final_stage,
 )
-from ..io.logging import ActionLogger, get_logger
+from ..io.job_queue import (
+    JobQueue,
+    LeaseKeeper,
+    STATUS_CANCELLED,
+    default_owner,
+    get_job_queue,
+)
+from ..io.logging import ActionLogger, get_logger, release_logger
 from ..io.memory import MemoryManager, get_memory
-from ..io.state import StateTracker, get_tracker
+from ..io.state import StateTracker, get_tracker, read_current_state, release_tracker
 from .agent_caller import AgentCaller
+from .broker import QueueBroker
 from .errors import (
     GateFailedError,
     HumanInterventionRequired,
     RollbackError,
+    WorkflowCancelled,
     WorkflowError,
 )
 from .rollback import RollbackManager
@@ -61,6 +87,9 @@ class Workflow:
         config: WorkflowConfig,
         memory: Optional[MemoryManager] = None,
         caller: Optional[AgentCaller] = None,
+        workflow_id: Optional[str] = None,
+        queue: Optional[JobQueue] = None,
+        broker: Optional[QueueBroker] = None,
     ):
         """
         初始化工作流
@@ -69,11 +98,17 @@ class Workflow:
             config: 工作流配置
             memory: Memory 管理器
             caller: Agent 調用器
+            workflow_id: 既有工作流 ID（恢復時使用，不重建目錄）
+            queue: 工作佇列（預設為 Memory 根目錄下的 jobs.db）
+            broker: 視角分派器（None 表示視角 Agent 在本機執行）
         """
         self.config = config
-        self.workflow_id = generate_workflow_id(config.topic)
+        self.workflow_id = workflow_id or generate_workflow_id(config.topic)
         self.memory = memory or get_memory()
         self.caller = caller or AgentCaller()
+        self.queue = queue or get_job_queue(self.memory.base_path)
+        self.broker = broker
+        self._lease: Optional[LeaseKeeper] = None
 
         # 初始化元件
         self.logger = get_logger(self.workflow_id)
@@ -87,8 +122,14 @@ class Workflow:
         self.stage_results: Dict[str, StageResult] = {}
         self.start_time: Optional[float] = None
 
+        # 執行位置：下一個要執行的階段索引，以及需強制重新執行的階段
+        self._stage_idx: Optional[int] = None
+        self._refresh_stage: Optional[StageID] = None
+        self._cancel_requested = threading.Event()
+
         # 建立工作流目錄
-        self._init_workflow()
+        if workflow_id is None:
+            self._init_workflow()
 
     def _init_workflow(self) -> None:
         """初始化工作流目錄與狀態"""
@@ -99,6 +140,7 @@ class Workflow:
                 "mode": self.config.mode.value,
                 "start_from": self.config.start_from.value if self.config.start_from else None,
                 "skip_stages": [s.value for s in self.config.skip_stages],
+                "priority": self.config.priority,
             },
         )
 
@@ -107,31 +149,74 @@ class Workflow:
 
     def run(self) -> WorkflowResult:
         """
-        執行完整工作流
+        執行完整工作流（持有佇列中 workflow 工作的租約）
 
         Returns:
             WorkflowResult 物件
+
+        Raises:
+            WorkflowError: 工作流正由其他程序執行
         """
+        owner = default_owner()
+        job_id = self.queue.enqueue(
+            "workflow",
+            self.workflow_id,
+            payload={"topic": self.config.topic},
+            priority=self.config.priority,
+        )
+        if self.queue.claim_job(job_id, owner) is None:
+            raise WorkflowError(f"工作流正由其他程序執行: {self.workflow_id}")
+
+        with LeaseKeeper(self.queue, job_id, owner) as lease:
+            self._lease = lease
+            try:
+                result = self._run()
+            except BaseException as e:
+                # 程序中斷：立即放回佇列，可由 recover_workflows 恢復
+                self.queue.fail(job_id, owner, error=str(e) or type(e).__name__)
+                raise
+            finally:
+                self._lease = None
+
+        if result.final_status == WorkflowStatus.COMPLETED:
+            self.queue.complete(job_id, owner, {"quality_score": result.quality_score})
+        elif result.final_status == WorkflowStatus.CANCELLED:
+            self.queue.release(job_id, owner, STATUS_CANCELLED)
+        else:
+            self.queue.fail(job_id, owner, error="; ".join(result.errors), retry=False)
+        return result
+
+    def _run(self) -> WorkflowResult:
+        """執行各階段直到完成、失敗或取消（見 run）"""
+        # 前一次執行結束時已釋放 Logger 與追蹤器（見 finally）
+        self.logger = get_logger(self.workflow_id)
+        self.tracker = get_tracker(self.workflow_id)
         self.start_time = time.time()
         self.status = WorkflowStatus.RUNNING
+        self.tracker.set_status(self.status.value)
         errors: List[str] = []
 
         try:
-            # 決定起始階段
-            start_idx = 0
-            if self.config.start_from:
-                start_idx = STAGE_ORDER.index(self.config.start_from)
+            # 決定起始階段（恢復時由檢查點決定）
+            if self._stage_idx is None:
+                self._stage_idx = 0
+                if self.config.start_from:
+                    self._stage_idx = STAGE_ORDER.index(self.config.start_from)
 
-            # 執行各階段
-            stage_idx = start_idx
-            while stage_idx < len(STAGE_ORDER):
-                stage_id = STAGE_ORDER[stage_idx]
+            # 執行各階段（回退目標階段強制重新執行，其餘階段重用輸入未變的視角）
+            while self._stage_idx < len(STAGE_ORDER):
+                stage_id = STAGE_ORDER[self._stage_idx]
 
                 # 檢查是否跳過
                 if stage_id in self.config.skip_stages:
-                    stage_idx += 1
+                    self._stage_idx += 1
                     continue
 
+                if self._cancel_requested.is_set():
+                    raise WorkflowCancelled(f"工作流已取消（{stage_id.value} 之前）")
+                if self._lease is not None and self._lease.lost:
+                    raise WorkflowError("工作流租約已失效（可能已由其他程序接手）")
+
                 # 執行階段
                 self.current_stage = stage_id
                 self.memory.update_workflow_meta(
@@ -139,7 +224,9 @@ class Workflow:
                     {"current_stage": stage_id.value, "status": "running"},
                 )
 
-                result = self._run_stage(stage_id)
+                result = self._run_stage(stage_id, reuse=stage_id != self._refresh_stage)
+                if stage_id == self._refresh_stage:
+                    self._refresh_stage = None
                 self.stage_results[stage_id.value] = result
 
                 if not result.success:
@@ -147,6 +234,7 @@ class Workflow:
 
                 # 品質閘門檢查
                 gate_result = self._check_quality_gate(stage_id, result)
+                self._save_stage_result(stage_id, result, gate_result.passed)
 
                 if not gate_result.passed:
                     # 觸發回退
@@ -157,6 +245,9 @@ class Workflow:
                     )
 
                     if rollback_decision.require_human:
+                        # 恢復時重新執行此階段（人工處理後輸入可能已改變）
+                        self._refresh_stage = stage_id
+                        self._save_checkpoint()
                         raise HumanInterventionRequired(
                             "需要人工介入",
                             reason=rollback_decision.reason,
@@ -175,8 +266,10 @@ class Workflow:
                         )
 
                         # 回退到指定階段
-                        stage_idx = STAGE_ORDER.index(rollback_decision.to_stage)
+                        self._stage_idx = STAGE_ORDER.index(rollback_decision.to_stage)
+                        self._refresh_stage = rollback_decision.to_stage
                         self.iteration += 1
+                        self._save_checkpoint()
 
                         # 檢查最大迭代次數
                         if self.iteration >= self.config.max_iterations:
@@ -188,7 +281,8 @@ class Workflow:
                         continue
 
                 # 進入下一階段
-                stage_idx += 1
+                self._stage_idx += 1
+                self._save_checkpoint()
 
             # 完成
             self.status = WorkflowStatus.COMPLETED
@@ -223,6 +317,30 @@ class Workflow:
                 errors=errors,
             )
 
+        except WorkflowCancelled as e:
+            self.status = WorkflowStatus.CANCELLED
+            duration = time.time() - self.start_time
+
+            self.memory.update_workflow_meta(
+                self.workflow_id,
+                {"status": "cancelled"},
+            )
+
+            self.logger.workflow_cancelled(
+                stage=self.next_stage.value if self.next_stage else None,
+                iteration=self.iteration,
+            )
+
+            return WorkflowResult(
+                workflow_id=self.workflow_id,
+                success=False,
+                final_status=WorkflowStatus.CANCELLED,
+                stage_results=self.stage_results,
+                total_iterations=self.iteration,
+                duration_seconds=duration,
+                errors=[str(e)],
+            )
+
         except HumanInterventionRequired as e:
             self.status = WorkflowStatus.HUMAN_INTERVENTION
             duration = time.time() - self.start_time
@@ -271,14 +389,168 @@ class Workflow:
                 errors=[str(e)],
             )
 
-    def _run_stage(self, stage_id: StageID) -> StageResult:
-        """執行單一階段"""
+        finally:
+            self.tracker.set_status(self.status.value)
+            self.memory.flush_meta(self.workflow_id)
+            # 釋放檔案控制代碼、寫入執行緒與 meta 快取（常駐服務與批次執行不累積）
+            self.memory.evict_meta(self.workflow_id)
+            release_logger(self.workflow_id)
+            release_tracker(self.workflow_id)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 檢查點
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _save_stage_result(
+        self,
+        stage_id: StageID,
+        result: StageResult,
+        gate_passed: bool,
+    ) -> None:
+        """保存階段結果（stages/<stage>/result.json 與 meta.yaml 階段狀態）"""
+        stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+        if stage_dir:
+            self.memory.write_json(stage_dir / "result.json", result.model_dump(mode="json"))
+
+        self.memory.update_stage_status(
+            self.workflow_id,
+            stage_id.value,
+            "completed" if result.success and gate_passed else "failed",
+            {
+                "quality_score": result.quality_score,
+                "gate_passed": gate_passed,
+                "iteration": self.iteration,
+            },
+        )
+
+    def _save_checkpoint(self) -> None:
+        """保存執行位置、迭代次數與回退歷史到 meta.yaml（階段邊界：立即寫回）"""
+        next_stage = (
+            STAGE_ORDER[self._stage_idx].value
+            if self._stage_idx is not None and self._stage_idx < len(STAGE_ORDER)
+            else None
+        )
+        history = self.rollback_manager.get_history()
+        self.memory.update_workflow_meta(
+            self.workflow_id,
+            {
+                "iteration": self.iteration,
+                "checkpoint": {
+                    "next_stage": next_stage,
+                    "refresh_stage": self._refresh_stage.value if self._refresh_stage else None,
+                    "completed_stages": list(self.stage_results),
+                    "rollback_history": {
+                        "error_history": history["error_history"],
+                        "stage_transitions": [list(t) for t in history["stage_transitions"]],
+                    },
+                    "saved_at": datetime.now().isoformat(),
+                },
+            },
+        )
+        self.memory.flush_meta(self.workflow_id)
+
+    @classmethod
+    def load(
+        cls,
+        workflow_id: str,
+        memory: Optional[MemoryManager] = None,
+        caller: Optional[AgentCaller] = None,
+        queue: Optional[JobQueue] = None,
+        broker: Optional[QueueBroker] = None,
+    ) -> "Workflow":
+        """
+        由檢查點恢復工作流（不重建目錄，沿用相同 workflow ID）
+
+        Args:
+            workflow_id: 工作流 ID
+            memory: Memory 管理器
+            caller: Agent 調用器
+            queue: 工作佇列
+            broker: 視角分派器
+
+        Raises:
+            WorkflowError: 工作流不存在
+        """
+        memory = memory or get_memory()
+        workflow_dir = memory.get_workflow_dir(workflow_id)
+        meta = memory.get_workflow_meta(workflow_id) if workflow_dir else None
+        if not meta:
+            raise WorkflowError(f"找不到工作流: {workflow_id}")
+
+        saved = meta.get("config") or {}
+        config = WorkflowConfig(
+            topic=meta.get("topic", ""),
+            mode=WorkflowMode(saved.get("mode") or WorkflowMode.NORMAL.value),
+            start_from=StageID(saved["start_from"]) if saved.get("start_from") else None,
+            skip_stages=[StageID(s) for s in saved.get("skip_stages") or []],
+            priority=saved.get("priority", 1),
+        )
+
+        workflow = cls(
+            config, memory=memory, caller=caller, workflow_id=workflow_id, queue=queue,
+            broker=broker,
+        )
+        workflow._restore(meta)
+        return workflow
+
+    def _restore(self, meta: Dict[str, Any]) -> None:
+        """恢復階段結果、迭代次數、回退歷史與執行位置"""
+        checkpoint = meta.get("checkpoint") or {}
+        self.iteration = meta.get("iteration", 0)
+        self.status = WorkflowStatus(meta.get("status", WorkflowStatus.INITIALIZED.value))
+
+        # 階段結果（依階段目錄中的 result.json）
+        for stage_id in STAGE_ORDER:
+            stage_dir = self.memory.get_stage_dir(self.workflow_id, stage_id.value)
+            data = self.memory.read_json(stage_dir / "result.json") if stage_dir else None
+            if data:
+                self.stage_results[stage_id.value] = StageResult.model_validate(data)
+
+        # 回退歷史
+        history = checkpoint.get("rollback_history") or {}
+        for stage, keys in (history.get("error_history") or {}).items():
+            self.rollback_manager.error_history[stage].extend(keys)
+        self.rollback_manager.stage_transitions.extend(
+            (StageID(f), StageID(t)) for f, t in history.get("stage_transitions") or []
+        )
+
+        # 執行位置：檢查點 → meta.yaml 的目前階段 → current.json 的階段
+        if "next_stage" in checkpoint:
+            next_stage = checkpoint["next_stage"]
+        else:
+            state_stage = (read_current_state(self.workflow_id).get("stage") or {}).get("id")
+            next_stage = meta.get("current_stage") or state_stage
+        if next_stage:
+            self._stage_idx = STAGE_ORDER.index(StageID(next_stage))
+        elif "next_stage" in checkpoint:
+            self._stage_idx = len(STAGE_ORDER)
+        if checkpoint.get("refresh_stage"):
+            self._refresh_stage = StageID(checkpoint["refresh_stage"])
+
+    @property
+    def next_stage(self) -> Optional[StageID]:
+        """下一個要執行的階段（None 表示已全部完成或尚未開始）"""
+        if self._stage_idx is None or self._stage_idx >= len(STAGE_ORDER):
+            return None
+        return STAGE_ORDER[self._stage_idx]
+
+    def _run_stage(self, stage_id: StageID, reuse: bool = True) -> StageResult:
+        """
+        執行單一階段
+
+        Args:
+            stage_id: 階段 ID
+            reuse: 是否重用指紋相符的先前視角結果
+        """
         runner = StageRunner(
             workflow_id=self.workflow_id,
             memory=self.memory,
             logger=self.logger,
             tracker=self.tracker,
             caller=self.caller,
+            queue=self.queue,
+            priority=self.config.priority,
+            broker=self.broker,
         )
 
         # 構建上下文
@@ -286,7 +558,7 @@ class Workflow:
 
         # 執行
         quick_mode = self.config.mode == WorkflowMode.QUICK
-        return runner.run(stage_id, context, quick_mode)
+        return runner.run(stage_id, context, quick_mode, reuse=reuse)
 
     def _build_stage_context(self, stage_id: StageID) -> Dict[str, Any]:
         """構建階段執行上下文"""
@@ -352,21 +624,35 @@ class Workflow:
 
         return sum(scores) / len(scores)
 
+    def cancel(self) -> None:
+        """要求取消（可跨執行緒呼叫；於下一個階段邊界生效）"""
+        self._cancel_requested.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        """是否已要求取消"""
+        return self._cancel_requested.is_set()
+
     def resume(self, from_stage: Optional[StageID] = None) -> WorkflowResult:
         """
-        恢復中斷的工作流
+        恢復中斷的工作流（沿用相同 workflow ID 與已完成的階段結果）
 
         Args:
-            from_stage: 從指定階段恢復（預設從中斷處繼續）
+            from_stage: 從指定階段恢復並強制重新執行該階段（預設從檢查點繼續）
 
         Returns:
             WorkflowResult 物件
         """
-        # 更新配置
+        self._cancel_requested.clear()
         if from_stage:
-            self.config.start_from = from_stage
+            self._stage_idx = STAGE_ORDER.index(from_stage)
+            self._refresh_stage = from_stage
 
-        # 重新執行
+        self.logger.workflow_resume(
+            next_stage=self.next_stage.value if self.next_stage else None,
+            iteration=self.iteration,
+            restored_stages=list(self.stage_results),
+        )
         return self.run()
 
 
@@ -375,6 +661,7 @@ def create_workflow(
     mode: str = "normal",
     start_from: Optional[str] = None,
     skip_stages: Optional[List[str]] = None,
+    broker: Optional[QueueBroker] = None,
 ) -> Workflow:
     """
     建立工作流
@@ -384,6 +671,7 @@ def create_workflow(
         mode: 執行模式 (quick/normal/deep)
         start_from: 從指定階段開始
         skip_stages: 跳過的階段列表
+        broker: 視角分派器（None 表示視角 Agent 在本機執行）
 
     Returns:
         Workflow 實例
@@ -407,4 +695,61 @@ def create_workflow(
         skip_stages=skip,
     )
 
-    return Workflow(config)
+    return Workflow(config, broker=broker)
+
+
+def load_workflow(workflow_id: str, broker: Optional[QueueBroker] = None) -> Workflow:
+    """
+    載入既有工作流以恢復執行
+
+    Args:
+        workflow_id: 工作流 ID
+        broker: 視角分派器
+
+    Returns:
+        Workflow 實例
+
+    Raises:
+        WorkflowError: 工作流不存在
+    """
+    return Workflow.load(workflow_id, broker=broker)
+
+
+def recover_workflows(
+    memory: Optional[MemoryManager] = None,
+    caller: Optional[AgentCaller] = None,
+    queue: Optional[JobQueue] = None,
+    limit: Optional[int] = None,
+) -> List[WorkflowResult]:
+    """
+    恢復被中斷的工作流
+
+    回收過期租約後，依佇列順序（優先級、提交者公平性）取出 workflow 工作，
+    由檢查點恢復執行。
+
+    Args:
+        memory: Memory 管理器
+        caller: Agent 調用器
+        queue: 工作佇列
+        limit: 最多恢復的工作流數
+
+    Returns:
+        各工作流的執行結果
+    """
+    memory = memory or get_memory()
+    queue = queue or get_job_queue(memory.base_path)
+    owner = default_owner()
+    results: List[WorkflowResult] = []
+
+    queue.requeue_expired()
+    while limit is None or len(results) < limit:
+        job = queue.claim(owner, kinds=["workflow"])
+        if job is None:
+            break
+        try:
+            workflow = Workflow.load(job.workflow_id, memory=memory, caller=caller, queue=queue)
+        except WorkflowError as e:
+            queue.fail(job.id, owner, error=str(e), retry=False)
+            continue
+        results.append(workflow.resume())
+    return results
@@ -16,6 +16,7 @@ from ..config.models import PerspectiveConfig, StageID
 
 # 導入各階段模組
 from . import research, plan, tasks, implement, review, verify
+from .implement import get_task_prompt
 
 
 # 視角 Prompt 映射
@@ -115,4 +116,5 @@ def get_synthesis_prompt(
 __all__ = [
     "get_perspective_prompt",
     "get_synthesis_prompt",
+    "get_task_prompt",
 ]
@@ -8,6 +8,10 @@ from ..config.models import PerspectiveConfig, StageID
 from ..config.perspectives import get_perspective
 
 
+# build_system_context 中隨工作流 / 迭代變動的行（回應快取 key 排除）
+VOLATILE_CONTEXT_LABELS = ("**Workflow ID**:", "**Iteration**:")
+
+
 def build_system_context(context: Dict[str, Any]) -> str:
     """構建系統上下文"""
     parts = []
@@ -32,6 +36,13 @@ def build_system_context(context: Dict[str, Any]) -> str:
     return "\n".join(parts)
 
 
+def strip_volatile_context(prompt: str) -> str:
+    """移除 prompt 中的工作流 ID 與迭代次數行（VOLATILE_CONTEXT_LABELS）"""
+    return "\n".join(
+        line for line in prompt.split("\n") if not line.startswith(VOLATILE_CONTEXT_LABELS)
+    )
+
+
 def build_perspective_header(perspective: PerspectiveConfig) -> str:
     """構建視角標頭"""
     parts = []
@@ -2,7 +2,7 @@
 IMPLEMENT 階段 Prompt 模板
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from ..config.models import PerspectiveConfig
 from .base import (
@@ -54,6 +54,88 @@ As a **{perspective.name}**, guide the implementation from your perspective.
     return "\n".join(parts)
 
 
+TASK_RESULT_SCHEMA_DESC = """
+```json
+{
+  "task_id": "string - the task ID",
+  "status": "planned | blocked",
+  "summary": "string - the implementation approach for this task",
+  "file_changes": [
+    {"path": "string - file path", "change": "string - what to change and why"}
+  ],
+  "test_plan": ["string - test to add or update, and what it asserts"],
+  "notes": "string - anything dependents should know (interfaces, decisions)"
+}
+```
+"""
+
+
+def get_task_prompt(
+    task: Dict[str, Any],
+    context: Dict[str, Any],
+    dependency_results: Optional[Dict[str, Dict]] = None,
+) -> str:
+    """
+    生成單一 DAG 任務的實作計畫 Prompt
+
+    Agent 只能讀取（見 agent_caller.ALLOWED_TOOLS），回報具體的修改計畫，
+    不回報已修改的檔案。
+
+    Args:
+        task: tasks.yaml 中的任務
+        context: 執行上下文
+        dependency_results: 依賴任務的回報內容（以任務 ID 為 key）
+    """
+    topic = context.get("topic", "")
+
+    parts = []
+
+    parts.append(build_system_context(context))
+    parts.append(build_previous_outputs(context))
+
+    parts.append(f"""
+## Task {task.get("id", "")}: {task.get("title", "")}
+
+Plan the implementation of this task, part of:
+
+**{topic}**
+
+{task.get("description", "")}
+""")
+
+    if criteria := task.get("acceptance_criteria"):
+        parts.append("### Acceptance Criteria\n")
+        parts.append("\n".join(f"- {c}" for c in criteria))
+        parts.append("")
+
+    if files := task.get("files"):
+        parts.append("### Files\n")
+        parts.append("\n".join(f"- {f}" for f in files))
+        parts.append("")
+
+    if dependency_results:
+        parts.append("### Planned Dependencies\n")
+        for dep_id, content in dependency_results.items():
+            parts.append(f"- **{dep_id}**: {content.get('summary', '')}")
+            if notes := content.get("notes"):
+                parts.append(f"  - Notes: {notes}")
+        parts.append("")
+
+    parts.append("""
+### Guidelines
+
+1. **Read Only**: You can read the codebase but cannot modify files; describe each change
+   concretely (file, function, behavior) so it can be applied without further analysis
+2. **Scope**: Only plan this task; the plans of its dependencies are listed above
+3. **TDD First**: List the tests to write before the implementation
+4. **Blocked**: If the task cannot be planned, report status "blocked" and explain why
+""")
+
+    parts.append(build_json_output_format(TASK_RESULT_SCHEMA_DESC))
+
+    return "\n".join(parts)
+
+
 def get_implement_synthesis_prompt(
     perspective_contents: Dict[str, Dict],
     context: Dict[str, Any],
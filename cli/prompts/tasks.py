@@ -39,6 +39,37 @@ TASKS_OUTPUT_SCHEMA = """
 """
 
 
+# 綜合報告：一般綜合欄位 + 統一的任務清單（寫入 tasks.yaml 供 IMPLEMENT 依 DAG 執行）
+TASKS_DAG_SCHEMA_DESC = """
+```json
+{
+  "stage_id": "TASKS",
+  "consensus": {"score": "number - 0-1", "points": ["string"]},
+  "key_insights": [...],
+  "conflicts": [...],
+  "action_items": [...],
+  "metadata": {
+    "total_tasks": "number",
+    "total_waves": "number"
+  },
+  "tasks": [
+    {
+      "id": "string - e.g., T-F-01, TEST-01",
+      "title": "string",
+      "description": "string",
+      "type": "feature | test | setup | config | docs",
+      "wave": "number - execution wave",
+      "depends_on": ["string - task IDs"],
+      "estimate_minutes": "number",
+      "acceptance_criteria": ["string"],
+      "test_id": "string - corresponding test ID for TDD"
+    }
+  ]
+}
+```
+"""
+
+
 def get_tasks_perspective_prompt(
     perspective: PerspectiveConfig,
     context: Dict[str, Any],
@@ -110,6 +141,10 @@ Synthesize task suggestions into a valid task DAG for:
         name = content.get("perspective_name", pid)
         tasks = content.get("task_suggestions", [])
         parts.append(f"- **{name}**: {len(tasks)} tasks suggested")
+        for task in tasks:
+            deps = ", ".join(task.get("depends_on", []) or [])
+            suffix = f" (depends on: {deps})" if deps else ""
+            parts.append(f"  - {task.get('id', '')}: {task.get('title', '')}{suffix}")
 
     parts.append("""
 ## DAG Requirements
@@ -119,26 +154,8 @@ Synthesize task suggestions into a valid task DAG for:
 3. **Wave Assignment**: Group independent tasks into parallel waves
 4. **Complete Coverage**: All features from the plan must be covered
 5. **Clear Dependencies**: Every dependency must point to an existing task
-
-## Output Format
-
-Return a unified task list in YAML format:
-
-```yaml
-metadata:
-  total_tasks: number
-  total_waves: number
-
-tasks:
-  - id: "T-F-01"
-    title: "Task title"
-    type: "feature"
-    wave: 1
-    depends_on: []
-    acceptance_criteria:
-      - "Criterion 1"
-    test_id: "TEST-01"
-```
 """)
 
+    parts.append(build_json_output_format(TASKS_DAG_SCHEMA_DESC))
+
     return "\n".join(parts)
@@ -5,19 +5,29 @@ Validators 模組 - 驗證器
 - perspective.py: 視角報告驗證
 - quality_gate.py: 品質閘門
 - dag.py: DAG 驗證
+- schema.py: Schema 驗證
 """
 
-from .dag import DAGValidator, DAGValidationResult, validate_dag, is_dag_valid
+from .dag import (
+    DAGValidator,
+    DAGValidationResult,
+    get_dependencies,
+    validate_dag,
+    is_dag_valid,
+)
 from .perspective import PerspectiveValidator, validate_perspective_report
 from .quality_gate import QualityGate, check_quality_gate
+from .schema import validate_schema
 
 __all__ = [
     "DAGValidator",
     "DAGValidationResult",
+    "get_dependencies",
     "validate_dag",
     "is_dag_valid",
     "PerspectiveValidator",
     "validate_perspective_report",
     "QualityGate",
     "check_quality_gate",
+    "validate_schema",
 ]
@@ -12,6 +12,14 @@ from collections import defaultdict
 from typing import Dict, List, Optional, Set, Tuple
 
 
+def get_dependencies(task: Dict) -> List[str]:
+    """取得任務的依賴列表（depends_on 或 blockedBy）"""
+    deps = task.get("depends_on", []) or task.get("blockedBy", []) or []
+    if isinstance(deps, str):
+        deps = [deps]
+    return deps
+
+
 class DAGValidationResult:
     """DAG 驗證結果"""
 
@@ -83,10 +91,7 @@ class DAGValidator:
 
     def _get_dependencies(self, task: Dict) -> List[str]:
         """取得任務的依賴列表"""
-        deps = task.get("depends_on", []) or task.get("blockedBy", []) or []
-        if isinstance(deps, str):
-            deps = [deps]
-        return deps
+        return get_dependencies(task)
 
     def _check_missing_dependencies(
         self,
@@ -62,6 +62,7 @@ class QualityGate:
         # 執行階段特定的檢查
         checker = self._get_stage_checker(stage_id)
         criteria, details = checker(result, extra_data or {})
+        self._check_partial(result, criteria, details)
 
         # 計算總分
         score = result.quality_score or 0.0
@@ -85,6 +86,24 @@ class QualityGate:
             details=details,
         )
 
+    def _check_partial(
+        self,
+        result: StageResult,
+        criteria: Dict[str, bool],
+        details: Dict,
+    ) -> None:
+        """提前完成的階段：要求成功視角數達到 quorum"""
+        if result.quorum is not None:
+            criteria["quorum_met"] = result.perspectives_succeeded >= result.quorum
+
+        if result.early_completion:
+            details["early_completion"] = result.early_completion
+            details["perspectives"] = {
+                "total": result.perspectives_total,
+                "succeeded": result.perspectives_succeeded,
+                "cancelled": len(result.perspectives_cancelled),
+            }
+
     def _get_stage_checker(self, stage_id: StageID):
         """取得階段特定的檢查器"""
         checkers = {
@@ -292,6 +311,18 @@ class QualityGate:
             "task_completion": impl_data.get("task_completion", 0) if impl_data else 0,
             "test_pass_rate": impl_data.get("test_pass_rate", 0) if impl_data else 0,
         }
+        # 依任務 DAG 執行時，以完成計畫的任務比例計算完成率
+        if result.tasks_total and not impl_data:
+            completion = result.tasks_completed / result.tasks_total
+            criteria["task_completion"] = completion >= 0.9
+            details["task_completion"] = completion
+        if result.tasks_total:
+            details["tasks"] = {
+                "total": result.tasks_total,
+                "completed": result.tasks_completed,
+                "failed": result.tasks_failed,
+                "skipped": result.tasks_skipped,
+            }
 
         return criteria, details
 
@@ -0,0 +1,70 @@
+"""
+Schema 驗證器 - 依 config/schema.py 的定義驗證 JSON 內容
+
+只支援本專案 Schema 用到的子集：
+- type（object / array / string / number / integer / boolean）
+- required / properties / items
+- enum / minimum / maximum
+"""
+
+from typing import Any, Dict, List
+
+
+# JSON Schema 型別對應
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+
+
+def validate_schema(
+    data: Any,
+    schema: Dict[str, Any],
+    path: str = "$",
+) -> List[str]:
+    """
+    依 Schema 驗證資料
+
+    Args:
+        data: 要驗證的資料
+        schema: Schema 定義
+        path: 目前位置（用於錯誤訊息）
+
+    Returns:
+        錯誤列表（空列表表示通過）
+    """
+    errors: List[str] = []
+
+    expected = schema.get("type")
+    if expected in _TYPES:
+        # bool 是 int 的子類別，數值欄位不接受 bool
+        is_bool = isinstance(data, bool) and expected != "boolean"
+        if is_bool or not isinstance(data, _TYPES[expected]):
+            return [f"{path} 類型錯誤: 應為 {expected}"]
+
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path} 值無效: {data}")
+
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        if "minimum" in schema and data < schema["minimum"]:
+            errors.append(f"{path} 小於最小值 {schema['minimum']}")
+        if "maximum" in schema and data > schema["maximum"]:
+            errors.append(f"{path} 大於最大值 {schema['maximum']}")
+
+    if isinstance(data, dict):
+        for field in schema.get("required", []):
+            if field not in data:
+                errors.append(f"{path} 缺少必要欄位: {field}")
+        for field, sub_schema in schema.get("properties", {}).items():
+            if field in data:
+                errors.extend(validate_schema(data[field], sub_schema, f"{path}.{field}"))
+
+    if isinstance(data, list) and "items" in schema:
+        for i, item in enumerate(data):
+            errors.extend(validate_schema(item, schema["items"], f"{path}[{i}]"))
+
+    return errors
@@ -5,6 +5,9 @@ Action Logger - 記錄工具調用到 actions.jsonl
 用法:
   python log-action.py --tool Read --status success --input '{"file_path": "/path"}' --output-size 1024
   python log-action.py --tool Bash --status failed --error "Command failed" --exit-code 1
+
+actions.jsonl 超過 --rotate-bytes 時輪替為編號分段（cli/io/log_segments.py）；
+分段在分離的子程序中壓縮，hook 不等待壓縮完成
 """
 
 import argparse
@@ -12,9 +15,21 @@ import json
 import os
 import random
 import string
+import subprocess
+import sys
 from datetime import datetime
 from pathlib import Path
 
+# 日誌分段（只依賴標準函式庫；無法匯入時不輪替）
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+try:
+    from cli.io import log_segments
+except ImportError:
+    log_segments = None
+
+DEFAULT_ROTATE_BYTES = log_segments.DEFAULT_ROTATE_BYTES if log_segments else 0
+
 
 def generate_id() -> str:
     """生成唯一 ID"""
@@ -35,6 +50,32 @@ def get_workflow_state(project_dir: str) -> dict:
     return {}
 
 
+def compress_in_background(log_file: Path) -> None:
+    """
+    在分離的子程序中壓縮已關閉的分段
+
+    壓縮大型分段需要數秒，不在 hook 內同步執行；子程序啟動期間，
+    輪替前開啟檔案的其他 hook 也已完成追加，壓縮時不會遺漏記錄。
+    子程序失敗時分段維持未壓縮（仍可讀取），下次輪替時再補壓縮。
+    """
+    try:
+        subprocess.Popen(
+            [
+                sys.executable, "-c",
+                "import sys; from cli.io import log_segments; "
+                "log_segments.compress_pending(sys.argv[1])",
+                str(log_file),
+            ],
+            cwd=str(REPO_ROOT),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
 def log_action(
     tool: str,
     status: str,
@@ -49,6 +90,7 @@ def log_action(
     workflow_id: str = None,
     agent_id: str = None,
     stage: str = None,
+    rotate_bytes: int = DEFAULT_ROTATE_BYTES,
 ):
     """記錄一個 action"""
     project_dir = project_dir or os.getcwd()
@@ -101,6 +143,11 @@ def log_action(
     with open(log_file, "a") as f:
         f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
+    # 超過大小時輪替（多個 hook 同時輪替時只有一個成功），壓縮延後到背景
+    if log_segments and log_segments.should_rotate(log_file, rotate_bytes):
+        if log_segments.rotate(log_file, reason="size", compress=False) is not None:
+            compress_in_background(log_file)
+
     return record
 
 
@@ -119,6 +166,10 @@ def main():
     parser.add_argument("--workflow-id", help="Workflow ID")
     parser.add_argument("--agent-id", help="Agent ID")
     parser.add_argument("--stage", help="Stage name")
+    parser.add_argument(
+        "--rotate-bytes", type=int, default=DEFAULT_ROTATE_BYTES,
+        help="Rotate actions.jsonl beyond this size (0 disables)",
+    )
 
     args = parser.parse_args()
 
@@ -143,6 +194,7 @@ def main():
         workflow_id=args.workflow_id,
         agent_id=args.agent_id,
         stage=args.stage,
+        rotate_bytes=args.rotate_bytes,
     )
 
     print(json.dumps(record, indent=2))
@@ -4,6 +4,7 @@ Action Log Viewer - 行動級日誌查詢工具
 
 用途：
   查詢和分析 .claude/workflow/{workflow-id}/logs/actions.jsonl
+  （包含輪替後的壓縮分段 actions.NNNNNN.jsonl.gz，依序串流讀取）
 
 範例：
   # 查看所有失敗的行動
@@ -21,8 +22,11 @@ Action Log Viewer - 行動級日誌查詢工具
   # 組合條件
   ./action-log-viewer.py --stage IMPLEMENT --failed --tool Edit
 
-  # 輸出統計資訊
+  # 輸出統計資訊（含各工具執行時間百分位數；--bucket 60 另列每小時直方圖）
   ./action-log-viewer.py --stats
+
+統計模式經由欄位式分析儲存（cli/io/action_store.py，.claude/workflow/.analytics/）：
+每次只匯入新追加的記錄，彙整直接在欄位陣列上計算
 """
 
 import argparse
@@ -32,6 +36,42 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Iterator
 
+# 日誌分段與分析儲存（只依賴標準函式庫；無法匯入時只讀取 actions.jsonl 並逐行統計）
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+try:
+    from cli.io import log_segments
+    from cli.io.action_store import ActionStore
+except ImportError:
+    log_segments = None
+    ActionStore = None
+
+
+def analytics_root() -> Path:
+    """分析儲存目錄（專案內有工作流目錄時放在專案內）"""
+    base = Path(".claude/workflow")
+    if not base.exists():
+        base = Path.home() / ".claude/workflow"
+    return base / ".analytics"
+
+
+def store_stats(log_files: list[Path], args: Any, since: datetime | None) -> dict[str, Any]:
+    """以分析儲存計算統計（--file 時只在記憶體中匯入指定檔案）"""
+    store = ActionStore(None if args.file else analytics_root())
+    store.ingest_many(log_files)
+    rows = store.select(
+        failed=args.failed,
+        agent=args.agent,
+        tool=args.tool,
+        stage=args.stage,
+        workflow=args.workflow,
+        since=since.timestamp() if since else None,
+        min_duration_ms=args.slow,
+    )
+    stats = store.summary(rows)
+    if args.bucket and stats["total"]:
+        stats["histogram"] = store.histogram(args.bucket * 60, rows, by="status")
+    return stats
+
 
 def find_action_logs() -> list[Path]:
     """尋找所有 actions.jsonl 檔案"""
@@ -49,19 +89,26 @@ def find_action_logs() -> list[Path]:
 
 
 def read_jsonl(path: Path) -> Iterator[dict]:
-    """讀取 JSONL 檔案"""
+    """依序串流讀取 JSONL 檔案的所有分段"""
     if not path.exists():
         return
 
-    with open(path, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError as e:
-                print(f"警告: {path}:{line_num} JSON 解析錯誤: {e}", file=sys.stderr)
+    segments = log_segments.segment_paths(path) if log_segments else [path]
+    opener = log_segments.open_segment if log_segments else lambda p: open(p, "rb")
+    for segment in segments:
+        try:
+            f = opener(segment)
+        except FileNotFoundError:
+            continue
+        with f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    print(f"警告: {segment}:{line_num} JSON 解析錯誤: {e}", file=sys.stderr)
 
 
 def filter_actions(
@@ -271,6 +318,25 @@ def print_stats(stats: dict[str, Any]) -> None:
                 f"  {stage:12}: {data['count']:>4} 次, 失敗 {data['failed']:>2} ({fail_rate:>5.1f}%)"
             )
 
+    # 百分位數
+    if stats.get("percentiles_by_tool"):
+        print("\n--- 工具執行時間百分位數 ---")
+        for tool, data in sorted(
+            stats["percentiles_by_tool"].items(), key=lambda x: x[1]["count"], reverse=True
+        ):
+            if not data["count"]:
+                continue
+            print(
+                f"  {tool:12}: p50 {data['p50']:>8.0f}ms, p90 {data['p90']:>8.0f}ms, p99 {data['p99']:>8.0f}ms"
+            )
+
+    # 時間分佈
+    if stats.get("histogram"):
+        print("\n--- 時間分佈 ---")
+        for bucket, counts in stats["histogram"].items():
+            detail = ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+            print(f"  {bucket[:16]}: {sum(counts.values()):>5} ({detail})")
+
     # 最慢行動
     print("\n--- 最慢的 10 個行動 ---")
     for i, item in enumerate(stats.get("top_10_slowest", []), 1):
@@ -322,6 +388,9 @@ def main():
     # 輸出選項
     parser.add_argument("-v", "--verbose", action="store_true", help="顯示詳細資訊")
     parser.add_argument("--stats", action="store_true", help="顯示統計資訊")
+    parser.add_argument(
+        "--bucket", type=float, metavar="MINUTES", help="統計模式另列時間分佈（每 N 分鐘一桶）"
+    )
     parser.add_argument("--json", action="store_true", help="以 JSON 格式輸出")
     parser.add_argument(
         "--limit", type=int, default=100, help="限制輸出行數 (預設: 100)"
@@ -353,6 +422,15 @@ def main():
             print(f"錯誤: --since 參數必須是數字 (小時)", file=sys.stderr)
             sys.exit(1)
 
+    # 統計模式（分析儲存）
+    if args.stats and ActionStore is not None:
+        stats = store_stats(log_files, args, since_dt)
+        if args.json:
+            print(json.dumps(stats, indent=2, ensure_ascii=False))
+        else:
+            print_stats(stats)
+        return
+
     # 讀取所有日誌
     all_actions = []
     for log_file in log_files:
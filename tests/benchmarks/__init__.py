@@ -0,0 +1 @@
+"""Benchmarks (run manually, not collected by pytest)."""
@@ -0,0 +1,109 @@
+"""
+JSON 擷取基準測試：舊 regex 串接 vs 線性掃描
+
+執行：python -m tests.benchmarks.bench_json_extract
+
+參考結果（best of 3，ms）：
+
+    case                old      new
+    report 1MB          1.9      1.0
+    report 4MB          3.7      2.9
+    braces+fence 1MB    1.7      0.7
+    braces bare 1MB     7.4    130.5   舊版回傳 None
+    unclosed { 20KB   737.7      5.3
+    unclosed { 80KB  9922.1     23.1
+
+- 有 fence 的輸出：兩者都只掃描 fence；早先 4MB 較慢是因為 str.find("```")
+  在單一反引號密集的敘述中退化，改用 regex 字面搜尋後已不再落後
+- 無 fence 且大括號密集：舊版的貪婪 regex 只取第一個 { 到最後一個 }，
+  解碼失敗後放棄，因此快但擷取不到結果；新版逐一追蹤結構字元，
+  成本與大括號/引號數量成正比（約 1µs/個），換取正確結果
+- 未閉合的 {：舊版為二次方時間，新版維持線性
+"""
+
+import json
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+from cli.orchestrator.json_extract import extract_json
+
+
+_OLD_PATTERNS = [
+    r"```json\s*([\s\S]*?)\s*```",
+    r"```\s*([\s\S]*?)\s*```",
+    r"\{[\s\S]*\}",
+]
+
+
+def old_extract(output: str) -> Optional[Dict[str, Any]]:
+    """原本 AgentCaller._parse_json_response 的 regex 串接"""
+    for pattern in _OLD_PATTERNS:
+        matches = re.findall(pattern, output, re.MULTILINE)
+        if matches:
+            try:
+                return json.loads(matches[-1])
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+_PAYLOAD = {
+    "perspective_id": "architecture",
+    "findings": [{"id": i, "text": "finding " * 8} for i in range(200)],
+}
+
+
+def make_report(size: int) -> str:
+    """約 size bytes 的典型 Agent 輸出：大量敘述 + 結尾 ```json 區塊"""
+    tail = "```json\n" + json.dumps(_PAYLOAD, indent=2) + "\n```\n"
+    prose = "Analysis of module {name}: consider `dict` usage.\n"
+    body = prose * max(1, (size - len(tail)) // len(prose))
+    return body + tail
+
+
+def make_brace_heavy(size: int, fenced: bool) -> str:
+    """約 size bytes、敘述中夾帶大量行內 JSON / 樣板大括號的輸出，結尾為最終物件"""
+    payload = json.dumps(_PAYLOAD, indent=2) + "\n"
+    tail = "```json\n" + payload + "```\n" if fenced else payload
+    prose = 'Set `{"retries": 3, "backoff": {"base": 0.5}}` in {name}, use {a, b} or "{x}".\n'
+    body = prose * max(1, (size - len(tail)) // len(prose))
+    return body + tail
+
+
+def make_pathological(size: int) -> str:
+    """大量未閉合的 {，舊的貪婪 regex 為二次方時間"""
+    return "{ " * (size // 2)
+
+
+def bench(fn: Callable[[str], Any], text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    cases = [
+        ("report 1MB", make_report(1_000_000)),
+        ("report 4MB", make_report(4_000_000)),
+        ("braces+fence 1MB", make_brace_heavy(1_000_000, fenced=True)),
+        ("braces bare 1MB", make_brace_heavy(1_000_000, fenced=False)),
+        ("unclosed { 20KB", make_pathological(20_000)),
+        ("unclosed { 80KB", make_pathological(80_000)),
+    ]
+
+    print(f"{'case':<18} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8}  note")
+    for name, text in cases:
+        new_result = extract_json(text)
+        assert new_result is not None or "unclosed" in name
+        note = "" if old_extract(text) == new_result else "old 擷取失敗"
+        old = bench(old_extract, text) * 1000
+        new = bench(extract_json, text) * 1000
+        print(f"{name:<18} {old:>10.1f} {new:>10.1f} {old / new:>7.1f}x  {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ Hook 追蹤測試 - 驗證 Pre/Post Task Hook 正常運作
 
 import json
 import sys
+import time
 from io import StringIO
 from pathlib import Path
 from typing import Any, Dict, List
@@ -388,3 +389,38 @@ class TestLogActionFunction:
         assert "error" not in filtered
         assert "tool" in filtered
         assert "status" in filtered
+
+    def test_log_action_rotation_defers_compression(self, hooks_dir: Path, tmp_path: Path):
+        """
+        驗證輪替時 hook 不同步壓縮，分段在背景壓縮後記錄完整
+        """
+        from cli.io import log_segments
+
+        sys.path.insert(0, str(hooks_dir))
+        try:
+            from log_action import log_action
+
+            for i in range(3):
+                log_action(
+                    tool="Read", status="success", project_dir=str(tmp_path),
+                    workflow_id="wf-rotate", input_data={"i": i}, rotate_bytes=1,
+                )
+        finally:
+            sys.path.remove(str(hooks_dir))
+
+        log_file = tmp_path / ".claude" / "workflow" / "wf-rotate" / "logs" / "actions.jsonl"
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            segments = [p for _, p in log_segments.closed_segments(log_file)]
+            if len(segments) == 3 and not any(p.name.endswith(".jsonl") for p in segments):
+                break
+            time.sleep(0.05)
+
+        assert len(segments) == 3
+        assert not any(p.name.endswith(".jsonl") for p in segments), "分段應在背景壓縮"
+        records = [
+            json.loads(line)
+            for segment in log_segments.segment_paths(log_file)
+            for _, line in log_segments.iter_segment_lines(segment)
+        ]
+        assert [r["input"]["i"] for r in records] == [0, 1, 2]
@@ -0,0 +1 @@
+"""I/O layer tests."""
@@ -0,0 +1,170 @@
+"""Action 分析儲存（欄位式匯入與彙整）測試"""
+
+import json
+
+import pytest
+
+from cli.io import log_segments
+from cli.io.action_store import ActionStore, find_action_logs, normalize_record, percentile
+
+
+def append(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def hook_record(n, tool="Edit", status="success", duration_ms=100, minute=0, **fields):
+    return {
+        "timestamp": f"2026-01-01T10:{minute:02d}:{n % 60:02d}",
+        "workflow_id": "wf-1",
+        "stage": "implement",
+        "agent_id": "implementer",
+        "tool": tool,
+        "status": status,
+        "duration_ms": duration_ms,
+        **fields,
+    }
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "logs" / "actions.jsonl"
+    path.parent.mkdir()
+    return path
+
+
+class TestIngest:
+    """增量匯入與保存"""
+
+    def test_incremental_and_persisted(self, log, tmp_path):
+        root = tmp_path / "analytics"
+        append(log, [hook_record(n) for n in range(3)])
+
+        store = ActionStore(root)
+        assert store.ingest_many([log]) == 3
+        assert store.ingest_many([log]) == 0
+
+        append(log, [hook_record(n, tool="Bash") for n in range(3, 5)])
+        with open(log, "a", encoding="utf-8") as f:
+            f.write('{"tool": "Ba')  # 未完成的行留待下次匯入
+        assert store.ingest_many([log]) == 2
+
+        reloaded = ActionStore(root)
+        assert len(reloaded) == 5
+        assert reloaded.count_by("tool") == {"Edit": 3, "Bash": 2}
+
+    def test_rotation_not_double_counted(self, log, tmp_path):
+        store = ActionStore(tmp_path / "analytics")
+        append(log, [hook_record(n) for n in range(4)])
+        assert store.ingest_many([log]) == 4
+
+        append(log, [hook_record(n) for n in range(4, 6)])
+        log_segments.rotate(log)
+        append(log, [hook_record(n) for n in range(6, 7)])
+        assert store.ingest_many([log]) == 3
+        assert len(ActionStore(tmp_path / "analytics")) == 7
+
+    def test_reloaded_store_keeps_filtering(self, log, tmp_path):
+        root = tmp_path / "analytics"
+        append(log, [hook_record(n, tool="Bash", status="failed") for n in range(2)])
+        append(log, [hook_record(n) for n in range(2, 5)])
+        ActionStore(root).ingest_many([log])
+
+        reloaded = ActionStore(root)
+        append(log, [hook_record(n, tool="Bash") for n in range(5, 7)])
+        assert reloaded.ingest_many([log]) == 2
+        assert reloaded.select(tool="Bash") == [0, 1, 5, 6]
+        assert reloaded.select(tool="Bash", failed=True) == [0, 1]
+        assert reloaded.failure_rates("tool")["Bash"]["failed"] == 2
+        assert reloaded.count_by("tool") == {"Bash": 4, "Edit": 3}
+
+    def test_find_action_logs(self, tmp_path):
+        memory_logs = tmp_path / "memory" / "workflows" / "wf-1" / "logs"
+        hook_logs = tmp_path / "workflow" / "wf-1" / "logs"
+        unscoped_logs = tmp_path / "workflow" / "logs"
+        for directory in (memory_logs, hook_logs, unscoped_logs):
+            directory.mkdir(parents=True)
+            (directory / "actions.jsonl").touch()
+
+        bases = [tmp_path / "memory" / "workflows", tmp_path / "workflow", tmp_path / "workflow"]
+        assert find_action_logs(bases) == sorted([
+            memory_logs / "actions.jsonl",
+            hook_logs / "actions.jsonl",
+            unscoped_logs / "actions.jsonl",
+        ])
+        assert find_action_logs([tmp_path / "missing"]) == []
+
+    def test_concurrent_save_reloads(self, log, tmp_path):
+        root = tmp_path / "analytics"
+        first, second = ActionStore(root), ActionStore(root)
+        append(log, [hook_record(n) for n in range(3)])
+        assert first.ingest_many([log]) == 3
+        # second 未看到 first 的保存：重新載入後不重複匯入
+        assert second.ingest_many([log]) == 0
+        assert len(ActionStore(root)) == 3
+
+
+class TestAggregations:
+    """篩選與彙整"""
+
+    @pytest.fixture
+    def store(self, log):
+        append(log, [hook_record(n, duration_ms=(n + 1) * 10) for n in range(10)])
+        append(log, [hook_record(n, tool="Bash", status="failed", minute=30) for n in range(2)])
+        append(log, [hook_record(n, tool="Bash", minute=30) for n in range(2)])
+        store = ActionStore()
+        store.ingest_many([log])
+        return store
+
+    def test_select(self, store):
+        assert len(store.select(tool="Bash")) == 4
+        assert len(store.select(failed=True)) == 2
+        assert len(store.select(stage="IMPLEMENT", tool=["Edit", "Bash"])) == 14
+        assert store.select(tool="Unknown") == []
+        assert len(store.select(min_duration_ms=90)) == 6
+
+    def test_failure_rates_and_percentiles(self, store):
+        rates = store.failure_rates("tool")
+        assert rates["Bash"]["failed"] == 2
+        assert rates["Bash"]["failure_rate"] == 0.5
+        assert rates["Edit"]["failure_rate"] == 0
+
+        edit = store.percentiles("tool")["Edit"]
+        assert edit["count"] == 10
+        assert edit["p50"] == pytest.approx(55)
+        assert edit["p90"] == pytest.approx(91)
+
+    def test_histogram(self, store):
+        histogram = store.histogram(600)
+        assert [counts["total"] for counts in histogram.values()] == [10, 4]
+        by_status = store.histogram(600, store.select(tool="Bash"), by="status")
+        assert list(by_status.values()) == [{"failed": 2, "success": 2}]
+
+    def test_summary(self, store):
+        summary = store.summary()
+        assert summary["total"] == 14
+        assert summary["by_status"] == {"success": 12, "failed": 2}
+        assert summary["top_10_slowest"][0] == {"duration_ms": 100, "tool": "Edit", "agent": "implementer"}
+
+
+class TestNormalize:
+    """記錄格式正規化"""
+
+    def test_action_logger_record(self):
+        ts, workflow, stage, agent, tool, status, duration_ms = normalize_record({
+            "timestamp": "2026-01-01T10:00:00",
+            "workflow_id": "wf-2",
+            "level": "error",
+            "action": "agent_failed",
+            "details": {"stage_id": "review", "agent_id": "reviewer", "duration_seconds": 1.5},
+        })
+        assert ts > 0
+        assert (workflow, stage, agent, tool, status, duration_ms) == (
+            "wf-2", "REVIEW", "reviewer", "agent_failed", "failed", 1500,
+        )
+
+    def test_percentile(self):
+        assert percentile([], 50) is None
+        assert percentile([10], 99) == 10
+        assert percentile([0, 10], 50) == 5
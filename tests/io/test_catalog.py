@@ -0,0 +1,77 @@
+"""工作流目錄索引測試"""
+
+import shutil
+
+import pytest
+
+from cli.io.memory import MemoryManager
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+
+
+def create(memory, workflow_id, topic="topic", status=None, created_at=None):
+    memory.create_workflow_dir(workflow_id, topic)
+    updates = {}
+    if status:
+        updates["status"] = status
+    if created_at:
+        updates["created_at"] = created_at
+        updates["date"] = created_at[:10]
+    if updates:
+        memory.update_workflow_meta(workflow_id, updates)
+
+
+class TestQuery:
+    """篩選與分頁"""
+
+    def test_filters_and_pagination(self, memory):
+        create(memory, "a", "auth login", "completed", "2025-01-01T10:00:00")
+        create(memory, "b", "perf tuning", "running", "2025-01-02T10:00:00")
+        create(memory, "c", "auth tokens", "failed", "2025-01-02T11:00:00")
+
+        assert [w["id"] for w in memory.list_workflows()] == ["c", "b", "a"]
+        assert [w["id"] for w in memory.list_workflows(limit=2, offset=2)] == ["a"]
+        assert [w["id"] for w in memory.list_workflows(status="running")] == ["b"]
+        assert [w["id"] for w in memory.list_workflows(status=["failed", "completed"])] == ["c", "a"]
+        assert [w["id"] for w in memory.list_workflows(date="2025-01-02")] == ["c", "b"]
+        assert [w["id"] for w in memory.list_workflows(topic="auth")] == ["c", "a"]
+        assert memory.catalog.count(topic="auth") == 2
+        assert memory.catalog.count(topic="%") == 0
+
+    def test_active_workflow(self, memory):
+        create(memory, "old", status="running", created_at="2025-01-01T10:00:00")
+        create(memory, "new", status="completed", created_at="2025-01-02T10:00:00")
+        assert memory.get_active_workflow()["id"] == "old"
+
+        memory.update_workflow_meta("old", {"status": "failed"})
+        assert memory.get_active_workflow()["id"] == "new"
+
+
+class TestRebuild:
+    """索引遺失或過期時由磁碟重建"""
+
+    def test_rebuild_when_missing(self, memory, tmp_path):
+        create(memory, "a", status="completed")
+        memory.flush_meta()
+        (tmp_path / "memory" / "catalog.db").unlink()
+
+        other = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+        assert [(w["id"], w["status"]) for w in other.list_workflows()] == [("a", "completed")]
+
+    def test_sync_with_other_writers(self, memory, tmp_path):
+        create(memory, "a", created_at="2025-01-01T10:00:00")
+        other = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+        other.create_workflow_dir("b", "from other process")
+        assert [w["id"] for w in memory.list_workflows()][0] == "b"
+
+        # 不經 MemoryManager 新增 / 刪除的目錄
+        shutil.copytree(tmp_path / "memory" / "workflows" / "b", tmp_path / "memory" / "workflows" / "c")
+        meta_file = tmp_path / "memory" / "workflows" / "c" / "meta.yaml"
+        meta = memory.read_yaml(meta_file)
+        memory.write_yaml(meta_file, {**meta, "id": "c", "created_at": "2099-01-01T00:00:00"})
+        shutil.rmtree(tmp_path / "memory" / "workflows" / "a")
+
+        assert [w["id"] for w in memory.list_workflows()] == ["c", "b"]
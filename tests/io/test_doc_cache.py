@@ -0,0 +1,120 @@
+"""已解析文件快取測試"""
+
+import json
+import os
+
+import pytest
+
+from cli.io.doc_cache import DocumentCache, FrozenDict, freeze, thaw
+from cli.io.memory import MemoryManager
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+
+
+def counting_loader(calls):
+    def load(path):
+        calls.append(path)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return load
+
+
+class TestDocumentCache:
+    """驗證與 LRU"""
+
+    def test_hit_until_file_changes(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text('{"a": [1, 2]}')
+        cache, calls = DocumentCache(), []
+        loader = counting_loader(calls)
+
+        first = cache.get(path, loader)
+        assert cache.get(path, loader) is first
+        assert len(calls) == 1
+
+        # 同大小改寫：mtime 改變即重新解析
+        path.write_text('{"a": [3, 4]}')
+        os.utime(path, ns=(0, 0))
+        assert cache.get(path, loader)["a"] == (3, 4)
+        assert len(calls) == 2
+
+        # rename 取代：inode 改變
+        replacement = tmp_path / "new.json"
+        replacement.write_text('{"a": [5, 6]}')
+        os.utime(replacement, ns=(0, 0))
+        os.replace(replacement, path)
+        assert cache.get(path, loader)["a"] == (5, 6)
+
+        path.unlink()
+        assert cache.get(path, loader) is None
+        assert len(cache) == 0
+
+    def test_lru_bounds(self, tmp_path):
+        cache, calls = DocumentCache(max_entries=2, max_bytes=100), []
+        loader = counting_loader(calls)
+        paths = []
+        for i in range(3):
+            paths.append(tmp_path / f"{i}.json")
+            paths[-1].write_text(json.dumps({"i": i}))
+
+        cache.get(paths[0], loader)
+        cache.get(paths[1], loader)
+        cache.get(paths[0], loader)
+        cache.get(paths[2], loader)  # 淘汰最久未使用的 1
+        assert len(calls) == 3
+        cache.get(paths[0], loader)
+        assert len(calls) == 3
+        cache.get(paths[1], loader)
+        assert len(calls) == 4
+
+        big = tmp_path / "big.json"
+        big.write_text(json.dumps({"x": "y" * 200}))
+        cache.get(big, loader)
+        assert str(big) not in cache._entries
+
+    def test_frozen_views(self):
+        view = freeze({"a": {"b": [1, {"c": 2}]}})
+        assert isinstance(view, FrozenDict)
+        with pytest.raises(TypeError):
+            view["a"] = 1
+        with pytest.raises(TypeError):
+            view["a"].update(b=1)
+        assert view["a"]["b"] == (1, {"c": 2})
+        assert json.loads(json.dumps(view)) == {"a": {"b": [1, {"c": 2}]}}
+
+        copy = thaw(view)
+        copy["a"]["b"].append(3)
+        assert view["a"]["b"] == (1, {"c": 2})
+
+
+class TestMemoryReads:
+    """MemoryManager 讀取經由快取"""
+
+    def test_read_returns_mutable_copy(self, memory, tmp_path):
+        path = tmp_path / "doc.yaml"
+        memory.write_yaml(path, {"stages": {"plan": {"status": "running"}}})
+
+        view = memory.view_yaml(path)
+        assert memory.view_yaml(path) is view
+        data = memory.read_yaml(path)
+        data["stages"]["plan"]["status"] = "changed"
+        assert memory.read_yaml(path)["stages"]["plan"]["status"] == "running"
+
+        memory.write_yaml(path, {"stages": {}})
+        assert memory.read_yaml(path) == {"stages": {}}
+
+    def test_jsonl_and_invalid_files(self, memory, tmp_path):
+        log = tmp_path / "log.jsonl"
+        memory.append_jsonl(log, {"n": 1})
+        assert memory.view_jsonl(log) == ({"n": 1},)
+        memory.append_jsonl(log, {"n": 2})
+        assert memory.read_jsonl(log) == [{"n": 1}, {"n": 2}]
+        assert memory.read_jsonl(tmp_path / "missing.jsonl") == []
+
+        broken = tmp_path / "broken.json"
+        broken.write_text("{not json")
+        assert memory.read_json(broken) is None
+        assert memory.read_yaml(tmp_path / "missing.yaml") is None
@@ -0,0 +1,134 @@
+"""持久化工作佇列測試"""
+
+import time
+
+import pytest
+
+from cli.io.job_queue import JobQueue, LeaseKeeper
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.db", lease_seconds=30)
+
+
+class TestEnqueue:
+    """提交"""
+
+    def test_idempotent(self, queue):
+        first = queue.enqueue("stage", "wf", "PLAN")
+        assert queue.enqueue("stage", "wf", "PLAN") == first
+        assert queue.enqueue("stage", "wf", "TASKS") != first
+        assert queue.stats() == {"stage": {"queued": 2}}
+
+    def test_finished_job_is_requeued(self, queue):
+        job_id = queue.enqueue("workflow", "wf")
+        queue.claim_job(job_id, "a")
+        queue.complete(job_id, "a", {"ok": True})
+        assert queue.get(job_id).result == {"ok": True}
+
+        assert queue.enqueue("workflow", "wf", payload={"again": 1}) == job_id
+        job = queue.get(job_id)
+        assert (job.status, job.attempts, job.result, job.payload) == (
+            "queued", 0, None, {"again": 1}
+        )
+
+    def test_cancel_workflow(self, queue):
+        queue.enqueue("stage", "wf", "PLAN")
+        queue.enqueue("stage", "wf", "TASKS")
+        queue.enqueue("stage", "other", "PLAN")
+        assert queue.cancel("wf") == 2
+        assert [j.workflow_id for j in queue.list(status="queued")] == ["other"]
+
+
+class TestClaim:
+    """排程順序與租約"""
+
+    def test_priority_then_submission_order(self, queue):
+        queue.enqueue("perspective", "wf", "a", priority=1)
+        queue.enqueue("perspective", "wf", "b", priority=5)
+        queue.enqueue("perspective", "wf", "c", priority=5)
+
+        assert [queue.claim("w").key for _ in range(3)] == ["b", "c", "a"]
+        assert queue.claim("w") is None
+
+    def test_fair_between_submitters(self, queue):
+        queue.enqueue("perspective", "wf1", "a1", submitter="alice")
+        queue.enqueue("perspective", "wf1", "a2", submitter="alice")
+        queue.enqueue("perspective", "wf2", "b1", submitter="bob")
+
+        # alice 已持有一個租約，bob 的工作先於 alice 較早提交的工作
+        assert queue.claim("w").key == "a1"
+        assert queue.claim("w").key == "b1"
+        assert queue.claim("w").key == "a2"
+
+    def test_kind_filter(self, queue):
+        queue.enqueue("stage", "wf", "PLAN")
+        queue.enqueue("workflow", "wf")
+        assert queue.claim("w", kinds=["workflow"]).kind == "workflow"
+        assert queue.claim("w", kinds=["workflow"]) is None
+
+    def test_claim_job_owner_rules(self, queue):
+        job_id = queue.enqueue("workflow", "wf")
+        assert queue.claim_job(job_id, "a").attempts == 1
+        assert queue.claim_job(job_id, "b") is None
+        # 同一持有者重新取得：續約，不增加嘗試次數
+        assert queue.claim_job(job_id, "a").attempts == 1
+
+
+class TestLease:
+    """heartbeat、過期與重試"""
+
+    def test_expired_lease_is_requeued_then_failed(self, queue):
+        job_id = queue.enqueue("stage", "wf", "PLAN", max_attempts=2)
+        queue.claim_job(job_id, "a", lease_seconds=0.01)
+        time.sleep(0.02)
+
+        assert queue.requeue_expired() == 1
+        assert queue.get(job_id).status == "queued"
+        assert queue.heartbeat(job_id, "a") is False
+        assert queue.complete(job_id, "a") is False
+
+        job = queue.claim("b", lease_seconds=0.01)
+        assert (job.id, job.attempts) == (job_id, 2)
+        time.sleep(0.02)
+        queue.requeue_expired()
+        assert queue.get(job_id).status == "failed"
+
+    def test_heartbeat_extends(self, queue):
+        job_id = queue.enqueue("stage", "wf", "PLAN")
+        before = queue.claim_job(job_id, "a", lease_seconds=1).lease_expires
+        assert queue.heartbeat(job_id, "a", lease_seconds=60)
+        assert queue.get(job_id).lease_expires > before + 30
+        assert queue.heartbeat(job_id, "b") is False
+
+    def test_fail_retry(self, queue):
+        job_id = queue.enqueue("stage", "wf", "PLAN", max_attempts=2)
+        queue.claim_job(job_id, "a")
+        assert queue.fail(job_id, "a", error="boom")
+        assert queue.get(job_id).status == "queued"
+
+        queue.claim_job(job_id, "a")
+        queue.fail(job_id, "a", error="boom")
+        job = queue.get(job_id)
+        assert (job.status, job.error) == ("failed", "boom")
+
+    def test_fail_without_retry(self, queue):
+        job_id = queue.enqueue("stage", "wf", "PLAN")
+        queue.claim_job(job_id, "a")
+        queue.fail(job_id, "a", retry=False)
+        assert queue.get(job_id).status == "failed"
+
+    def test_lease_keeper(self, queue):
+        job_id = queue.enqueue("stage", "wf", "PLAN")
+        queue.claim_job(job_id, "a", lease_seconds=0.2)
+
+        with LeaseKeeper(queue, job_id, "a", lease_seconds=0.2, interval=0.05) as keeper:
+            time.sleep(0.4)
+            assert queue.requeue_expired() == 0
+            assert not keeper.lost
+
+        queue.cancel("wf")
+        with LeaseKeeper(queue, job_id, "a", lease_seconds=0.2, interval=0.02) as keeper:
+            time.sleep(0.1)
+        assert keeper.lost
@@ -0,0 +1,95 @@
+"""Action Log 索引測試"""
+
+import json
+import os
+
+import pytest
+
+from cli.io.log_index import LogIndex
+from cli.io.logging import ActionLogger
+from cli.io.memory import MemoryManager
+
+
+def append(path, *records, raw=""):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(raw)
+
+
+def rec(n, action="file_write", level="info", **details):
+    return {"n": n, "action": action, "level": level, "details": details}
+
+
+@pytest.fixture
+def log(tmp_path):
+    return tmp_path / "logs" / "actions.jsonl"
+
+
+class TestLogIndex:
+    """增量索引、篩選與分頁"""
+
+    def test_incremental_refresh(self, log):
+        log.parent.mkdir()
+        append(log, rec(0), rec(1, "gate_failed", "error", stage="plan"))
+        index = LogIndex(log)
+        assert index.refresh() == 2
+        assert index.refresh() == 0
+
+        # 半行與損壞的行：半行留待下次索引，損壞的行略過
+        append(log, rec(2), raw='not json\n{"n": 3, "act')
+        assert index.refresh() == 1
+        append(log, raw='ion": "stage_start", "level": "info", "details": {}}\n')
+        assert index.refresh() == 1
+        assert [r["n"] for r in index.query()] == [0, 1, 2, 3]
+
+        # 日誌被取代：重建
+        replacement = log.with_name("new.jsonl")
+        append(replacement, rec(10))
+        os.replace(replacement, log)
+        assert [r["n"] for r in index.query()] == [10]
+
+    def test_filters_and_pagination(self, log):
+        log.parent.mkdir()
+        for n in range(30):
+            if n % 3 == 0:
+                append(log, rec(n, "gate_failed", "error", stage="plan"))
+            else:
+                append(log, rec(n, "agent_start", stage_id="RESEARCH"))
+        index = LogIndex(log)
+
+        assert [r["n"] for r in index.query(action="gate_failed", limit=3)] == [21, 24, 27]
+        assert [r["n"] for r in index.query(action="gate_failed", limit=3, offset=3)] == [12, 15, 18]
+        assert index.count(action="gate_failed") == 10
+        assert index.count(stage="PLAN", level=["error", "warning"]) == 10
+        assert [r["n"] for r in index.query(stage="research", limit=2)] == [28, 29]
+        assert index.query(action="workflow_init") == []
+        assert index.count() == 30
+
+        index.rebuild()
+        assert index.count() == 30
+
+
+class TestActionLoggerQueries:
+    """ActionLogger 查詢經由索引"""
+
+    def test_get_logs(self, tmp_path, monkeypatch):
+        memory = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+        monkeypatch.setattr("cli.io.logging.get_memory", lambda base_path=None: memory)
+        memory.create_workflow_dir("wf", "topic")
+        logger = ActionLogger("wf", durability="error")
+
+        for i in range(10):
+            logger.agent_start(f"a{i}", "A", "sonnet", "task")
+        logger.gate_failed("PLAN", ["x"])
+        logger.stage_complete("PLAN", True)
+
+        # 篩選在分頁之前（原先 limit 先截斷再篩選）
+        assert [r["action"] for r in logger.get_logs(action_filter=["gate_failed"], limit=1)] == [
+            "gate_failed"
+        ]
+        assert [r["details"]["agent_id"] for r in logger.get_logs(limit=2, offset=2)] == ["a8", "a9"]
+        assert len(logger.get_stage_logs("plan")) == 2
+        assert logger.count_logs(level_filter=["info"]) == 11
+        assert logger.index.db_path.name == "actions.idx.db"
+        logger.close()
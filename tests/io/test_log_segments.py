@@ -0,0 +1,100 @@
+"""JSONL 日誌分段（輪替、壓縮、跨分段讀取）測試"""
+
+import json
+
+import pytest
+
+from cli.io import log_segments
+from cli.io.log_index import LogIndex
+from cli.io.log_writer import JsonlWriter
+from cli.io.memory import MemoryManager
+
+
+def append(path, start, count, **fields):
+    with open(path, "a", encoding="utf-8") as f:
+        for n in range(start, start + count):
+            f.write(json.dumps({"n": n, "timestamp": f"t{n:04d}", **fields}) + "\n")
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "logs" / "actions.jsonl"
+    path.parent.mkdir()
+    return path
+
+
+class TestRotation:
+    """輪替、壓縮與清單"""
+
+    def test_rotate_and_read_across_segments(self, log):
+        append(log, 0, 5)
+        first = log_segments.rotate(log, reason="stage")
+        assert first.name == "actions.000001.jsonl.gz"
+        assert log.exists() and log.stat().st_size == 0
+        assert log_segments.rotate(log) is None  # 空白的寫入中分段不輪替
+
+        append(log, 5, 5)
+        log_segments.rotate(log, compress=False)
+        append(log, 10, 2)
+
+        assert [p.name for p in log_segments.segment_paths(log)] == [
+            "actions.000001.jsonl.gz", "actions.000002.jsonl", "actions.jsonl",
+        ]
+        assert [r["n"] for r in log_segments.iter_records(log)] == list(range(12))
+
+        assert log_segments.compress_pending(log) == 1
+        manifest = log_segments.read_manifest(log)
+        assert [(e["name"], e["records"], e["reason"]) for e in manifest] == [
+            ("actions.000001.jsonl.gz", 5, "stage"),
+            ("actions.000002.jsonl.gz", 5, "size"),
+        ]
+        assert manifest[0]["first_timestamp"] == "t0000"
+        assert manifest[0]["stored_bytes"] < manifest[0]["bytes"] * 2
+
+        log_segments.prune_segments(log, keep=1)
+        assert [r["n"] for r in log_segments.iter_records(log)] == list(range(5, 12))
+        assert [e["number"] for e in log_segments.read_manifest(log)] == [2]
+
+    def test_memory_reads_all_segments(self, log, tmp_path):
+        memory = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+        append(log, 0, 3)
+        assert len(memory.read_jsonl(log)) == 3
+        log_segments.rotate(log)
+        append(log, 3, 1)
+        assert [r["n"] for r in memory.read_jsonl(log)] == [0, 1, 2, 3]
+        assert [r["n"] for r in memory.iter_jsonl(log)] == [0, 1, 2, 3]
+
+
+class TestSegmentedIndex:
+    """索引涵蓋已輪替的分段"""
+
+    def test_index_follows_rotation(self, log):
+        append(log, 0, 4, action="gate_failed", level="error")
+        index = LogIndex(log)
+        assert index.count(action="gate_failed") == 4
+
+        log_segments.rotate(log)
+        append(log, 4, 3, action="gate_failed", level="error")
+        append(log, 7, 3, action="file_write", level="info")
+
+        assert index.count(action="gate_failed") == 7
+        assert [r["n"] for r in index.query(action="gate_failed", limit=4)] == [3, 4, 5, 6]
+        assert [r["n"] for r in index.query(limit=3, offset=8)] == [0, 1]
+
+        log_segments.prune_segments(log, keep=0)
+        assert index.count() == 6
+
+
+class TestWriterRotation:
+    """JsonlWriter 依大小輪替"""
+
+    def test_rotates_by_size(self, log):
+        writer = JsonlWriter(log, "event", rotate_bytes=200)
+        for n in range(20):
+            writer.write(json.dumps({"n": n, "pad": "x" * 20}))
+        writer.close()
+
+        segments = log_segments.closed_segments(log)
+        assert len(segments) >= 3
+        assert all(p.name.endswith(".gz") for _, p in segments)
+        assert [r["n"] for r in log_segments.iter_records(log)] == list(range(20))
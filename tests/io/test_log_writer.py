@@ -0,0 +1,135 @@
+"""JSONL 批次寫入器與 ActionLogger 寫入後端測試"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from cli.io.log_writer import JsonlWriter
+from cli.io.logging import ActionLogger
+from cli.io.memory import MemoryManager
+
+
+def read_lines(path):
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def logger_factory(tmp_path, monkeypatch):
+    memory = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+    monkeypatch.setattr("cli.io.logging.get_memory", lambda base_path=None: memory)
+    memory.create_workflow_dir("wf", "topic")
+    loggers = []
+
+    def make(durability):
+        logger = ActionLogger("wf", durability=durability)
+        loggers.append(logger)
+        return logger
+
+    yield make
+    for logger in loggers:
+        logger.close()
+
+
+class TestJsonlWriter:
+    """批次、同步寫入與關閉"""
+
+    def test_batches_by_size_and_time(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        writer = JsonlWriter(path, "error", batch_size=5, flush_interval=0.2)
+
+        for i in range(4):
+            writer.write(json.dumps({"n": i}))
+        assert read_lines(path) == []
+
+        writer.write(json.dumps({"n": 4}))  # 達到批次大小
+        time.sleep(0.05)
+        assert len(read_lines(path)) == 5
+
+        writer.write(json.dumps({"n": 5}))  # 未達批次大小：等待時間間隔
+        time.sleep(0.35)
+        assert [r["n"] for r in read_lines(path)] == list(range(6))
+        assert writer.batches == 2
+
+        writer.close()
+        writer.write(json.dumps({"n": 6}))  # 關閉後同步寫入
+        assert len(read_lines(path)) == 7
+        assert writer._handle is None and writer._thread is None
+
+    def test_sync_writes_and_backpressure(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        writer = JsonlWriter(path, "error", batch_size=100, flush_interval=60, max_queue=3)
+        writer.write("{}")
+        writer.write('{"e": 1}', error=True)  # 錯誤記錄連同之前的記錄一起寫入
+        assert len(read_lines(path)) == 2
+
+        for _ in range(3):
+            writer.write("{}")
+        assert len(read_lines(path)) == 5 and len(writer) == 0
+
+        assert JsonlWriter(tmp_path / "x", "stage").write("{}", barrier=True)
+        assert read_lines(tmp_path / "x") == [{}]
+        with pytest.raises(ValueError):
+            JsonlWriter(path, "never")
+        writer.close()
+
+    def test_reopens_replaced_file(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        writer = JsonlWriter(path, "event")
+        writer.write('{"n": 1}')
+        os.replace(path, tmp_path / "old.jsonl")
+        writer.write('{"n": 2}')
+        writer.close()
+        assert read_lines(path) == [{"n": 2}]
+        assert read_lines(tmp_path / "old.jsonl") == [{"n": 1}]
+
+
+class TestActionLogger:
+    """持久化等級與並行順序"""
+
+    def test_stage_durability(self, logger_factory):
+        logger = logger_factory("stage")
+        logger.agent_start("a", "A", "sonnet", "task")
+        assert read_lines(logger.log_file) == []
+
+        logger.stage_complete("RESEARCH", True)  # 階段邊界
+        assert [r["action"] for r in read_lines(logger.log_file)] == [
+            "agent_start", "stage_complete",
+        ]
+
+        logger.file_write("x.md", 10)
+        assert len(logger.get_logs()) == 3  # 讀取前寫入佇列
+
+    def test_event_durability(self, logger_factory):
+        logger = logger_factory("event")
+        details = {"k": 1}
+        logger.log("file_write", details)
+        details["k"] = 2
+        assert read_lines(logger.log_file)[0]["details"] == {"k": 1}
+
+    def test_parallel_threads_keep_order(self, logger_factory):
+        logger = logger_factory("error")
+
+        def worker(n):
+            for i in range(50):
+                logger.agent_complete(f"w{n}-{i}", True)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logger.close()
+
+        records = read_lines(logger.log_file)
+        assert len(records) == 400
+        timestamps = [r["timestamp"] for r in records]
+        assert timestamps == sorted(timestamps)
+        for n in range(8):
+            ids = [r["details"]["agent_id"] for r in records if r["details"]["agent_id"].startswith(f"w{n}-")]
+            assert ids == [f"w{n}-{i}" for i in range(50)]
@@ -0,0 +1,115 @@
+"""meta.yaml 寫回快取測試"""
+
+import threading
+import time
+
+import pytest
+
+from cli.io.memory import MemoryManager
+
+
+@pytest.fixture
+def memory(tmp_path):
+    memory = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+    memory.create_workflow_dir("wf", "topic")
+    return memory
+
+
+def read_meta(memory, workflow_id="wf"):
+    return memory.read_yaml(memory.get_workflow_dir(workflow_id) / "meta.yaml")
+
+
+class TestMetaWriteBehind:
+    """記憶體內更新、合併寫回"""
+
+    def test_updates_stay_in_memory_until_flush(self, memory):
+        memory.update_workflow_meta("wf", {"status": "running"})
+        memory.update_stage_status("wf", "PLAN", "running")
+
+        assert read_meta(memory)["status"] == "initialized"
+        meta = memory.get_workflow_meta("wf")
+        assert (meta["status"], meta["current_stage"]) == ("running", "PLAN")
+        assert memory.list_workflows()[0]["status"] == "running"
+
+        assert memory.flush_meta("wf")
+        on_disk = read_meta(memory)
+        assert on_disk["stages"]["plan"]["status"] == "running"
+        assert on_disk == memory.get_workflow_meta("wf")
+        assert not list(memory.get_workflow_dir("wf").glob(".*.tmp"))
+
+    def test_timer_coalesces_updates(self, tmp_path, monkeypatch):
+        memory = MemoryManager(str(tmp_path / "memory"), flush_interval=0.1)
+        memory.create_workflow_dir("wf", "topic")
+        writes = []
+        original = memory.write_yaml
+        monkeypatch.setattr(
+            memory, "write_yaml", lambda path, data: writes.append(path) or original(path, data)
+        )
+
+        for i in range(20):
+            memory.update_workflow_meta("wf", {"iteration": i})
+        time.sleep(0.3)
+
+        assert len(writes) == 1
+        assert read_meta(memory)["iteration"] == 19
+
+    def test_returned_meta_is_a_copy(self, memory):
+        details = {"nested": {"score": 1}}
+        memory.update_stage_status("wf", "PLAN", "completed", details)
+        details["nested"]["score"] = 2
+        memory.get_workflow_meta("wf")["stages"]["plan"]["nested"]["score"] = 3
+
+        assert memory.get_workflow_meta("wf")["stages"]["plan"]["nested"]["score"] == 1
+
+    def test_loads_existing_meta_and_unknown_workflow(self, memory, tmp_path):
+        memory.update_workflow_meta("wf", {"status": "running"})
+        memory.flush_meta()
+
+        other = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+        assert other.get_workflow_meta("wf")["status"] == "running"
+        assert other.update_workflow_meta("missing", {"status": "x"}) is False
+        assert other.get_workflow_meta("missing") is None
+
+    def test_concurrent_updates(self, memory):
+        def worker(n):
+            for i in range(50):
+                memory.update_stage_status("wf", f"S{n}", "running", {"i": i})
+                if i % 10 == 0:
+                    memory.flush_meta("wf")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        memory.flush_meta()
+
+        stages = read_meta(memory)["stages"]
+        assert {stages[f"s{n}"]["i"] for n in range(8)} == {49}
+
+    def test_external_update_is_not_overwritten(self, memory, tmp_path):
+        memory.get_workflow_meta("wf")  # 快取 meta
+        other = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+
+        other.update_workflow_meta("wf", {"recovered_by": "other"})
+        other.flush_meta("wf")
+        memory.update_workflow_meta("wf", {"status": "cancelled"})
+        memory.flush_meta("wf")
+        meta = read_meta(memory)
+        assert (meta["recovered_by"], meta["status"]) == ("other", "cancelled")
+
+        # 未寫回的更新在其他程序寫入後仍保留
+        memory.update_stage_status("wf", "PLAN", "running")
+        other.update_workflow_meta("wf", {"iteration": 2})
+        other.flush_meta("wf")
+        memory.flush_meta("wf")
+        meta = read_meta(memory)
+        assert (meta["iteration"], meta["stages"]["plan"]["status"]) == (2, "running")
+
+    def test_evict_meta(self, memory):
+        memory.update_workflow_meta("wf", {"status": "completed"})
+        assert memory.evict_meta("wf") is False  # 尚未寫回
+        memory.flush_meta("wf")
+        assert memory.evict_meta("wf") is True
+        assert "wf" not in memory._meta
+        assert memory.get_workflow_meta("wf")["status"] == "completed"
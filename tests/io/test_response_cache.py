@@ -0,0 +1,69 @@
+"""ResponseCache 測試"""
+
+import time
+
+import pytest
+
+from cli.io.cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """建立小容量快取"""
+    return ResponseCache(tmp_path / "cache", max_entries=3)
+
+
+class TestResponseCache:
+    """ResponseCache 測試"""
+
+    def test_make_key_depends_on_all_inputs(self):
+        """測試 Key 由 prompt、模型、工具、格式與輸入摘要共同決定"""
+        base = ResponseCache.make_key("p", "sonnet", ["Read"], "json")
+
+        assert base == ResponseCache.make_key("p", "sonnet", ["Read"], "json")
+        assert base != ResponseCache.make_key("p2", "sonnet", ["Read"], "json")
+        assert base != ResponseCache.make_key("p", "opus", ["Read"], "json")
+        assert base != ResponseCache.make_key("p", "sonnet", ["Read", "Bash"], "json")
+        assert base != ResponseCache.make_key("p", "sonnet", ["Read"], "text")
+        assert base != ResponseCache.make_key("p", "sonnet", ["Read"], "json", {"a": "1"})
+
+    def test_put_get_roundtrip(self, cache):
+        """測試寫入後讀取"""
+        cache.put("k1", {"success": True, "content": {"a": 1}})
+
+        assert cache.get("k1") == {"success": True, "content": {"a": 1}}
+        assert cache.get("missing") is None
+
+    def test_lru_eviction(self, cache):
+        """測試超過筆數時淘汰最久未使用的項目"""
+        for key in ["k1", "k2", "k3"]:
+            cache.put(key, {"v": key})
+        cache.get("k1")  # k1 變成最近使用
+        cache.put("k4", {"v": "k4"})
+
+        assert cache.get("k2") is None
+        assert cache.get("k1") is not None
+        assert cache.get_info()["entries"] == 3
+
+    def test_size_bound(self, tmp_path):
+        """測試超過總大小時淘汰"""
+        cache = ResponseCache(tmp_path / "cache", max_bytes=100)
+        cache.put("k1", {"v": "x" * 60})
+        cache.put("k2", {"v": "y" * 60})
+
+        assert cache.get("k1") is None
+        assert cache.get("k2") is not None
+
+    def test_ttl_expiry(self, tmp_path):
+        """測試過期項目不會命中"""
+        cache = ResponseCache(tmp_path / "cache", ttl_seconds=0.05)
+        cache.put("k1", {"v": 1})
+        time.sleep(0.1)
+
+        assert cache.get("k1") is None
+
+    def test_index_rebuilt_from_disk(self, tmp_path):
+        """測試重新建立實例後仍可命中"""
+        ResponseCache(tmp_path / "cache").put("k1", {"v": 1})
+
+        assert ResponseCache(tmp_path / "cache").get("k1") == {"v": 1}
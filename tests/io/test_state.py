@@ -0,0 +1,207 @@
+"""即時狀態追蹤（記憶體狀態、去抖動寫入、事件日誌）測試"""
+
+import threading
+import time
+
+import pytest
+
+from cli.io.memory import MemoryManager
+import cli.io.state as state_module
+from cli.io.state import StateFollower, StateTracker, replay_state
+
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    memory = MemoryManager(str(tmp_path / "memory"), flush_interval=None)
+    monkeypatch.setattr("cli.io.state.get_memory", lambda base_path=None: memory)
+    memory.create_workflow_dir("wf", "topic")
+    tracker = StateTracker("wf", flush_interval=0.1)
+
+    writes = []
+    original = memory.write_json
+    monkeypatch.setattr(
+        memory, "write_json", lambda path, data: writes.append(data) or original(path, data)
+    )
+    tracker.writes = writes
+    return tracker
+
+
+def on_disk(tracker):
+    return tracker.memory.read_json(tracker.state_file)
+
+
+class TestPersistence:
+    """去抖動與略過未變更的寫入"""
+
+    def test_updates_are_debounced(self, tracker):
+        tracker.set_stage("RESEARCH", "研究", "desc", 1, 6)
+        assert len(tracker.writes) == 1
+        assert on_disk(tracker)["stage"]["id"] == "RESEARCH"
+
+        for i in range(20):
+            tracker.add_agent(f"a{i}", f"A{i}")
+            tracker.update_agent_status(f"a{i}", "running")
+        assert tracker.get_progress()["agents_total"] == 20
+        assert len(on_disk(tracker)["agents"]) == 0
+
+        time.sleep(0.3)
+        assert len(tracker.writes) == 2
+        assert len(on_disk(tracker)["agents"]) == 20
+
+    def test_unchanged_state_is_not_written(self, tracker):
+        tracker.set_workflow("topic")
+        tracker.flush()
+        count = len(tracker.writes)
+
+        tracker.set_workflow("topic")
+        tracker.flush()
+        tracker.clear_stage()
+        tracker.clear_stage()
+        assert len(tracker.writes) == count
+
+    def test_existing_state_is_loaded(self, tracker):
+        tracker.set_stage("PLAN", "計劃", "desc", 2, 6)
+        tracker.add_agent("a", "A")
+        tracker.flush()
+
+        reloaded = StateTracker("wf")
+        assert reloaded.get_stage()["id"] == "PLAN"
+        assert [a["id"] for a in reloaded.get_agents()] == ["a"]
+
+    def test_getters_return_copies(self, tracker):
+        tracker.add_agent("a", "A")
+        tracker.get_agents()[0]["status"] = "changed"
+        tracker.get_state()["agents"].clear()
+        assert tracker.get_agents()[0]["status"] == "pending"
+
+
+class TestConcurrency:
+    """並行更新不遺失"""
+
+    def test_parallel_agent_updates(self, tracker):
+        tracker.set_stage("RESEARCH", "研究", "desc", 1, 6)
+
+        def worker(n):
+            for i in range(25):
+                agent_id = f"w{n}-{i}"
+                tracker.add_agent(agent_id, agent_id)
+                tracker.update_agent_status(agent_id, "completed")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tracker.flush()
+
+        state = on_disk(tracker)
+        assert len(state["agents"]) == 200
+        assert state["progress"] == {"agents_completed": 200, "agents_total": 200}
+        assert tracker.is_all_agents_done()
+
+
+def journal_ops(tracker):
+    return [e["op"] for e in tracker.memory.read_jsonl(tracker.journal_file)]
+
+
+class TestJournal:
+    """狀態事件日誌、follow 與重播"""
+
+    def test_transitions_are_journaled(self, tracker):
+        tracker.set_status("running")
+        tracker.set_stage("RESEARCH", "研究", "desc", 1, 6)
+        tracker.add_agent("a", "A")
+        tracker.update_agent_status("a", "running")
+        tracker.update_agent_status("a", "running")  # 未改變，不產生事件
+        tracker.update_agent_status("a", "completed")
+        tracker.flush()
+
+        assert journal_ops(tracker) == [
+            "workflow", "stage", "agent_add", "agent_status", "agent_status",
+        ]
+        snapshot = on_disk(tracker)
+        assert snapshot["seq"] == 5
+        assert snapshot["progress"] == {"agents_completed": 1, "agents_total": 1}
+
+        # 時間線保留中間狀態
+        statuses = [
+            s["agents"][0]["status"] for e, s in replay_state(tracker.state_file.parent)
+            if e["op"] == "agent_status"
+        ]
+        assert statuses == ["running", "completed"]
+
+    def test_follower_reads_only_new_events(self, tracker):
+        tracker.set_stage("RESEARCH", "研究", "desc", 1, 6)
+        follower = StateFollower(tracker.state_file.parent)
+        assert follower.load()["stage"]["id"] == "RESEARCH"
+        assert follower.poll() == []
+
+        tracker.add_agent("a", "A")
+        tracker.update_agent_status("a", "running")
+        tracker.flush()
+        offset = follower.offset
+        assert [e["op"] for e in follower.poll()] == ["agent_add", "agent_status"]
+        assert follower.offset > offset
+        assert follower.state["agents"][0]["status"] == "running"
+        assert follower.state == {**tracker.get_state(), "updated_at": follower.state["updated_at"]}
+
+        # 半行（寫入中）保留到下次讀取
+        with open(tracker.journal_file, "a") as f:
+            f.write('{"seq": 4, "ts": "t", "op": "workflow", "status": "comp')
+        assert follower.poll() == []
+        with open(tracker.journal_file, "a") as f:
+            f.write('leted"}\n')
+        assert [e["seq"] for e in follower.poll()] == [4]
+        assert follower.finished
+
+    def test_tracker_resumes_from_journal(self, tracker):
+        tracker.set_stage("PLAN", "計劃", "desc", 2, 6)
+        tracker.add_agent("a", "A")
+        tracker.flush()
+        # 快照落後於日誌（例如程序在寫入快照前結束）
+        with open(tracker.journal_file, "a") as f:
+            f.write('{"seq": 3, "ts": "t", "op": "agent_status", "id": "a", "status": "failed"}\n')
+
+        reloaded = StateTracker("wf")
+        assert reloaded.get_agents()[0]["status"] == "failed"
+        assert on_disk(reloaded)["seq"] == 3
+        reloaded.update_agent_status("a", "completed")
+        reloaded.flush()
+        assert [e["seq"] for e in reloaded.memory.read_jsonl(reloaded.journal_file)] == [1, 2, 3, 4]
+
+    def test_resumed_tracker_counts_existing_journal(self, tracker, monkeypatch):
+        monkeypatch.setattr(state_module, "JOURNAL_COMPACT_EVENTS", 6)
+        tracker.set_stage("PLAN", "計劃", "desc", 2, 6)
+        tracker.add_agent("a", "A")
+        for i in range(3):
+            tracker.update_agent_progress("a", {"events": i})
+        tracker.flush()
+
+        reloaded = StateTracker("wf")
+        assert reloaded._journal_events == 5
+        reloaded.update_agent_progress("a", {"events": 3})
+        reloaded.flush()
+        # 第六個事件即達壓縮門檻，不必再累積六個新事件
+        assert journal_ops(reloaded).count("agent_progress") == 1
+
+    def test_compaction_keeps_transitions(self, tracker, monkeypatch):
+        monkeypatch.setattr(state_module, "JOURNAL_COMPACT_EVENTS", 20)
+        tracker.set_stage("RESEARCH", "研究", "desc", 1, 6)
+        follower = StateFollower(tracker.state_file.parent)
+        follower.load()
+
+        for agent_id in ("a", "b"):
+            tracker.add_agent(agent_id, agent_id)
+            tracker.update_agent_status(agent_id, "running")
+        for i in range(10):
+            tracker.update_agent_progress("a", {"events": i})
+            tracker.update_agent_progress("b", {"events": i})
+        tracker.update_agent_status("a", "completed")
+        tracker.flush()
+
+        ops = journal_ops(tracker)
+        assert ops.count("agent_progress") == 2
+        assert ops.count("agent_status") == 3
+        follower.poll()
+        assert follower.state["agents"] == tracker.get_agents()
+        assert follower.state["agents"][1]["progress"] == {"events": 9}
@@ -0,0 +1,132 @@
+"""
+Orchestrator 測試共用 fixtures
+
+以假的 `claude` 執行檔取代真實 CLI：
+- FAKE_CLAUDE_OUTPUT: 輸出內容
+- FAKE_CLAUDE_SLEEP: 輸出前等待秒數
+- FAKE_CLAUDE_EXIT: 結束碼
+- FAKE_CLAUDE_STDERR: stderr 內容
+- FAKE_CLAUDE_TAIL_SLEEP: 輸出後、結束前等待秒數
+- FAKE_CLAUDE_FIRST_SLEEP: 僅第一次調用額外等待的秒數
+- FAKE_CLAUDE_FAIL_FIRST: 前 N 次調用以結束碼 1 失敗
+
+調用次數記錄在 fixture 目錄的 calls 檔案（fake_claude.parent / "calls"）。
+
+caller 為使用假 CLI 的 AgentCaller（預設輸出 REPORT、不快取），
+參數由 caller_options 提供，模組可覆蓋該 fixture 或以 parametrize 逐項指定。
+memory 為取代全域實例的暫存 Memory；env 另加上一律通過的品質閘門，供工作流測試使用。
+"""
+
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+import cli.io.memory as memory_module
+from cli.config.models import GateCheckResult
+from cli.io.cache import ResponseCache
+from cli.io.memory import MemoryManager
+from cli.orchestrator.agent_caller import AgentCaller
+from cli.orchestrator.engine import AgentEngine
+from cli.orchestrator.scheduler import AgentScheduler
+from cli.orchestrator.workflow import Workflow
+
+
+# 符合視角報告 Schema 的假 CLI 輸出
+REPORT = {
+    "perspective_id": "p",
+    "perspective_name": "P",
+    "findings": [{"title": "f", "description": "d"}],
+    "recommendations": [{"title": "r", "description": "d"}],
+}
+
+
+FAKE_CLAUDE_SCRIPT = """#!{python}
+import os
+import sys
+import time
+
+sys.stdin.read()
+counter = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls")
+with open(counter, "a") as f:
+    f.write("x")
+with open(counter) as f:
+    call = len(f.read())
+
+if call == 1:
+    time.sleep(float(os.environ.get("FAKE_CLAUDE_FIRST_SLEEP", "0")))
+if call <= int(os.environ.get("FAKE_CLAUDE_FAIL_FIRST", "0")):
+    sys.stderr.write("simulated crash")
+    sys.exit(1)
+time.sleep(float(os.environ.get("FAKE_CLAUDE_SLEEP", "0")))
+sys.stderr.write(os.environ.get("FAKE_CLAUDE_STDERR", ""))
+sys.stdout.write(os.environ.get("FAKE_CLAUDE_OUTPUT", ""))
+sys.stdout.flush()
+time.sleep(float(os.environ.get("FAKE_CLAUDE_TAIL_SLEEP", "0")))
+sys.exit(int(os.environ.get("FAKE_CLAUDE_EXIT", "0")))
+"""
+
+
+@pytest.fixture
+def fake_claude(tmp_path, monkeypatch):
+    """在 PATH 前端放入假的 claude 執行檔"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "claude"
+    script.write_text(FAKE_CLAUDE_SCRIPT.format(python=sys.executable))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("FAKE_CLAUDE_OUTPUT", '```json\n{"ok": true}\n```')
+    return script
+
+
+@pytest.fixture
+def caller_options():
+    """
+    caller 的參數（AgentCaller 關鍵字參數，另可指定 output）
+
+    - output: 假 CLI 輸出的 JSON 內容（預設 REPORT）
+    - use_cache: 是否使用回應快取（預設 False；快取位於暫存目錄）
+    """
+    return {}
+
+
+@pytest.fixture
+def caller(fake_claude, caller_options, tmp_path, monkeypatch):
+    """使用假 CLI、8 個 sonnet 槽位且不限速的 Agent 調用器"""
+    options = {"use_cache": False, **caller_options}
+    output = options.pop("output", REPORT)
+    monkeypatch.setenv("FAKE_CLAUDE_OUTPUT", "```json\n" + json.dumps(output) + "\n```")
+
+    engine = AgentEngine()
+    yield AgentCaller(
+        engine=engine,
+        scheduler=AgentScheduler(model_slots={"sonnet": 8}, rate_limits={"sonnet": None}),
+        cache=ResponseCache(tmp_path / "cache"),
+        **options,
+    )
+    engine.shutdown()
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    """暫存 Memory（取代全域實例）"""
+    memory = MemoryManager(str(tmp_path / "memory"))
+    monkeypatch.setattr(memory_module, "_memory", memory)
+    return memory
+
+
+@pytest.fixture
+def env(memory, caller, monkeypatch):
+    """暫存 Memory、假 CLI 調用器、一律通過的品質閘門"""
+    monkeypatch.setattr(
+        Workflow,
+        "_check_quality_gate",
+        lambda self, stage_id, result: GateCheckResult(
+            stage=stage_id, passed=True, score=100.0, threshold=70.0
+        ),
+    )
+    return memory, caller
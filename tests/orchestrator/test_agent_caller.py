@@ -0,0 +1,254 @@
+"""AgentCaller / ParallelAgentCaller 測試"""
+
+import threading
+import time
+
+import pytest
+
+from cli.config.schema import PERSPECTIVE_REPORT_SCHEMA
+from cli.io.cache import ResponseCache
+from cli.orchestrator.agent_caller import AgentCaller, ParallelAgentCaller
+from cli.orchestrator.engine import AgentEngine
+from cli.orchestrator.scheduler import AgentScheduler
+
+
+@pytest.fixture
+def engine():
+    """獨立的執行引擎"""
+    engine = AgentEngine()
+    yield engine
+    engine.shutdown()
+
+
+@pytest.fixture
+def scheduler():
+    """不限速的獨立排程器"""
+    return AgentScheduler(model_slots={"sonnet": 16}, rate_limits={"sonnet": None})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """獨立的回應快取"""
+    return ResponseCache(tmp_path / "cache")
+
+
+class TestAgentCaller:
+    """AgentCaller 測試"""
+
+    def test_call_parses_json(self, fake_claude, engine, scheduler, cache):
+        """測試同步調用與 JSON 解析"""
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        response = caller.call("hello")
+
+        assert response.success
+        assert response.content == {"ok": True}
+
+    async def test_acall(self, fake_claude, engine, scheduler, cache):
+        """測試 async 調用"""
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        response = await caller.acall("hello", output_format="text")
+
+        assert response.success
+        assert "ok" in response.content["text"]
+
+    def test_timeout_is_retryable_failure(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試超時後子程序被終止並返回失敗"""
+        monkeypatch.setenv("FAKE_CLAUDE_SLEEP", "5")
+        caller = AgentCaller(timeout=0.2, max_retries=1, engine=engine, scheduler=scheduler, cache=cache)
+
+        start = time.time()
+        response = caller.call("hello")
+
+        assert not response.success
+        assert "timed out" in response.error
+        assert time.time() - start < 3
+
+    def test_missing_cli_not_retried(self, engine, scheduler, cache, monkeypatch, tmp_path):
+        """測試找不到 CLI 時不重試"""
+        monkeypatch.setenv("PATH", str(tmp_path))
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+
+        response = caller.call("hello")
+
+        assert not response.success
+        assert "not found" in response.error
+
+    def test_run_inside_engine_thread_raises(self, engine):
+        """測試在引擎執行緒內同步等待會被拒絕"""
+
+        async def nested():
+            return engine.run(_noop())
+
+        async def _noop():
+            return None
+
+        with pytest.raises(RuntimeError):
+            engine.run(nested())
+
+
+class TestJsonRepair:
+    """JSON 修復整合測試"""
+
+    TRUNCATED = '```json\n{"perspective_id": "p", "perspective_name": "P", "findings": [], "recommendations": [{"title": "t", "descr'
+
+    def test_truncated_output_is_repaired(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試截斷輸出修復後採用並計入統計"""
+        monkeypatch.setenv("FAKE_CLAUDE_OUTPUT", self.TRUNCATED)
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+
+        response = caller.call("hello", workflow_id="wf")
+
+        assert response.success
+        assert response.repaired
+        assert response.content["recommendations"] == [{"title": "t"}]
+        stats = caller.get_stats("wf")
+        assert (stats["json_parses"], stats["json_repairs"]) == (1, 1)
+
+    def test_repair_rejected_by_schema(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試修復結果不符 Schema 時仍視為失敗"""
+        monkeypatch.setenv("FAKE_CLAUDE_OUTPUT", '{"findings": [1, 2,')
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+
+        response = caller.call("hello", workflow_id="wf", schema=PERSPECTIVE_REPORT_SCHEMA)
+
+        assert not response.success
+        assert caller.get_stats("wf")["json_repair_failures"] == 1
+
+
+class TestResponseCaching:
+    """快取與 single-flight 測試"""
+
+    def test_second_call_hits_cache(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試相同 prompt 第二次命中快取"""
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        first = caller.call("same", workflow_id="wf")
+
+        monkeypatch.setenv("FAKE_CLAUDE_EXIT", "1")
+        second = caller.call("same", workflow_id="wf")
+
+        assert not first.cached
+        assert second.cached
+        assert second.content == first.content
+        stats = caller.get_stats("wf")
+        assert (stats["cache_hits"], stats["cache_misses"]) == (1, 1)
+
+    def test_hits_across_iterations_and_misses_on_changed_input(
+        self, fake_claude, engine, scheduler, cache, tmp_path
+    ):
+        """測試回退迭代（工作流 ID / 迭代次數不同）命中快取，輸入檔案改變時不命中"""
+        from cli.prompts.base import build_system_context
+
+        implementation = tmp_path / "wf-1" / "implementation.md"
+        implementation.parent.mkdir()
+        implementation.write_text("v1")
+
+        def call(workflow_id, iteration, path=implementation):
+            context = {
+                "workflow_id": workflow_id,
+                "topic": "t",
+                "iteration": iteration,
+                "implement_outputs": {"implementation": str(path)},
+            }
+            return caller.call(build_system_context(context) + "review", context=context)
+
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        assert not call("wf-1", 0).cached
+        assert call("wf-1", 1).cached
+
+        # 相同主題的其他工作流：路徑不同但內容相同
+        other = tmp_path / "wf-2" / "implementation.md"
+        other.parent.mkdir()
+        other.write_text("v1")
+        assert call("wf-2", 0, other).cached
+
+        implementation.write_text("v2")
+        assert not call("wf-1", 2).cached
+
+    def test_cache_io_runs_off_the_event_loop(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試快取讀寫不在事件迴圈執行緒上執行"""
+        threads = []
+        for name in ("get", "put"):
+            original = getattr(cache, name)
+
+            def record(*args, _original=original):
+                threads.append(threading.current_thread())
+                return _original(*args)
+
+            monkeypatch.setattr(cache, name, record)
+
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        caller.call("same")
+        assert caller.call("same").cached
+
+        assert len(threads) == 3  # get、put、命中的 get
+        assert engine._thread not in threads
+
+    def test_use_cache_opt_out(self, fake_claude, engine, scheduler, cache):
+        """測試逐次關閉快取"""
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        caller.call("same")
+        response = caller.call("same", use_cache=False)
+
+        assert not response.cached
+        stats = caller.get_stats()
+        assert stats["cache_misses"] == 1
+        assert "cache_hits" not in stats
+
+    def test_failures_are_not_cached(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試失敗回應不會寫入快取"""
+        monkeypatch.setenv("FAKE_CLAUDE_OUTPUT", "no json here")
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        caller.call("same")
+
+        assert cache.get_info()["entries"] == 0
+
+    def test_concurrent_identical_calls_share_subprocess(
+        self, fake_claude, engine, scheduler, cache, monkeypatch
+    ):
+        """測試並行的相同請求只啟動一個子程序"""
+        monkeypatch.setenv("FAKE_CLAUDE_SLEEP", "0.3")
+        caller = AgentCaller(engine=engine, scheduler=scheduler, cache=cache)
+        parallel = ParallelAgentCaller(caller)
+        agents = [{"id": f"a{i}", "prompt": "same"} for i in range(4)]
+
+        results = parallel.call_parallel(agents, {"workflow_id": "wf"})
+
+        assert all(r.success for r in results.values())
+        stats = caller.get_stats("wf")
+        assert stats["cache_misses"] == 1
+        assert stats["inflight_joins"] == 3
+
+
+class TestParallelAgentCaller:
+    """ParallelAgentCaller 測試"""
+
+    def test_call_parallel_runs_concurrently(self, fake_claude, engine, scheduler, cache, monkeypatch):
+        """測試多個 Agent 在同一事件迴圈中並行"""
+        monkeypatch.setenv("FAKE_CLAUDE_SLEEP", "0.5")
+        parallel = ParallelAgentCaller(AgentCaller(engine=engine, scheduler=scheduler, cache=cache))
+        agents = [{"id": f"a{i}", "prompt": f"hi {i}"} for i in range(8)]
+
+        start = time.time()
+        results = parallel.call_parallel(agents)
+
+        assert set(results) == {f"a{i}" for i in range(8)}
+        assert all(r.success for r in results.values())
+        assert time.time() - start < 3
+
+    def test_iter_completed_yields_each_agent(self, fake_claude, engine, scheduler, cache):
+        """測試依完成順序產出所有結果"""
+        parallel = ParallelAgentCaller(AgentCaller(engine=engine, scheduler=scheduler, cache=cache))
+        agents = [{"id": "a"}, {"id": "b"}]
+        for agent in agents:
+            agent["prompt"] = "hi"
+
+        seen = [agent_id for agent_id, _ in parallel.iter_completed(agents)]
+
+        assert sorted(seen) == ["a", "b"]
+
+    async def test_acall_parallel(self, fake_claude, engine, scheduler, cache):
+        """測試 async 並行調用"""
+        parallel = ParallelAgentCaller(AgentCaller(engine=engine, scheduler=scheduler, cache=cache))
+        results = await parallel.acall_parallel([{"id": "a", "prompt": "hi"}])
+
+        assert results["a"].success
@@ -0,0 +1,87 @@
+"""批次執行器測試"""
+
+import pytest
+
+from cli.config.models import StageID, WorkflowMode
+from cli.orchestrator.batch import BatchRunner, load_batch, summarize_batch
+from cli.orchestrator.errors import WorkflowError
+
+
+# 只執行 RESEARCH 以縮短測試
+SKIP = ["PLAN", "TASKS", "IMPLEMENT", "REVIEW", "VERIFY"]
+
+
+class TestLoadBatch:
+    """批次檔解析"""
+
+    def test_defaults_and_plain_topics(self, tmp_path):
+        path = tmp_path / "topics.yaml"
+        path.write_text(
+            "concurrency: 3\n"
+            "defaults: {mode: quick}\n"
+            "workflows:\n"
+            "  - plain topic\n"
+            "  - {topic: urgent, priority: 5, skip_stages: [verify], mode: deep}\n",
+            encoding="utf-8",
+        )
+
+        entries, concurrency = load_batch(path)
+
+        assert concurrency == 3
+        assert [e.topic for e in entries] == ["plain topic", "urgent"]
+        assert entries[0].mode == WorkflowMode.QUICK
+        assert entries[0].priority == 1
+        assert entries[1].mode == WorkflowMode.DEEP
+        assert entries[1].skip_stages == [StageID.VERIFY]
+
+    def test_bare_list(self):
+        entries, concurrency = load_batch(["a", {"topic": "b", "start_from": "plan"}])
+        assert concurrency is None
+        assert entries[1].start_from == StageID.PLAN
+
+    @pytest.mark.parametrize("data", [{"workflows": []}, [{"priority": 2}], [3]])
+    def test_invalid(self, data):
+        with pytest.raises(WorkflowError):
+            load_batch(data)
+
+
+class TestBatchRunner:
+    """批次執行"""
+
+    def test_runs_all_with_shared_memory(self, env):
+        memory, caller = env
+        entries, _ = load_batch([
+            {"topic": f"topic {i}", "mode": "quick", "skip_stages": SKIP} for i in range(3)
+        ])
+
+        results = BatchRunner(memory=memory, caller=caller, concurrency=3).run(entries)
+
+        assert [r.entry.topic for r in results] == ["topic 0", "topic 1", "topic 2"]
+        assert all(r.success for r in results)
+        assert len({r.workflow_id for r in results}) == 3
+        assert all(memory.get_workflow_dir(r.workflow_id) for r in results)
+        assert caller.scheduler.workflow_weights == {}
+
+        summary = summarize_batch(results)
+        assert summary["succeeded"] == 3
+        assert summary["avg_quality"] is not None
+
+    def test_priority_order_and_progress(self, env):
+        memory, caller = env
+        entries, _ = load_batch([
+            {"topic": "low", "priority": 1, "mode": "quick", "skip_stages": SKIP},
+            {"topic": "high", "priority": 9, "mode": "quick", "skip_stages": SKIP},
+        ])
+        started = []
+
+        def on_progress(snapshot):
+            for wf in snapshot["workflows"]:
+                if wf["state"] != "pending" and wf["topic"] not in started:
+                    started.append(wf["topic"])
+
+        runner = BatchRunner(memory=memory, caller=caller, concurrency=1, on_progress=on_progress)
+        runner.run(entries)
+
+        assert started == ["high", "low"]
+        snapshot = runner.progress()
+        assert (snapshot["total"], snapshot["completed"], snapshot["pending"]) == (2, 2, 0)
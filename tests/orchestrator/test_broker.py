@@ -0,0 +1,121 @@
+"""視角工作分派（broker / worker）測試"""
+
+import asyncio
+import threading
+
+import pytest
+
+from cli.config.models import StageID, StageResult
+from cli.config.stages import STAGES
+from cli.io.job_queue import JobQueue
+from cli.io.logging import ActionLogger
+from cli.io.state import StateTracker
+from cli.orchestrator.agent_caller import ParallelAgentCaller
+from cli.orchestrator.broker import PERSPECTIVE_KIND, AgentWorker, QueueBroker
+from cli.orchestrator.stage_runner import StageRunner
+
+from .conftest import REPORT
+
+
+WORKFLOW_ID = "wf-broker"
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / "shared" / "jobs.db", lease_seconds=30)
+
+
+def start_worker(queue, caller, **kwargs):
+    """在背景執行緒執行 worker，佇列持續為空時結束"""
+    worker = AgentWorker(queue, caller, poll_interval=0.05, **kwargs)
+    thread = threading.Thread(target=worker.run, kwargs={"idle_exit": 1.0})
+    thread.start()
+    return worker, thread
+
+
+class TestBroker:
+    """需求端與 worker 經由佇列交換結果"""
+
+    def test_worker_executes_perspectives(self, caller, queue, fake_claude):
+        parallel = ParallelAgentCaller(caller, broker=QueueBroker(queue, poll_interval=0.05))
+        agents = [{"id": f"p{i}", "prompt": f"prompt {i}", "model": "sonnet"} for i in range(3)]
+        worker, thread = start_worker(queue, caller, concurrency=2)
+
+        results = parallel.call_parallel(agents, {"workflow_id": WORKFLOW_ID})
+        thread.join()
+
+        assert set(results) == {"p0", "p1", "p2"}
+        assert all(r.success and r.content == REPORT for r in results.values())
+        assert worker.processed == 3
+        assert (fake_claude.parent / "calls").read_text() == "xxx"
+
+        jobs = queue.list(workflow_id=WORKFLOW_ID, kind=PERSPECTIVE_KIND)
+        assert {j.status for j in jobs} == {"done"}
+        assert {j.key.split(":")[0] for j in jobs} == {"p0", "p1", "p2"}
+
+    def test_failed_job_becomes_failed_response(self, caller, queue, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_EXIT", "1")
+        monkeypatch.setenv("FAKE_CLAUDE_STDERR", "boom")
+        broker = QueueBroker(queue, poll_interval=0.05)
+        _, thread = start_worker(queue, caller)
+
+        response = caller.engine.run(
+            broker.acall({"id": "p", "prompt": "x"}, {"workflow_id": WORKFLOW_ID})
+        )
+        thread.join()
+
+        assert not response.success
+        assert response.error
+
+    def test_cancel_cancels_job(self, queue, monkeypatch):
+        broker = QueueBroker(queue, poll_interval=0.05)
+        threads = []
+        cancel_job = queue.cancel_job
+
+        def record_cancel(job_id):
+            threads.append(threading.current_thread())
+            return cancel_job(job_id)
+
+        monkeypatch.setattr(queue, "cancel_job", record_cancel)
+
+        async def cancel_while_waiting():
+            task = asyncio.ensure_future(broker.acall({"id": "p", "prompt": "x"}, {"workflow_id": WORKFLOW_ID}))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_while_waiting())
+        job = queue.find(PERSPECTIVE_KIND, WORKFLOW_ID, queue.list()[0].key)
+        assert job.status == "cancelled"
+        # 佇列寫入不在事件迴圈執行緒上
+        assert threads and threads[0] is not threading.main_thread()
+        assert queue.claim("w") is None
+
+
+class TestStageWithBroker:
+    """分派的視角結果寫入相同的階段目錄"""
+
+    def test_results_land_in_stage_dir(self, caller, memory, queue, monkeypatch):
+        memory.create_workflow_dir(WORKFLOW_ID, "topic")
+        monkeypatch.setitem(
+            STAGES, StageID.RESEARCH,
+            STAGES[StageID.RESEARCH].model_copy(update={"quorum": None, "deadline_seconds": None}),
+        )
+        runner = StageRunner(
+            WORKFLOW_ID,
+            memory,
+            ActionLogger(WORKFLOW_ID),
+            StateTracker(WORKFLOW_ID),
+            caller=caller,
+            broker=QueueBroker(queue, poll_interval=0.05),
+        )
+        worker, thread = start_worker(queue, caller, concurrency=4)
+
+        result: StageResult = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+        thread.join()
+
+        assert result.success
+        assert result.perspectives_succeeded == result.perspectives_total == worker.processed == 4
+        perspectives_dir = memory.get_stage_dir(WORKFLOW_ID, "RESEARCH") / "perspectives"
+        assert len(list(perspectives_dir.glob("*.md"))) == 4
@@ -0,0 +1,115 @@
+"""常駐編排服務測試"""
+
+import time
+
+import pytest
+
+from cli.config.models import BatchEntry, WorkflowStatus
+from cli.orchestrator.daemon import DAEMON_FILE, OrchestratorDaemon, find_daemon
+from cli.orchestrator.errors import WorkflowError
+from cli.orchestrator.workflow import Workflow
+
+
+# 只執行 RESEARCH、PLAN 以縮短測試
+SKIP = ["TASKS", "IMPLEMENT", "REVIEW", "VERIFY"]
+
+
+@pytest.fixture
+def daemon(env):
+    """以系統分配埠啟動的服務（暫存 Memory、假 CLI、一律通過的閘門）"""
+    memory, caller = env
+    daemon = OrchestratorDaemon(memory=memory, caller=caller, port=0, concurrency=1)
+    daemon.start()
+    yield daemon
+    daemon.shutdown()
+
+
+def entry(topic):
+    return BatchEntry(topic=topic, mode="quick", skip_stages=SKIP)
+
+
+class TestDaemon:
+    """服務 API"""
+
+    def test_discovery_file(self, daemon):
+        client = find_daemon(daemon.memory)
+        assert client is not None
+        assert client.port == daemon.port
+        assert client.health()["status"] == "ok"
+
+    def test_submit_and_stream_events(self, daemon):
+        client = find_daemon(daemon.memory)
+        workflow_id = client.submit(entry("served"))
+
+        events = list(client.events(workflow_id))
+
+        assert events[-1]["type"] == "end"
+        final = events[-1]["workflow"]
+        assert final["state"] == "completed"
+        assert final["result"]["success"] is True
+        actions = [e["record"]["action"] for e in events if e["type"] == "action"]
+        assert actions[0] == "workflow_init"
+        assert actions[-1] == "workflow_complete"
+        assert [e["index"] for e in events[:-1]] == list(range(1, len(actions) + 1))
+
+        # since 之後只送出新的事件
+        replay = list(client.events(workflow_id, since=len(actions) - 1))
+        assert [e["type"] for e in replay] == ["action", "end"]
+        assert client.get(workflow_id)["state"] == "completed"
+
+    def test_cancel_pending_and_running(self, daemon, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_SLEEP", "0.3")
+        client = find_daemon(daemon.memory)
+        running_id = client.submit(entry("first"))
+        pending_id = client.submit(entry("second"))
+        while client.get(running_id)["state"] != "running":
+            time.sleep(0.01)
+
+        assert client.cancel(pending_id) is True
+        assert client.cancel(running_id) is True
+
+        end = list(client.events(running_id))[-1]["workflow"]
+        assert end["state"] == WorkflowStatus.CANCELLED.value
+        assert end["result"]["final_status"] == "cancelled"
+        assert client.get(pending_id)["state"] == "cancelled"
+        assert client.cancel(pending_id) is False
+
+        meta = daemon.memory.read_yaml(
+            daemon.memory.get_workflow_dir(running_id) / "meta.yaml"
+        )
+        assert meta["status"] == "cancelled"
+
+    def test_worker_survives_run_error(self, daemon, monkeypatch):
+        import cli.orchestrator.daemon as daemon_module
+
+        monkeypatch.setattr(daemon_module, "MAX_FINISHED_JOBS", 1)
+        original = Workflow.run
+
+        def run(self):
+            if self.config.topic == "locked":
+                raise WorkflowError("工作流正由其他程序執行")
+            return original(self)
+
+        monkeypatch.setattr(Workflow, "run", run)
+        client = find_daemon(daemon.memory)
+        failed_id = client.submit(entry("locked"))
+        end = list(client.events(failed_id))[-1]["workflow"]
+        assert end["state"] == "failed"
+        assert "其他程序" in end["result"]["errors"][0]
+
+        # 唯一的工作執行緒仍在服務；最早結束的工作流被移除
+        ok_id = client.submit(entry("after"))
+        assert list(client.events(ok_id))[-1]["workflow"]["state"] == "completed"
+        assert [w["workflow_id"] for w in client.list()] == [ok_id]
+
+    def test_errors(self, daemon):
+        client = find_daemon(daemon.memory)
+        with pytest.raises(WorkflowError):
+            client.get("missing")
+        with pytest.raises(WorkflowError):
+            client._check(*client._request("POST", "/workflows", {"priority": 1}))
+
+    def test_shutdown_removes_discovery_file(self, daemon):
+        daemon.shutdown()
+        assert not (daemon.memory.base_path / DAEMON_FILE).exists()
+        assert find_daemon(daemon.memory) is None
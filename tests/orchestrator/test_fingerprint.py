@@ -0,0 +1,47 @@
+"""視角指紋測試"""
+
+from cli.orchestrator.fingerprint import (
+    perspective_fingerprint,
+    stable_context,
+    upstream_digests,
+)
+
+
+class TestFingerprint:
+    """指紋計算測試"""
+
+    def test_iteration_is_excluded(self):
+        assert stable_context({"topic": "t", "iteration": 2}) == {"topic": "t"}
+
+    def test_digests_follow_file_content(self, tmp_path):
+        plan = tmp_path / "plan.md"
+        plan.write_text("v1")
+        context = {"plan_outputs": {"plan": str(plan)}}
+
+        before = upstream_digests(context)
+        plan.write_text("v2")
+        after = upstream_digests(context)
+
+        assert list(before) == ["plan_outputs/plan"]
+        assert before != after
+
+    def test_all_stage_outputs_included(self, tmp_path):
+        context = {
+            "implement_outputs": {"implementation": str(tmp_path / "implementation.md")},
+            "review_outputs": {"x": str(tmp_path / "x")},
+            "implement_score": 80.0,
+        }
+        assert list(upstream_digests(context)) == [
+            "implement_outputs/implementation", "review_outputs/x",
+        ]
+
+    def test_missing_file(self, tmp_path):
+        context = {"tasks_outputs": {"dag": str(tmp_path / "nope.yaml")}}
+        assert upstream_digests(context) == {"tasks_outputs/dag": "missing"}
+
+    def test_fingerprint_inputs(self):
+        base = perspective_fingerprint("p", "sonnet", {"a": "1"})
+        assert base == perspective_fingerprint("p", "sonnet", {"a": "1"})
+        assert base != perspective_fingerprint("p2", "sonnet", {"a": "1"})
+        assert base != perspective_fingerprint("p", "opus", {"a": "1"})
+        assert base != perspective_fingerprint("p", "sonnet", {"a": "2"})
@@ -0,0 +1,98 @@
+"""JSON 區塊擷取測試"""
+
+import time
+
+from cli.orchestrator.json_extract import (
+    decode_span,
+    extract_json,
+    find_fences,
+    find_object_spans,
+)
+
+
+class TestExtractJson:
+    """extract_json 測試"""
+
+    def test_json_fence(self):
+        text = 'Here is my report:\n```json\n{"score": 8}\n```\nDone.'
+        assert extract_json(text) == {"score": 8}
+
+    def test_last_json_fence_wins(self):
+        text = '```json\n{"draft": true}\n```\nRevised:\n```json\n{"final": true}\n```\n'
+        assert extract_json(text) == {"final": True}
+
+    def test_json_fence_preferred_over_plain_fence(self):
+        text = '```json\n{"a": 1}\n```\n```\n{"b": 2}\n```\n'
+        assert extract_json(text) == {"a": 1}
+
+    def test_plain_fence(self):
+        text = 'Result:\n```\n{"b": 2}\n```\n'
+        assert extract_json(text) == {"b": 2}
+
+    def test_bare_object(self):
+        text = 'The answer is {"x": [1, 2, {"y": "z"}]} as requested.'
+        assert extract_json(text) == {"x": [1, 2, {"y": "z"}]}
+
+    def test_last_bare_object_wins(self):
+        text = 'First {"a": 1} then {"b": 2}'
+        assert extract_json(text) == {"b": 2}
+
+    def test_braces_inside_strings(self):
+        text = 'Output: {"code": "if (x) { return \\"}\\"; }", "n": 1}'
+        assert extract_json(text) == {"code": 'if (x) { return "}"; }', "n": 1}
+
+    def test_fence_inside_string_does_not_split(self):
+        text = '```json\n{"md": "use ``` for code"}\n```\n'
+        assert extract_json(text) == {"md": "use ``` for code"}
+
+    def test_invalid_fence_falls_back_to_object(self):
+        text = '```json\n{not json}\n```\nActually: {"ok": true}'
+        assert extract_json(text) == {"ok": True}
+
+    def test_non_dict_ignored(self):
+        assert extract_json('```json\n[1, 2, 3]\n```') is None
+
+    def test_no_json(self):
+        assert extract_json("no json here") is None
+        assert extract_json("") is None
+
+    def test_unbalanced_braces(self):
+        assert extract_json("{" * 1000) is None
+        assert extract_json('{"a": 1} ' + "{" * 1000) == {"a": 1}
+
+    def test_pathological_input_is_fast(self):
+        # 舊的貪婪 regex 在大量未閉合 { 時為二次方時間
+        text = "{ " * 200_000
+        start = time.perf_counter()
+        assert extract_json(text) is None
+        assert time.perf_counter() - start < 2.0
+
+
+class TestScanner:
+    """掃描器測試"""
+
+    def test_outermost_spans_only(self):
+        text = 'a {"x": {"y": 1}} b {"z": 2}'
+        spans = find_object_spans(text)
+        assert [text[s:e] for s, e in spans] == ['{"x": {"y": 1}}', '{"z": 2}']
+
+    def test_fence_spans(self):
+        text = '```json\n{"a": 1}\n```\n```python\nx = {}\n```\n'
+        json_fences, other_fences = find_fences(text)
+        assert [text[s:e].strip() for s, e in json_fences] == ['{"a": 1}']
+        assert [text[s:e].strip() for s, e in other_fences] == ["x = {}"]
+
+    def test_inline_backticks_are_not_fences(self):
+        text = 'use ``` inline ```\n```json\n{"a": 1}\n```\n'
+        json_fences, other_fences = find_fences(text)
+        assert len(json_fences) == 1 and other_fences == []
+
+    def test_unterminated_string_ends_at_newline(self):
+        text = '{"a": "oops\n} {"b": 2}'
+        spans = find_object_spans(text)
+        assert text[spans[-1][0]:spans[-1][1]] == '{"b": 2}'
+
+    def test_decode_span_rejects_trailing_text(self):
+        text = '{"a": 1} trailing'
+        assert decode_span(text, 0, len(text)) is None
+        assert decode_span(text, 0, 8) == {"a": 1}
@@ -0,0 +1,96 @@
+"""JSON 修復與 Schema 驗證測試"""
+
+from cli.config.schema import PERSPECTIVE_REPORT_SCHEMA, SYNTHESIS_REPORT_SCHEMA
+from cli.orchestrator.json_repair import repair_json
+from cli.validators.schema import validate_schema
+
+
+class TestRepairJson:
+    """repair_json 測試"""
+
+    def test_trailing_commas(self):
+        value, fixes = repair_json('{"a": [1, 2,], "b": {"c": 3,},}')
+        assert value == {"a": [1, 2], "b": {"c": 3}}
+        assert fixes == ["trailing_comma"]
+
+    def test_smart_quotes(self):
+        value, fixes = repair_json("{“title”: “It's ok”, “n”: 1}")
+        assert value == {"title": "It's ok", "n": 1}
+        assert "smart_quotes" in fixes
+
+    def test_smart_quotes_inside_plain_string_kept(self):
+        value, fixes = repair_json('{"title": "say “hi”",}')
+        assert value == {"title": "say “hi”"}
+        assert fixes == ["trailing_comma"]
+
+    def test_raw_newline_in_string(self):
+        value, fixes = repair_json('{"text": "line 1\nline 2"}')
+        assert value == {"text": "line 1\nline 2"}
+        assert fixes == ["raw_newline"]
+
+    def test_truncated_string(self):
+        value, fixes = repair_json('{"summary": "cut off mid')
+        assert value == {"summary": "cut off mid"}
+        assert "truncated" in fixes
+
+    def test_truncated_nested(self):
+        value, _ = repair_json('{"findings": [{"title": "a"}, {"title": "b", "importance":')
+        assert value == {"findings": [{"title": "a"}, {"title": "b", "importance": None}]}
+
+    def test_truncated_after_key_drops_partial_element(self):
+        value, fixes = repair_json('{"a": 1, "b": [1, 2], "c"')
+        assert value == {"a": 1, "b": [1, 2]}
+        assert "dropped_partial" in fixes
+
+    def test_truncated_escape(self):
+        value, _ = repair_json('{"path": "C:\\')
+        assert value == {"path": "C:"}
+
+    def test_uses_last_json_fence(self):
+        text = 'draft {"x": 1}\n```json\n{"a": 1,}\n```\n'
+        assert repair_json(text)[0] == {"a": 1}
+
+    def test_stops_at_closing_fence(self):
+        text = '```json\n{"a": [1, 2\n```\ntrailing prose'
+        assert repair_json(text)[0] == {"a": [1, 2]}
+
+    def test_unrepairable(self):
+        assert repair_json("no json") == (None, [])
+        assert repair_json("{key: value}") == (None, [])
+
+
+class TestValidateSchema:
+    """validate_schema 測試"""
+
+    def test_valid_perspective_report(self):
+        report = {
+            "perspective_id": "p",
+            "perspective_name": "P",
+            "findings": [{"title": "t", "description": "d", "importance": "high"}],
+            "recommendations": [],
+        }
+        assert validate_schema(report, PERSPECTIVE_REPORT_SCHEMA) == []
+
+    def test_missing_required_and_bad_enum(self):
+        report = {
+            "perspective_id": "p",
+            "findings": [{"title": "t", "description": "d", "importance": "urgent"}],
+            "recommendations": [],
+        }
+        errors = validate_schema(report, PERSPECTIVE_REPORT_SCHEMA)
+        assert any("perspective_name" in e for e in errors)
+        assert any("$.findings[0].importance" in e for e in errors)
+
+    def test_type_and_range(self):
+        synthesis = {
+            "stage_id": "RESEARCH",
+            "consensus": {"score": 1.5},
+            "key_insights": "none",
+            "action_items": [],
+        }
+        errors = validate_schema(synthesis, SYNTHESIS_REPORT_SCHEMA)
+        assert any("$.consensus.score" in e for e in errors)
+        assert any("$.key_insights" in e for e in errors)
+
+    def test_bool_is_not_a_number(self):
+        assert validate_schema(True, {"type": "number"}) != []
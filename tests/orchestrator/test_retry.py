@@ -0,0 +1,180 @@
+"""重試與對沖策略測試"""
+
+import random
+import time
+
+import pytest
+
+from cli.io.cache import ResponseCache
+from cli.orchestrator.agent_caller import AgentCaller
+from cli.orchestrator.engine import AgentEngine
+from cli.orchestrator.errors import AgentError
+from cli.orchestrator.retry import (
+    HedgePolicy,
+    LatencyTracker,
+    RetryPolicy,
+    classify_failure,
+    parse_retry_after,
+)
+from cli.orchestrator.scheduler import AgentScheduler
+
+
+def call_count(fake_claude) -> int:
+    """假 CLI 的調用次數"""
+    counter = fake_claude.parent / "calls"
+    return len(counter.read_text()) if counter.exists() else 0
+
+
+class TestClassifyFailure:
+    """失敗分類測試"""
+
+    @pytest.mark.parametrize(
+        "stderr, kind, retryable",
+        [
+            ("Error: 429 Too Many Requests", "rate_limit", True),
+            ("API Error: Overloaded", "overloaded", True),
+            ("Invalid API key · Please run /login", "auth", False),
+            ("Error: prompt is too long", "invalid_request", False),
+            ("Traceback (most recent call last):\n  ...", "crash", True),
+            ("something odd", "unknown", True),
+            ('API Error: 529 {"type":"error","error":{"type":"overloaded_error"}}', "overloaded", True),
+            ('API Error: 401 {"error":{"type":"authentication_error"}}', "auth", False),
+            ("HTTP/1.1 503 Service Unavailable", "overloaded", True),
+            ("request failed: status_code=502", "overloaded", True),
+        ],
+    )
+    def test_kinds(self, stderr, kind, retryable):
+        error = classify_failure(stderr, 1)
+        assert error.details["kind"] == kind
+        assert error.retryable is retryable
+
+    @pytest.mark.parametrize(
+        "stderr",
+        [
+            "Found 500 files; 503 were skipped",
+            "Refactor the authentication module",
+            "Add tests for HTTP 500 handling in the forbidden path",
+            "The upstream service returned 429 during load tests",
+            "Workers were killed by the test harness",
+        ],
+    )
+    def test_unanchored_mentions_are_unknown(self, stderr):
+        error = classify_failure(stderr, 1)
+        assert error.details["kind"] == "unknown"
+        assert error.retryable
+
+    def test_signal_is_crash(self):
+        assert classify_failure("", -9).details["kind"] == "crash"
+
+    def test_retry_after(self):
+        assert parse_retry_after("429 rate limited; Retry-After: 30") == 30
+        assert parse_retry_after('{"retry_after": 2.5}') == 2.5
+        assert parse_retry_after("please try again in 2 minutes") == 120
+        assert parse_retry_after("no hint") is None
+        assert classify_failure("rate limit, retry after 7", 1).details["retry_after"] == 7
+
+
+class TestRetryPolicy:
+    """RetryPolicy 測試"""
+
+    def test_full_jitter_bounds(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=random.Random(0))
+        delays = [policy.backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+        assert all(0 <= d <= 5.0 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_retry_after_is_lower_bound(self):
+        policy = RetryPolicy(base_delay=1.0, rng=random.Random(0))
+        error = AgentError("rate", details={"retry_after": 10})
+        assert 10 <= policy.backoff(1, error) <= 11
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_attempts=3, max_retry_after=60)
+        assert policy.should_retry(AgentError("x"), 1)
+        assert not policy.should_retry(AgentError("x"), 3)
+        assert not policy.should_retry(AgentError("x", retryable=False), 1)
+        assert not policy.should_retry(AgentError("x", details={"retry_after": 600}), 1)
+
+
+class TestHedgePolicy:
+    """延遲追蹤與對沖延遲測試"""
+
+    def test_percentile_needs_samples(self):
+        tracker = LatencyTracker(min_samples=5)
+        for v in [1, 2, 3, 4]:
+            tracker.record("k", v)
+        assert tracker.percentile("k") is None
+        tracker.record("k", 100)
+        assert tracker.percentile("k") == 100
+        assert tracker.percentile("k", 50) == 3
+
+    def test_delay_falls_back_to_model(self):
+        policy = HedgePolicy(LatencyTracker(min_samples=2), min_delay=0.5)
+        assert policy.delay_for("sonnet", "arch") is None
+        policy.record("sonnet", "other", 2.0)
+        policy.record("sonnet", "other", 3.0)
+        assert policy.delay_for("sonnet", "arch") == 3.0
+        policy.record("sonnet", "arch", 0.1)
+        policy.record("sonnet", "arch", 0.2)
+        assert policy.delay_for("sonnet", "arch") == 0.5
+
+
+class TestAgentCallerRetries:
+    """AgentCaller 重試與對沖整合測試"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = AgentEngine()
+        yield engine
+        engine.shutdown()
+
+    @pytest.fixture
+    def caller_kwargs(self, engine, tmp_path):
+        return {
+            "engine": engine,
+            "scheduler": AgentScheduler(model_slots={"sonnet": 4}, rate_limits={"sonnet": None}),
+            "cache": ResponseCache(tmp_path / "cache"),
+            "use_cache": False,
+            "retry_policy": RetryPolicy(max_attempts=3, base_delay=0.01),
+        }
+
+    def test_crash_is_retried(self, fake_claude, caller_kwargs, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_FAIL_FIRST", "2")
+        caller = AgentCaller(**caller_kwargs)
+
+        response = caller.call("hello", workflow_id="wf")
+
+        assert response.success
+        assert call_count(fake_claude) == 3
+        assert caller.get_stats("wf")["retries"] == 2
+
+    def test_auth_failure_not_retried(self, fake_claude, caller_kwargs, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_EXIT", "1")
+        monkeypatch.setenv("FAKE_CLAUDE_STDERR", "Invalid API key")
+        caller = AgentCaller(**caller_kwargs)
+
+        response = caller.call("hello")
+
+        assert not response.success
+        assert call_count(fake_claude) == 1
+
+    def test_hedge_wins_over_slow_primary(self, fake_claude, caller_kwargs, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_FIRST_SLEEP", "10")
+        hedge = HedgePolicy(LatencyTracker(min_samples=1), min_delay=0.2)
+        hedge.record("sonnet", "arch", 0.1)
+        caller = AgentCaller(hedge_policy=hedge, **caller_kwargs)
+
+        start = time.time()
+        response = caller.call("hello", workflow_id="wf", agent_id="arch")
+
+        assert response.success
+        assert time.time() - start < 5
+        stats = caller.get_stats("wf")
+        assert (stats["hedges_launched"], stats["hedges_won"]) == (1, 1)
+
+    def test_no_hedge_without_history(self, fake_claude, caller_kwargs):
+        caller = AgentCaller(hedge_policy=HedgePolicy(min_delay=0.0), **caller_kwargs)
+
+        assert caller.call("hello", workflow_id="wf").success
+        assert "hedges_launched" not in caller.get_stats("wf")
+        assert caller.hedge_policy.tracker.percentile("sonnet") is None
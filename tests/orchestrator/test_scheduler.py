@@ -0,0 +1,147 @@
+"""AgentScheduler 測試"""
+
+import asyncio
+import time
+
+import pytest
+
+from cli.orchestrator.errors import AgentError
+from cli.orchestrator.scheduler import AgentScheduler, TokenBucket
+
+
+def make_scheduler(**kwargs) -> AgentScheduler:
+    """建立不限速的排程器"""
+    kwargs.setdefault("rate_limits", {"sonnet": None, "opus": None, "haiku": None})
+    return AgentScheduler(**kwargs)
+
+
+class TestAgentScheduler:
+    """AgentScheduler 測試"""
+
+    async def test_slots_bound_concurrency(self):
+        """測試模型槽位限制並發數"""
+        scheduler = make_scheduler(model_slots={"sonnet": 2})
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            async with scheduler.slot("sonnet"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.05)
+                running -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+
+        assert peak == 2
+        metrics = scheduler.get_metrics()["sonnet"]
+        assert metrics["admitted"] == 6
+        assert metrics["in_use"] == 0
+        assert metrics["max_queue_depth"] == 4
+
+    async def test_models_are_independent(self):
+        """測試不同模型的槽位互不影響"""
+        scheduler = make_scheduler(model_slots={"opus": 1, "haiku": 1})
+
+        async with scheduler.slot("opus"):
+            await asyncio.wait_for(scheduler.acquire("haiku"), timeout=0.5)
+            scheduler.release("haiku")
+
+    async def test_fair_sharing_between_workflows(self):
+        """測試等待中的工作流輪流取得槽位"""
+        scheduler = make_scheduler(model_slots={"sonnet": 1})
+        order = []
+
+        async def job(workflow_id):
+            async with scheduler.slot("sonnet", workflow_id):
+                order.append(workflow_id)
+                await asyncio.sleep(0.01)
+
+        await scheduler.acquire("sonnet", "holder")
+        tasks = [asyncio.ensure_future(job("a")) for _ in range(3)]
+        tasks += [asyncio.ensure_future(job("b")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        scheduler.release("sonnet")
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "a", "b", "a", "b"]
+
+    async def test_admission_control_rejects_when_full(self):
+        """測試佇列滿時拒絕新請求"""
+        scheduler = make_scheduler(model_slots={"sonnet": 1}, max_queue=1)
+
+        await scheduler.acquire("sonnet")
+        waiting = asyncio.ensure_future(scheduler.acquire("sonnet"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AgentError) as exc_info:
+            await scheduler.acquire("sonnet")
+        assert exc_info.value.retryable
+
+        scheduler.release("sonnet")
+        await waiting
+        assert scheduler.get_metrics()["sonnet"]["rejected"] == 1
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """測試取消等待不會佔用槽位"""
+        scheduler = make_scheduler(model_slots={"sonnet": 1})
+
+        await scheduler.acquire("sonnet")
+        waiting = asyncio.ensure_future(scheduler.acquire("sonnet"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        scheduler.release("sonnet")
+
+        metrics = scheduler.get_metrics()["sonnet"]
+        assert metrics["in_use"] == 0
+        assert metrics["queued"] == 0
+
+    async def test_slot_not_held_while_waiting_for_token(self):
+        """測試等待速率配額時不佔用槽位"""
+        scheduler = AgentScheduler(model_slots={"sonnet": 2}, rate_limits={"sonnet": (5, 1)})
+
+        await scheduler.acquire("sonnet")
+        waiting = asyncio.ensure_future(scheduler.acquire("sonnet"))
+        await asyncio.sleep(0.05)
+
+        assert scheduler.get_metrics()["sonnet"]["in_use"] == 1
+        assert await waiting >= 0.1
+        assert scheduler.get_metrics()["sonnet"]["in_use"] == 2
+
+class TestTokenBucket:
+    """TokenBucket 測試"""
+
+    async def test_burst_then_throttle(self):
+        """測試突發容量用完後限速"""
+        bucket = TokenBucket(rate=20, capacity=2)
+
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+
+        # 2 個突發 + 2 個各需 0.05s
+        assert time.monotonic() - start >= 0.09
+
+    async def test_concurrent_waiters_reserve_in_order(self):
+        """測試並行等待者依預支順序等待（不在鎖內睡眠）"""
+        bucket = TokenBucket(rate=20, capacity=2)
+
+        waits = await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.05, abs=0.01)
+        assert waits[3] == pytest.approx(0.1, abs=0.01)
+
+    async def test_cancelled_wait_returns_token(self):
+        """測試取消等待時歸還預支的 token"""
+        bucket = TokenBucket(rate=10, capacity=1)
+        await bucket.acquire()
+
+        waiting = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+        assert bucket.tokens > -0.5
@@ -0,0 +1,292 @@
+"""StageRunner 提前完成（quorum / 期限）、管線化綜合、視角重用與任務 DAG 測試"""
+
+import json
+
+import pytest
+
+from cli.config.models import StageID, StageResult
+from cli.config.stages import STAGES
+from cli.io.logging import ActionLogger
+from cli.io.state import StateTracker
+from cli.orchestrator.stage_runner import StageRunner
+from cli.validators.quality_gate import QualityGate
+
+
+WORKFLOW_ID = "wf-test"
+
+
+@pytest.fixture
+def runner(caller, memory):
+    """使用暫存 Memory 與假 CLI 的 StageRunner"""
+    memory.create_workflow_dir(WORKFLOW_ID, "topic")
+
+    return StageRunner(
+        WORKFLOW_ID,
+        memory,
+        ActionLogger(WORKFLOW_ID),
+        StateTracker(WORKFLOW_ID),
+        caller=caller,
+    )
+
+
+def set_policy(monkeypatch, **policy):
+    config = STAGES[StageID.RESEARCH].model_copy(update=policy)
+    monkeypatch.setitem(STAGES, StageID.RESEARCH, config)
+
+
+def read_actions(runner):
+    with open(runner.logger.log_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestEarlyCompletion:
+    """提前完成測試"""
+
+    def test_waits_for_all_without_policy(self, runner, monkeypatch):
+        set_policy(monkeypatch, quorum=None, deadline_seconds=None)
+
+        result = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+
+        assert result.success
+        assert result.early_completion is None
+        assert result.perspectives_succeeded == result.perspectives_total == 4
+
+    def test_quorum_cancels_straggler(self, runner, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_FIRST_SLEEP", "30")
+        set_policy(monkeypatch, quorum=3, deadline_seconds=None)
+
+        result = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+
+        assert result.success
+        assert result.early_completion == "quorum"
+        assert result.perspectives_succeeded == 3
+        assert len(result.perspectives_cancelled) == 1
+        assert result.duration_seconds < 20
+
+        state = runner.tracker.get_state()
+        assert state["stage"]["early_completion"]["reason"] == "quorum"
+        statuses = {a["id"]: a["status"] for a in state["agents"]}
+        assert statuses[result.perspectives_cancelled[0]] == "cancelled"
+
+        early = [a for a in read_actions(runner) if a["action"] == "stage_early_completion"]
+        assert early and early[0]["details"]["cancelled"] == result.perspectives_cancelled
+
+    def test_deadline_proceeds_with_finished(self, runner, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_FIRST_SLEEP", "30")
+        set_policy(monkeypatch, quorum=None, deadline_seconds=2.0)
+
+        result = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+
+        assert result.early_completion == "deadline"
+        assert result.perspectives_succeeded == 3
+        # 逾期取消的視角計入成功率分母
+        assert result.quality_score < 100
+
+
+class TestPipelinedSynthesis:
+    """管線化綜合測試"""
+
+    def test_partial_syntheses_merged(self, runner, monkeypatch, fake_claude):
+        set_policy(
+            monkeypatch,
+            quorum=None,
+            deadline_seconds=None,
+            pipelined_synthesis=True,
+            synthesis_batch_size=2,
+        )
+
+        result = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+
+        assert result.success
+        assert "synthesis" in result.outputs
+        assert sum(1 for key in result.outputs if key.startswith("perspective_")) == 4
+
+        stage_dir = runner.memory.get_stage_dir(WORKFLOW_ID, StageID.RESEARCH.value)
+        synthesis = json.loads((stage_dir / "summaries" / "synthesis.json").read_text())
+        assert synthesis["partial_syntheses"] == 2
+        assert (stage_dir / "summaries" / "partial-1.json").exists()
+        assert (stage_dir / "summaries" / "partial-2.json").exists()
+        # 4 個視角 + 2 次部分綜合
+        assert len((fake_claude.parent / "calls").read_text()) == 6
+
+    def test_single_batch_matches_plain_synthesis(self, runner, monkeypatch):
+        set_policy(
+            monkeypatch,
+            quorum=None,
+            deadline_seconds=None,
+            pipelined_synthesis=True,
+            synthesis_batch_size=10,
+        )
+
+        result = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+
+        stage_dir = runner.memory.get_stage_dir(WORKFLOW_ID, StageID.RESEARCH.value)
+        synthesis = json.loads((stage_dir / "summaries" / "synthesis.json").read_text())
+        assert result.success
+        assert "partial_syntheses" not in synthesis
+        assert not (stage_dir / "summaries" / "partial-1.json").exists()
+
+    def test_tasks_stage_is_never_pipelined(self, runner, monkeypatch, fake_claude):
+        config = STAGES[StageID.TASKS].model_copy(update={
+            "quorum": None,
+            "deadline_seconds": None,
+            "pipelined_synthesis": True,
+            "synthesis_batch_size": 1,
+        })
+        monkeypatch.setitem(STAGES, StageID.TASKS, config)
+
+        result = runner.run(StageID.TASKS, {"workflow_id": WORKFLOW_ID})
+
+        stage_dir = runner.memory.get_stage_dir(WORKFLOW_ID, StageID.TASKS.value)
+        assert result.success
+        assert not (stage_dir / "summaries" / "partial-1.json").exists()
+        # 各視角 + 一次一般綜合
+        perspectives = sum(1 for key in result.outputs if key.startswith("perspective_"))
+        assert len((fake_claude.parent / "calls").read_text()) == perspectives + 1
+
+
+class TestPerspectiveReuse:
+    """回退迭代間的視角重用"""
+
+    def calls(self, fake_claude):
+        return len((fake_claude.parent / "calls").read_text())
+
+    def test_unchanged_inputs_reuse_everything(self, runner, monkeypatch, fake_claude):
+        set_policy(monkeypatch, quorum=None, deadline_seconds=None)
+        first = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID, "iteration": 0})
+        calls = self.calls(fake_claude)
+
+        second = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID, "iteration": 1})
+
+        assert second.success
+        assert len(second.perspectives_reused) == 4
+        assert self.calls(fake_claude) == calls
+        assert second.outputs == first.outputs
+        reuse = [a for a in read_actions(runner) if a["action"] == "stage_reuse"]
+        assert reuse[-1]["details"]["synthesis_reused"] is True
+
+    def test_changed_fingerprint_reruns_only_that_perspective(
+        self, runner, monkeypatch, fake_claude
+    ):
+        set_policy(monkeypatch, quorum=None, deadline_seconds=None)
+        first = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+        calls = self.calls(fake_claude)
+
+        stale = first.outputs["perspective_architecture"]
+        meta = runner.memory.read_json(stale.replace(".json", ".meta.json"))
+        meta["fingerprint"] = "stale"
+        runner.memory.write_json(stale.replace(".json", ".meta.json"), meta)
+
+        second = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+
+        assert "architecture" not in second.perspectives_reused
+        assert len(second.perspectives_reused) == 3
+        # 重新執行 1 個視角 + 綜合
+        assert self.calls(fake_claude) == calls + 2
+
+    def test_changed_implementation_invalidates_review(self, runner, fake_claude, tmp_path):
+        implementation = tmp_path / "implementation.md"
+        implementation.write_text("v1")
+        context = {
+            "workflow_id": WORKFLOW_ID,
+            "implement_outputs": {"implementation": str(implementation)},
+        }
+        runner.run(StageID.REVIEW, {**context, "iteration": 0})
+        calls = self.calls(fake_claude)
+
+        implementation.write_text("v2")
+        second = runner.run(StageID.REVIEW, {**context, "iteration": 1})
+
+        assert second.perspectives_reused == []
+        assert self.calls(fake_claude) == calls + 5  # 4 個視角 + 綜合
+
+    def test_reuse_disabled_reruns(self, runner, monkeypatch, fake_claude):
+        set_policy(monkeypatch, quorum=None, deadline_seconds=None)
+        runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID})
+        calls = self.calls(fake_claude)
+
+        result = runner.run(StageID.RESEARCH, {"workflow_id": WORKFLOW_ID}, reuse=False)
+
+        assert result.perspectives_reused == []
+        assert self.calls(fake_claude) == calls + 5
+
+
+class TestTaskDag:
+    """IMPLEMENT 階段依 tasks.yaml 執行任務"""
+
+    TASK_REPORT = {"task_id": "T", "status": "planned", "summary": "ok"}
+
+    def calls(self, fake_claude):
+        return len((fake_claude.parent / "calls").read_text())
+
+    def context(self, tmp_path):
+        tasks_file = tmp_path / "tasks.yaml"
+        tasks_file.write_text(
+            "tasks:\n"
+            "  - {id: SETUP-001, name: a, wave: 1}\n"
+            "  - {id: CORE-001, name: b, wave: 2, dependencies: [SETUP-001]}\n"
+            "  - {id: CORE-002, name: c, wave: 2, dependencies: [SETUP-001]}\n",
+            encoding="utf-8",
+        )
+        return {"workflow_id": WORKFLOW_ID, "tasks_outputs": {"tasks": str(tasks_file)}}
+
+    def test_runs_tasks_and_reuses_on_rerun(self, runner, monkeypatch, fake_claude, tmp_path):
+        monkeypatch.setenv(
+            "FAKE_CLAUDE_OUTPUT", "```json\n" + json.dumps(self.TASK_REPORT) + "\n```"
+        )
+        context = self.context(tmp_path)
+
+        first = runner.run(StageID.IMPLEMENT, context)
+
+        assert first.success
+        assert (first.tasks_total, first.tasks_completed, first.tasks_failed) == (3, 3, [])
+        assert "implementation" in first.outputs
+        calls = self.calls(fake_claude)
+        assert calls == 3
+
+        second = runner.run(StageID.IMPLEMENT, {**context, "iteration": 1})
+
+        assert second.tasks_completed == 3
+        assert self.calls(fake_claude) == calls
+
+    def test_without_tasks_falls_back_to_perspectives(self, runner, fake_claude):
+        result = runner.run(StageID.IMPLEMENT, {"workflow_id": WORKFLOW_ID})
+
+        assert result.tasks_total == 0
+        assert result.perspectives_succeeded > 0
+
+
+class TestQuorumGate:
+    """閘門的 quorum 條件"""
+
+    def test_quorum_not_met_fails_gate(self):
+        result = StageResult(
+            stage_id=StageID.PLAN,
+            success=True,
+            outputs={"plan": "x"},
+            quality_score=95.0,
+            perspectives_total=4,
+            perspectives_succeeded=2,
+            quorum=3,
+        )
+        gate = QualityGate().check(StageID.PLAN, result)
+
+        assert not gate.passed
+        assert "quorum_met" in gate.failed_criteria
+
+    def test_partial_details(self):
+        result = StageResult(
+            stage_id=StageID.PLAN,
+            success=True,
+            outputs={"plan": "x"},
+            quality_score=95.0,
+            perspectives_total=4,
+            perspectives_succeeded=3,
+            perspectives_cancelled=["ux_designer"],
+            early_completion="quorum",
+            quorum=3,
+        )
+        gate = QualityGate().check(StageID.PLAN, result)
+
+        assert gate.passed
+        assert gate.details["early_completion"] == "quorum"
@@ -0,0 +1,122 @@
+"""StreamReader 與串流模式測試"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from cli.io.cache import ResponseCache
+from cli.orchestrator.agent_caller import AgentCaller
+from cli.orchestrator.engine import AgentEngine
+from cli.orchestrator.errors import AgentError
+from cli.orchestrator.scheduler import AgentScheduler
+from cli.orchestrator.streaming import StreamLimits, StreamReader
+
+
+def stream_lines(*events) -> bytes:
+    """組成 stream-json 輸出"""
+    return "".join(json.dumps(e) + "\n" for e in events).encode("utf-8")
+
+
+ASSISTANT_TOOL = {
+    "type": "assistant",
+    "message": {"content": [{"type": "tool_use", "name": "Read"}]},
+}
+RESULT = {"type": "result", "subtype": "success", "result": '```json\n{"ok": true}\n```'}
+
+
+async def feed_reader(reader: StreamReader, data: bytes) -> str:
+    """以 asyncio.StreamReader 餵入資料"""
+    stream = asyncio.StreamReader()
+    stream.feed_data(data)
+    stream.feed_eof()
+    return await reader.read(stream)
+
+
+class TestStreamReader:
+    """StreamReader 測試"""
+
+    async def test_stops_at_result_event(self):
+        """測試讀到 result 事件即停止"""
+        events = []
+        reader = StreamReader("stream-json", on_event=events.append)
+        data = stream_lines(ASSISTANT_TOOL, RESULT) + b"this line is never read\n"
+
+        output = await feed_reader(reader, data)
+
+        assert reader.done
+        assert '"ok": true' in output
+        assert [e["kind"] for e in events] == ["tool_use", "result"]
+        assert events[0]["tool"] == "Read"
+
+    async def test_text_mode_stops_at_complete_json_block(self):
+        """測試 text 模式讀到完整 JSON 區塊即停止"""
+        reader = StreamReader("text")
+        data = b"thinking...\n```json\n{\"a\": 1}\n```\ntrailing\n"
+
+        output = await feed_reader(reader, data)
+
+        assert reader.done
+        assert output.endswith("```\n")
+
+    async def test_output_limit(self):
+        """測試輸出超過上限"""
+        reader = StreamReader("text", StreamLimits(max_output_bytes=10))
+
+        with pytest.raises(AgentError) as exc_info:
+            await feed_reader(reader, b"x" * 20 + b"\n")
+        assert exc_info.value.details["kind"] == "output_limit"
+
+    async def test_garbage_detection(self):
+        """測試大量無法解析的行"""
+        reader = StreamReader("stream-json", StreamLimits(max_garbage_lines=2))
+
+        with pytest.raises(AgentError) as exc_info:
+            await feed_reader(reader, b"garbage\n" * 5)
+        assert exc_info.value.details["kind"] == "garbage"
+
+    async def test_idle_timeout(self):
+        """測試長時間無輸出視為卡住"""
+        reader = StreamReader("stream-json", StreamLimits(idle_timeout=0.05))
+        stream = asyncio.StreamReader()
+
+        with pytest.raises(AgentError) as exc_info:
+            await reader.read(stream)
+        assert exc_info.value.details["kind"] == "stalled"
+
+    async def test_error_result(self):
+        """測試 result 事件回報錯誤"""
+        reader = StreamReader("stream-json")
+        data = stream_lines({"type": "result", "is_error": True, "result": "boom"})
+
+        with pytest.raises(AgentError):
+            await feed_reader(reader, data)
+
+
+class TestStreamingCaller:
+    """串流模式 AgentCaller 測試"""
+
+    def test_returns_before_process_exits(self, fake_claude, tmp_path, monkeypatch):
+        """測試取得結果後不等待子程序結束"""
+        monkeypatch.setenv("FAKE_CLAUDE_OUTPUT", stream_lines(ASSISTANT_TOOL, RESULT).decode())
+        monkeypatch.setenv("FAKE_CLAUDE_TAIL_SLEEP", "10")
+        engine = AgentEngine()
+        caller = AgentCaller(
+            engine=engine,
+            scheduler=AgentScheduler(rate_limits={"sonnet": None}),
+            cache=ResponseCache(tmp_path / "cache"),
+            streaming=True,
+        )
+        events = []
+
+        try:
+            start = time.time()
+            response = caller.call("hi", on_event=events.append)
+        finally:
+            engine.shutdown()
+
+        assert response.success
+        assert response.content == {"ok": True}
+        assert time.time() - start < 5
+        assert events[-1]["kind"] == "result"
@@ -0,0 +1,83 @@
+"""部分綜合合併測試"""
+
+from cli.config.models import StageID
+from cli.orchestrator.synthesis import merge_syntheses
+
+
+def partial(score, points=(), insights=(), conflicts=(), actions=()):
+    return {
+        "consensus": {"score": score, "points": list(points)},
+        "key_insights": list(insights),
+        "conflicts": list(conflicts),
+        "action_items": list(actions),
+    }
+
+
+class TestMergeSyntheses:
+    """merge_syntheses 測試"""
+
+    def test_weighted_consensus(self):
+        merged = merge_syntheses(StageID.RESEARCH, [
+            (["a", "b", "c"], partial(0.9, points=["Use Postgres"])),
+            (["d"], partial(0.5, points=["use  postgres", "Cache reads"])),
+        ])
+
+        assert merged["consensus"]["score"] == 0.8
+        assert merged["consensus"]["points"] == ["Use Postgres", "Cache reads"]
+        assert merged["stage_id"] == StageID.RESEARCH.value
+        assert merged["partial_syntheses"] == 2
+
+    def test_insights_merge_sources_and_confidence(self):
+        merged = merge_syntheses(StageID.RESEARCH, [
+            (["a"], partial(1, insights=[
+                {"insight": "Latency matters", "source_perspectives": ["a"], "confidence": "low"},
+            ])),
+            (["b"], partial(1, insights=[
+                {"insight": "latency matters", "source_perspectives": ["b"], "confidence": "high"},
+                {"insight": "Other", "source_perspectives": ["b"], "confidence": "medium"},
+            ])),
+        ])
+
+        insights = merged["key_insights"]
+        assert len(insights) == 2
+        assert insights[0]["source_perspectives"] == ["a", "b"]
+        assert insights[0]["confidence"] == "high"
+
+    def test_conflicts_merge_by_topic(self):
+        merged = merge_syntheses(StageID.RESEARCH, [
+            (["a"], partial(1, conflicts=[
+                {"topic": "DB", "perspectives": [{"perspective_id": "a", "position": "SQL"}]},
+            ])),
+            (["b"], partial(1, conflicts=[
+                {"topic": "db", "perspectives": [{"perspective_id": "b", "position": "NoSQL"}],
+                 "resolution": "SQL"},
+            ])),
+        ])
+
+        (conflict,) = merged["conflicts"]
+        assert [p["perspective_id"] for p in conflict["perspectives"]] == ["a", "b"]
+        assert conflict["resolution"] == "SQL"
+
+    def test_actions_keep_highest_priority_and_sort(self):
+        merged = merge_syntheses(StageID.RESEARCH, [
+            (["a"], partial(1, actions=[
+                {"action": "Add index", "priority": "low"},
+                {"action": "Write docs", "priority": "medium"},
+            ])),
+            (["b"], partial(1, actions=[{"action": "add index", "priority": "critical"}])),
+        ])
+
+        assert [(a["action"], a["priority"]) for a in merged["action_items"]] == [
+            ("Add index", "critical"),
+            ("Write docs", "medium"),
+        ]
+
+    def test_stage_specific_keys_carried_through(self):
+        merged = merge_syntheses(StageID.RESEARCH, [
+            (["a"], {**partial(1), "metadata": {"total": 1}, "sources": ["x"]}),
+            (["b"], {**partial(1), "metadata": {"total": 2}}),
+        ])
+
+        assert merged["metadata"] == {"total": 2}
+        assert merged["sources"] == ["x"]
+        assert merged["stage_id"] == StageID.RESEARCH.value
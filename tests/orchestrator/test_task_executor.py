@@ -0,0 +1,216 @@
+"""DAG 任務執行器測試"""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from cli.orchestrator.errors import ValidationError
+from cli.orchestrator.retry import RetryPolicy
+from cli.orchestrator.task_executor import (
+    TaskExecutor,
+    critical_path_lengths,
+    load_tasks,
+)
+
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+
+TASK_REPORT = {"task_id": "t", "status": "planned", "summary": "implemented"}
+
+
+@pytest.fixture
+def caller_options():
+    """輸出任務報告、不重試"""
+    return {"output": TASK_REPORT, "retry_policy": RetryPolicy(max_attempts=1)}
+
+
+# 啟用回應快取的 caller
+CACHED_OPTIONS = {"output": TASK_REPORT, "retry_policy": RetryPolicy(max_attempts=1), "use_cache": True}
+
+
+def task(task_id, *deps, minutes=None, **extra):
+    data = {"id": task_id, "title": task_id, "depends_on": list(deps), **extra}
+    if minutes is not None:
+        data["estimate_minutes"] = minutes
+    return data
+
+
+class TestLoadTasks:
+    """任務 DAG 載入"""
+
+    def test_sample_file(self):
+        tasks = load_tasks(FIXTURES / "sample_tasks.yaml")
+        assert [t["id"] for t in tasks][:2] == ["SETUP-001", "TEST-001"]
+
+    def test_cycle_rejected(self):
+        with pytest.raises(ValidationError) as exc:
+            load_tasks({"tasks": [task("A", "B"), task("B", "A")]})
+        assert exc.value.validator == "dag"
+        assert any("循環" in e for e in exc.value.errors)
+
+    def test_missing_tasks_list(self):
+        with pytest.raises(ValidationError):
+            load_tasks({"metadata": {}})
+
+
+class TestCriticalPath:
+    """關鍵路徑"""
+
+    def test_weighted_longest_path(self):
+        lengths = critical_path_lengths([
+            task("A", minutes=10),
+            task("B", "A", minutes=5),
+            task("C", minutes=1),
+        ])
+        assert lengths == {"A": 15.0, "B": 5.0, "C": 1.0}
+
+
+class TestTaskExecutor:
+    """任務執行"""
+
+    def test_critical_path_first_and_dependencies_respected(self, caller):
+        started = []
+        tasks = [
+            task("SHORT", minutes=1),
+            task("LONG", minutes=10),
+            task("AFTER", "LONG", minutes=10),
+        ]
+
+        results = TaskExecutor(caller, max_parallel=1).execute(
+            tasks, {}, on_start=started.append
+        )
+
+        assert started == ["LONG", "AFTER", "SHORT"]
+        assert all(r.success for r in results.values())
+        assert results["AFTER"].attempts == 1
+
+    def test_bounded_parallelism(self, caller, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_SLEEP", "0.3")
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def on_start(task_id):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+
+        def on_result(task_id, result):
+            with lock:
+                active[0] -= 1
+
+        tasks = [task(f"T{i}") for i in range(5)]
+        results = TaskExecutor(caller, max_parallel=2).execute(
+            tasks, {}, on_start=on_start, on_result=on_result
+        )
+
+        assert len(results) == 5
+        assert peak[0] == 2
+
+    def test_retry_then_success(self, caller, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_FAIL_FIRST", "1")
+
+        results = TaskExecutor(caller, max_attempts=2).execute([task("A")], {})
+
+        assert results["A"].success
+        assert results["A"].attempts == 2
+
+    def test_failure_skips_dependents(self, caller, monkeypatch):
+        monkeypatch.setenv("FAKE_CLAUDE_FAIL_FIRST", "2")
+        tasks = [
+            task("A", minutes=10),
+            task("B", "A"),
+            task("C", "B"),
+            task("D", minutes=1),
+        ]
+
+        results = TaskExecutor(caller, max_parallel=1, max_attempts=2).execute(tasks, {})
+
+        assert results["A"].status == "failed"
+        assert results["A"].attempts == 2
+        assert results["B"].status == "skipped" and results["B"].blocked_by == "A"
+        assert results["C"].status == "skipped" and results["C"].blocked_by == "A"
+        assert results["D"].success
+
+    def test_blocked_report_is_failure(self, caller, monkeypatch):
+        monkeypatch.setenv(
+            "FAKE_CLAUDE_OUTPUT",
+            json.dumps({"task_id": "A", "status": "blocked", "summary": "", "notes": "no db"}),
+        )
+
+        results = TaskExecutor(caller, max_attempts=1).execute([task("A")], {})
+
+        assert results["A"].status == "failed"
+        assert results["A"].error == "no db"
+
+    @pytest.mark.parametrize("caller_options", [CACHED_OPTIONS])
+    def test_blocked_report_retried_and_never_cached(self, caller, monkeypatch, fake_claude):
+        monkeypatch.setenv(
+            "FAKE_CLAUDE_OUTPUT",
+            json.dumps({"task_id": "A", "status": "blocked", "summary": "", "notes": "no db"}),
+        )
+        calls = fake_claude.parent / "calls"
+
+        results = TaskExecutor(caller, max_attempts=3).execute([task("A")], {})
+
+        assert results["A"].attempts == 3
+        assert len(calls.read_text()) == 3
+
+        # 重跑同一階段：blocked 回報不在快取中，仍實際調用
+        TaskExecutor(caller, max_attempts=1).execute([task("A")], {})
+        assert len(calls.read_text()) == 4
+
+    @pytest.mark.parametrize("caller_options", [CACHED_OPTIONS])
+    def test_completed_report_cached(self, caller, fake_claude):
+        for _ in range(2):
+            results = TaskExecutor(caller, max_attempts=1).execute([task("A")], {})
+            assert results["A"].success
+
+        assert len((fake_claude.parent / "calls").read_text()) == 1
+
+    def test_completed_tasks_not_executed(self, caller, fake_claude):
+        tasks = [
+            task("SETUP-001", status="completed"),
+            task("SETUP-002", "SETUP-001", status="completed"),
+            task("A", "SETUP-002"),
+        ]
+
+        results = TaskExecutor(caller).execute(tasks, {})
+
+        assert results["SETUP-001"].attempts == results["SETUP-002"].attempts == 0
+        assert results["A"].success
+        assert len((fake_claude.parent / "calls").read_text()) == 1
+
+    def test_lookup_reuses_result(self, caller, fake_claude):
+        seen = {}
+
+        def lookup(t, dependency_results):
+            seen[t["id"]] = dependency_results
+            return {"summary": "cached"} if t["id"] == "A" else None
+
+        results = TaskExecutor(caller).execute(
+            [task("A"), task("B", "A")], {}, lookup=lookup
+        )
+
+        assert results["A"].reused
+        assert seen["B"] == {"A": {"summary": "cached"}}
+        assert len((fake_claude.parent / "calls").read_text()) == 1
+
+    def test_callbacks_run_off_the_event_loop(self, caller):
+        threads = []
+
+        def record(*args):
+            threads.append(threading.current_thread())
+
+        TaskExecutor(caller, max_attempts=1).execute(
+            [task("A"), task("B", "A")],
+            {},
+            on_start=record,
+            on_result=record,
+            lookup=lambda t, deps: record(),
+        )
+
+        assert len(threads) == 6  # 開始、查詢、結果各 2 次
+        assert caller.engine._thread not in threads
@@ -0,0 +1,159 @@
+"""Workflow 檢查點、恢復與工作佇列測試"""
+
+import pytest
+
+from cli.config.models import StageID, WorkflowConfig, WorkflowStatus
+from cli.config.perspectives import get_stage_perspectives
+from cli.orchestrator.errors import WorkflowError
+from cli.orchestrator.stage_runner import StageRunner
+from cli.orchestrator.workflow import Workflow, recover_workflows
+
+
+class Crash(BaseException):
+    """模擬程序中斷（不被工作流的 except Exception 攔截）"""
+
+
+def calls(counter):
+    return len(counter.read_text()) if counter.exists() else 0
+
+
+class TestResume:
+    """恢復測試"""
+
+    def test_crash_in_verify_resumes_same_workflow(self, env, fake_claude, monkeypatch):
+        memory, caller = env
+        counter = fake_claude.parent / "calls"
+        original = StageRunner._generate_synthesis
+
+        def crash_in_verify(self, stage_id, results, context):
+            if stage_id == StageID.VERIFY:
+                raise Crash()
+            return original(self, stage_id, results, context)
+
+        monkeypatch.setattr(StageRunner, "_generate_synthesis", crash_in_verify)
+        workflow = Workflow(WorkflowConfig(topic="resume"), memory=memory, caller=caller)
+        with pytest.raises(Crash):
+            workflow.run()
+        monkeypatch.setattr(StageRunner, "_generate_synthesis", original)
+        before = calls(counter)
+
+        resumed = Workflow.load(workflow.workflow_id, memory=memory, caller=caller)
+        assert resumed.workflow_id == workflow.workflow_id
+        assert resumed.next_stage == StageID.VERIFY
+        assert list(resumed.stage_results) == [
+            "RESEARCH", "PLAN", "TASKS", "IMPLEMENT", "REVIEW",
+        ]
+
+        result = resumed.resume()
+
+        assert result.success
+        assert result.workflow_id == workflow.workflow_id
+        assert len(result.stage_results) == 6
+        # VERIFY 的視角報告已在中斷前保存：只重新執行綜合
+        assert calls(counter) == before + 1
+        assert result.stage_results["VERIFY"].perspectives_reused == sorted(
+            p.id for p in get_stage_perspectives(StageID.VERIFY)
+        )
+        meta = memory.read_yaml(memory.get_workflow_dir(workflow.workflow_id) / "meta.yaml")
+        assert meta["status"] == "completed"
+        assert meta["checkpoint"]["next_stage"] is None
+
+    def test_checkpoint_restores_iteration_and_rollback_history(self, env):
+        memory, caller = env
+        workflow = Workflow(WorkflowConfig(topic="history"), memory=memory, caller=caller)
+        workflow.iteration = 2
+        workflow._stage_idx = 3
+        workflow._refresh_stage = StageID.IMPLEMENT
+        workflow.rollback_manager.error_history["REVIEW"].append("REVIEW:blockers")
+        workflow.rollback_manager.stage_transitions.append((StageID.REVIEW, StageID.IMPLEMENT))
+        workflow._save_checkpoint()
+
+        resumed = Workflow.load(workflow.workflow_id, memory=memory, caller=caller)
+
+        assert resumed.iteration == 2
+        assert resumed.next_stage == StageID.IMPLEMENT
+        assert resumed._refresh_stage == StageID.IMPLEMENT
+        assert resumed.rollback_manager.get_history() == workflow.rollback_manager.get_history()
+
+    def test_from_stage_forces_rerun(self, env):
+        memory, caller = env
+        workflow = Workflow(WorkflowConfig(topic="done"), memory=memory, caller=caller)
+        assert workflow.run().success
+
+        resumed = Workflow.load(workflow.workflow_id, memory=memory, caller=caller)
+        assert resumed.next_stage is None
+        assert resumed.status == WorkflowStatus.COMPLETED
+
+        result = resumed.resume(StageID.VERIFY)
+        assert result.success
+        assert result.stage_results["VERIFY"].perspectives_reused == []
+
+    def test_unknown_workflow(self, env):
+        memory, caller = env
+        with pytest.raises(WorkflowError):
+            Workflow.load("missing", memory=memory, caller=caller)
+
+
+class TestJobQueue:
+    """工作佇列整合"""
+
+    def test_run_leases_workflow_and_stages(self, env):
+        memory, caller = env
+        workflow = Workflow(WorkflowConfig(topic="queued", priority=3), memory=memory, caller=caller)
+        assert workflow.run().success
+
+        job = workflow.queue.find("workflow", workflow.workflow_id)
+        assert (job.status, job.priority, job.lease_owner) == ("done", 3, None)
+        stages = workflow.queue.list(workflow_id=workflow.workflow_id, kind="stage")
+        assert [j.key for j in stages] == [
+            "RESEARCH", "PLAN", "TASKS", "IMPLEMENT", "REVIEW", "VERIFY",
+        ]
+        assert {j.status for j in stages} == {"done"}
+
+    def test_run_releases_logger_and_tracker(self, env):
+        from cli.io import logging as logging_module, state as state_module
+
+        memory, caller = env
+        workflow = Workflow(WorkflowConfig(topic="released"), memory=memory, caller=caller)
+        assert workflow.run().success
+
+        assert workflow.workflow_id not in logging_module._loggers
+        assert workflow.workflow_id not in state_module._trackers
+        assert workflow.logger.writer._handle is None
+        assert workflow.logger.writer._thread is None
+
+    def test_crashed_workflow_is_recovered(self, env, fake_claude, monkeypatch):
+        memory, caller = env
+        counter = fake_claude.parent / "calls"
+        original = StageRunner._generate_synthesis
+
+        def crash_in_review(self, stage_id, results, context):
+            if stage_id == StageID.REVIEW:
+                raise Crash()
+            return original(self, stage_id, results, context)
+
+        monkeypatch.setattr(StageRunner, "_generate_synthesis", crash_in_review)
+        workflow = Workflow(WorkflowConfig(topic="crash"), memory=memory, caller=caller)
+        with pytest.raises(Crash):
+            workflow.run()
+        monkeypatch.setattr(StageRunner, "_generate_synthesis", original)
+
+        queue = workflow.queue
+        assert queue.find("workflow", workflow.workflow_id).status == "queued"
+        assert queue.find("stage", workflow.workflow_id, "REVIEW").status == "queued"
+
+        results = recover_workflows(memory=memory, caller=caller, queue=queue)
+
+        assert [r.workflow_id for r in results] == [workflow.workflow_id]
+        assert results[0].success
+        assert queue.find("workflow", workflow.workflow_id).status == "done"
+        assert recover_workflows(memory=memory, caller=caller, queue=queue) == []
+
+    def test_live_lease_blocks_second_runner(self, env):
+        memory, caller = env
+        workflow = Workflow(WorkflowConfig(topic="busy"), memory=memory, caller=caller)
+        job_id = workflow.queue.enqueue("workflow", workflow.workflow_id)
+        workflow.queue.claim_job(job_id, "other-host:1:1")
+
+        with pytest.raises(WorkflowError):
+            Workflow.load(workflow.workflow_id, memory=memory, caller=caller).resume()